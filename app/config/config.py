@@ -12,6 +12,131 @@ AZ_COSMOS_DB_CONTAINER_NAME = "FormDataContainer"
 AZ_COSMOS_DB_PARTITION_KEY = "FormData"
 # Azure SQL DB 関連
 AZ_SQL_DB_CONNECTION_STRING = os.getenv("AZ_SQL_DB_CONNECTION_STRING")
+# 起動時にテーブル定義とDBスキーマの一致を検証するか
+SCHEMA_CHECK_ENABLED = os.getenv("SCHEMA_CHECK_ENABLED", "true").lower() == "true"
+# スキーマ不一致時に起動を中止するか（false の場合はエラーログのみ）
+SCHEMA_CHECK_STRICT = os.getenv("SCHEMA_CHECK_STRICT", "false").lower() == "true"
+# アウトボックスワーカー関連
+OUTBOX_WORKER_ENABLED = os.getenv("OUTBOX_WORKER_ENABLED", "true").lower() == "true"
+OUTBOX_POLL_INTERVAL_SECONDS = float(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "2"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "20"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "120"))
+# 予約時にイベント登録をその場で実行して会議URLを返すまで待つ秒数（超えた場合は受付のみ返す）
+# 既定の 0 では待たず、SQL のコミットだけで応答する（会議URLは確認メールで送る）。待たせる場合のみ明示的に指定する
+APPOINTMENT_EVENT_WAIT_SECONDS = float(os.getenv("APPOINTMENT_EVENT_WAIT_SECONDS", "0"))
+# メール通知キュー関連（永続化のためボリュームをマウントしたパスを指定すること）
+NOTIFICATION_QUEUE_PATH = os.getenv("NOTIFICATION_QUEUE_PATH", "data/notification_queue.sqlite3")
+NOTIFICATION_MAX_CONCURRENCY = int(os.getenv("NOTIFICATION_MAX_CONCURRENCY", "4"))
+NOTIFICATION_RATE_PER_SECOND = float(os.getenv("NOTIFICATION_RATE_PER_SECOND", "4"))
+NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", "50"))
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "8"))
+NOTIFICATION_LEASE_SECONDS = float(os.getenv("NOTIFICATION_LEASE_SECONDS", "120"))
+NOTIFICATION_POLL_INTERVAL_SECONDS = float(os.getenv("NOTIFICATION_POLL_INTERVAL_SECONDS", "2"))
+NOTIFICATION_RETENTION_SECONDS = float(os.getenv("NOTIFICATION_RETENTION_SECONDS", str(7 * 24 * 3600)))
+# 従業員一覧キャッシュの有効期間（秒）
+EMPLOYEE_DIRECTORY_CACHE_TTL_SECONDS = int(os.getenv("EMPLOYEE_DIRECTORY_CACHE_TTL_SECONDS", "600"))
+# イベントループ遅延の監視（しきい値を超えてブロックした場合にスタックを出力する）
+LOOP_LAG_MONITOR_ENABLED = os.getenv("LOOP_LAG_MONITOR_ENABLED", "true").lower() == "true"
+LOOP_LAG_INTERVAL_SECONDS = float(os.getenv("LOOP_LAG_INTERVAL_SECONDS", "0.1"))
+LOOP_LAG_THRESHOLD_SECONDS = float(os.getenv("LOOP_LAG_THRESHOLD_SECONDS", "0.2"))
+# トレースの出力先（none / stdout / file）とサンプリング率（0.0〜1.0）
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_FILE_PATH = os.getenv("TRACE_FILE_PATH", "data/traces.jsonl")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+# ログ設定（LOG_FORMAT は json / text、LOG_SAMPLING は "ロガー名=割合" のカンマ区切り）
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")
+# ログに出力するペイロード要約の最大文字数
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "1000"))
+# SQLAlchemy の発行SQLをすべてログ出力するか（デバッグ用）
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() == "true"
+# レスポンス圧縮（この値未満のレスポンスは圧縮しない）
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+# 実際のリクエストの記録（リプレイ用）。個人情報はハッシュ化し、ファイルサイズでローテーションする
+REQUEST_CAPTURE_ENABLED = os.getenv("REQUEST_CAPTURE_ENABLED", "false").lower() == "true"
+REQUEST_CAPTURE_PATH = os.getenv("REQUEST_CAPTURE_PATH", "data/capture/requests.jsonl")
+REQUEST_CAPTURE_MAX_BYTES = int(os.getenv("REQUEST_CAPTURE_MAX_BYTES", str(50 * 1024 * 1024)))
+REQUEST_CAPTURE_BACKUP_COUNT = int(os.getenv("REQUEST_CAPTURE_BACKUP_COUNT", "5"))
+REQUEST_CAPTURE_SAMPLE_RATE = float(os.getenv("REQUEST_CAPTURE_SAMPLE_RATE", "1.0"))
+REQUEST_CAPTURE_MAX_BODY_BYTES = int(os.getenv("REQUEST_CAPTURE_MAX_BODY_BYTES", str(256 * 1024)))
+# 個人情報のハッシュに使う秘密値（同じ人物は同じ値に置き換わるが、元の値は推測できないようにする）
+# 未設定の場合は REQUEST_CAPTURE_ENABLED=true でも記録しない
+REQUEST_CAPTURE_HASH_SECRET = os.getenv("REQUEST_CAPTURE_HASH_SECRET", "")
+# キャッシュのバックエンド（memory: プロセス内LRU / sqlite: 同一ホストのワーカー間で共有 / redis: レプリカ間で共有）
+# キャッシュごとに *_CACHE_BACKEND で個別に選べる（未指定の場合は CACHE_BACKEND）
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_MEMORY_MAX_ENTRIES = int(os.getenv("CACHE_MEMORY_MAX_ENTRIES", "10000"))
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "data/cache.sqlite3")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+# Graph API のアクセストークン（有効期限の MARGIN 秒前まで使い回す）。
+# トークンを平文でファイルや Redis に書き出さないよう、常にプロセス内（memory）に保持する
+TOKEN_CACHE_MARGIN_SECONDS = float(os.getenv("TOKEN_CACHE_MARGIN_SECONDS", "300"))
+# 担当者・日付ごとの空き時間（getSchedule の結果）。予定の登録・変更・削除時に担当者単位で無効化する。0 で無効
+# 無効化が他のワーカーに届かないと予約済みの枠を空きとして返すため、sqlite（同一ホストのワーカー間）/
+# redis（レプリカ間）と組み合わせた場合のみ有効になる
+FREEBUSY_CACHE_BACKEND = os.getenv("FREEBUSY_CACHE_BACKEND", CACHE_BACKEND)
+FREEBUSY_CACHE_TTL_SECONDS = float(os.getenv("FREEBUSY_CACHE_TTL_SECONDS", "0"))
+# フォームデータ（Cosmos DB）。更新時の無効化が他のワーカーに届くよう、sqlite / redis と組み合わせた場合のみ有効になる。0 で無効
+FORM_CACHE_BACKEND = os.getenv("FORM_CACHE_BACKEND", CACHE_BACKEND)
+FORM_CACHE_TTL_SECONDS = float(os.getenv("FORM_CACHE_TTL_SECONDS", "0"))
+# Idempotency-Key の実行中の印と結果。ワーカー・レプリカ間で重複実行を防ぐには sqlite / redis を指定する
+# （memory はプロセス内のみ）。結果の保持期間（秒、0 で無効）、実行中の印の期限（秒、プロセス停止時にキーを解放する）、
+# 処理中の同一キーを待つ最大時間（秒）
+IDEMPOTENCY_CACHE_BACKEND = os.getenv("IDEMPOTENCY_CACHE_BACKEND", CACHE_BACKEND)
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+IDEMPOTENCY_LEASE_SECONDS = float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "300"))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "60"))
+# 起動直後の温め処理（SQLの接続プール、Cosmos DB の接続、従業員一覧キャッシュ）。完了するまで /readyz は 503 を返す
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "30"))
+WARMUP_SQL_CONNECTIONS = int(os.getenv("WARMUP_SQL_CONNECTIONS", "5"))
+WARMUP_EMPLOYEE_DIRECTORY = os.getenv("WARMUP_EMPLOYEE_DIRECTORY", "true").lower() == "true"
+# リクエスト単位のプロファイル取得。PROFILING_SECRET を設定した場合のみ有効になり、
+# X-Profile-Secret ヘッダーに同じ値を指定したリクエストだけを計測して PROFILING_DIR に保存する
+PROFILING_SECRET = os.getenv("PROFILING_SECRET", "")
+PROFILING_DIR = os.getenv("PROFILING_DIR", "data/profiles")
+PROFILING_INTERVAL_SECONDS = float(os.getenv("PROFILING_INTERVAL_SECONDS", "0.001"))
+# POST /availability/batch で受け付ける検索数の上限と、getSchedule の同時呼び出し数
+AVAILABILITY_BATCH_MAX_REQUESTS = int(os.getenv("AVAILABILITY_BATCH_MAX_REQUESTS", "50"))
+AVAILABILITY_BATCH_CONCURRENCY = int(os.getenv("AVAILABILITY_BATCH_CONCURRENCY", "8"))
+# POST /store_form_data/bulk で受け付けるフォーム数の上限、1回のトランザクションバッチの件数
+# （Cosmos DB の上限は100件）とバッチの同時実行数
+FORM_BULK_MAX_ITEMS = int(os.getenv("FORM_BULK_MAX_ITEMS", "500"))
+FORM_BULK_BATCH_SIZE = min(int(os.getenv("FORM_BULK_BATCH_SIZE", "100")), 100)
+FORM_BULK_CONCURRENCY = int(os.getenv("FORM_BULK_CONCURRENCY", "4"))
+# 担当者の予定のローカルミラー（calendarView/delta で同期し、空き時間を Graph API を呼ばずに計算する）
+# 同期は前日から WEEKS 週間先まで、SYNC_INTERVAL 秒ごと。最終同期から MAX_STALENESS 秒を過ぎた担当者は getSchedule で取得する。
+# MAILBOXES（カンマ区切り）は起動時に同期対象に登録する担当者。それ以外は空き時間の検索で使われた時点で登録する
+# ミラーはホストごとの SQLite で、予定の変更による無効化（mark_stale）も同じホストにしか届かないため、
+# APP_REPLICAS が2以上の場合は有効にしない（他のレプリカで変更した予定を MAX_STALENESS 秒まで古いまま返すため）
+APP_REPLICAS = int(os.getenv("APP_REPLICAS", "1"))
+CALENDAR_MIRROR_ENABLED = os.getenv("CALENDAR_MIRROR_ENABLED", "false").lower() == "true"
+CALENDAR_MIRROR_PATH = os.getenv("CALENDAR_MIRROR_PATH", "data/calendar_mirror.sqlite3")
+CALENDAR_MIRROR_WEEKS = int(os.getenv("CALENDAR_MIRROR_WEEKS", "4"))
+CALENDAR_MIRROR_SYNC_INTERVAL_SECONDS = float(os.getenv("CALENDAR_MIRROR_SYNC_INTERVAL_SECONDS", "60"))
+CALENDAR_MIRROR_MAX_STALENESS_SECONDS = float(os.getenv("CALENDAR_MIRROR_MAX_STALENESS_SECONDS", "120"))
+CALENDAR_MIRROR_MAX_MAILBOXES = int(os.getenv("CALENDAR_MIRROR_MAX_MAILBOXES", "500"))
+CALENDAR_MIRROR_CONCURRENCY = int(os.getenv("CALENDAR_MIRROR_CONCURRENCY", "4"))
+CALENDAR_MIRROR_LEASE_SECONDS = float(os.getenv("CALENDAR_MIRROR_LEASE_SECONDS", "300"))
+CALENDAR_MIRROR_PAGE_SIZE = int(os.getenv("CALENDAR_MIRROR_PAGE_SIZE", "200"))
+CALENDAR_MIRROR_MAILBOXES = [
+    email.strip() for email in os.getenv("CALENDAR_MIRROR_MAILBOXES", "").split(",") if email.strip()
+]
+# Graph API 呼び出しの受付制御（コストは担当者数×日数＝getSchedule の呼び出し回数）
+# 全体と送信元ごとのトークンバケットで制限し、全体の容量のうち RESERVE の割合は候補者向けの画面に確保する
+GRAPH_ADMISSION_ENABLED = os.getenv("GRAPH_ADMISSION_ENABLED", "true").lower() == "true"
+GRAPH_ADMISSION_RATE_PER_SECOND = float(os.getenv("GRAPH_ADMISSION_RATE_PER_SECOND", "20"))
+GRAPH_ADMISSION_BURST = float(os.getenv("GRAPH_ADMISSION_BURST", "600"))
+GRAPH_ADMISSION_RESERVE = float(os.getenv("GRAPH_ADMISSION_RESERVE", "0.3"))
+GRAPH_CLIENT_RATE_PER_SECOND = float(os.getenv("GRAPH_CLIENT_RATE_PER_SECOND", "3"))
+GRAPH_CLIENT_BURST = float(os.getenv("GRAPH_CLIENT_BURST", "300"))
+GRAPH_ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("GRAPH_ADMISSION_MAX_WAIT_SECONDS", "10"))
+# 送信元の判定で信頼するリバースプロキシの数（X-Forwarded-For の末尾からこの数だけ数えた値を送信元とする。0 で接続元）
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "1"))
 # Azure AD認証関連
 TENANT_ID = os.getenv("TENANT_ID")
 CLIENT_ID = os.getenv("CLIENT_ID")
@@ -36,6 +161,88 @@ def get_config():
         "AZ_COSMOS_DB_CONTAINER_NAME": AZ_COSMOS_DB_CONTAINER_NAME,
         "AZ_COSMOS_DB_PARTITION_KEY": AZ_COSMOS_DB_PARTITION_KEY,
         "AZ_SQL_DB_CONNECTION_STRING": AZ_SQL_DB_CONNECTION_STRING,
+        "SCHEMA_CHECK_ENABLED": SCHEMA_CHECK_ENABLED,
+        "SCHEMA_CHECK_STRICT": SCHEMA_CHECK_STRICT,
+        "OUTBOX_WORKER_ENABLED": OUTBOX_WORKER_ENABLED,
+        "OUTBOX_POLL_INTERVAL_SECONDS": OUTBOX_POLL_INTERVAL_SECONDS,
+        "OUTBOX_BATCH_SIZE": OUTBOX_BATCH_SIZE,
+        "OUTBOX_MAX_ATTEMPTS": OUTBOX_MAX_ATTEMPTS,
+        "OUTBOX_LEASE_SECONDS": OUTBOX_LEASE_SECONDS,
+        "APPOINTMENT_EVENT_WAIT_SECONDS": APPOINTMENT_EVENT_WAIT_SECONDS,
+        "NOTIFICATION_QUEUE_PATH": NOTIFICATION_QUEUE_PATH,
+        "NOTIFICATION_MAX_CONCURRENCY": NOTIFICATION_MAX_CONCURRENCY,
+        "NOTIFICATION_RATE_PER_SECOND": NOTIFICATION_RATE_PER_SECOND,
+        "NOTIFICATION_BATCH_SIZE": NOTIFICATION_BATCH_SIZE,
+        "NOTIFICATION_MAX_ATTEMPTS": NOTIFICATION_MAX_ATTEMPTS,
+        "NOTIFICATION_LEASE_SECONDS": NOTIFICATION_LEASE_SECONDS,
+        "NOTIFICATION_POLL_INTERVAL_SECONDS": NOTIFICATION_POLL_INTERVAL_SECONDS,
+        "NOTIFICATION_RETENTION_SECONDS": NOTIFICATION_RETENTION_SECONDS,
+        "EMPLOYEE_DIRECTORY_CACHE_TTL_SECONDS": EMPLOYEE_DIRECTORY_CACHE_TTL_SECONDS,
+        "LOOP_LAG_MONITOR_ENABLED": LOOP_LAG_MONITOR_ENABLED,
+        "LOOP_LAG_INTERVAL_SECONDS": LOOP_LAG_INTERVAL_SECONDS,
+        "LOOP_LAG_THRESHOLD_SECONDS": LOOP_LAG_THRESHOLD_SECONDS,
+        "TRACE_EXPORTER": TRACE_EXPORTER,
+        "TRACE_FILE_PATH": TRACE_FILE_PATH,
+        "TRACE_SAMPLE_RATE": TRACE_SAMPLE_RATE,
+        "LOG_LEVEL": LOG_LEVEL,
+        "LOG_FORMAT": LOG_FORMAT,
+        "LOG_SAMPLING": LOG_SAMPLING,
+        "LOG_PAYLOAD_MAX_CHARS": LOG_PAYLOAD_MAX_CHARS,
+        "SQL_ECHO": SQL_ECHO,
+        "COMPRESSION_MINIMUM_SIZE": COMPRESSION_MINIMUM_SIZE,
+        "COMPRESSION_GZIP_LEVEL": COMPRESSION_GZIP_LEVEL,
+        "COMPRESSION_BROTLI_QUALITY": COMPRESSION_BROTLI_QUALITY,
+        "REQUEST_CAPTURE_ENABLED": REQUEST_CAPTURE_ENABLED,
+        "REQUEST_CAPTURE_PATH": REQUEST_CAPTURE_PATH,
+        "REQUEST_CAPTURE_MAX_BYTES": REQUEST_CAPTURE_MAX_BYTES,
+        "REQUEST_CAPTURE_BACKUP_COUNT": REQUEST_CAPTURE_BACKUP_COUNT,
+        "REQUEST_CAPTURE_SAMPLE_RATE": REQUEST_CAPTURE_SAMPLE_RATE,
+        "REQUEST_CAPTURE_MAX_BODY_BYTES": REQUEST_CAPTURE_MAX_BODY_BYTES,
+        "REQUEST_CAPTURE_HASH_SECRET": REQUEST_CAPTURE_HASH_SECRET,
+        "CACHE_BACKEND": CACHE_BACKEND,
+        "CACHE_MEMORY_MAX_ENTRIES": CACHE_MEMORY_MAX_ENTRIES,
+        "CACHE_SQLITE_PATH": CACHE_SQLITE_PATH,
+        "CACHE_REDIS_URL": CACHE_REDIS_URL,
+        "TOKEN_CACHE_MARGIN_SECONDS": TOKEN_CACHE_MARGIN_SECONDS,
+        "FREEBUSY_CACHE_BACKEND": FREEBUSY_CACHE_BACKEND,
+        "FREEBUSY_CACHE_TTL_SECONDS": FREEBUSY_CACHE_TTL_SECONDS,
+        "FORM_CACHE_BACKEND": FORM_CACHE_BACKEND,
+        "FORM_CACHE_TTL_SECONDS": FORM_CACHE_TTL_SECONDS,
+        "IDEMPOTENCY_CACHE_BACKEND": IDEMPOTENCY_CACHE_BACKEND,
+        "IDEMPOTENCY_TTL_SECONDS": IDEMPOTENCY_TTL_SECONDS,
+        "IDEMPOTENCY_LEASE_SECONDS": IDEMPOTENCY_LEASE_SECONDS,
+        "IDEMPOTENCY_WAIT_SECONDS": IDEMPOTENCY_WAIT_SECONDS,
+        "WARMUP_ENABLED": WARMUP_ENABLED,
+        "WARMUP_TIMEOUT_SECONDS": WARMUP_TIMEOUT_SECONDS,
+        "WARMUP_SQL_CONNECTIONS": WARMUP_SQL_CONNECTIONS,
+        "WARMUP_EMPLOYEE_DIRECTORY": WARMUP_EMPLOYEE_DIRECTORY,
+        "PROFILING_SECRET": PROFILING_SECRET,
+        "PROFILING_DIR": PROFILING_DIR,
+        "PROFILING_INTERVAL_SECONDS": PROFILING_INTERVAL_SECONDS,
+        "AVAILABILITY_BATCH_MAX_REQUESTS": AVAILABILITY_BATCH_MAX_REQUESTS,
+        "AVAILABILITY_BATCH_CONCURRENCY": AVAILABILITY_BATCH_CONCURRENCY,
+        "FORM_BULK_MAX_ITEMS": FORM_BULK_MAX_ITEMS,
+        "FORM_BULK_BATCH_SIZE": FORM_BULK_BATCH_SIZE,
+        "FORM_BULK_CONCURRENCY": FORM_BULK_CONCURRENCY,
+        "APP_REPLICAS": APP_REPLICAS,
+        "CALENDAR_MIRROR_ENABLED": CALENDAR_MIRROR_ENABLED,
+        "CALENDAR_MIRROR_PATH": CALENDAR_MIRROR_PATH,
+        "CALENDAR_MIRROR_WEEKS": CALENDAR_MIRROR_WEEKS,
+        "CALENDAR_MIRROR_SYNC_INTERVAL_SECONDS": CALENDAR_MIRROR_SYNC_INTERVAL_SECONDS,
+        "CALENDAR_MIRROR_MAX_STALENESS_SECONDS": CALENDAR_MIRROR_MAX_STALENESS_SECONDS,
+        "CALENDAR_MIRROR_MAX_MAILBOXES": CALENDAR_MIRROR_MAX_MAILBOXES,
+        "CALENDAR_MIRROR_CONCURRENCY": CALENDAR_MIRROR_CONCURRENCY,
+        "CALENDAR_MIRROR_LEASE_SECONDS": CALENDAR_MIRROR_LEASE_SECONDS,
+        "CALENDAR_MIRROR_PAGE_SIZE": CALENDAR_MIRROR_PAGE_SIZE,
+        "CALENDAR_MIRROR_MAILBOXES": CALENDAR_MIRROR_MAILBOXES,
+        "GRAPH_ADMISSION_ENABLED": GRAPH_ADMISSION_ENABLED,
+        "GRAPH_ADMISSION_RATE_PER_SECOND": GRAPH_ADMISSION_RATE_PER_SECOND,
+        "GRAPH_ADMISSION_BURST": GRAPH_ADMISSION_BURST,
+        "GRAPH_ADMISSION_RESERVE": GRAPH_ADMISSION_RESERVE,
+        "GRAPH_CLIENT_RATE_PER_SECOND": GRAPH_CLIENT_RATE_PER_SECOND,
+        "GRAPH_CLIENT_BURST": GRAPH_CLIENT_BURST,
+        "GRAPH_ADMISSION_MAX_WAIT_SECONDS": GRAPH_ADMISSION_MAX_WAIT_SECONDS,
+        "TRUSTED_PROXY_HOPS": TRUSTED_PROXY_HOPS,
         "TENANT_ID": TENANT_ID,
         "CLIENT_ID": CLIENT_ID,
         "CLIENT_SECRET": CLIENT_SECRET,
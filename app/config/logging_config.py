@@ -0,0 +1,112 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+
+from app.utils.tracing import current_span
+
+# LogRecord の標準属性（これ以外は extra で渡された構造化フィールドとして出力する）
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """ログレコードを1行のJSONに整形する"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            entry["trace_id"] = trace_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and key != "trace_id":
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _TraceQueueHandler(logging.handlers.QueueHandler):
+    """呼び出し元スレッドでは引数の文字列化とトレースIDの付与だけを行い、整形と出力は別スレッドに任せる"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        span = current_span()
+        record.trace_id = span.trace_id if span else None
+        # 引数はキュー投入後に変更される可能性があるため、ここで文字列化する
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """ロガー名の前方一致で指定した割合だけ WARNING 未満のログを通す"""
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        # 長い（より具体的な）ロガー名を優先する
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        for name, rate in self.rates:
+            if record.name == name or record.name.startswith(name + "."):
+                return random.random() < rate
+        return True
+
+
+def parse_sampling_rates(value: str) -> dict[str, float]:
+    """"app.infrastructure.graph_api=0.1,sqlalchemy.engine=0.01" 形式の設定を解析する"""
+    rates = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        name, rate = item.split("=", 1)
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+def setup_logging(level: str, log_format: str, sampling: str) -> None:
+    """ルートロガーにキュー経由の非同期ハンドラを設定する
+
+    リクエスト処理側はレコードをキューに積むだけで、整形と標準出力への書き込みは
+    QueueListener のスレッドで行う。
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if log_format == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(
+            logging.Formatter("%(asctime)s - %(levelname)s - %(name)s - %(message)s")
+        )
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _TraceQueueHandler(log_queue)
+    rates = parse_sampling_rates(sampling)
+    if rates:
+        queue_handler.addFilter(SamplingFilter(rates))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
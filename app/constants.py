@@ -16,3 +16,20 @@ INTERVIEW_STAGE_MAPPING = {
     "offerInterview": "オファー面談",
     "additionalInterview": "追加面談",
 }
+
+# Graph API（Windows）のタイムゾーン名と IANA のタイムゾーン名の対応
+# （ローカルの予定のミラーから空き時間を計算する場合に使う。未登録のタイムゾーンは Graph API から取得する）
+WINDOWS_TIME_ZONES = {
+    "Tokyo Standard Time": "Asia/Tokyo",
+    "Korea Standard Time": "Asia/Seoul",
+    "China Standard Time": "Asia/Shanghai",
+    "Singapore Standard Time": "Asia/Singapore",
+    "Taipei Standard Time": "Asia/Taipei",
+    "India Standard Time": "Asia/Kolkata",
+    "UTC": "UTC",
+    "GMT Standard Time": "Europe/London",
+    "W. Europe Standard Time": "Europe/Berlin",
+    "Eastern Standard Time": "America/New_York",
+    "Central Standard Time": "America/Chicago",
+    "Pacific Standard Time": "America/Los_Angeles",
+}
@@ -0,0 +1,248 @@
+import logging
+
+from app.config.config import get_config
+from app.infrastructure.appointment_repository import AppointmentRepository
+from app.infrastructure.az_cosmos import AzCosmosDBClient
+from app.infrastructure.cache import Cache, create_cache_backend
+from app.infrastructure.calendar_mirror import CalendarMirror
+from app.infrastructure.db import engine
+from app.infrastructure.employee_directory_cache import EmployeeDirectoryCache
+from app.infrastructure.employee_directory_repository import EmployeeDirectoryRepository
+from app.infrastructure.graph_api import GraphAPIClient
+from app.infrastructure.idempotency_store import IdempotencyStore
+from app.infrastructure.notification_queue import NotificationQueue
+from app.infrastructure.outbox_repository import OutboxRepository
+from app.interfaces.appointment_repository_interface import AppointmentRepositoryInterface
+from app.interfaces.az_cosmos_interface import AzCosmosDBClientInterface
+from app.interfaces.cache_backend_interface import CacheBackendInterface
+from app.interfaces.calendar_mirror_interface import CalendarMirrorInterface
+from app.interfaces.employee_directory_repository_interface import EmployeeDirectoryRepositoryInterface
+from app.interfaces.graph_api_interface import GraphAPIClientInterface
+from app.interfaces.notification_queue_interface import NotificationQueueInterface
+from app.interfaces.outbox_repository_interface import OutboxRepositoryInterface
+from app.usecases.schedule.appointment_side_effects_usecase import AppointmentSideEffectsUsecase
+from app.utils.admission import GraphAdmissionController
+from app.workers.calendar_syncer import CalendarSyncer
+from app.workers.loop_lag_monitor import LoopLagMonitor
+from app.workers.notification_dispatcher import NotificationDispatcher
+from app.workers.outbox_worker import OutboxWorker
+from app.workers.warmup import Warmup, WarmupStep
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+# 成功するまで準備完了にしない温め処理（どのリクエストも処理できなくなる依存サービス）
+REQUIRED_WARMUP_STEPS = ("graph_token", "cosmos")
+
+
+class Container:
+    """アプリケーション全体で共有するインフラクライアントとワーカーを保持するコンテナ
+
+    FastAPI の lifespan で1度だけ構築し、各ユースケースへ Depends 経由で注入する。
+    テストやベンチマークでは各引数にスタンドインを渡して差し替える。
+    """
+
+    def __init__(
+        self,
+        graph_api_client: GraphAPIClientInterface | None = None,
+        cosmos_db_client: AzCosmosDBClientInterface | None = None,
+        appointment_repository: AppointmentRepositoryInterface | None = None,
+        employee_directory_repository: EmployeeDirectoryRepositoryInterface | None = None,
+        outbox_repository: OutboxRepositoryInterface | None = None,
+        notification_queue: NotificationQueueInterface | None = None,
+    ):
+        # キャッシュのバックエンドは種類ごとに1つ構築し、名前空間で区切って共有する
+        self.cache_backends: dict[str, CacheBackendInterface] = {}
+        self.calendar_mirror = self._calendar_mirror()
+        self.graph_api_client = graph_api_client or GraphAPIClient(
+            token_cache=self._cache("graph_token", "memory", ttl_seconds=3600),
+            freebusy_cache=self._cache(
+                "freebusy", config["FREEBUSY_CACHE_BACKEND"], config["FREEBUSY_CACHE_TTL_SECONDS"], shared=True
+            ),
+            calendar_mirror=self.calendar_mirror,
+        )
+        self.cosmos_db_client = cosmos_db_client or AzCosmosDBClient(
+            form_cache=self._cache(
+                "form", config["FORM_CACHE_BACKEND"], config["FORM_CACHE_TTL_SECONDS"], shared=True
+            )
+        )
+        self.appointment_repository = appointment_repository or AppointmentRepository()
+        self.employee_directory_repository = (
+            employee_directory_repository or EmployeeDirectoryRepository()
+        )
+        self.outbox_repository = outbox_repository or OutboxRepository()
+        self.notification_queue = notification_queue or NotificationQueue(
+            config["NOTIFICATION_QUEUE_PATH"]
+        )
+
+        self.employee_directory_cache = EmployeeDirectoryCache(
+            self.employee_directory_repository,
+            ttl_seconds=config["EMPLOYEE_DIRECTORY_CACHE_TTL_SECONDS"],
+        )
+        self.notification_dispatcher = NotificationDispatcher(
+            self.notification_queue,
+            self.graph_api_client,
+            max_concurrency=config["NOTIFICATION_MAX_CONCURRENCY"],
+            rate_per_second=config["NOTIFICATION_RATE_PER_SECOND"],
+            batch_size=config["NOTIFICATION_BATCH_SIZE"],
+            max_attempts=config["NOTIFICATION_MAX_ATTEMPTS"],
+            lease_seconds=config["NOTIFICATION_LEASE_SECONDS"],
+            poll_interval_seconds=config["NOTIFICATION_POLL_INTERVAL_SECONDS"],
+            retention_seconds=config["NOTIFICATION_RETENTION_SECONDS"],
+        )
+        self.outbox_worker = OutboxWorker(
+            self.outbox_repository,
+            poll_interval_seconds=config["OUTBOX_POLL_INTERVAL_SECONDS"],
+            batch_size=config["OUTBOX_BATCH_SIZE"],
+            max_attempts=config["OUTBOX_MAX_ATTEMPTS"],
+            lease_seconds=config["OUTBOX_LEASE_SECONDS"],
+        )
+        if config["IDEMPOTENCY_CACHE_BACKEND"] == "memory":
+            logger.warning(
+                "Idempotency-Key の記録はプロセス内（memory）のため、他のワーカー・レプリカへの再送は重複して実行されます"
+            )
+        self.idempotency_store = IdempotencyStore(
+            self._cache("idempotency", config["IDEMPOTENCY_CACHE_BACKEND"], config["IDEMPOTENCY_TTL_SECONDS"]),
+            lease_seconds=config["IDEMPOTENCY_LEASE_SECONDS"],
+            wait_timeout_seconds=config["IDEMPOTENCY_WAIT_SECONDS"],
+        )
+        self.graph_admission_controller = GraphAdmissionController(
+            rate_per_second=config["GRAPH_ADMISSION_RATE_PER_SECOND"],
+            burst=config["GRAPH_ADMISSION_BURST"],
+            reserve_ratio=config["GRAPH_ADMISSION_RESERVE"],
+            client_rate_per_second=config["GRAPH_CLIENT_RATE_PER_SECOND"],
+            client_burst=config["GRAPH_CLIENT_BURST"],
+            max_wait_seconds=config["GRAPH_ADMISSION_MAX_WAIT_SECONDS"],
+            enabled=config["GRAPH_ADMISSION_ENABLED"],
+        )
+        self.loop_lag_monitor = LoopLagMonitor(
+            interval_seconds=config["LOOP_LAG_INTERVAL_SECONDS"],
+            threshold_seconds=config["LOOP_LAG_THRESHOLD_SECONDS"],
+        )
+        self.calendar_syncer = (
+            CalendarSyncer(
+                self.calendar_mirror,
+                self.graph_api_client,
+                weeks=config["CALENDAR_MIRROR_WEEKS"],
+                interval_seconds=config["CALENDAR_MIRROR_SYNC_INTERVAL_SECONDS"],
+                max_concurrency=config["CALENDAR_MIRROR_CONCURRENCY"],
+                lease_seconds=config["CALENDAR_MIRROR_LEASE_SECONDS"],
+                mailboxes=config["CALENDAR_MIRROR_MAILBOXES"],
+            )
+            if self.calendar_mirror is not None
+            else None
+        )
+        self.outbox_worker.register_handlers(
+            AppointmentSideEffectsUsecase(
+                self.graph_api_client,
+                self.cosmos_db_client,
+                self.appointment_repository,
+                self.notification_dispatcher,
+            ).handlers()
+        )
+        self.warmup = Warmup(
+            self._warmup_steps(),
+            timeout_seconds=config["WARMUP_TIMEOUT_SECONDS"],
+            required=set(REQUIRED_WARMUP_STEPS),
+        )
+
+    def _cache(self, namespace: str, backend: str, ttl_seconds: float, shared: bool = False) -> Cache | None:
+        """キャッシュを構築する（TTL が 0 以下の場合は使わない）
+
+        shared: 更新時の無効化を他のワーカーにも届ける必要があるキャッシュ。memory では届かず古い値を返すため使わない。
+        """
+        if ttl_seconds <= 0:
+            return None
+        if shared and backend == "memory":
+            logger.error(
+                f"{namespace} キャッシュは memory バックエンドでは有効にできないため無効にします"
+                "（sqlite または redis を指定してください）"
+            )
+            return None
+        if backend not in self.cache_backends:
+            self.cache_backends[backend] = create_cache_backend(backend)
+        return Cache(self.cache_backends[backend], namespace, ttl_seconds)
+
+    @staticmethod
+    def _calendar_mirror() -> CalendarMirrorInterface | None:
+        """予定のミラーを構築する
+
+        ミラーと変更時の無効化はホスト内でしか共有されないため、複数レプリカで動かす設定では使わない。
+        """
+        if not config["CALENDAR_MIRROR_ENABLED"]:
+            return None
+        if config["APP_REPLICAS"] > 1:
+            logger.error(
+                "予定のミラーはレプリカ間で無効化を共有できないため、APP_REPLICAS が2以上の場合は無効にします"
+            )
+            return None
+        if config["CALENDAR_MIRROR_MAX_STALENESS_SECONDS"] <= config["CALENDAR_MIRROR_SYNC_INTERVAL_SECONDS"]:
+            logger.warning(
+                "CALENDAR_MIRROR_MAX_STALENESS_SECONDS が同期間隔以下のため、ミラーはほとんど使われません"
+            )
+        return CalendarMirror(
+            config["CALENDAR_MIRROR_PATH"],
+            max_mailboxes=config["CALENDAR_MIRROR_MAX_MAILBOXES"],
+            max_staleness_seconds=config["CALENDAR_MIRROR_MAX_STALENESS_SECONDS"],
+        )
+
+    def _warmup_steps(self) -> dict[str, WarmupStep]:
+        """起動直後に実行する温め処理（warmup を持たないスタンドインは対象外）
+
+        Graph API のトークン取得と Cosmos DB への接続（データベース・コンテナの作成を含む）はここで行い、
+        成功するまで /readyz は 503 を返す（REQUIRED_WARMUP_STEPS）。
+        """
+        steps = {}
+        graph_warmup = getattr(self.graph_api_client, "warmup", None)
+        if graph_warmup is not None:
+            steps["graph_token"] = graph_warmup
+        sql_warmup = getattr(self.appointment_repository, "warmup", None)
+        if sql_warmup is not None:
+            steps["sql_pool"] = lambda: sql_warmup(config["WARMUP_SQL_CONNECTIONS"])
+        cosmos_warmup = getattr(self.cosmos_db_client, "warmup", None)
+        if cosmos_warmup is not None:
+            steps["cosmos"] = cosmos_warmup
+        if config["WARMUP_EMPLOYEE_DIRECTORY"]:
+            steps["employee_directory"] = self.employee_directory_cache.get
+        return steps
+
+    async def start(self) -> None:
+        """バックグラウンドタスクを開始する"""
+        if config["LOOP_LAG_MONITOR_ENABLED"]:
+            self.loop_lag_monitor.start()
+        self.employee_directory_cache.start()
+        self.notification_dispatcher.start()
+        if config["OUTBOX_WORKER_ENABLED"]:
+            self.outbox_worker.start()
+        if self.calendar_syncer is not None:
+            self.calendar_syncer.start()
+        # 従業員一覧は定期更新タスクの初回ロードを待つだけなので、その開始後に始める
+        if config["WARMUP_ENABLED"]:
+            self.warmup.start()
+        else:
+            self.warmup.skip()
+
+    async def close(self) -> None:
+        """バックグラウンドタスクを停止し、各クライアントの接続を閉じる"""
+        await self.warmup.stop()
+        await self.outbox_worker.stop()
+        if self.calendar_syncer is not None:
+            await self.calendar_syncer.stop()
+        await self.notification_dispatcher.stop()
+        await self.employee_directory_cache.stop()
+        await self.loop_lag_monitor.stop()
+
+        for name, close in (
+            ("Graph API", getattr(self.graph_api_client, "close", None)),
+            ("Cosmos DB", getattr(self.cosmos_db_client, "close", None)),
+            ("予定のミラー", getattr(self.calendar_mirror, "close", None)),
+            *((f"キャッシュ({kind})", backend.close) for kind, backend in self.cache_backends.items()),
+        ):
+            if close is None:
+                continue
+            try:
+                close()
+            except Exception as e:
+                logger.warning(f"{name} クライアントの終了に失敗しました: {e}")
+        engine.dispose()
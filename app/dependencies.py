@@ -0,0 +1,150 @@
+from fastapi import Depends, Request
+
+from app.config.config import get_config
+from app.container import Container
+from app.infrastructure.employee_directory_cache import EmployeeDirectoryCache
+from app.infrastructure.idempotency_store import IdempotencyStore
+from app.utils.admission import GraphAdmissionController
+from app.workers.calendar_syncer import CalendarSyncer
+from app.workers.loop_lag_monitor import LoopLagMonitor
+from app.workers.notification_dispatcher import NotificationDispatcher
+from app.workers.warmup import Warmup
+from app.usecases.form.store_form_data_usecase import StoreFormDataUsecase
+from app.usecases.form.store_form_data_bulk_usecase import StoreFormDataBulkUsecase
+from app.usecases.form.retrieve_form_data_usecase import RetrieveFormDataUsecase
+from app.usecases.schedule.availability_usecase import AvailabilityUsecase
+from app.usecases.schedule.availability_batch_usecase import AvailabilityBatchUsecase
+from app.usecases.schedule.appointment_usecase import AppointmentUsecase
+from app.usecases.schedule.reschedule_usecase import RescheduleUsecase
+from app.usecases.schedule.get_reschedule_data_usecase import GetRescheduleDataUsecase
+from app.usecases.appointment.list_appointments_usecase import ListAppointmentsUsecase
+from app.usecases.appointment.export_appointments_usecase import ExportAppointmentsUsecase
+
+config = get_config()
+
+# ルーターに注入する依存関係（コンテナはlifespanで app.state.container に格納される）
+
+
+def get_container(request: Request) -> Container:
+    return request.app.state.container
+
+
+def get_employee_directory_cache(
+    container: Container = Depends(get_container),
+) -> EmployeeDirectoryCache:
+    return container.employee_directory_cache
+
+
+def get_idempotency_store(
+    container: Container = Depends(get_container),
+) -> IdempotencyStore:
+    return container.idempotency_store
+
+
+def get_warmup(
+    container: Container = Depends(get_container),
+) -> Warmup:
+    return container.warmup
+
+
+def get_graph_admission_controller(
+    container: Container = Depends(get_container),
+) -> GraphAdmissionController:
+    return container.graph_admission_controller
+
+
+def get_notification_dispatcher(
+    container: Container = Depends(get_container),
+) -> NotificationDispatcher:
+    return container.notification_dispatcher
+
+
+def get_loop_lag_monitor(
+    container: Container = Depends(get_container),
+) -> LoopLagMonitor:
+    return container.loop_lag_monitor
+
+
+def get_calendar_syncer(
+    container: Container = Depends(get_container),
+) -> CalendarSyncer | None:
+    return container.calendar_syncer
+
+
+def get_store_form_data_usecase(
+    container: Container = Depends(get_container),
+) -> StoreFormDataUsecase:
+    return StoreFormDataUsecase(container.cosmos_db_client)
+
+
+def get_store_form_data_bulk_usecase(
+    container: Container = Depends(get_container),
+) -> StoreFormDataBulkUsecase:
+    return StoreFormDataBulkUsecase(
+        container.cosmos_db_client,
+        batch_size=config["FORM_BULK_BATCH_SIZE"],
+        max_concurrency=config["FORM_BULK_CONCURRENCY"],
+    )
+
+
+def get_retrieve_form_data_usecase(
+    container: Container = Depends(get_container),
+) -> RetrieveFormDataUsecase:
+    return RetrieveFormDataUsecase(
+        container.cosmos_db_client,
+        container.graph_api_client,
+        container.graph_admission_controller,
+    )
+
+
+def get_availability_usecase(
+    container: Container = Depends(get_container),
+) -> AvailabilityUsecase:
+    return AvailabilityUsecase(container.graph_api_client)
+
+
+def get_availability_batch_usecase(
+    container: Container = Depends(get_container),
+) -> AvailabilityBatchUsecase:
+    return AvailabilityBatchUsecase(
+        container.graph_api_client, max_concurrency=config["AVAILABILITY_BATCH_CONCURRENCY"]
+    )
+
+
+def get_appointment_usecase(
+    container: Container = Depends(get_container),
+) -> AppointmentUsecase:
+    return AppointmentUsecase(
+        container.appointment_repository,
+        container.outbox_repository,
+        container.outbox_worker,
+    )
+
+
+def get_reschedule_usecase(
+    container: Container = Depends(get_container),
+) -> RescheduleUsecase:
+    return RescheduleUsecase(
+        container.cosmos_db_client,
+        container.graph_api_client,
+        container.appointment_repository,
+        container.notification_dispatcher,
+    )
+
+
+def get_reschedule_data_usecase(
+    container: Container = Depends(get_container),
+) -> GetRescheduleDataUsecase:
+    return GetRescheduleDataUsecase(container.cosmos_db_client)
+
+
+def get_list_appointments_usecase(
+    container: Container = Depends(get_container),
+) -> ListAppointmentsUsecase:
+    return ListAppointmentsUsecase(container.appointment_repository)
+
+
+def get_export_appointments_usecase(
+    container: Container = Depends(get_container),
+) -> ExportAppointmentsUsecase:
+    return ExportAppointmentsUsecase(container.appointment_repository)
@@ -1,9 +1,13 @@
-from sqlalchemy import insert, update, delete, select
-from typing import Any
+from datetime import timedelta
+from sqlalchemy import and_, insert, or_, update, delete, select, text
+from typing import Any, Iterator
 
 from app.config.config import get_config
-from app.schemas.schedule import AppointmentRequest
-from app.infrastructure.db import engine, metadata
+from app.schemas.schedule import AppointmentFilter, AppointmentRequest
+from app.schemas.outbox import OutboxMessage
+from app.infrastructure.db import engine
+from app.infrastructure.outbox_repository import add_outbox_messages
+from app.infrastructure.tables import schedule_management
 from app.interfaces.appointment_repository_interface import AppointmentRepositoryInterface
 
 config = get_config()
@@ -12,12 +16,19 @@ config = get_config()
 class AppointmentRepository(AppointmentRepositoryInterface):
     def __init__(self):
         self.engine = engine
-        self.metadata = metadata
+        self.appointments = schedule_management
 
-        if "schedule_management" not in self.metadata.tables:
-            self.metadata.reflect(bind=self.engine, only=["schedule_management"])
-
-        self.appointments = self.metadata.tables["schedule_management"]
+    def warmup(self, connections: int) -> None:
+        """接続プールに connections 本（プールの上限まで）の接続を確立しておく"""
+        opened = []
+        try:
+            for _ in range(min(connections, self.engine.pool.size())):
+                conn = self.engine.connect()
+                opened.append(conn)
+                conn.execute(text("SELECT 1"))
+        finally:
+            for conn in opened:
+                conn.close()
 
     def get_appointment_by_cosmos_db_id(self, cosmos_db_id: str)-> Any:
         """cosmos_db_idに基づいてアポイントメントデータを取得する"""
@@ -28,7 +39,12 @@ class AppointmentRepository(AppointmentRepositoryInterface):
             result = conn.execute(stmt)
             return result.fetchone()
 
-    def create_appointment(self, appointment_req: AppointmentRequest)-> None:
+    def create_appointment(
+        self,
+        appointment_req: AppointmentRequest,
+        outbox_messages: list[OutboxMessage] | None = None,
+    )-> None:
+        """アポイントメントを登録する。outbox_messages は同一トランザクションでアウトボックスに記録する"""
         values = {
             "scheduled_interview_datetime": appointment_req.schedule_interview_datetime,
             "employee_email": appointment_req.employee_email,
@@ -45,6 +61,7 @@ class AppointmentRepository(AppointmentRepositoryInterface):
         with self.engine.begin() as conn:
             stmt = insert(self.appointments).values(values)
             conn.execute(stmt)
+            add_outbox_messages(conn, outbox_messages or [])
 
     def update_schedule_interview_datetime(self, cosmos_db_id: str, new_schedule_interview_datetime: str)-> None:
         """cosmos_db_idに基づいてscheduled_interview_datetimeを更新する"""
@@ -61,3 +78,67 @@ class AppointmentRepository(AppointmentRepositoryInterface):
                 self.appointments.c.cosmos_db_id == cosmos_db_id
             )
             conn.execute(stmt)
+
+    def _filter_conditions(self, appointment_filter: AppointmentFilter) -> list[Any]:
+        """絞り込み条件をWHERE句の条件リストに変換する"""
+        columns = self.appointments.c
+        conditions = []
+        if appointment_filter.employee_email:
+            conditions.append(columns.employee_email == appointment_filter.employee_email)
+        if appointment_filter.interview_stage:
+            conditions.append(columns.interview_stage == appointment_filter.interview_stage)
+        # scheduled_interview_datetime は 'ISO日時,ISO日時' の文字列のため、文字列比較で日付範囲を絞り込む
+        if appointment_filter.start_date:
+            conditions.append(
+                columns.scheduled_interview_datetime >= appointment_filter.start_date.isoformat()
+            )
+        if appointment_filter.end_date:
+            next_day = appointment_filter.end_date + timedelta(days=1)
+            conditions.append(columns.scheduled_interview_datetime < next_day.isoformat())
+        return conditions
+
+    def list_appointments(
+        self,
+        appointment_filter: AppointmentFilter,
+        limit: int,
+        after: tuple[str, int] | None = None,
+    ) -> list[Any]:
+        """条件に一致するアポイントメントを (面接日時, id) 順にキーセットページネーションで取得する
+
+        id は一意なため、同じ日時の行がページの境界をまたいでも取りこぼし・重複しない。
+        """
+        columns = self.appointments.c
+        conditions = self._filter_conditions(appointment_filter)
+        if after:
+            after_datetime, after_id = after
+            conditions.append(
+                or_(
+                    columns.scheduled_interview_datetime > after_datetime,
+                    and_(
+                        columns.scheduled_interview_datetime == after_datetime,
+                        columns.id > after_id,
+                    ),
+                )
+            )
+        stmt = (
+            select(self.appointments)
+            .where(*conditions)
+            .order_by(columns.scheduled_interview_datetime, columns.id)
+            .limit(limit)
+        )
+        with self.engine.connect() as conn:
+            return conn.execute(stmt).fetchall()
+
+    def stream_appointments(
+        self, appointment_filter: AppointmentFilter, batch_size: int = 1000
+    ) -> Iterator[Any]:
+        """条件に一致するアポイントメントを一定件数ずつカーソルから読み出して逐次返す"""
+        columns = self.appointments.c
+        stmt = (
+            select(self.appointments)
+            .where(*self._filter_conditions(appointment_filter))
+            .order_by(columns.scheduled_interview_datetime, columns.id)
+        )
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(stmt)
+            yield from result
@@ -1,13 +1,18 @@
 import logging
+import threading
 import uuid
 import time
-from typing import Any
+from typing import Any, Callable
 from fastapi import HTTPException
 from dateutil.parser import parse
-from azure.cosmos import CosmosClient, exceptions
+from azure.core.exceptions import ServiceRequestError, ServiceResponseError
+from azure.cosmos import ContainerProxy, CosmosClient, exceptions
 
 from app.config.config import get_config
+from app.infrastructure.cache import Cache
 from app.interfaces.az_cosmos_interface import AzCosmosDBClientInterface
+from app.utils.metrics import COSMOS_REQUEST_CHARGE, track_dependency
+from app.utils.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -15,16 +20,32 @@ config = get_config()
 
 
 class AzCosmosDBClient(AzCosmosDBClientInterface):
-    def __init__(self):
-        """Cosmos DB クライアント初期化"""
+    def __init__(self, form_cache: Cache | None = None):
+        """Cosmos DB クライアント初期化（form_cache: フォームデータの読み取りキャッシュ。書き込み時に無効化する）
+
+        接続とデータベース・コンテナの作成は最初の呼び出し（または起動時の温め処理）で行う。
+        構築時には通信しないため、Cosmos DB の障害中でもアプリケーションは起動できる。
+        """
+        self.form_cache = form_cache
+        self.cosmos_db_client: CosmosClient | None = None
+        self._container: ContainerProxy | None = None
+        self._connect_lock = threading.Lock()
+
+    @property
+    def container(self) -> ContainerProxy:
+        """コンテナ（未接続の場合は接続する。失敗した場合は次の呼び出しで接続し直す）"""
+        if self._container is None:
+            with self._connect_lock:
+                if self._container is None:
+                    self._container = self._connect()
+        return self._container
+
+    def _connect(self) -> ContainerProxy:
         try:
-            self.cosmos_db_client = CosmosClient(
-                config["AZ_COSMOS_DB_ENDPOINT"], config["AZ_COSMOS_DB_KEY"]
-            )
-            self.database = self.cosmos_db_client.create_database_if_not_exists(
-                id=config["AZ_COSMOS_DB_NAME"]
-            )
-            self.container = self.database.create_container_if_not_exists(
+            if self.cosmos_db_client is None:
+                self.cosmos_db_client = CosmosClient(config["AZ_COSMOS_DB_ENDPOINT"], config["AZ_COSMOS_DB_KEY"])
+            database = self.cosmos_db_client.create_database_if_not_exists(id=config["AZ_COSMOS_DB_NAME"])
+            container = database.create_container_if_not_exists(
                 id=config["AZ_COSMOS_DB_CONTAINER_NAME"],
                 partition_key={
                     "paths": [f"/{config['AZ_COSMOS_DB_PARTITION_KEY']}"],
@@ -32,6 +53,7 @@ class AzCosmosDBClient(AzCosmosDBClientInterface):
                 },
             )
             logger.info("Cosmos DB クライアントの初期化成功")
+            return container
         except exceptions.CosmosHttpResponseError as e:
             logger.error(f"Cosmos DB への接続エラー: {e}")
             raise HTTPException(status_code=503, detail="Cosmos DB サービス利用不可")
@@ -39,6 +61,43 @@ class AzCosmosDBClient(AzCosmosDBClientInterface):
             logger.error(f"Cosmos DB クライアントの初期化エラー: {e}")
             raise HTTPException(status_code=500, detail="Cosmos DB 初期化エラー")
 
+    def close(self) -> None:
+        """Cosmos DB クライアントの接続を閉じる"""
+        if self.cosmos_db_client is not None:
+            self.cosmos_db_client.close()
+
+    def warmup(self) -> None:
+        """コンテナのプロパティを読み込み、接続とパーティションキーの情報を確立しておく"""
+        self._call("read_container", self.container.read)
+
+    def _call(
+        self, operation: str, method: Callable[..., Any], request_charges: list[float] | None = None, **kwargs
+    ) -> Any:
+        """Cosmos DB の呼び出し時間と消費RU（レスポンスヘッダの x-ms-request-charge）を記録する
+
+        request_charges を渡した場合は、呼び出し元で合計できるよう消費RUを追加する。
+        失敗した呼び出しの消費RUはエラーのヘッダから取る。
+        """
+        charges: list[float] = []
+
+        def record_charge(headers, _result) -> None:
+            charges.append(float(headers.get("x-ms-request-charge", 0)))
+
+        with track_dependency("cosmos", operation) as call_span:
+            try:
+                return method(response_hook=record_charge, **kwargs)
+            except (exceptions.CosmosHttpResponseError, exceptions.CosmosBatchOperationError) as e:
+                if not charges and getattr(e, "headers", None):
+                    charges.append(float(e.headers.get("x-ms-request-charge", 0)))
+                raise
+            finally:
+                if charges:
+                    COSMOS_REQUEST_CHARGE.labels(operation).inc(sum(charges))
+                    if call_span is not None:
+                        call_span.set_attribute("request_charge", sum(charges))
+                    if request_charges is not None:
+                        request_charges.extend(charges)
+
     def create_form_data(self, payload: dict[str, Any]) -> str:
         """フォームデータをCosmos DBに保存する"""
         cosmos_db_id = str(uuid.uuid4())
@@ -48,7 +107,7 @@ class AzCosmosDBClient(AzCosmosDBClientInterface):
             **payload,
         }
         try:
-            self.container.create_item(body=data)
+            self._call("create_item", self.container.create_item, body=data)
             logger.info("フォームデータを保存しました")
             return cosmos_db_id
         except exceptions.CosmosResourceExistsError:
@@ -58,13 +117,143 @@ class AzCosmosDBClient(AzCosmosDBClientInterface):
             logger.error(f"フォームデータの保存エラー: {e}")
             raise HTTPException(status_code=500, detail="データ保存エラー")
 
-    def get_form_data(self, cosmos_db_id: str) -> dict[str, Any]:
-        """Cosmos DB IDからフォームデータを取得する"""
+    def create_form_data_batch(self, payloads: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], float]:
+        """複数のフォームデータを1回のトランザクションバッチで保存する（1回あたり最大100件）
+
+        payloads に "id" があればその ID で保存する（呼び出し元が結果不明の項目を ID で確認できるようにするため）。
+        戻り値は payloads と同じ順序の結果（{"status": "stored" | "failed" | "unknown", "cosmos_db_id", "error",
+        "status_code"}）と消費RUの合計。バッチは1件でも失敗すると全体が取り消されるため、その場合は1件ずつ保存し直して
+        項目ごとの結果を返す。タイムアウトしたバッチ・保存はサーバー側ではコミットされている場合があるため、
+        保存済みの内容が同じであれば成功とし、確認できなければ失敗ではなく unknown とする。
+        """
+        request_charges: list[float] = []
+        documents = [
+            {
+                **payload,
+                "id": payload.get("id") or str(uuid.uuid4()),
+                "partitionKey": config["AZ_COSMOS_DB_PARTITION_KEY"],
+            }
+            for payload in payloads
+        ]
+        try:
+            self._call(
+                "execute_item_batch",
+                self.container.execute_item_batch,
+                request_charges=request_charges,
+                batch_operations=[("create", (document,)) for document in documents],
+                partition_key=config["AZ_COSMOS_DB_PARTITION_KEY"],
+            )
+            logger.info(f"フォームデータを一括保存しました: {len(documents)}件")
+            return [{"status": "stored", "cosmos_db_id": document["id"]} for document in documents], sum(
+                request_charges
+            )
+        except (
+            exceptions.CosmosHttpResponseError,
+            exceptions.CosmosBatchOperationError,
+            ServiceRequestError,
+            ServiceResponseError,
+        ) as e:
+            logger.warning(f"フォームデータの一括保存に失敗したため1件ずつ保存します: {e}")
+
+        results: list[dict[str, Any]] = []
+        for document in documents:
+            try:
+                self._call(
+                    "create_item", self.container.create_item, request_charges=request_charges, body=document
+                )
+                results.append({"status": "stored", "cosmos_db_id": document["id"]})
+            except exceptions.CosmosResourceExistsError:
+                stored = self._is_stored(document, request_charges)
+                if stored is False:
+                    logger.error("重複するCosmos DB IDが存在します")
+                    results.append({"status": "failed", "error": "Duplicate cosmos_db_id", "status_code": 409})
+                else:
+                    results.append(self._stored_or_unknown(document, stored))
+            except (ServiceResponseError, exceptions.CosmosHttpResponseError) as e:
+                if isinstance(e, exceptions.CosmosHttpResponseError) and e.status_code != 408:
+                    logger.error(f"フォームデータの保存エラー: {e}")
+                    results.append(
+                        {"status": "failed", "error": "データ保存エラー", "status_code": e.status_code or 500}
+                    )
+                    continue
+                # 送信後に応答が得られなかった（サーバー側では保存されている可能性がある）。
+                # 見つからない場合もまだ反映中の可能性があるため、失敗ではなく unknown とする
+                logger.warning(f"フォームデータの保存がタイムアウトしたため結果を確認します: {document['id']}: {e}")
+                results.append(self._stored_or_unknown(document, self._is_stored(document, request_charges)))
+            except ServiceRequestError as e:
+                # 送信できなかった（サーバー側には届いていない）
+                logger.error(f"フォームデータの保存エラー: {e}")
+                results.append({"status": "failed", "error": "データ保存エラー", "status_code": 503})
+        return results, sum(request_charges)
+
+    @staticmethod
+    def _stored_or_unknown(document: dict[str, Any], stored: bool | None) -> dict[str, Any]:
+        """保存を確認できた項目は成功、確認できなかった項目は unknown の結果にする
+
+        unknown の場合、呼び出し元は cosmos_db_id でフォームを取得して確認してから再送する。
+        """
+        if stored:
+            return {"status": "stored", "cosmos_db_id": document["id"]}
+        return {
+            "status": "unknown",
+            "cosmos_db_id": document["id"],
+            "error": "保存されたか確認できませんでした",
+            "status_code": 504,
+        }
+
+    def _is_stored(self, document: dict[str, Any], request_charges: list[float]) -> bool | None:
+        """同じ ID のドキュメントが、保存しようとした内容で保存済みか（確認できなかった場合は None）
+
+        バッチ・保存がクライアント側でタイムアウトしてもサーバー側ではコミットされている場合があり、
+        その後の1件ずつの保存は 409 になる。ID はこの呼び出しで生成したものなので、内容が同じであれば保存済みとみなす。
+        """
         try:
-            item = self.container.read_item(
-                item=cosmos_db_id, partition_key=config["AZ_COSMOS_DB_PARTITION_KEY"]
+            stored = self._call(
+                "read_item",
+                self.container.read_item,
+                request_charges=request_charges,
+                item=document["id"],
+                partition_key=document["partitionKey"],
             )
-            for key in ["_rid", "_self", "_etag", "_ts"]:
+        except (exceptions.CosmosHttpResponseError, ServiceRequestError, ServiceResponseError) as e:
+            logger.warning(f"フォームデータの保存結果の確認に失敗しました: {e}")
+            return None
+        return all(stored.get(key) == value for key, value in document.items())
+
+    def _replace(self, form: dict[str, Any]) -> None:
+        """フォームを置き換え、キャッシュを無効化する"""
+        try:
+            self._call("replace_item", self.container.replace_item, item=form["id"], body=form)
+        finally:
+            self._invalidate(form["id"])
+
+    def _invalidate(self, cosmos_db_id: str) -> None:
+        if self.form_cache is not None:
+            self.form_cache.delete(cosmos_db_id)
+
+    def get_form_data(self, cosmos_db_id: str, use_cache: bool = True) -> dict[str, Any]:
+        """Cosmos DB IDからフォームデータを取得する（form_cache がある場合はキャッシュから返す）
+
+        読み込んだ内容を元に書き込む処理では use_cache=False を指定し、常に Cosmos DB から読み込む。
+        """
+        if self.form_cache is None or not use_cache:
+            return self._read_form_data(cosmos_db_id)
+        form = self.form_cache.get(cosmos_db_id)
+        if form is None:
+            form = self._read_form_data(cosmos_db_id)
+            self.form_cache.set(cosmos_db_id, form)
+        return form
+
+    def _read_form_data(self, cosmos_db_id: str) -> dict[str, Any]:
+        """Cosmos DB からフォームデータを読み込む（_etag はキャッシュ検証用に残す）"""
+        try:
+            item = self._call(
+                "read_item",
+                self.container.read_item,
+                item=cosmos_db_id,
+                partition_key=config["AZ_COSMOS_DB_PARTITION_KEY"],
+            )
+            for key in ["_rid", "_self", "_ts"]:
                 item.pop(key, None)
             return item
         except exceptions.CosmosResourceNotFoundError:
@@ -86,13 +275,15 @@ class AzCosmosDBClient(AzCosmosDBClientInterface):
 
         while retry_count < max_retries:
             try:
-                form = self.container.read_item(
+                form = self._call(
+                    "read_item",
+                    self.container.read_item,
                     item=cosmos_db_id,
                     partition_key=config["AZ_COSMOS_DB_PARTITION_KEY"],
                 )
                 form["schedule_interview_datetime"] = schedule_interview_datetime
                 form["event_ids"] = event_ids
-                self.container.replace_item(item=form["id"], body=form)
+                self._replace(form)
                 return
             except exceptions.CosmosResourceNotFoundError:
                 logger.error(f"更新対象のCosmos DB IDが見つかりません: {cosmos_db_id}")
@@ -103,7 +294,8 @@ class AzCosmosDBClient(AzCosmosDBClientInterface):
                     logger.error(f"Cosmos DB 更新失敗: {e}")
                     raise HTTPException(status_code=500, detail="データ更新エラー")
                 logger.warning(f"更新リトライ ({retry_count}/{max_retries})")
-                time.sleep(2**retry_count)
+                with span("cosmos.retry_backoff", attempt=retry_count):
+                    time.sleep(2**retry_count)
 
     def remove_candidate_from_other_forms(
         self,
@@ -129,7 +321,12 @@ class AzCosmosDBClient(AzCosmosDBClientInterface):
                     "value": selected_schedule_interview_datetime,
                 },
             ]
-            forms = list(self.container.query_items(query=query, parameters=parameters))
+            forms = self._call(
+                "query_items",
+                lambda **kwargs: list(self.container.query_items(**kwargs)),
+                query=query,
+                parameters=parameters,
+            )
 
             for form in forms:
                 updated_candidates = [
@@ -144,17 +341,29 @@ class AzCosmosDBClient(AzCosmosDBClientInterface):
                 form["candidates"] = updated_candidates
                 for key in ["_rid", "_self", "_attachments", "_ts"]:
                     form.pop(key, None)
-                self.container.replace_item(item=form["id"], body=form)
+                self._replace(form)
         except Exception as e:
             logger.error(f"候補日削除エラー: {e}")
             raise HTTPException(status_code=500, detail="候補日削除エラー")
 
+    def replace_form_data(self, form: dict[str, Any]) -> None:
+        """取得済みのフォームデータで置き換える"""
+        try:
+            self._replace(form)
+        except exceptions.CosmosResourceNotFoundError:
+            logger.error(f"更新対象のCosmos DB IDが見つかりません: {form['id']}")
+            raise HTTPException(status_code=404, detail="Cosmos DB IDが見つかりません")
+        except Exception as e:
+            logger.error(f"フォームデータ更新エラー: {e}")
+            raise HTTPException(status_code=500, detail="データ更新エラー")
+
     def confirm_form(self, cosmos_db_id: str) -> None:
         """フォームを確定状態に更新"""
         try:
-            form = self.get_form_data(cosmos_db_id)
+            # 書き込み前の読み込みはキャッシュを使わない（古い内容で上書きしないため）
+            form = self._read_form_data(cosmos_db_id)
             form["is_confirmed"] = True
-            self.container.replace_item(item=form["id"], body=form)
+            self._replace(form)
         except exceptions.CosmosResourceNotFoundError:
             logger.error(f"確定対象のCosmos DB IDが見つかりません: {cosmos_db_id}")
             raise HTTPException(status_code=404, detail="Cosmos DB IDが見つかりません")
@@ -180,7 +389,9 @@ class AzCosmosDBClient(AzCosmosDBClientInterface):
     def delete_form_data(self, cosmos_db_id: str) -> None:
         """特定のCosmos DBレコードを削除する"""
         try:
-            self.container.delete_item(
+            self._call(
+                "delete_item",
+                self.container.delete_item,
                 item=cosmos_db_id,
                 partition_key=config["AZ_COSMOS_DB_PARTITION_KEY"],
             )
@@ -191,4 +402,6 @@ class AzCosmosDBClient(AzCosmosDBClientInterface):
         except Exception as e:
             logger.error(f"Cosmos DBレコード削除エラー: {e}")
             raise HTTPException(status_code=500, detail="削除中にエラーが発生しました")
+        finally:
+            self._invalidate(cosmos_db_id)
 
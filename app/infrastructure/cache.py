@@ -0,0 +1,277 @@
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import orjson
+
+from app.config.config import get_config
+from app.interfaces.cache_backend_interface import CacheBackendInterface
+from app.utils.metrics import CACHE_REQUESTS
+
+try:
+    import redis
+except ImportError:  # redis が未インストールの場合は CACHE_BACKEND=redis を選べない
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+# キャッシュのバックエンド
+#   memory: プロセス内のLRU（ワーカーごとに別々に保持する）
+#   sqlite: 同一ホストのワーカー間で共有するSQLite(WAL)ファイル
+#   redis:  レプリカ間で共有する Redis（Redis プロトコル互換のサーバーも可）
+BACKEND_KINDS = ("memory", "sqlite", "redis")
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class MemoryCacheBackend(CacheBackendInterface):
+    """件数上限付きのプロセス内LRU"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def get_many(self, keys: list[str]) -> list[bytes | None]:
+        return [self.get(key) for key in keys]
+
+    def _store(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        """書き込みと件数上限による追い出し（self._lock を取得した状態で呼び出す）"""
+        self._entries[key] = (value, time.monotonic() + ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        with self._lock:
+            self._store(key, value, ttl_seconds)
+
+    def add(self, key: str, value: bytes, ttl_seconds: float) -> bool:
+        """キーが存在しない（期限切れを含む）場合だけ書き込み、書き込んだかどうかを返す
+
+        確認と書き込みを同じロックの中で行い、同時に呼び出しても書き込めるのは1つだけにする。
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                return False
+            self._store(key, value, ttl_seconds)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def close(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCacheBackend(CacheBackendInterface):
+    """同一ホストの複数ワーカープロセスで共有する SQLite(WAL) のキャッシュ
+
+    期限は壁時計（time.time）で管理し、期限切れの行は書き込みのたびに一定回数ごとにまとめて削除する。
+    """
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """スレッドごとに接続を再利用する。初回接続時にファイルとテーブルを作成する"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SQLITE_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> bytes | None:
+        row = self._connect().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, keys: list[str]) -> list[bytes | None]:
+        if not keys:
+            return []
+        found: dict[str, bytes] = {}
+        conn = self._connect()
+        now = time.time()
+        # SQLite のパラメータ数の上限を超えないよう分割する
+        for i in range(0, len(keys), 500):
+            chunk = keys[i : i + 500]
+            rows = conn.execute(
+                f"SELECT key, value FROM cache_entries WHERE key IN ({','.join('?' * len(chunk))}) AND expires_at > ?",
+                (*chunk, now),
+            ).fetchall()
+            found.update(rows)
+        return [found.get(key) for key in keys]
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, now + ttl_seconds),
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+
+    def add(self, key: str, value: bytes, ttl_seconds: float) -> bool:
+        """キーが存在しない（期限切れを含む）場合だけ書き込み、書き込んだかどうかを返す（ワーカー間で不可分）"""
+        now = time.time()
+        cursor = self._connect().execute(
+            "INSERT INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+            "WHERE cache_entries.expires_at <= ?",
+            (key, value, now + ttl_seconds, now),
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key: str) -> None:
+        self._connect().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class RedisCacheBackend(CacheBackendInterface):
+    """Redis のキャッシュ。client には redis.Redis 互換（get / mget / set(px=, nx=) / delete）のオブジェクトを渡せる"""
+
+    def __init__(self, url: str | None = None, client: Any = None):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("CACHE_BACKEND=redis には redis パッケージが必要です")
+            client = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+        self.client = client
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(key)
+
+    def get_many(self, keys: list[str]) -> list[bytes | None]:
+        return list(self.client.mget(keys)) if keys else []
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self.client.set(key, value, px=max(1, math.ceil(ttl_seconds * 1000)))
+
+    def add(self, key: str, value: bytes, ttl_seconds: float) -> bool:
+        return bool(self.client.set(key, value, px=max(1, math.ceil(ttl_seconds * 1000)), nx=True))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+    def close(self) -> None:
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            close()
+
+
+def create_cache_backend(kind: str) -> CacheBackendInterface:
+    """設定値（memory / sqlite / redis）からバックエンドを構築する"""
+    if kind == "memory":
+        return MemoryCacheBackend(config["CACHE_MEMORY_MAX_ENTRIES"])
+    if kind == "sqlite":
+        return SQLiteCacheBackend(config["CACHE_SQLITE_PATH"])
+    if kind == "redis":
+        return RedisCacheBackend(config["CACHE_REDIS_URL"])
+    raise ValueError(f"不明なキャッシュバックエンドです: {kind}（{', '.join(BACKEND_KINDS)} のいずれか）")
+
+
+class Cache:
+    """バックエンドを名前空間で区切って使う、JSONの値のキャッシュ
+
+    バックエンドの障害はキャッシュのミスとして扱い、呼び出し元の処理は止めない。
+    """
+
+    def __init__(self, backend: CacheBackendInterface, namespace: str, ttl_seconds: float):
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Any | None:
+        try:
+            value = self.backend.get(self._key(key))
+        except Exception as e:
+            logger.warning(f"キャッシュの読み込みに失敗しました ({self.namespace}): {e}")
+            value = None
+        CACHE_REQUESTS.labels(self.namespace, "miss" if value is None else "hit").inc()
+        return None if value is None else orjson.loads(value)
+
+    def get_many(self, keys: list[str]) -> list[Any | None]:
+        try:
+            values = self.backend.get_many([self._key(key) for key in keys])
+        except Exception as e:
+            logger.warning(f"キャッシュの読み込みに失敗しました ({self.namespace}): {e}")
+            values = [None] * len(keys)
+        hits = sum(1 for value in values if value is not None)
+        if hits:
+            CACHE_REQUESTS.labels(self.namespace, "hit").inc(hits)
+        if len(values) - hits:
+            CACHE_REQUESTS.labels(self.namespace, "miss").inc(len(values) - hits)
+        return [None if value is None else orjson.loads(value) for value in values]
+
+    def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl_seconds <= 0:
+            return
+        try:
+            self.backend.set(self._key(key), orjson.dumps(value), ttl_seconds)
+        except Exception as e:
+            logger.warning(f"キャッシュの書き込みに失敗しました ({self.namespace}): {e}")
+
+    def add(self, key: str, value: Any, ttl_seconds: float | None = None) -> bool:
+        """キーが存在しない場合だけ書き込み、書き込んだかどうかを返す
+
+        バックエンドの障害時は書き込めたものとして扱う（呼び出し元の処理は止めない）。
+        """
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        try:
+            return self.backend.add(self._key(key), orjson.dumps(value), ttl_seconds)
+        except Exception as e:
+            logger.error(f"キャッシュの書き込みに失敗しました ({self.namespace}): {key}: {e}")
+            return True
+
+    def delete(self, key: str) -> None:
+        """キーを無効化する。失敗すると古い値が期限まで残るため、エラーとしてログに残す"""
+        try:
+            self.backend.delete(self._key(key))
+        except Exception as e:
+            logger.error(f"キャッシュの無効化に失敗しました ({self.namespace}): {key}: {e}")
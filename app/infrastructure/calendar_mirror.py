@@ -0,0 +1,271 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from typing import Any
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.constants import WINDOWS_TIME_ZONES
+from app.interfaces.calendar_mirror_interface import CalendarMirrorInterface
+from app.schemas.form import ScheduleRequest
+from app.utils.availability import build_availability_view
+from app.utils.metrics import CACHE_REQUESTS
+
+# 予定は開始・終了の UNIX 時刻（秒）と availabilityView の状態（1: 仮, 2: 予定あり, 3: 外出中, 4: 他の場所で作業中）のみを保持する
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mailboxes (
+    email TEXT PRIMARY KEY,
+    delta_link TEXT,
+    window_start INTEGER,
+    window_end INTEGER,
+    synced_at REAL,
+    next_sync_at REAL NOT NULL,
+    locked_until REAL,
+    tracked_at REAL NOT NULL,
+    last_error TEXT
+);
+CREATE TABLE IF NOT EXISTS busy_intervals (
+    email TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    PRIMARY KEY (email, event_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_busy_intervals_email_start
+    ON busy_intervals (email, start_ts);
+"""
+
+
+def _zone(time_zone: str) -> ZoneInfo | None:
+    try:
+        return ZoneInfo(WINDOWS_TIME_ZONES.get(time_zone, time_zone))
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+class CalendarMirror(CalendarMirrorInterface):
+    """担当者ごとの予定（calendarView/delta の結果）を保持する SQLite(WAL) のミラー
+
+    同一ホストの複数ワーカープロセスから共有でき、同期対象の取得は BEGIN IMMEDIATE で排他する。
+    ホストをまたいでは共有されず、mark_stale による無効化も同じホストにしか届かないため、単一レプリカでのみ使う
+    （Container は APP_REPLICAS が2以上の場合にミラーを無効にする）。
+    ミラーから計算できない担当者・日付（未同期・期間外・同期が古い）は get_schedules で None を返し、
+    呼び出し元は Graph API の getSchedule で取得する。
+    """
+
+    def __init__(self, path: str, max_mailboxes: int, max_staleness_seconds: float):
+        self.path = path
+        self.max_mailboxes = max_mailboxes
+        self.max_staleness_seconds = max_staleness_seconds
+        self._local = threading.local()
+        # 登録を試みたメールアドレス（リクエストのたびに書き込まないため）
+        self._tracked: set[str] = set()
+
+    def _connect(self) -> sqlite3.Connection:
+        """スレッドごとに接続を再利用する。初回接続時にファイルとテーブルを作成する"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def track(self, emails: list[str]) -> None:
+        """メールアドレスを同期対象に登録する（上限に達している場合は登録しない）"""
+        new = sorted({email.lower() for email in emails} - self._tracked)
+        if not new:
+            return
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            count = conn.execute("SELECT COUNT(*) FROM mailboxes").fetchone()[0]
+            for email in new:
+                cursor = conn.execute(
+                    """
+                    INSERT INTO mailboxes (email, next_sync_at, tracked_at)
+                    SELECT ?, ?, ? WHERE ? < ?
+                    ON CONFLICT (email) DO NOTHING
+                    """,
+                    (email, now, now, count, self.max_mailboxes),
+                )
+                count += cursor.rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        # 上限で登録できなかったものも、このプロセスでは再度試みない
+        self._tracked.update(new)
+
+    def claim_due(self, limit: int, lease_seconds: float) -> list[dict[str, Any]]:
+        """同期時刻を過ぎたメールボックスをリース付きで取得する"""
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                """
+                SELECT email, delta_link, window_start, window_end FROM mailboxes
+                WHERE next_sync_at <= ? AND (locked_until IS NULL OR locked_until < ?)
+                ORDER BY next_sync_at
+                LIMIT ?
+                """,
+                (now, now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE mailboxes SET locked_until = ? WHERE email = ?",
+                [(now + lease_seconds, row["email"]) for row in rows],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [dict(row) for row in rows]
+
+    def apply_changes(
+        self,
+        email: str,
+        upserts: list[tuple[str, int, int, int]],
+        removed: list[str],
+        delta_link: str | None,
+        window_start: int,
+        window_end: int,
+        reset: bool,
+        next_sync_at: float,
+    ) -> None:
+        """同期結果を1トランザクションで反映する
+
+        upserts は (イベントID, 開始, 終了, 状態)、removed は削除・キャンセル・空き扱いになったイベントID。
+        reset の場合は既存の予定をすべて置き換える（初回同期・期間の更新・deltaLink の失効時）。
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if reset:
+                conn.execute("DELETE FROM busy_intervals WHERE email = ?", (email,))
+            conn.executemany(
+                "DELETE FROM busy_intervals WHERE email = ? AND event_id = ?",
+                [(email, event_id) for event_id in removed],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO busy_intervals (email, event_id, start_ts, end_ts, status) VALUES (?, ?, ?, ?, ?)",
+                [(email, *upsert) for upsert in upserts],
+            )
+            conn.execute(
+                """
+                UPDATE mailboxes SET delta_link = ?, window_start = ?, window_end = ?, synced_at = ?,
+                    next_sync_at = ?, locked_until = NULL, last_error = NULL
+                WHERE email = ?
+                """,
+                (delta_link, window_start, window_end, time.time(), next_sync_at, email),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def mark_failed(self, email: str, error: str, next_sync_at: float) -> None:
+        self._connect().execute(
+            "UPDATE mailboxes SET next_sync_at = ?, locked_until = NULL, last_error = ? WHERE email = ?",
+            (next_sync_at, error[:4000], email),
+        )
+
+    def mark_stale(self, email: str) -> None:
+        """このアプリが予定を変更した場合に呼び出し、次の同期まで Graph API から取得させる"""
+        self._connect().execute(
+            "UPDATE mailboxes SET synced_at = NULL, next_sync_at = 0 WHERE email = ?", (email.lower(),)
+        )
+
+    def get_schedules(
+        self, schedule_req: ScheduleRequest, targets: list[tuple[date, str]]
+    ) -> list[dict[str, Any] | None]:
+        """getSchedule と同じ形式の結果を（日付, 担当者）ごとに返す。ミラーから計算できないものは None"""
+        results: list[dict[str, Any] | None] = [None] * len(targets)
+        zone = _zone(schedule_req.time_zone)
+        interval_seconds = schedule_req.duration_minutes * 60
+        if zone is None or interval_seconds <= 0 or not targets:
+            CACHE_REQUESTS.labels("calendar_mirror", "miss").inc(len(targets))
+            return results
+
+        start_time = datetime.strptime(schedule_req.start_time, "%H:%M").time()
+        end_time = datetime.strptime(schedule_req.end_time, "%H:%M").time()
+        windows = [
+            (
+                datetime.combine(day, start_time, zone).timestamp(),
+                datetime.combine(day, end_time, zone).timestamp(),
+            )
+            for day, _ in targets
+        ]
+        conn = self._connect()
+        fresh_after = time.time() - self.max_staleness_seconds
+        by_email: dict[str, list[int]] = {}
+        for i, (_, email) in enumerate(targets):
+            by_email.setdefault(email.lower(), []).append(i)
+
+        for email, indexes in by_email.items():
+            state = conn.execute(
+                "SELECT window_start, window_end, synced_at FROM mailboxes WHERE email = ?", (email,)
+            ).fetchone()
+            if state is None or state["synced_at"] is None or state["synced_at"] < fresh_after:
+                continue
+            covered = [
+                i for i in indexes if state["window_start"] <= windows[i][0] and windows[i][1] <= state["window_end"]
+            ]
+            if not covered:
+                continue
+            intervals = conn.execute(
+                "SELECT start_ts, end_ts, status FROM busy_intervals WHERE email = ? AND start_ts < ? AND end_ts > ?",
+                (email, max(windows[i][1] for i in covered), min(windows[i][0] for i in covered)),
+            ).fetchall()
+            for i in covered:
+                start, end = windows[i]
+                view = build_availability_view(
+                    [tuple(row) for row in intervals if row[0] < end and row[1] > start],
+                    start,
+                    interval_seconds,
+                    math.ceil((end - start) / interval_seconds),
+                )
+                results[i] = {"value": [{"scheduleId": targets[i][1], "availabilityView": view}]}
+
+        hits = sum(1 for r in results if r is not None)
+        if hits:
+            CACHE_REQUESTS.labels("calendar_mirror", "hit").inc(hits)
+        if len(results) - hits:
+            CACHE_REQUESTS.labels("calendar_mirror", "miss").inc(len(results) - hits)
+        return results
+
+    def stats(self) -> dict[str, Any]:
+        """同期対象のメールボックス数・同期済みの数・失敗中の数・保持している予定の数と、最も古い同期からの経過秒数"""
+        conn = self._connect()
+        row = conn.execute(
+            """
+            SELECT COUNT(*) AS mailboxes,
+                   SUM(synced_at IS NOT NULL) AS synced,
+                   SUM(last_error IS NOT NULL) AS failing,
+                   MIN(synced_at) AS oldest_synced_at
+            FROM mailboxes
+            """
+        ).fetchone()
+        intervals = conn.execute("SELECT COUNT(*) FROM busy_intervals").fetchone()[0]
+        return {
+            "mailboxes": row["mailboxes"],
+            "synced": row["synced"] or 0,
+            "failing": row["failing"] or 0,
+            "busy_intervals": intervals,
+            "oldest_sync_age_seconds": round(time.time() - row["oldest_synced_at"], 3)
+            if row["oldest_synced_at"]
+            else None,
+        }
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -1,6 +1,11 @@
 from sqlalchemy import create_engine, MetaData
 from sqlalchemy.engine import URL
 
+from app.config.config import get_config
+from app.utils.metrics import instrument_engine
+
+config = get_config()
+
 engine = create_engine(
     URL.create(
         "mssql+pyodbc",
@@ -14,9 +19,10 @@ engine = create_engine(
             "Encrypt": "yes",
         },
     ),
-    echo=True,
+    echo=config["SQL_ECHO"],
     fast_executemany=True,
     pool_pre_ping=True,
 )
+instrument_engine(engine)
 
 metadata = MetaData()
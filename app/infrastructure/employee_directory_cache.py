@@ -0,0 +1,117 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+
+from app.interfaces.employee_directory_repository_interface import EmployeeDirectoryRepositoryInterface
+from app.utils.metrics import CACHE_REQUESTS
+from app.utils.search_index import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class EmployeeDirectorySnapshot:
+    """ある時点の従業員一覧と検索インデックス"""
+
+    entries: list[dict[str, str]]
+    version: str
+    loaded_at: float
+    index: SearchIndex = field(repr=False)
+
+    def search(self, query: str | None) -> list[dict[str, str]]:
+        if not query:
+            return self.entries
+        return [self.entries[i] for i in self.index.search(query)]
+
+
+class EmployeeDirectoryCache:
+    """従業員一覧をTTL付きでメモリに保持し、バックグラウンドで更新するキャッシュ"""
+
+    def __init__(
+        self,
+        repository: EmployeeDirectoryRepositoryInterface,
+        ttl_seconds: float,
+    ):
+        self.repository = repository
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: EmployeeDirectorySnapshot | None = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+        self._periodic_task: asyncio.Task | None = None
+
+    def _load(self) -> EmployeeDirectorySnapshot:
+        """DBから従業員一覧を読み込み、スナップショットを構築する（同期処理）"""
+        rows = self.repository.get_all_employee_directory()
+        entries = [{"name": row.name, "email": row.mail} for row in rows]
+        version = hashlib.sha256(
+            json.dumps(entries, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+        index = SearchIndex([[e["name"], e["email"]] for e in entries])
+        return EmployeeDirectorySnapshot(entries, version, time.monotonic(), index)
+
+    async def _replace(self) -> EmployeeDirectorySnapshot:
+        snapshot = await asyncio.to_thread(self._load)
+        if self._snapshot is None or self._snapshot.version != snapshot.version:
+            logger.info(f"従業員一覧キャッシュを更新しました: {len(snapshot.entries)}件")
+        self._snapshot = snapshot
+        return snapshot
+
+    async def refresh(self) -> EmployeeDirectorySnapshot:
+        """DBから再読込してキャッシュを置き換える"""
+        async with self._lock:
+            return await self._replace()
+
+    def _is_stale(self, snapshot: EmployeeDirectorySnapshot) -> bool:
+        return time.monotonic() - snapshot.loaded_at >= self.ttl_seconds
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_quietly())
+
+    async def _refresh_quietly(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"従業員一覧キャッシュの更新に失敗しました: {e}")
+
+    async def get(self) -> EmployeeDirectorySnapshot:
+        """スナップショットを返す。期限切れの場合は古い値を返しつつバックグラウンドで更新する"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            CACHE_REQUESTS.labels("employee_directory", "miss").inc()
+            # 初回ロードは同時リクエストがあっても1回だけ行う
+            async with self._lock:
+                snapshot = self._snapshot or await self._replace()
+        elif self._is_stale(snapshot):
+            CACHE_REQUESTS.labels("employee_directory", "stale").inc()
+            self._schedule_refresh()
+        else:
+            CACHE_REQUESTS.labels("employee_directory", "hit").inc()
+        return snapshot
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await self._refresh_quietly()
+            await asyncio.sleep(self.ttl_seconds)
+
+    def start(self) -> None:
+        """定期更新タスクを開始する"""
+        if self._periodic_task is None:
+            self._periodic_task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        """定期更新タスクを停止する"""
+        for task in (self._periodic_task, self._refresh_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._periodic_task = None
+        self._refresh_task = None
+
@@ -2,7 +2,8 @@ from sqlalchemy import select
 from typing import Any
 
 from app.config.config import get_config
-from app.infrastructure.db import engine, metadata
+from app.infrastructure.db import engine
+from app.infrastructure.tables import employee_directory
 from app.interfaces.employee_directory_repository_interface import EmployeeDirectoryRepositoryInterface
 
 config = get_config()
@@ -11,12 +12,7 @@ config = get_config()
 class EmployeeDirectoryRepository(EmployeeDirectoryRepositoryInterface):
     def __init__(self):
         self.engine = engine
-        self.metadata = metadata
-
-        if "employee_directory" not in self.metadata.tables:
-            self.metadata.reflect(bind=self.engine, only=["employee_directory"])
-
-        self.employee_directory = self.metadata.tables["employee_directory"]
+        self.employee_directory = employee_directory
 
     def get_all_employee_directory(self) -> Any:
         with self.engine.begin() as conn:
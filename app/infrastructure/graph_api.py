@@ -1,48 +1,131 @@
+import logging
+import threading
 import requests
 import urllib.parse
+import uuid
 from fastapi import HTTPException
 from typing import Any
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
-from app.utils.access_token import get_access_token
+from app.config.config import get_config
+from app.infrastructure.cache import Cache
+from app.interfaces.calendar_mirror_interface import CalendarMirrorInterface
+from app.utils.access_token import acquire_access_token
+from app.utils.admission import record_graph_call
 from app.schemas.form import ScheduleRequest
 from app.interfaces.graph_api_interface import GraphAPIClientInterface
+from app.utils.metrics import track_dependency
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+_TOKEN_CACHE_KEY = "graph"
+# 担当者ごとの空き時間の世代を保持する期間（秒）。失われた場合は新しい世代を作るため、古い結果は返さない
+_FREEBUSY_GENERATION_TTL_SECONDS = 24 * 3600
 
 class GraphAPIClient(GraphAPIClientInterface):
     BASE_URL = "https://graph.microsoft.com/v1.0/users"
 
-    def __init__(self):
+    def __init__(
+        self,
+        token_cache: Cache | None = None,
+        freebusy_cache: Cache | None = None,
+        calendar_mirror: CalendarMirrorInterface | None = None,
+    ):
+        """token_cache: プロセス間でアクセストークンを共有する / freebusy_cache: 担当者・日付ごとの空き時間 /
+        calendar_mirror: 同期済みの担当者の空き時間を Graph API を呼ばずに計算する予定のミラー
+
+        アクセストークンは最初のリクエスト（または起動時の温め処理）で取得する。
+        構築時には通信しないため、Azure AD の障害中でもアプリケーションは起動できる。
+        """
+        # 接続を使い回すため、クライアントごとに1つのセッションを保持する
+        self.session = requests.Session()
+        self.token_cache = token_cache
+        self.freebusy_cache = freebusy_cache
+        self.calendar_mirror = calendar_mirror
+        self.access_token: str | None = None
+        # 複数のスレッドが同時に 401 を受けてもトークンの取得は1回にする
+        self._token_lock = threading.Lock()
+
+    def close(self) -> None:
+        """HTTPセッションを閉じる"""
+        self.session.close()
+
+    def _acquire_token(self, rejected: str | None) -> str:
+        """キャッシュのトークン（拒否されたものと異なる場合）を使い、なければ新たに取得してキャッシュする"""
+        if self.token_cache is not None:
+            cached = self.token_cache.get(_TOKEN_CACHE_KEY)
+            if cached and cached != rejected:
+                return cached
+        token, expires_in = acquire_access_token()
+        if self.token_cache is not None:
+            self.token_cache.set(_TOKEN_CACHE_KEY, token, expires_in - config["TOKEN_CACHE_MARGIN_SECONDS"])
+        return token
+
+    def refresh_token(self, rejected: str | None = None) -> None:
+        """アクセストークンを取得またはリフレッシュ（rejected: 401 を受けたトークン。キャッシュからも使わない）
+
+        他のスレッドが既に rejected と異なるトークンを取得している場合はそれを使う。
+        """
+        with self._token_lock:
+            if self.access_token is not None and self.access_token != rejected:
+                return
+            try:
+                token = self._acquire_token(rejected=rejected)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"トークン更新失敗: {str(e)}")
+            if not token:
+                raise HTTPException(status_code=500, detail="トークン更新失敗: アクセストークンが空です")
+            self.access_token = token
+
+    def warmup(self) -> None:
+        """アクセストークンを取得しておく（起動時の温め処理。失敗した場合は例外を送出する）"""
         self.refresh_token()
 
-    def refresh_token(self) -> None:
-        """アクセストークンを取得またはリフレッシュ"""
-        try:
-            self.access_token = get_access_token()
-            if not self.access_token:
-                raise HTTPException(status_code=401, detail="アクセストークンが空です")
-            self.headers = {
-                "Authorization": f"Bearer {self.access_token}",
-                "Content-Type": "application/json",
-            }
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"トークン更新失敗: {str(e)}")
+    def _current_token(self) -> str:
+        if self.access_token is None:
+            self.refresh_token()
+        return self.access_token
+
+    @staticmethod
+    def _auth_headers(token: str, extra_headers: dict[str, str]) -> dict[str, str]:
+        """リクエストごとのヘッダー（共有のクライアントに保持せず、スレッド間で書き換え合わないようにする）"""
+        return {"Authorization": f"Bearer {token}", "Content-Type": "application/json", **extra_headers}
 
     def _handle_request(
-        self, method: str, url: str, **kwargs
+        self, method: str, url: str, operation: str = "request", **kwargs
     ) -> dict[str, Any] | None:
-        """APIリクエストの共通処理"""
+        """APIリクエストの共通処理（operation はメトリクスの操作名、headers は共通のヘッダーに追加する）"""
+        extra_headers = kwargs.pop("headers", None) or {}
         try:
-            response = requests.request(method, url, headers=self.headers, **kwargs)
+            with track_dependency("graph", operation, method=method) as span:
+                token = self._current_token()
+                response = self.session.request(method, url, headers=self._auth_headers(token, extra_headers), **kwargs)
+
+                if response.status_code == 401:
+                    self.refresh_token(rejected=token)
+                    response = self.session.request(
+                        method, url, headers=self._auth_headers(self._current_token(), extra_headers), **kwargs
+                    )
+                    if span is not None:
+                        span.set_attribute("token_refreshed", True)
 
-            if response.status_code == 401:
-                self.refresh_token()
-                response = requests.request(method, url, headers=self.headers, **kwargs)
+                if span is not None:
+                    span.set_attribute("status_code", response.status_code)
 
-            response.raise_for_status()
+                response.raise_for_status()
 
-            return response.json() if response.content else None
+                return response.json() if response.content else None
 
         except requests.exceptions.RequestException as e:
+            status_code = getattr(e.response, "status_code", None)
+            # 410 は deltaLink の失効を表すため、呼び出し元で初回同期からやり直せるようそのまま返す
+            if status_code == 410:
+                raise HTTPException(status_code=410, detail=f"Graph APIの同期状態が失効しました: {str(e)}")
+            # 404 は対象（削除済みのイベントなど）が存在しないことを表すため、呼び出し元で区別できるようそのまま返す
+            if status_code == 404:
+                raise HTTPException(status_code=404, detail=f"Graph APIの対象が存在しません: {str(e)}")
             raise HTTPException(
                 status_code=502, detail=f"Graph APIリクエストエラー: {str(e)}"
             )
@@ -52,37 +135,127 @@ class GraphAPIClient(GraphAPIClientInterface):
             )
 
     def post_request(
-        self, url: str, body: dict[str, Any], timeout: int = 60
+        self, url: str, body: dict[str, Any], timeout: int = 60, operation: str = "post"
     ) -> dict[str, Any] | None:
         """Graph APIへのPOSTリクエスト"""
-        return self._handle_request("POST", url, json=body, timeout=timeout)
+        return self._handle_request("POST", url, operation, json=body, timeout=timeout)
+
+    def _get_schedule(self, schedule_req: ScheduleRequest, day: date, email: str) -> dict[str, Any] | None:
+        """1人・1日分の getSchedule を呼び出す"""
+        record_graph_call()
+        url = f"{self.BASE_URL}/{urllib.parse.quote(email)}/calendar/getSchedule"
+        body = {
+            "schedules": [email],
+            "startTime": {
+                "dateTime": f"{day}T{schedule_req.start_time}:00",
+                "timeZone": schedule_req.time_zone,
+            },
+            "endTime": {
+                "dateTime": f"{day}T{schedule_req.end_time}:00",
+                "timeZone": schedule_req.time_zone,
+            },
+            "availabilityViewInterval": schedule_req.duration_minutes,
+        }
+        return self.post_request(url, body, operation="get_schedule")
+
+    def _freebusy_keys(self, schedule_req: ScheduleRequest, targets: list[tuple[date, str]]) -> list[str]:
+        """空き時間のキャッシュキー。担当者ごとの世代を含め、予定の変更時に世代を変えて無効化する
+
+        世代が見つからない場合（期限切れ・バックエンドからの追い出し・障害）は新しい世代を作る。
+        既定の世代に戻すと、変更前に保存した結果を再び返してしまうため。
+        """
+        emails = sorted({email.lower() for _, email in targets})
+        generations = dict(zip(emails, self.freebusy_cache.get_many([f"gen:{e}" for e in emails])))
+        for email, generation in generations.items():
+            if generation is None:
+                generations[email] = uuid.uuid4().hex
+                self.freebusy_cache.set(f"gen:{email}", generations[email], _FREEBUSY_GENERATION_TTL_SECONDS)
+        return [
+            f"{email.lower()}:{generations[email.lower()]}:{day}:{schedule_req.start_time}-{schedule_req.end_time}"
+            f":{schedule_req.duration_minutes}:{schedule_req.time_zone}"
+            for day, email in targets
+        ]
+
+    def _invalidate_freebusy(self, employee_email: str) -> None:
+        if self.freebusy_cache is not None:
+            self.freebusy_cache.set(
+                f"gen:{employee_email.lower()}", uuid.uuid4().hex, _FREEBUSY_GENERATION_TTL_SECONDS
+            )
+        if self.calendar_mirror is not None:
+            try:
+                self.calendar_mirror.mark_stale(employee_email)
+            except Exception as e:
+                logger.error(f"予定のミラーの無効化に失敗しました: {employee_email}: {e}")
+
+    def calendar_view_delta(
+        self, employee_email: str, start_datetime: str, end_datetime: str, delta_link: str | None = None
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """calendarView/delta で期間内の予定を取得する（delta_link を渡すと前回の同期以降の変更のみ）
+
+        日時は UTC で返す。戻り値は全ページ分の予定（削除されたものは "@removed" を含む）と次回用の deltaLink。
+        deltaLink が失効している場合は 410 の HTTPException を送出する。
+        """
+        if delta_link:
+            url = delta_link
+        else:
+            query = urllib.parse.urlencode({"startDateTime": start_datetime, "endDateTime": end_datetime})
+            url = f"{self.BASE_URL}/{urllib.parse.quote(employee_email)}/calendarView/delta?{query}"
+        headers = {"Prefer": f'outlook.timezone="UTC", odata.maxpagesize={config["CALENDAR_MIRROR_PAGE_SIZE"]}'}
+        events: list[dict[str, Any]] = []
+        while True:
+            page = self._handle_request("GET", url, "calendar_view_delta", headers=headers, timeout=60) or {}
+            events.extend(page.get("value", []))
+            if "@odata.nextLink" in page:
+                url = page["@odata.nextLink"]
+                continue
+            return events, page.get("@odata.deltaLink")
+
+    def _mirrored_schedules(
+        self, schedule_req: ScheduleRequest, targets: list[tuple[date, str]]
+    ) -> list[dict[str, Any] | None]:
+        """ミラーから計算できた結果を返す。計算できなかった担当者は同期対象に登録する（ミラーの障害は取得なしとして扱う）"""
+        try:
+            schedules_list = self.calendar_mirror.get_schedules(schedule_req, targets)
+            missing = {email for (_, email), schedule in zip(targets, schedules_list) if schedule is None}
+            if missing:
+                self.calendar_mirror.track(sorted(missing))
+            return schedules_list
+        except Exception as e:
+            logger.warning(f"予定のミラーの参照に失敗しました: {e}")
+            return [None] * len(targets)
 
     def get_schedules(self, schedule_req: ScheduleRequest) -> list[dict[str, Any]]:
-        """スケジュールを取得"""
+        """スケジュールを取得（freebusy_cache がある場合は担当者・日付ごとの結果を再利用する）"""
         try:
-            schedules_list = []
+            targets = []
             start_date = datetime.strptime(schedule_req.start_date, "%Y-%m-%d")
             end_date = datetime.strptime(schedule_req.end_date, "%Y-%m-%d")
 
             delta = timedelta(days=1)
             while start_date <= end_date:
                 for employee_email in schedule_req.employee_emails:
-                    url = f"{self.BASE_URL}/{urllib.parse.quote(employee_email.email)}/calendar/getSchedule"
-                    body = {
-                        "schedules": [employee_email.email],
-                        "startTime": {
-                            "dateTime": f"{start_date.date()}T{schedule_req.start_time}:00",
-                            "timeZone": schedule_req.time_zone,
-                        },
-                        "endTime": {
-                            "dateTime": f"{start_date.date()}T{schedule_req.end_time}:00",
-                            "timeZone": schedule_req.time_zone,
-                        },
-                        "availabilityViewInterval": schedule_req.duration_minutes,
-                    }
-                    schedules_list.append(self.post_request(url, body))
+                    targets.append((start_date.date(), employee_email.email))
                 start_date += delta
 
+            # 同期済みの担当者はミラーから計算し、残りを（キャッシュを経由して）Graph API から取得する
+            schedules_list: list[dict[str, Any] | None] = [None] * len(targets)
+            if self.calendar_mirror is not None:
+                schedules_list = self._mirrored_schedules(schedule_req, targets)
+            missing = [i for i, schedule in enumerate(schedules_list) if schedule is None]
+            if not missing:
+                return schedules_list
+
+            if self.freebusy_cache is None:
+                for i in missing:
+                    schedules_list[i] = self._get_schedule(schedule_req, *targets[i])
+                return schedules_list
+
+            keys = self._freebusy_keys(schedule_req, [targets[i] for i in missing])
+            for i, key, cached in zip(missing, keys, self.freebusy_cache.get_many(keys)):
+                if cached is None:
+                    cached = self._get_schedule(schedule_req, *targets[i])
+                    self.freebusy_cache.set(key, cached)
+                schedules_list[i] = cached
             return schedules_list
         except Exception as e:
             raise HTTPException(
@@ -97,14 +270,23 @@ class GraphAPIClient(GraphAPIClientInterface):
             url = (
                 f"{self.BASE_URL}/{urllib.parse.quote(employee_email)}/calendar/events"
             )
-            return self.post_request(url, event)
+            return self.post_request(url, event, operation="register_event")
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"予定登録エラー: {str(e)}")
+        finally:
+            # 失敗した場合も登録済みの可能性があるため無効化する
+            self._invalidate_freebusy(employee_email)
 
     def send_email(
         self, sender_email: str, target_employee_email: str, subject: str, body: str
     ) -> None:
         """メールを送信"""
+        self.send_email_to_recipients(sender_email, [target_employee_email], subject, body)
+
+    def send_email_to_recipients(
+        self, sender_email: str, recipient_emails: list[str], subject: str, body: str
+    ) -> None:
+        """同一内容のメールを複数の宛先に1回のリクエストで送信"""
         try:
             endpoint = f"{self.BASE_URL}/{sender_email}/sendMail"
             modified_body = (
@@ -121,11 +303,12 @@ class GraphAPIClient(GraphAPIClientInterface):
                         "content": modified_body,
                     },
                     "toRecipients": [
-                        {"emailAddress": {"address": target_employee_email}}
+                        {"emailAddress": {"address": recipient_email}}
+                        for recipient_email in recipient_emails
                     ],
                 }
             }
-            self.post_request(endpoint, email_data)
+            self.post_request(endpoint, email_data, operation="send_mail")
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"メール送信エラー: {str(e)}")
 
@@ -145,18 +328,22 @@ class GraphAPIClient(GraphAPIClientInterface):
                     "timeZone": "Tokyo Standard Time"
                 }
             }
-            self._handle_request("PATCH", url, json=update_data)
+            self._handle_request("PATCH", url, "update_event", json=update_data)
         except Exception as e:
             raise HTTPException(
                 status_code=500, detail=f"Graph APIイベント時刻更新エラー: {e}"
             )
+        finally:
+            self._invalidate_freebusy(employee_email)
 
     def delete_event(self, employee_email: str, event_id: str) -> None:
         """予定を削除するためのGraph API呼び出し"""
         try:
             url = f"{self.BASE_URL}/{urllib.parse.quote(employee_email)}/events/{event_id}"
-            self._handle_request("DELETE", url)
+            self._handle_request("DELETE", url, "delete_event")
         except requests.RequestException as e:
             raise HTTPException(
                 status_code=500, detail=f"Graph APIイベント削除エラー: {e}"
             )
+        finally:
+            self._invalidate_freebusy(employee_email)
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException
+from starlette.responses import Response
+
+from app.infrastructure.cache import Cache
+from app.utils.metrics import CACHE_REQUESTS
+from app.utils.responses import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# 他のワーカーが実行中のキーの完了を確認する間隔（秒）の上限
+_POLL_MAX_SECONDS = 0.5
+
+STATE_PENDING = "pending"
+STATE_DONE = "done"
+
+
+@dataclass
+class _InFlight:
+    fingerprint: str
+    # 成功・失敗のいずれかで完了する（同じプロセスで待機中の重複リクエストを起こす）
+    done: asyncio.Future = field(repr=False)
+
+
+class IdempotencyStore:
+    """Idempotency-Key ごとに実行中・完了済みの結果を保持するストア
+
+    同じキーのリクエストが実行中であれば完了を待ち、完了済みであれば保存したレスポンスを
+    そのまま返す（Graph API の予定登録やメール送信を繰り返さない）。
+    失敗した実行の結果は保存せず、キーを解放して再試行できるようにする。
+
+    実行中の印と完了した結果はキャッシュ（sqlite / redis でワーカー・レプリカ間で共有）に保存し、
+    実行中の印は存在しない場合だけ書き込む（add）ことで、複数のワーカーで同じキーを重複して実行しない。
+    実行中の印は lease_seconds で期限切れになる（実行中にプロセスが停止した場合にキーを解放するため）。
+    同じプロセスで実行中のキーはキャッシュとは別に保持し、件数上限による追い出しの対象にしない。
+    """
+
+    def __init__(self, cache: Cache | None, lease_seconds: float, wait_timeout_seconds: float):
+        self.cache = cache
+        self.lease_seconds = lease_seconds
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self._in_flight: dict[str, _InFlight] = {}
+
+    @staticmethod
+    def _replay(record: dict[str, Any]) -> Response:
+        return Response(
+            content=record["body"].encode("utf-8"),
+            status_code=record["status_code"],
+            media_type="application/json",
+            headers={REPLAYED_HEADER: "true"},
+        )
+
+    @staticmethod
+    def _reject_mismatch() -> HTTPException:
+        return HTTPException(
+            status_code=422,
+            detail="Idempotency-Key が異なる内容のリクエストで再利用されています",
+        )
+
+    @staticmethod
+    def _busy() -> HTTPException:
+        return HTTPException(
+            status_code=409,
+            detail="同じ Idempotency-Key のリクエストを処理中です",
+            headers={"Retry-After": "1"},
+        )
+
+    async def _acquire(self, entry_key: str, fingerprint: str) -> Response | None:
+        """キーの実行権を得るまで待つ。完了済みの結果があればそのレスポンスを返す"""
+        deadline = time.monotonic() + self.wait_timeout_seconds
+        poll = 0.05
+        waited = False
+        while True:
+            remaining = deadline - time.monotonic()
+            local = self._in_flight.get(entry_key)
+            if local is not None:
+                if local.fingerprint != fingerprint:
+                    raise self._reject_mismatch()
+                if not waited:
+                    CACHE_REQUESTS.labels("idempotency", "wait").inc()
+                    waited = True
+                try:
+                    await asyncio.wait_for(asyncio.shield(local.done), max(remaining, 0))
+                except asyncio.TimeoutError:
+                    raise self._busy()
+                # 完了していれば保存した結果を返し、失敗していれば自分で実行する
+                continue
+
+            record = await asyncio.to_thread(self.cache.get, entry_key)
+            if record is None:
+                claimed = await asyncio.to_thread(
+                    self.cache.add,
+                    entry_key,
+                    {"state": STATE_PENDING, "fingerprint": fingerprint},
+                    self.lease_seconds,
+                )
+                if claimed:
+                    return None
+                continue
+            if record["fingerprint"] != fingerprint:
+                raise self._reject_mismatch()
+            if record["state"] == STATE_DONE:
+                CACHE_REQUESTS.labels("idempotency", "replay").inc()
+                logger.info(f"Idempotency-Key の結果を再送します: {entry_key}")
+                return self._replay(record)
+
+            # 他のワーカーが実行中
+            if not waited:
+                CACHE_REQUESTS.labels("idempotency", "wait").inc()
+                waited = True
+            if remaining <= 0:
+                raise self._busy()
+            await asyncio.sleep(min(poll, remaining))
+            poll = min(poll * 2, _POLL_MAX_SECONDS)
+
+    async def execute(
+        self,
+        scope: str,
+        key: str,
+        fingerprint: str,
+        func: Callable[[], Awaitable[Any]],
+    ) -> Response:
+        """キーに対して func を1度だけ実行し、そのレスポンスを返す
+
+        scope はエンドポイントごとにキーを分けるための名前、fingerprint はリクエスト内容のハッシュ。
+        同じキーで内容の異なるリクエストは 422、実行中の待機がタイムアウトした場合は 409 を返す。
+        キャッシュを使わない設定（IDEMPOTENCY_TTL_SECONDS=0）の場合は毎回実行する。
+        """
+        if self.cache is None:
+            return FastJSONResponse(await func())
+
+        entry_key = f"{scope}:{key}"
+        replay = await self._acquire(entry_key, fingerprint)
+        if replay is not None:
+            return replay
+
+        CACHE_REQUESTS.labels("idempotency", "miss").inc()
+        in_flight = _InFlight(fingerprint=fingerprint, done=asyncio.get_running_loop().create_future())
+        self._in_flight[entry_key] = in_flight
+        try:
+            result = await func()
+            response = FastJSONResponse(result)
+        except BaseException:
+            await asyncio.to_thread(self.cache.delete, entry_key)
+            raise
+        else:
+            await asyncio.to_thread(
+                self.cache.set,
+                entry_key,
+                {
+                    "state": STATE_DONE,
+                    "fingerprint": fingerprint,
+                    "status_code": response.status_code,
+                    "body": bytes(response.body).decode("utf-8"),
+                },
+            )
+            return response
+        finally:
+            del self._in_flight[entry_key]
+            in_flight.done.set_result(None)
@@ -0,0 +1,190 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from app.interfaces.notification_queue_interface import NotificationQueueInterface
+from app.schemas.notification import Notification
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_SENDING = "sending"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dedupe_key TEXT UNIQUE,
+    sender_email TEXT NOT NULL,
+    recipient_email TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    locked_until REAL,
+    enqueued_at REAL NOT NULL,
+    sent_at REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_notifications_status_available_at
+    ON notifications (status, available_at);
+"""
+
+
+def content_hash(sender_email: str, subject: str, body: str) -> str:
+    """送信元・件名・本文が同一の通知をまとめるためのハッシュ"""
+    return hashlib.sha256(f"{sender_email}\0{subject}\0{body}".encode("utf-8")).hexdigest()
+
+
+class NotificationQueue(NotificationQueueInterface):
+    """SQLite(WAL)に永続化されるメール送信キュー
+
+    同一ホストの複数ワーカープロセスから共有できるよう、取得は BEGIN IMMEDIATE で排他する。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """スレッドごとに接続を再利用する。初回接続時にファイルとテーブルを作成する"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, notifications: list[Notification]) -> int:
+        """通知をキューに追加し、追加件数を返す。dedupe_key が重複する通知は無視する"""
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            inserted = 0
+            for n in notifications:
+                cursor = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO notifications
+                        (dedupe_key, sender_email, recipient_email, subject, body, content_hash,
+                         status, available_at, enqueued_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        n.dedupe_key,
+                        n.sender_email,
+                        n.recipient_email,
+                        n.subject,
+                        n.body,
+                        content_hash(n.sender_email, n.subject, n.body),
+                        STATUS_PENDING,
+                        now,
+                        now,
+                    ),
+                )
+                inserted += cursor.rowcount
+            conn.execute("COMMIT")
+            return inserted
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def claim(self, limit: int, lease_seconds: float, max_attempts: int) -> list[dict[str, Any]]:
+        """送信可能な通知をリース付きで取得する
+
+        送信中のままリース期限が切れたもの（送信中にワーカーが停止した）は再取得するが、上限回数に達していれば
+        失敗状態にする（停止のたびに同じメールを送り続けないため）。
+        """
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            dead_lettered = conn.execute(
+                """
+                UPDATE notifications SET status = ?, locked_until = NULL, last_error = ?
+                WHERE status = ? AND locked_until < ? AND attempts >= ?
+                """,
+                (STATUS_FAILED, f"lease expired after {max_attempts} attempts", STATUS_SENDING, now, max_attempts),
+            ).rowcount
+            rows = conn.execute(
+                """
+                SELECT id, sender_email, recipient_email, subject, body, content_hash, attempts, enqueued_at
+                FROM notifications
+                WHERE (status = ? AND available_at <= ?)
+                   OR (status = ? AND locked_until < ?)
+                ORDER BY available_at
+                LIMIT ?
+                """,
+                (STATUS_PENDING, now, STATUS_SENDING, now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE notifications SET status = ?, locked_until = ?, attempts = attempts + 1 WHERE id = ?",
+                [(STATUS_SENDING, now + lease_seconds, row["id"]) for row in rows],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if dead_lettered:
+            logger.error(f"送信中のまま上限回数に達した通知を失敗にしました: {dead_lettered}件")
+        return [{**dict(row), "attempts": row["attempts"] + 1} for row in rows]
+
+    def mark_sent(self, ids: list[int]) -> None:
+        conn = self._connect()
+        conn.executemany(
+            "UPDATE notifications SET status = ?, sent_at = ?, locked_until = NULL, last_error = NULL WHERE id = ?",
+            [(STATUS_SENT, time.time(), i) for i in ids],
+        )
+
+    def mark_failed(self, ids: list[int], error: str, retry_at: float | None) -> None:
+        """送信失敗を記録する。retry_at が None の場合は再試行しない"""
+        conn = self._connect()
+        if retry_at is None:
+            conn.executemany(
+                "UPDATE notifications SET status = ?, locked_until = NULL, last_error = ? WHERE id = ?",
+                [(STATUS_FAILED, error[:4000], i) for i in ids],
+            )
+        else:
+            conn.executemany(
+                "UPDATE notifications SET status = ?, available_at = ?, locked_until = NULL, last_error = ? WHERE id = ?",
+                [(STATUS_PENDING, retry_at, error[:4000], i) for i in ids],
+            )
+
+    def stats(self) -> dict[str, Any]:
+        """ステータス別件数と、未送信のうち最も古い通知の待ち時間（秒）を返す"""
+        conn = self._connect()
+        counts = {
+            row["status"]: row["count"]
+            for row in conn.execute("SELECT status, COUNT(*) AS count FROM notifications GROUP BY status")
+        }
+        oldest = conn.execute(
+            "SELECT MIN(enqueued_at) FROM notifications WHERE status IN (?, ?)",
+            (STATUS_PENDING, STATUS_SENDING),
+        ).fetchone()[0]
+        return {
+            "pending": counts.get(STATUS_PENDING, 0),
+            "sending": counts.get(STATUS_SENDING, 0),
+            "sent": counts.get(STATUS_SENT, 0),
+            "failed": counts.get(STATUS_FAILED, 0),
+            "oldest_pending_age_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+        }
+
+    def purge_sent(self, older_than_seconds: float) -> int:
+        """送信済みの古い通知を削除する"""
+        conn = self._connect()
+        cursor = conn.execute(
+            "DELETE FROM notifications WHERE status = ? AND sent_at < ?",
+            (STATUS_SENT, time.time() - older_than_seconds),
+        )
+        return cursor.rowcount
@@ -0,0 +1,174 @@
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.engine import Connection
+
+from app.infrastructure.db import engine
+from app.infrastructure.tables import appointment_outbox
+from app.interfaces.outbox_repository_interface import OutboxRepositoryInterface
+from app.schemas.outbox import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_PROCESSING = "processing"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+def utcnow() -> datetime:
+    """DBに保存するためのタイムゾーンなしUTC現在時刻"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def add_outbox_messages(conn: Connection, messages: list[OutboxMessage]) -> None:
+    """呼び出し元のトランザクション内でアウトボックスにメッセージを追加する"""
+    if not messages:
+        return
+    now = utcnow()
+    conn.execute(
+        insert(appointment_outbox),
+        [
+            {
+                "id": message.id,
+                "message_type": message.message_type,
+                "aggregate_id": message.aggregate_id,
+                "payload": json.dumps(message.payload, ensure_ascii=False),
+                "status": STATUS_PENDING,
+                "attempts": 0,
+                "available_at": now,
+                "created_at": now,
+            }
+            for message in messages
+        ],
+    )
+
+
+class OutboxRepository(OutboxRepositoryInterface):
+    def __init__(self):
+        self.engine = engine
+        self.outbox = appointment_outbox
+
+    def enqueue(self, messages: list[OutboxMessage]) -> None:
+        """単独のトランザクションでメッセージを追加する"""
+        with self.engine.begin() as conn:
+            add_outbox_messages(conn, messages)
+
+    def _claimable(self, now: datetime, max_attempts: int):
+        columns = self.outbox.c
+        return or_(
+            and_(columns.status == STATUS_PENDING, columns.available_at <= now),
+            # 処理中のままリース期限が切れたもの（ワーカー停止など）は、上限回数に達していなければ再取得する
+            and_(
+                columns.status == STATUS_PROCESSING,
+                columns.locked_until < now,
+                columns.attempts < max_attempts,
+            ),
+        )
+
+    def _dead_letter_expired(self, now: datetime, max_attempts: int) -> None:
+        """上限回数に達したままリース期限が切れたもの（処理中にワーカーが停止し続けるもの）を失敗状態にする"""
+        columns = self.outbox.c
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                update(self.outbox)
+                .where(
+                    and_(
+                        columns.status == STATUS_PROCESSING,
+                        columns.locked_until < now,
+                        columns.attempts >= max_attempts,
+                    )
+                )
+                .values(
+                    status=STATUS_FAILED,
+                    processed_at=now,
+                    locked_until=None,
+                    last_error=f"lease expired after {max_attempts} attempts",
+                )
+            )
+        if result.rowcount:
+            logger.error(f"処理中のまま上限回数に達したアウトボックスのメッセージを失敗にしました: {result.rowcount}件")
+
+    def _claim_row(self, row: Any, now: datetime, lease_seconds: float, max_attempts: int) -> OutboxMessage | None:
+        columns = self.outbox.c
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                update(self.outbox)
+                .where(and_(columns.id == row.id, self._claimable(now, max_attempts)))
+                .values(
+                    status=STATUS_PROCESSING,
+                    attempts=columns.attempts + 1,
+                    locked_until=now + timedelta(seconds=lease_seconds),
+                )
+            )
+        if result.rowcount != 1:
+            return None
+        return OutboxMessage(
+            id=row.id,
+            message_type=row.message_type,
+            aggregate_id=row.aggregate_id,
+            payload=json.loads(row.payload),
+            attempts=row.attempts + 1,
+        )
+
+    def _candidates(self):
+        columns = self.outbox.c
+        return select(columns.id, columns.message_type, columns.aggregate_id, columns.payload, columns.attempts)
+
+    def claim(self, limit: int, lease_seconds: float, max_attempts: int) -> list[OutboxMessage]:
+        """処理可能なメッセージをリース付きで取得する。他のワーカーと競合した行は除外される"""
+        now = utcnow()
+        columns = self.outbox.c
+        self._dead_letter_expired(now, max_attempts)
+        with self.engine.begin() as conn:
+            candidates = conn.execute(
+                self._candidates().where(self._claimable(now, max_attempts)).order_by(columns.available_at).limit(limit)
+            ).fetchall()
+
+        claimed: list[OutboxMessage] = []
+        for row in candidates:
+            message = self._claim_row(row, now, lease_seconds, max_attempts)
+            if message is not None:
+                claimed.append(message)
+        return claimed
+
+    def claim_message(self, message_id: str, lease_seconds: float, max_attempts: int) -> OutboxMessage | None:
+        """指定したメッセージが処理可能であればリース付きで取得する（他のワーカーが取得済みの場合は None）"""
+        now = utcnow()
+        columns = self.outbox.c
+        with self.engine.begin() as conn:
+            row = conn.execute(
+                self._candidates().where(and_(columns.id == message_id, self._claimable(now, max_attempts)))
+            ).fetchone()
+        if row is None:
+            return None
+        return self._claim_row(row, now, lease_seconds, max_attempts)
+
+    def complete(self, message_id: str, follow_ups: list[OutboxMessage] | None = None) -> None:
+        """メッセージを完了にし、後続メッセージを同一トランザクションで追加する"""
+        with self.engine.begin() as conn:
+            conn.execute(
+                update(self.outbox)
+                .where(self.outbox.c.id == message_id)
+                .values(status=STATUS_DONE, processed_at=utcnow(), locked_until=None, last_error=None)
+            )
+            add_outbox_messages(conn, follow_ups or [])
+
+    def fail(
+        self, message_id: str, error: str, retry_at: datetime | None, payload: dict[str, Any] | None = None
+    ) -> None:
+        """処理失敗を記録する。retry_at が None の場合は再試行せず失敗状態にする
+
+        payload を渡した場合は、ハンドラが再試行に引き継ぐ内容としてペイロードを置き換える。
+        """
+        values = {"last_error": error[:4000], "locked_until": None}
+        if payload is not None:
+            values["payload"] = json.dumps(payload, ensure_ascii=False)
+        if retry_at is None:
+            values.update(status=STATUS_FAILED, processed_at=utcnow())
+        else:
+            values.update(status=STATUS_PENDING, available_at=retry_at)
+        with self.engine.begin() as conn:
+            conn.execute(update(self.outbox).where(self.outbox.c.id == message_id).values(**values))
@@ -0,0 +1,110 @@
+import logging
+from sqlalchemy import BigInteger, Column, DateTime, Identity, Index, Integer, Table, Unicode, UnicodeText, inspect
+from sqlalchemy.engine import Engine
+
+from app.infrastructure.db import metadata
+
+logger = logging.getLogger(__name__)
+
+# テーブル定義（リクエスト処理中のリフレクションを避けるため静的に宣言）
+
+schedule_management = Table(
+    "schedule_management",
+    metadata,
+    Column("scheduled_interview_datetime", Unicode(255)),
+    Column("employee_email", Unicode(255)),
+    Column("candidate_lastname", Unicode(255)),
+    Column("candidate_firstname", Unicode(255)),
+    Column("company", Unicode(255)),
+    Column("candidate_email", Unicode(255)),
+    Column("cosmos_db_id", Unicode(255)),
+    Column("candidate_id", Integer),
+    Column("interview_stage", Unicode(255)),
+    # キーセットページネーションで同じ日時の行を一意に並べるためのキー（migrations/003_schedule_management_keyset_id.sql で追加）
+    Column("id", BigInteger, Identity(), nullable=False),
+    # 一覧・エクスポート用のキーセットページネーションを支えるインデックス
+    # （migrations/001_schedule_management_indexes.sql と 003_schedule_management_keyset_id.sql で作成）
+    Index("ix_schedule_management_cosmos_db_id", "cosmos_db_id"),
+    Index("ux_schedule_management_id", "id", unique=True),
+    Index("ix_schedule_management_datetime_id", "scheduled_interview_datetime", "id"),
+    Index(
+        "ix_schedule_management_employee_datetime_id",
+        "employee_email",
+        "scheduled_interview_datetime",
+        "id",
+    ),
+    Index(
+        "ix_schedule_management_stage_datetime_id",
+        "interview_stage",
+        "scheduled_interview_datetime",
+        "id",
+    ),
+)
+
+# アポイントメント登録に伴う副作用（Graph/Cosmos/メール）を非同期に実行するためのアウトボックス
+# （migrations/002_appointment_outbox.sql で作成）
+appointment_outbox = Table(
+    "appointment_outbox",
+    metadata,
+    Column("id", Unicode(36), primary_key=True),
+    Column("message_type", Unicode(64), nullable=False),
+    Column("aggregate_id", Unicode(255)),
+    Column("payload", UnicodeText, nullable=False),
+    Column("status", Unicode(16), nullable=False),
+    Column("attempts", Integer, nullable=False),
+    Column("available_at", DateTime, nullable=False),
+    Column("locked_until", DateTime),
+    Column("last_error", UnicodeText),
+    Column("created_at", DateTime, nullable=False),
+    Column("processed_at", DateTime),
+    Index("ix_appointment_outbox_status_available_at", "status", "available_at"),
+)
+
+employee_directory = Table(
+    "employee_directory",
+    metadata,
+    Column("name", Unicode(255)),
+    Column("mail", Unicode(255)),
+)
+
+
+def _python_type(column_type: object) -> type | None:
+    """SQLAlchemy の型から対応する Python 型を返す。判定できない場合は None"""
+    try:
+        return column_type.python_type
+    except (AttributeError, NotImplementedError):
+        return None
+
+
+def verify_schema(engine: Engine, tables: list[Table] | None = None) -> list[str]:
+    """静的に宣言したテーブル定義が実際のDBスキーマと一致するか検証し、不一致の内容を返す"""
+    inspector = inspect(engine)
+    mismatches: list[str] = []
+
+    for table in tables or list(metadata.tables.values()):
+        if not inspector.has_table(table.name, schema=table.schema):
+            mismatches.append(f"{table.name}: テーブルが存在しません")
+            continue
+
+        actual_columns = {
+            column["name"]: column["type"]
+            for column in inspector.get_columns(table.name, schema=table.schema)
+        }
+        for column in table.columns:
+            if column.name not in actual_columns:
+                mismatches.append(f"{table.name}.{column.name}: カラムが存在しません")
+                continue
+            expected_type = _python_type(column.type)
+            actual_type = _python_type(actual_columns[column.name])
+            if expected_type and actual_type and expected_type is not actual_type:
+                mismatches.append(
+                    f"{table.name}.{column.name}: 型が一致しません "
+                    f"(宣言: {expected_type.__name__}, 実際: {actual_type.__name__})"
+                )
+
+        actual_indexes = {index["name"] for index in inspector.get_indexes(table.name, schema=table.schema)}
+        for index in table.indexes:
+            if index.name not in actual_indexes:
+                mismatches.append(f"{table.name}: インデックス {index.name} が存在しません（マイグレーション未適用）")
+
+    return mismatches
@@ -1,16 +1,34 @@
 
-from typing import Protocol, Any
-from app.schemas.schedule import AppointmentRequest
+from typing import Protocol, Any, Iterator
+from app.schemas.schedule import AppointmentFilter, AppointmentRequest
+from app.schemas.outbox import OutboxMessage
 
 class AppointmentRepositoryInterface(Protocol):
     def get_appointment_by_cosmos_db_id(self, cosmos_db_id: str) -> Any:
         ...
 
-    def create_appointment(self, appointment_req: AppointmentRequest) -> None:
+    def create_appointment(
+        self,
+        appointment_req: AppointmentRequest,
+        outbox_messages: list[OutboxMessage] | None = None,
+    ) -> None:
         ...
 
     def update_schedule_interview_datetime(self, cosmos_db_id: str, new_schedule_interview_datetime: str) -> None:
         ...
 
     def delete_appointment(self, cosmos_db_id: str) -> None:
-        ...
\ No newline at end of file
+        ...
+
+    def list_appointments(
+        self,
+        appointment_filter: AppointmentFilter,
+        limit: int,
+        after: tuple[str, int] | None = None,
+    ) -> list[Any]:
+        ...
+
+    def stream_appointments(
+        self, appointment_filter: AppointmentFilter, batch_size: int = 1000
+    ) -> Iterator[Any]:
+        ...
@@ -2,10 +2,16 @@ from typing import Protocol, Any
 
 
 class AzCosmosDBClientInterface(Protocol):
+    def close(self) -> None:
+        ...
+
     def create_form_data(self, payload: dict[str, Any]) -> str:
         ...
 
-    def get_form_data(self, cosmos_db_id: str) -> dict[str, Any]:
+    def create_form_data_batch(self, payloads: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], float]:
+        ...
+
+    def get_form_data(self, cosmos_db_id: str, use_cache: bool = True) -> dict[str, Any]:
         ...
 
     def update_form_data(
@@ -23,6 +29,9 @@ class AzCosmosDBClientInterface(Protocol):
     ) -> None:
         ...
 
+    def replace_form_data(self, form: dict[str, Any]) -> None:
+        ...
+
     def confirm_form(self, cosmos_db_id: str) -> None:
         ...
 
@@ -0,0 +1,21 @@
+from typing import Protocol
+
+
+class CacheBackendInterface(Protocol):
+    def get(self, key: str) -> bytes | None:
+        ...
+
+    def get_many(self, keys: list[str]) -> list[bytes | None]:
+        ...
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        ...
+
+    def add(self, key: str, value: bytes, ttl_seconds: float) -> bool:
+        ...
+
+    def delete(self, key: str) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
@@ -0,0 +1,42 @@
+from datetime import date
+from typing import Any, Protocol
+
+from app.schemas.form import ScheduleRequest
+
+
+class CalendarMirrorInterface(Protocol):
+    def track(self, emails: list[str]) -> None:
+        ...
+
+    def claim_due(self, limit: int, lease_seconds: float) -> list[dict[str, Any]]:
+        ...
+
+    def apply_changes(
+        self,
+        email: str,
+        upserts: list[tuple[str, int, int, int]],
+        removed: list[str],
+        delta_link: str | None,
+        window_start: int,
+        window_end: int,
+        reset: bool,
+        next_sync_at: float,
+    ) -> None:
+        ...
+
+    def mark_failed(self, email: str, error: str, next_sync_at: float) -> None:
+        ...
+
+    def mark_stale(self, email: str) -> None:
+        ...
+
+    def get_schedules(
+        self, schedule_req: ScheduleRequest, targets: list[tuple[date, str]]
+    ) -> list[dict[str, Any] | None]:
+        ...
+
+    def stats(self) -> dict[str, Any]:
+        ...
+
+    def close(self) -> None:
+        ...
@@ -3,17 +3,25 @@ from app.schemas.form import ScheduleRequest
 
 
 class GraphAPIClientInterface(Protocol):
-    def refresh_token(self) -> None:
+    def close(self) -> None:
+        ...
+
+    def refresh_token(self, rejected: str | None = None) -> None:
         ...
 
     def post_request(
-        self, url: str, body: dict[str, Any], timeout: int = 60
+        self, url: str, body: dict[str, Any], timeout: int = 60, operation: str = "post"
     ) -> dict[str, Any] | None:
         ...
 
     def get_schedules(self, schedule_req: ScheduleRequest) -> list[dict[str, Any]]:
         ...
 
+    def calendar_view_delta(
+        self, employee_email: str, start_datetime: str, end_datetime: str, delta_link: str | None = None
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        ...
+
     def register_event(
         self, employee_email: str, event: dict[str, Any]
     ) -> dict[str, Any]:
@@ -24,6 +32,11 @@ class GraphAPIClientInterface(Protocol):
     ) -> None:
         ...
 
+    def send_email_to_recipients(
+        self, sender_email: str, recipient_emails: list[str], subject: str, body: str
+    ) -> None:
+        ...
+
     def update_event_time(
         self, employee_email: str, event_id: str, start_datetime: str, end_datetime: str
     ) -> None:
@@ -0,0 +1,22 @@
+from typing import Protocol, Any
+from app.schemas.notification import Notification
+
+
+class NotificationQueueInterface(Protocol):
+    def enqueue(self, notifications: list[Notification]) -> int:
+        ...
+
+    def claim(self, limit: int, lease_seconds: float, max_attempts: int) -> list[dict[str, Any]]:
+        ...
+
+    def mark_sent(self, ids: list[int]) -> None:
+        ...
+
+    def mark_failed(self, ids: list[int], error: str, retry_at: float | None) -> None:
+        ...
+
+    def stats(self) -> dict[str, Any]:
+        ...
+
+    def purge_sent(self, older_than_seconds: float) -> int:
+        ...
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Any, Protocol
+from app.schemas.outbox import OutboxMessage
+
+
+class OutboxRepositoryInterface(Protocol):
+    def enqueue(self, messages: list[OutboxMessage]) -> None:
+        ...
+
+    def claim(self, limit: int, lease_seconds: float, max_attempts: int) -> list[OutboxMessage]:
+        ...
+
+    def claim_message(self, message_id: str, lease_seconds: float, max_attempts: int) -> OutboxMessage | None:
+        ...
+
+    def complete(self, message_id: str, follow_ups: list[OutboxMessage] | None = None) -> None:
+        ...
+
+    def fail(
+        self, message_id: str, error: str, retry_at: datetime | None, payload: dict[str, Any] | None = None
+    ) -> None:
+        ...
@@ -1,31 +1,130 @@
+import time
+from contextlib import asynccontextmanager
+from typing import Callable
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 import logging
 
-from app.routers import form_router, schedule_router
+from app.routers import (
+    form_router,
+    schedule_router,
+    appointment_router,
+    monitoring_router,
+    metrics_router,
+    health_router,
+)
 from app.config.config import get_config
+from app.config.logging_config import setup_logging
+from app.container import Container
+from app.infrastructure.db import engine
+from app.infrastructure.tables import verify_schema
+from app.middlewares.capture_middleware import capture_requests
 from app.middlewares.logging_middleware import log_requests
+from app.middlewares.metrics_middleware import record_metrics
+from app.middlewares.profiling_middleware import profile_requests
+from app.middlewares.tracing_middleware import trace_requests
 from app.middlewares.cors_middleware import add_cors
+from app.middlewares.compression_middleware import add_compression
+from app.utils.tracing import shutdown_tracing
+
+config = get_config()
 
 # ログ設定
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
-)
+setup_logging(config["LOG_LEVEL"], config["LOG_FORMAT"], config["LOG_SAMPLING"])
 logger = logging.getLogger(__name__)
 
-config = get_config()
 
-app = FastAPI()
-# CORS設定
-add_cors(app)
+def check_schema() -> None:
+    """静的なテーブル定義がDBスキーマと一致しているか起動時に検証する"""
+    try:
+        mismatches = verify_schema(engine)
+    except Exception as e:
+        logger.error(f"スキーマ検証に失敗しました: {e}")
+        if config["SCHEMA_CHECK_STRICT"]:
+            raise
+        return
+
+    if not mismatches:
+        logger.info("スキーマ検証成功")
+        return
+
+    for mismatch in mismatches:
+        logger.error(f"スキーマ不一致: {mismatch}")
+    if config["SCHEMA_CHECK_STRICT"]:
+        raise RuntimeError("テーブル定義がDBスキーマと一致しません")
+
+
+def create_app(container_factory: Callable[[], Container] = Container) -> FastAPI:
+    """アプリケーションを構築する
+
+    container_factory を差し替えることで、テストやベンチマーク用のスタンドインを注入できる。
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        started = time.perf_counter()
+        if config["SCHEMA_CHECK_ENABLED"]:
+            await run_in_threadpool(check_schema)
+        # クライアントの構築では通信しない（トークンの取得や Cosmos DB への接続は温め処理と最初の呼び出しで行う）ため、
+        # 依存サービスの障害中でも起動できる。ファイルの作成などを伴うためスレッドプールで行う
+        container = await run_in_threadpool(container_factory)
+        app.state.container = container
+        # 接続プールやキャッシュの温めはバックグラウンドで行い、完了までは /readyz が 503 を返す
+        await container.start()
+        logger.info(f"起動処理が完了しました: {time.perf_counter() - started:.3f}秒")
+        try:
+            yield
+        finally:
+            await container.close()
+            # 停止直前のリクエストのトレースも書き出してからファイルを閉じる
+            await run_in_threadpool(shutdown_tracing)
+
+    app = FastAPI(lifespan=lifespan)
+    # CORS設定
+    add_cors(app)
+    # レスポンス圧縮
+    add_compression(app)
+
+    # ログミドルウェアの追加
+    @app.middleware("http")
+    async def log_requests_middleware(request: Request, call_next):
+        return await log_requests(request, call_next)
+
+    # リクエスト記録ミドルウェアの追加（リプレイ用、設定で有効にした場合のみ）
+    # ハッシュの秘密値がない場合は個人情報のハッシュを辞書攻撃で戻せるため、記録しない
+    if config["REQUEST_CAPTURE_ENABLED"] and not config["REQUEST_CAPTURE_HASH_SECRET"]:
+        logger.error("REQUEST_CAPTURE_HASH_SECRET が設定されていないため、リクエストを記録しません")
+    elif config["REQUEST_CAPTURE_ENABLED"]:
+
+        @app.middleware("http")
+        async def capture_requests_middleware(request: Request, call_next):
+            return await capture_requests(request, call_next)
+
+    # メトリクスミドルウェアの追加
+    @app.middleware("http")
+    async def record_metrics_middleware(request: Request, call_next):
+        return await record_metrics(request, call_next)
+
+    # プロファイルミドルウェアの追加（秘密値を設定した場合のみ。リクエストIDを使うためトレースより内側に置く）
+    if config["PROFILING_SECRET"]:
+
+        @app.middleware("http")
+        async def profile_requests_middleware(request: Request, call_next):
+            return await profile_requests(request, call_next)
 
+    # トレースミドルウェアの追加（ログ・メトリクスより外側でルートスパンを作成する）
+    @app.middleware("http")
+    async def trace_requests_middleware(request: Request, call_next):
+        return await trace_requests(request, call_next)
 
-# ログミドルウェアの追加
-@app.middleware("http")
-async def log_requests_middleware(request: Request, call_next):
-    return await log_requests(request, call_next)
+    # ルーターの登録
+    app.include_router(form_router.router)
+    app.include_router(schedule_router.router)
+    app.include_router(appointment_router.router)
+    app.include_router(monitoring_router.router)
+    app.include_router(metrics_router.router)
+    app.include_router(health_router.router)
+    return app
 
 
-# ルーターの登録
-app.include_router(form_router.router)
-app.include_router(schedule_router.router)
+app = create_app()
@@ -0,0 +1,172 @@
+import atexit
+import hashlib
+import hmac
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import threading
+import time
+from typing import Any
+
+from fastapi import Request
+
+from app.config.config import get_config
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+# リプレイ用にリクエストを記録する（REQUEST_CAPTURE_ENABLED=true かつ REQUEST_CAPTURE_HASH_SECRET を設定した場合のみ登録される）
+# 候補者・担当者の個人情報は HMAC でハッシュ化し、同じ値は同じハッシュに置き換える
+# （キャッシュのヒット率や同一人物の操作といったトラフィックの形を保つため）
+
+PII_KEYS = {
+    "candidate_lastname",
+    "candidate_firstname",
+    "candidate_email",
+    "company",
+    "university",
+    "email",
+    "employee_email",
+    "name",
+    "mail",
+    "q",
+}
+# 数値の識別子はスキーマの検証を通るよう、ハッシュから作った数値に置き換える
+NUMERIC_PII_KEYS = {"candidate_id"}
+# 再送時にも意味を持つヘッダーだけを記録する（認証情報などは残さない）
+CAPTURED_HEADERS = ("content-type", "accept", "accept-encoding", "if-none-match", "idempotency-key")
+SKIPPED_PATH_PREFIXES = ("/healthz", "/readyz", "/metrics", "/monitoring", "/docs", "/redoc", "/openapi.json")
+
+_EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def _hash(value: str) -> str:
+    secret = config["REQUEST_CAPTURE_HASH_SECRET"].encode("utf-8")
+    return hmac.new(secret, value.encode("utf-8"), hashlib.sha256).hexdigest()[:16]
+
+
+def mask(value: str) -> str:
+    """文字列をハッシュに置き換える。メールアドレスはスキーマの検証を通るようメールアドレスの形を保つ"""
+    if _EMAIL_PATTERN.match(value):
+        return f"{_hash(value.lower())}@redacted.invalid"
+    return f"redacted-{_hash(value)}"
+
+
+def mask_number(value: int | str) -> int:
+    """数値の識別子をハッシュから作った10桁の数値に置き換える"""
+    return int(_hash(str(value)), 16) % 10**10
+
+
+def sanitize(value: Any, key: str | None = None) -> Any:
+    """JSONの値から個人情報を取り除く（PII_KEYS の値と、メールアドレスの形をした文字列・キーをハッシュ化）"""
+    if key in NUMERIC_PII_KEYS and value is not None and not isinstance(value, (dict, list, bool)):
+        return mask_number(value)
+    if isinstance(value, dict):
+        return {
+            (mask(k) if _EMAIL_PATTERN.match(k) else k): sanitize(v, k) for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [sanitize(v, key) for v in value]
+    if isinstance(value, str) and (key in PII_KEYS or _EMAIL_PATTERN.match(value)):
+        return mask(value)
+    return value
+
+
+class _JsonLineFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.capture, ensure_ascii=False, default=str)
+
+
+class CaptureWriter:
+    """記録をキュー経由で別スレッドに渡し、サイズでローテーションするJSONLファイルに書き込む"""
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        handler.setFormatter(_JsonLineFormatter())
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(self._queue, handler)
+        self._listener.start()
+        atexit.register(self._listener.stop)
+
+    def write(self, capture: dict[str, Any]) -> None:
+        self._queue.put(logging.makeLogRecord({"capture": capture}))
+
+
+_writer: CaptureWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def _get_writer() -> CaptureWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = CaptureWriter(
+                    config["REQUEST_CAPTURE_PATH"],
+                    config["REQUEST_CAPTURE_MAX_BYTES"],
+                    config["REQUEST_CAPTURE_BACKUP_COUNT"],
+                )
+    return _writer
+
+
+async def _read_body(request: Request) -> tuple[Any, int]:
+    """JSONボディを個人情報を除いて返す。JSON以外や上限を超えるものはサイズだけ記録する"""
+    if request.method not in ("POST", "PUT", "PATCH"):
+        return None, 0
+    body = await request.body()
+    if not body or "application/json" not in request.headers.get("Content-Type", ""):
+        return None, len(body)
+    if len(body) > config["REQUEST_CAPTURE_MAX_BODY_BYTES"]:
+        return None, len(body)
+    try:
+        return sanitize(json.loads(body)), len(body)
+    except ValueError:
+        return None, len(body)
+
+
+async def capture_requests(request: Request, call_next):
+    """リクエストの内容（個人情報はハッシュ化）と応答のステータス・処理時間を記録する"""
+    if request.url.path.startswith(SKIPPED_PATH_PREFIXES) or random.random() >= config["REQUEST_CAPTURE_SAMPLE_RATE"]:
+        return await call_next(request)
+
+    started_at = time.time()
+    started = time.perf_counter()
+    try:
+        body, body_bytes = await _read_body(request)
+    except Exception as e:
+        logger.warning(f"リクエストの記録に失敗しました: {e}")
+        return await call_next(request)
+
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        try:
+            _get_writer().write(
+                {
+                    "ts": started_at,
+                    "request_id": getattr(request.state, "request_id", None),
+                    "method": request.method,
+                    "path": request.url.path,
+                    "route": route.path if route is not None else None,
+                    "query": [[k, sanitize(v, k)] for k, v in request.query_params.multi_items()],
+                    "headers": {k: request.headers[k] for k in CAPTURED_HEADERS if k in request.headers},
+                    "body": body,
+                    "body_bytes": body_bytes,
+                    "status": status,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                }
+            )
+        except Exception as e:
+            logger.warning(f"リクエストの記録に失敗しました: {e}")
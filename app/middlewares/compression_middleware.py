@@ -0,0 +1,148 @@
+import zlib
+from fastapi import FastAPI
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.config import get_config
+
+try:
+    import brotli
+except ImportError:  # brotli が未インストールの場合は gzip のみ
+    brotli = None
+
+config = get_config()
+
+# 圧縮しても効果が薄い、または逐次配信が前提のコンテンツ
+_SKIP_CONTENT_TYPES = ("image/", "video/", "audio/", "text/event-stream", "application/zip", "application/gzip")
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+            self._compress = self._compressor.process
+            self._flush = self._compressor.flush
+            self._finish = self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress = self._compressor.compress
+            self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._compressor.flush
+
+    def compress(self, data: bytes, more: bool) -> bytes:
+        """more=True の場合はストリーミング配信のためにここまでの内容をフラッシュする"""
+        out = self._compress(data)
+        return out + (self._flush() if more else self._finish())
+
+
+class CompressionMiddleware:
+    """Accept-Encoding に応じて br / gzip でレスポンスを圧縮するASGIミドルウェア
+
+    minimum_size 未満の単一ボディのレスポンスは圧縮しない。StreamingResponse はチャンクごとに圧縮して送る。
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int, gzip_level: int, brotli_quality: int):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose_encoding(self, accept_encoding: str) -> str | None:
+        accepted = set()
+        for item in accept_encoding.lower().split(","):
+            name, _, params = item.strip().partition(";")
+            params = params.replace(" ", "")
+            try:
+                q = float(params[2:]) if params.startswith("q=") else 1.0
+            except ValueError:
+                q = 0.0
+            if q > 0:
+                accepted.add(name.strip())
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = self._choose_encoding(request_headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+        compressor: _Compressor | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                content_type = headers.get("Content-Type", "")
+                skip = (
+                    "Content-Encoding" in headers
+                    or start_message["status"] in (204, 304)
+                    or content_type.startswith(_SKIP_CONTENT_TYPES)
+                    or (not more_body and len(body) < self.minimum_size)
+                )
+                if skip:
+                    if start_message["status"] == 304:
+                        # クライアントが圧縮版のETagで問い合わせた場合は同じETagを返す
+                        etag = headers.get("ETag")
+                        encoded_etag = f'{etag[:-1]}-{encoding}"' if etag else None
+                        if encoded_etag and encoded_etag in request_headers.get("If-None-Match", ""):
+                            headers["ETag"] = encoded_etag
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                # 強いETagは表現（エンコーディング）ごとに異なる必要がある
+                etag = headers.get("ETag")
+                if etag and etag.endswith('"'):
+                    headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+                if "Content-Length" in headers:
+                    del headers["Content-Length"]
+                if not more_body:
+                    compressed = compressor.compress(body, more=False)
+                    headers["Content-Length"] = str(len(compressed))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                await send(start_message)
+
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": compressor.compress(body, more=more_body),
+                    "more_body": more_body,
+                }
+            )
+
+        await self.app(scope, receive, send_compressed)
+
+
+def add_compression(app: FastAPI):
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=config["COMPRESSION_MINIMUM_SIZE"],
+        gzip_level=config["COMPRESSION_GZIP_LEVEL"],
+        brotli_quality=config["COMPRESSION_BROTLI_QUALITY"],
+    )
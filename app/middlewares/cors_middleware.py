@@ -11,4 +11,5 @@ def add_cors(app: FastAPI):
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "X-Total-Count", "X-Request-ID", "Idempotent-Replayed", "Retry-After", "X-Profile-File"],
     )
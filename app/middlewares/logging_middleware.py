@@ -1,13 +1,14 @@
 from fastapi import Request
 import time
 import logging
-import json
+
+from app.utils.log_payload import summarize
 
 logger = logging.getLogger(__name__)
 
 
 async def log_requests(request: Request, call_next):
-    request_id = request.headers.get("X-Request-ID", "N/A")
+    request_id = getattr(request.state, "request_id", None) or request.headers.get("X-Request-ID", "N/A")
     start_time = time.time()
 
     # リクエストログ
@@ -17,11 +18,11 @@ async def log_requests(request: Request, call_next):
     )
 
     try:
-        # POST/PUT/PATCHのJSONボディをログ
-        if request.method in ["POST", "PUT", "PATCH"]:
+        # POST/PUT/PATCHのJSONボディをログ（DEBUG が有効な場合のみ読み込む）
+        if request.method in ["POST", "PUT", "PATCH"] and logger.isEnabledFor(logging.DEBUG):
             body = await request.body()
             if body and "application/json" in request.headers.get("Content-Type", ""):
-                logger.debug(f"Request Body: {json.dumps(json.loads(body), indent=2)}")
+                logger.debug("Request Body: %s", summarize(body.decode("utf-8", errors="replace")))
 
         # レスポンス処理
         response = await call_next(request)
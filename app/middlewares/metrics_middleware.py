@@ -0,0 +1,24 @@
+import time
+from fastapi import Request
+
+from app.utils.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+
+
+async def record_metrics(request: Request, call_next):
+    """ルートごとの処理時間と処理中リクエスト数を記録する"""
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    start_time = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        # パスパラメータ等でラベルが増えないよう、実際のパスではなくルートのテンプレートを使う
+        route = request.scope.get("route")
+        HTTP_REQUEST_DURATION.labels(
+            request.method,
+            route.path if route is not None else "unmatched",
+            str(status),
+        ).observe(time.perf_counter() - start_time)
@@ -0,0 +1,105 @@
+import cProfile
+import hmac
+import logging
+import os
+import re
+import time
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.config.config import get_config
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # pyinstrument が未インストールの場合は cProfile で計測する
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+# 特定のリクエストだけをプロファイルする（PROFILING_SECRET を設定した場合のみ登録される）
+# X-Profile-Secret ヘッダーが一致したリクエストだけを計測するため、それ以外のリクエストにはほぼ負荷がかからない
+# URLやアクセスログに秘密値が残らないよう、クエリパラメータではなくヘッダーで指定する
+PROFILE_HEADER = "X-Profile-Secret"
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_-]+")
+
+# 計測中のプロファイラ（同時に計測すると互いの結果が混ざるため、1リクエストずつ計測する）
+_active = False
+
+
+def _is_requested(request: Request) -> bool:
+    secret = request.headers.get(PROFILE_HEADER)
+    if not secret:
+        return False
+    return hmac.compare_digest(secret.encode("utf-8"), config["PROFILING_SECRET"].encode("utf-8"))
+
+
+def _profile_path(request: Request, extension: str) -> str:
+    """保存先のパス（リクエストIDとパスを含める。いずれも外部入力のためファイル名に使える文字だけ残す）"""
+    request_id = _UNSAFE_CHARS.sub("_", getattr(request.state, "request_id", None) or "N-A")[:64]
+    path = _UNSAFE_CHARS.sub("_", request.url.path.strip("/"))[:64] or "root"
+    timestamp = time.strftime("%Y%m%dT%H%M%S")
+    return os.path.join(config["PROFILING_DIR"], f"{timestamp}_{request_id}_{request.method}_{path}.{extension}")
+
+
+def _save_pyinstrument(profiler, path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(profiler.output_html())
+
+
+def _save_cprofile(profiler: cProfile.Profile, path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    profiler.dump_stats(path)
+
+
+async def profile_requests(request: Request, call_next):
+    """X-Profile-Secret が一致したリクエストの処理をプロファイルし、結果をファイルに保存する
+
+    pyinstrument がある場合はサンプリングで計測して HTML（タイムライン・コールツリー）を保存し、
+    ない場合は cProfile で計測して pstats 形式（.prof、snakeviz などで可視化できる）を保存する。
+    cProfile はスレッド単位で計測するため、計測中に同じイベントループで処理された他のリクエストも含まれる。
+    保存したファイル名は X-Profile-File ヘッダーで返す。
+    """
+    global _active
+    if not _is_requested(request):
+        return await call_next(request)
+    if _active:
+        response = await call_next(request)
+        response.headers["X-Profile-File"] = "busy"
+        return response
+
+    _active = True
+    try:
+        if Profiler is not None:
+            profiler = Profiler(interval=config["PROFILING_INTERVAL_SECONDS"], async_mode="enabled")
+            path = _profile_path(request, "html")
+            profiler.start()
+            try:
+                response = await call_next(request)
+            finally:
+                profiler.stop()
+            save = _save_pyinstrument
+        else:
+            profiler = cProfile.Profile()
+            path = _profile_path(request, "prof")
+            profiler.enable()
+            try:
+                response = await call_next(request)
+            finally:
+                profiler.disable()
+            save = _save_cprofile
+    finally:
+        _active = False
+
+    try:
+        await run_in_threadpool(save, profiler, path)
+    except Exception as e:
+        logger.warning(f"プロファイルの保存に失敗しました: {e}")
+        return response
+    logger.info(f"プロファイルを保存しました | ID: {getattr(request.state, 'request_id', 'N/A')} | {path}")
+    response.headers["X-Profile-File"] = os.path.basename(path)
+    return response
@@ -0,0 +1,40 @@
+import logging
+import re
+import uuid
+from fastapi import Request
+
+from app.utils.tracing import start_trace
+
+logger = logging.getLogger(__name__)
+
+# 受け入れる X-Request-ID（トレースID・ログ・プロファイルのファイル名に使うため、長さと文字種を制限する）
+_VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+
+def resolve_request_id(header: str | None) -> str:
+    """X-Request-ID が安全な形式であればそのまま使い、そうでなければ新しいIDを生成する"""
+    if header and _VALID_REQUEST_ID.fullmatch(header):
+        return header
+    if header:
+        logger.debug(f"不正な X-Request-ID を置き換えます: {header[:64]!r}")
+    return uuid.uuid4().hex
+
+
+async def trace_requests(request: Request, call_next):
+    """X-Request-ID をトレースIDとしてルートスパンを作成する（未指定・不正な場合は生成する）"""
+    request_id = resolve_request_id(request.headers.get("X-Request-ID"))
+    request.state.request_id = request_id
+    with start_trace(
+        f"{request.method} {request.url.path}",
+        trace_id=request_id,
+        method=request.method,
+        path=request.url.path,
+    ) as root:
+        response = await call_next(request)
+        if root is not None:
+            route = request.scope.get("route")
+            if route is not None:
+                root.name = f"{request.method} {route.path}"
+            root.set_attribute("status_code", response.status_code)
+        response.headers["X-Request-ID"] = request_id
+        return response
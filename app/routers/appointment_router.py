@@ -0,0 +1,74 @@
+import asyncio
+import logging
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Literal
+
+from app.schemas import AppointmentFilter, AppointmentListResponse
+from app.usecases.appointment.list_appointments_usecase import ListAppointmentsUsecase
+from app.usecases.appointment.export_appointments_usecase import (
+    ExportAppointmentsUsecase,
+    EXPORT_MEDIA_TYPES,
+)
+from app.dependencies import get_list_appointments_usecase, get_export_appointments_usecase
+
+router = APIRouter(tags=["appointments"])
+logger = logging.getLogger(__name__)
+
+
+@router.get("/appointments", response_model=AppointmentListResponse)
+async def list_appointments(
+    employee_email: str | None = Query(None, description="面接担当者のメールアドレス"),
+    start_date: date | None = Query(None, description="面接日の開始日 (YYYY-MM-DD)"),
+    end_date: date | None = Query(None, description="面接日の終了日 (YYYY-MM-DD)"),
+    interview_stage: str | None = Query(None, description="面接のステージ"),
+    cursor: str | None = Query(None, description="前ページのレスポンスに含まれる next_cursor"),
+    limit: int = Query(100, ge=1, le=1000, description="取得件数"),
+    usecase: ListAppointmentsUsecase = Depends(get_list_appointments_usecase),
+):
+    """面接担当者・日付範囲・面接ステージでアポイントメントを絞り込んで取得"""
+    appointment_filter = AppointmentFilter(
+        employee_email=employee_email,
+        start_date=start_date,
+        end_date=end_date,
+        interview_stage=interview_stage,
+    )
+    try:
+        return await usecase.execute(appointment_filter, limit, cursor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"アポイントメント一覧取得エラー: {e}")
+        raise HTTPException(status_code=500, detail="アポイントメント一覧取得エラー")
+
+
+@router.get("/appointments/export")
+async def export_appointments(
+    export_format: Literal["csv", "ndjson"] = Query("csv", alias="format", description="出力形式"),
+    employee_email: str | None = Query(None, description="面接担当者のメールアドレス"),
+    start_date: date | None = Query(None, description="面接日の開始日 (YYYY-MM-DD)"),
+    end_date: date | None = Query(None, description="面接日の終了日 (YYYY-MM-DD)"),
+    interview_stage: str | None = Query(None, description="面接のステージ"),
+    usecase: ExportAppointmentsUsecase = Depends(get_export_appointments_usecase),
+):
+    """絞り込み条件に一致するアポイントメントをCSV/NDJSONでストリーミング出力"""
+    appointment_filter = AppointmentFilter(
+        employee_email=employee_email,
+        start_date=start_date,
+        end_date=end_date,
+        interview_stage=interview_stage,
+    )
+    try:
+        # 最初のチャンクまで読み出し、DBのエラーはストリーミングを始める前に 500 として返す
+        content = await asyncio.to_thread(usecase.execute, appointment_filter, export_format)
+    except Exception as e:
+        logger.error(f"アポイントメントエクスポートエラー: {e}")
+        raise HTTPException(status_code=500, detail="アポイントメントエクスポートエラー")
+
+    filename = f"appointments_{datetime.now().strftime('%Y%m%d%H%M%S')}.{export_format}"
+    return StreamingResponse(
+        content,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
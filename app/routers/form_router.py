@@ -1,39 +1,80 @@
 import logging
-from fastapi import APIRouter, HTTPException, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Request, Response
 from fastapi.responses import JSONResponse
+
+from app.utils.http_cache import is_not_modified, make_etag
+from app.utils.responses import FastJSONResponse
 from typing import Any
 
-from app.schemas import FormData
+from app.config.config import get_config
+from app.schemas import FormData, FormDataBulkRequest, FormDataBulkResponse
 from app.usecases.form.store_form_data_usecase import StoreFormDataUsecase
+from app.usecases.form.store_form_data_bulk_usecase import StoreFormDataBulkUsecase
 from app.usecases.form.retrieve_form_data_usecase import RetrieveFormDataUsecase
+from app.dependencies import (
+    get_store_form_data_usecase,
+    get_store_form_data_bulk_usecase,
+    get_retrieve_form_data_usecase,
+)
 
 router = APIRouter(tags=["forms"])
 logger = logging.getLogger(__name__)
 
+config = get_config()
+
 
 @router.post("/store_form_data", response_model=dict[str, Any])
-async def store_form_data(payload: FormData = Body(...)):
+async def store_form_data(
+    payload: FormData = Body(...),
+    usecase: StoreFormDataUsecase = Depends(get_store_form_data_usecase),
+):
     """
     フォームデータを保存し、CosmosDBのIDを返すエンドポイント
     """
     try:
-        cosmos_db_id = await StoreFormDataUsecase().execute(payload)
+        cosmos_db_id = await usecase.execute(payload)
         return JSONResponse(content={"cosmos_db_id": cosmos_db_id})
     except Exception as e:
         logger.error(f"フォームデータの保存に失敗しました: {e}")
         raise HTTPException(status_code=500, detail="Failed to store form data")
 
 
-@router.get("/retrieve_form_data", response_model=FormData)
+@router.post("/store_form_data/bulk", response_model=FormDataBulkResponse, response_class=FastJSONResponse)
+async def store_form_data_bulk(
+    payload: FormDataBulkRequest = Body(...),
+    usecase: StoreFormDataBulkUsecase = Depends(get_store_form_data_bulk_usecase),
+):
+    """
+    複数のフォームデータをまとめて保存し、forms と同じ順序で項目ごとの CosmosDB の ID またはエラーと、
+    消費した RU の合計を返すエンドポイント（一部が失敗しても 200 を返す）
+    """
+    if len(payload.forms) > config["FORM_BULK_MAX_ITEMS"]:
+        raise HTTPException(
+            status_code=422,
+            detail=f"一度に保存できるのは{config['FORM_BULK_MAX_ITEMS']}件までです",
+        )
+    try:
+        return FastJSONResponse(await usecase.execute(payload.forms))
+    except Exception as e:
+        logger.error(f"フォームデータの一括保存に失敗しました: {e}")
+        raise HTTPException(status_code=500, detail="Failed to store form data")
+
+
+@router.get("/retrieve_form_data", response_model=FormData, response_class=FastJSONResponse)
 async def retrieve_form_data(
-    cosmos_db_id: str = Query(..., description="CosmosDBのID")
+    request: Request,
+    cosmos_db_id: str = Query(..., description="CosmosDBのID"),
+    usecase: RetrieveFormDataUsecase = Depends(get_retrieve_form_data_usecase),
 ):
     """
     CosmosDBのIDから保存されたフォームデータを復元し、空き時間を含めて返すエンドポイント
     """
     try:
-        form_data = await RetrieveFormDataUsecase().execute(cosmos_db_id)
-        return form_data
+        form_data, version = await usecase.execute(cosmos_db_id)
+        headers = {"ETag": make_etag(cosmos_db_id, version), "Cache-Control": "no-cache"}
+        if is_not_modified(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        return FastJSONResponse(form_data, headers=headers)
     except Exception as e:
         logger.error(f"フォームデータの取得に失敗しました: {e}")
         raise HTTPException(status_code=404, detail="CosmosDB ID not found")
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+
+from app.dependencies import get_warmup
+from app.utils.responses import FastJSONResponse
+from app.workers.warmup import Warmup
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/healthz")
+async def get_liveness():
+    """プロセスとイベントループが応答しているか（Container Apps の liveness プローブ用）"""
+    return FastJSONResponse({"status": "ok"})
+
+
+@router.get("/readyz")
+async def get_readiness(warmup: Warmup = Depends(get_warmup)):
+    """起動時の温め処理が完了しているか（readiness プローブ用、完了前は 503）
+
+    Graph API のトークン取得や Cosmos DB への接続に失敗している間は、ステップごとの失敗内容とともに 503 を返す。
+    """
+    stats = warmup.stats()
+    if not stats["ready"]:
+        return FastJSONResponse({"status": "warming_up", **stats}, status_code=503)
+    return FastJSONResponse({"status": "ready", **stats})
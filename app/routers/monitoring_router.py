@@ -0,0 +1,59 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from app.dependencies import (
+    get_calendar_syncer,
+    get_notification_dispatcher,
+    get_loop_lag_monitor,
+    get_graph_admission_controller,
+)
+from app.utils.admission import GraphAdmissionController
+from app.workers.calendar_syncer import CalendarSyncer
+from app.workers.loop_lag_monitor import LoopLagMonitor
+from app.workers.notification_dispatcher import NotificationDispatcher
+
+router = APIRouter(prefix="/monitoring", tags=["monitoring"])
+logger = logging.getLogger(__name__)
+
+
+@router.get("/notifications")
+async def get_notification_stats(
+    notification_dispatcher: NotificationDispatcher = Depends(get_notification_dispatcher),
+):
+    """メール送信キューの深さと送信レイテンシを取得"""
+    try:
+        return await run_in_threadpool(notification_dispatcher.stats)
+    except Exception as e:
+        logger.error(f"通知キュー統計取得エラー: {e}")
+        raise HTTPException(status_code=500, detail="通知キュー統計取得エラー")
+
+
+@router.get("/event_loop")
+async def get_event_loop_stats(
+    loop_lag_monitor: LoopLagMonitor = Depends(get_loop_lag_monitor),
+):
+    """イベントループの遅延分布と、しきい値を超えたブロッキングの発生箇所を取得"""
+    return loop_lag_monitor.stats()
+
+
+@router.get("/graph_admission")
+async def get_graph_admission_stats(
+    admission_controller: GraphAdmissionController = Depends(get_graph_admission_controller),
+):
+    """Graph API 呼び出しの受付判定の件数と残り枠を取得"""
+    return admission_controller.stats()
+
+
+@router.get("/calendar_mirror")
+async def get_calendar_mirror_stats(
+    calendar_syncer: CalendarSyncer | None = Depends(get_calendar_syncer),
+):
+    """予定のミラーの同期状況（同期済みの担当者数・失敗中の数・最も古い同期からの経過秒数）を取得"""
+    if calendar_syncer is None:
+        return {"enabled": False}
+    try:
+        return {"enabled": True, **await run_in_threadpool(calendar_syncer.stats)}
+    except Exception as e:
+        logger.error(f"予定のミラー統計取得エラー: {e}")
+        raise HTTPException(status_code=500, detail="予定のミラー統計取得エラー")
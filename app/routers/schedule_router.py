@@ -1,68 +1,160 @@
 import logging
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Body
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Body, Request, Response
 
 from app.schemas import (
     ScheduleRequest,
     AppointmentRequest,
     AppointmentResponse,
     AvailabilityResponse,
+    AvailabilityBatchRequest,
+    AvailabilityBatchResponse,
+    FormData,
     RescheduleRequest,
 )
-from app.infrastructure.employee_directory_repository import EmployeeDirectoryRepository
+from app.config.config import get_config
+from app.infrastructure.employee_directory_cache import EmployeeDirectoryCache
+from app.infrastructure.idempotency_store import IdempotencyStore
+from app.utils.admission import GraphAdmissionController, estimate_graph_cost, get_client_id
+from app.utils.http_cache import digest, is_not_modified, make_etag
+from app.utils.responses import FastJSONResponse
 from app.usecases.schedule.availability_usecase import AvailabilityUsecase
+from app.usecases.schedule.availability_batch_usecase import AvailabilityBatchUsecase, plan_fetches
 from app.usecases.schedule.appointment_usecase import AppointmentUsecase
 from app.usecases.schedule.reschedule_usecase import RescheduleUsecase
 from app.usecases.schedule.get_reschedule_data_usecase import GetRescheduleDataUsecase
+from app.dependencies import (
+    get_employee_directory_cache,
+    get_idempotency_store,
+    get_graph_admission_controller,
+    get_availability_usecase,
+    get_availability_batch_usecase,
+    get_appointment_usecase,
+    get_reschedule_usecase,
+    get_reschedule_data_usecase,
+)
 
 router = APIRouter(tags=["schedule"])
 logger = logging.getLogger(__name__)
 
+config = get_config()
+
 @router.get("/employee_directory")
-async def get_employee_directory():
+async def get_employee_directory(
+    request: Request,
+    q: str | None = Query(None, description="氏名・メールアドレスの前方一致/部分一致検索"),
+    offset: int = Query(0, ge=0, description="取得開始位置"),
+    limit: int | None = Query(None, ge=1, le=1000, description="取得件数（未指定の場合は全件）"),
+    employee_directory_cache: EmployeeDirectoryCache = Depends(get_employee_directory_cache),
+):
     """従業員一覧を取得"""
     try:
-        employee_directory_repository = EmployeeDirectoryRepository()
-        employee_directory_data_list = employee_directory_repository.get_all_employee_directory()
-        return [
-            {
-                "name": employee_directory_data.name,
-                "email": employee_directory_data.mail,
-            }
-            for employee_directory_data in employee_directory_data_list
-        ]
+        snapshot = await employee_directory_cache.get()
+        headers = {
+            "ETag": make_etag(snapshot.version, q or "", str(offset), str(limit)),
+            "Cache-Control": "no-cache",
+        }
+        if is_not_modified(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        matched = snapshot.search(q)
+        page = matched[offset : offset + limit if limit else None]
+        headers["X-Total-Count"] = str(len(matched))
+        return FastJSONResponse(content=page, headers=headers)
     except Exception as e:
         logger.error(f"従業員一覧取得エラー: {e}")
         raise HTTPException(status_code=500, detail="従業員一覧取得エラー")
 
-@router.post("/availability", response_model=AvailabilityResponse)
-async def get_availability(schedule_req: ScheduleRequest):
-    """指定されたユーザリストと時間帯における空き時間を返す"""
+@router.post("/availability", response_model=AvailabilityResponse, response_class=FastJSONResponse)
+async def get_availability(
+    request: Request,
+    schedule_req: ScheduleRequest,
+    usecase: AvailabilityUsecase = Depends(get_availability_usecase),
+    admission_controller: GraphAdmissionController = Depends(get_graph_admission_controller),
+):
+    """指定されたユーザリストと時間帯における空き時間を返す
+
+    Graph API の呼び出し回数（担当者数×日数）に応じて受付を制限し、枠が空かない場合は 429 を返す。
+    ミラーやキャッシュから返した分は処理後に枠へ戻す。
+    """
+    async with admission_controller.metered(get_client_id(request), estimate_graph_cost(schedule_req)):
+        try:
+            availability = await usecase.execute(schedule_req)
+        except Exception as e:
+            logger.error(f"空き時間取得に失敗: {e}")
+            raise HTTPException(status_code=500, detail="空き時間取得エラー")
+    return FastJSONResponse(availability)
+
+
+@router.post("/availability/batch", response_model=AvailabilityBatchResponse, response_class=FastJSONResponse)
+async def get_availability_batch(
+    request: Request,
+    batch_req: AvailabilityBatchRequest,
+    usecase: AvailabilityBatchUsecase = Depends(get_availability_batch_usecase),
+    admission_controller: GraphAdmissionController = Depends(get_graph_admission_controller),
+):
+    """複数の空き時間検索をまとめて計算し、requests と同じ順序で返す
+
+    担当者・日付が重なる検索どうしで Graph API の取得を共有する。受付制御のコストは共有後の呼び出し回数。
+    """
+    if len(batch_req.requests) > config["AVAILABILITY_BATCH_MAX_REQUESTS"]:
+        raise HTTPException(
+            status_code=422,
+            detail=f"一度に検索できるのは{config['AVAILABILITY_BATCH_MAX_REQUESTS']}件までです",
+        )
     try:
-        return await AvailabilityUsecase().execute(schedule_req)
-    except Exception as e:
-        logger.error(f"空き時間取得に失敗: {e}")
-        raise HTTPException(status_code=500, detail="空き時間取得エラー")
+        plan = plan_fetches(batch_req.requests)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"検索条件が不正です: {e}")
+    cost = len({view_slice.fetch for slices in plan for view_slice in slices})
+    async with admission_controller.metered(get_client_id(request), cost):
+        try:
+            results = await usecase.execute(batch_req.requests, plan)
+        except Exception as e:
+            logger.error(f"空き時間のバッチ取得に失敗: {e}")
+            raise HTTPException(status_code=500, detail="空き時間取得エラー")
+    return FastJSONResponse(AvailabilityBatchResponse.model_construct(results=results))
 
 
 @router.post("/appointment", response_model=AppointmentResponse)
 async def create_appointment(
-    background_tasks: BackgroundTasks, appointment_req: AppointmentRequest = Body(...)
+    appointment_req: AppointmentRequest = Body(...),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+    usecase: AppointmentUsecase = Depends(get_appointment_usecase),
+    idempotency_store: IdempotencyStore = Depends(get_idempotency_store),
 ):
-    """面接担当者の予定を登録し、確認メールを送信"""
-    try:
-        return await AppointmentUsecase().execute(background_tasks, appointment_req)
-    except Exception as e:
-        logger.error(f"予定作成エラー: {e}")
-        raise HTTPException(status_code=500, detail="予定作成エラー")
+    """面接予約を記録し、予定登録と確認メール送信を非同期処理として受け付ける
+
+    Idempotency-Key ヘッダーがある場合、同じキーの再送（ダブルクリックやタイムアウト後の再試行）には
+    最初の実行結果を返し、予約を重複して作成しない。
+    """
 
+    async def execute():
+        try:
+            return await usecase.execute(appointment_req)
+        except Exception as e:
+            logger.error(f"予定作成エラー: {e}")
+            raise HTTPException(status_code=500, detail="予定作成エラー")
 
-@router.get("/reschedule")
+    if idempotency_key is None:
+        return await execute()
+    return await idempotency_store.execute(
+        "appointment", idempotency_key, digest(appointment_req.model_dump(mode="json")), execute
+    )
+
+
+@router.get("/reschedule", response_model=FormData, response_class=FastJSONResponse)
 async def reschedule(
+    request: Request,
     cosmos_db_id: str = Query(..., description="CosmosDBのID"),
+    usecase: GetRescheduleDataUsecase = Depends(get_reschedule_data_usecase),
 ):
     """日程再調整のための日時を取得"""
     try:
-        return await GetRescheduleDataUsecase().execute(cosmos_db_id)
+        form_data, version = await usecase.execute(cosmos_db_id)
+        headers = {"ETag": make_etag(cosmos_db_id, version), "Cache-Control": "no-cache"}
+        if is_not_modified(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        return FastJSONResponse(form_data, headers=headers)
     except Exception as e:
         logger.error(f"リスケジュールエラー: {e}")
         raise HTTPException(status_code=500, detail="リスケジュールエラー")
@@ -71,10 +163,21 @@ async def reschedule(
 @router.post("/reschedule")
 async def reschedule(
     reschedule_req: RescheduleRequest = Body(...),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+    usecase: RescheduleUsecase = Depends(get_reschedule_usecase),
+    idempotency_store: IdempotencyStore = Depends(get_idempotency_store),
 ):
-    """日程再調整の確認および実行"""
-    try:
-        return await RescheduleUsecase().execute(reschedule_req)
-    except Exception as e:
-        logger.error(f"リスケジュールエラー: {e}")
-        raise HTTPException(status_code=500, detail="リスケジュールエラー")
+    """日程再調整の確認および実行（Idempotency-Key による再送の扱いは /appointment と同じ）"""
+
+    async def execute():
+        try:
+            return await usecase.execute(reschedule_req)
+        except Exception as e:
+            logger.error(f"リスケジュールエラー: {e}")
+            raise HTTPException(status_code=500, detail="リスケジュールエラー")
+
+    if idempotency_key is None:
+        return await execute()
+    return await idempotency_store.execute(
+        "reschedule", idempotency_key, digest(reschedule_req.model_dump(mode="json")), execute
+    )
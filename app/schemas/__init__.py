@@ -2,15 +2,40 @@ from app.schemas.schedule import (
     AppointmentRequest,
     AppointmentResponse,
     AvailabilityResponse,
+    AvailabilityBatchRequest,
+    AvailabilityBatchResponse,
+    AppointmentFilter,
+    AppointmentRecord,
+    AppointmentListResponse,
 )
-from app.schemas.form import FormData, EmployeeEmail, ScheduleRequest, RescheduleRequest
+from app.schemas.form import (
+    FormData,
+    FormDataBulkRequest,
+    FormDataBulkItemResult,
+    FormDataBulkResponse,
+    EmployeeEmail,
+    ScheduleRequest,
+    RescheduleRequest,
+)
+from app.schemas.outbox import OutboxMessage
+from app.schemas.notification import Notification
 
 __all__ = [
     "ScheduleRequest",
     "FormData",
+    "FormDataBulkRequest",
+    "FormDataBulkItemResult",
+    "FormDataBulkResponse",
     "EmployeeEmail",
     "AppointmentRequest",
     "AppointmentResponse",
     "AvailabilityResponse",
+    "AvailabilityBatchRequest",
+    "AvailabilityBatchResponse",
     "RescheduleRequest",
+    "AppointmentFilter",
+    "AppointmentRecord",
+    "AppointmentListResponse",
+    "OutboxMessage",
+    "Notification",
 ]
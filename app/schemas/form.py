@@ -1,3 +1,4 @@
+from typing import Any
 from pydantic import BaseModel, Field
 
 
@@ -60,6 +61,18 @@ class FormData(BaseModel):
     schedule_interview_datetime: str | None = None
     event_ids: dict | None = None
 
+    @classmethod
+    def from_trusted(cls, data: dict[str, Any]) -> "FormData":
+        """保存時に検証済みのデータ（Cosmos DB のドキュメント等）から再検証せずに構築する"""
+        return cls.model_construct(
+            **{
+                **data,
+                "employee_emails": [
+                    EmployeeEmail.model_construct(**e) for e in data["employee_emails"]
+                ],
+            }
+        )
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -99,3 +112,32 @@ class RescheduleRequest(BaseModel):
                 "schedule_interview_datetime": "2025-01-10T10:00:00,2025-01-10T11:00:00",
             }
         }
+
+
+class FormDataBulkRequest(BaseModel):
+    """複数のフォームデータをまとめて保存するリクエストを表すスキーマ"""
+
+    forms: list[FormData] = Field(..., min_length=1, description="保存するフォームデータのリスト")
+
+
+class FormDataBulkItemResult(BaseModel):
+    """一括保存の項目ごとの結果を表すスキーマ（成功時は cosmos_db_id、失敗時は error と status_code）
+
+    status が unknown の項目はタイムアウトなどで保存されたか確認できなかったもの。サーバー側では保存されている
+    場合があるため、再送する前に cosmos_db_id でフォームを取得して確認する。
+    """
+
+    status: str = Field("stored", description="stored: 保存済み / failed: 失敗 / unknown: 保存されたか不明")
+    cosmos_db_id: str | None = Field(None, description="保存したフォームのCosmosDBのID（unknown の場合は確認用のID）")
+    error: str | None = Field(None, description="保存に失敗した理由")
+    status_code: int | None = Field(None, description="失敗時のステータスコード")
+
+
+class FormDataBulkResponse(BaseModel):
+    """一括保存の結果を表すスキーマ（results は forms と同じ順序）"""
+
+    results: list[FormDataBulkItemResult] = Field(..., description="項目ごとの結果")
+    succeeded: int = Field(..., description="保存に成功した件数")
+    failed: int = Field(..., description="保存に失敗した件数")
+    unknown: int = Field(0, description="保存されたか確認できなかった件数")
+    request_charge: float = Field(..., description="消費した Cosmos DB の RU の合計")
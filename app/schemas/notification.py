@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+
+
+class Notification(BaseModel):
+    """送信キューに積まれるメール通知を表すスキーマ"""
+
+    sender_email: str = Field(..., description="送信元メールアドレス")
+    recipient_email: str = Field(..., description="送信先メールアドレス")
+    subject: str = Field(..., description="件名")
+    body: str = Field(..., description="本文（HTML）")
+    dedupe_key: str | None = Field(
+        None, description="重複登録防止キー（同じキーの通知は1度だけキューに積まれる）"
+    )
@@ -0,0 +1,13 @@
+import uuid
+from pydantic import BaseModel, Field
+from typing import Any
+
+
+class OutboxMessage(BaseModel):
+    """アウトボックスに記録される非同期処理メッセージを表すスキーマ"""
+
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="メッセージID")
+    message_type: str = Field(..., description="メッセージの種類（ハンドラの識別子）")
+    aggregate_id: str | None = Field(None, description="対象データのID（cosmos_db_id など）")
+    payload: dict[str, Any] = Field(default_factory=dict, description="ハンドラに渡すデータ")
+    attempts: int = Field(0, description="これまでの処理試行回数")
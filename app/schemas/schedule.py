@@ -1,5 +1,8 @@
+from datetime import date
 from pydantic import BaseModel, Field
 
+from app.schemas.form import ScheduleRequest
+
 
 class AppointmentRequest(BaseModel):
     """面接予約リクエストを表すスキーマ"""
@@ -79,3 +82,65 @@ class AvailabilityResponse(BaseModel):
                 },
             }
         }
+
+
+class AvailabilityBatchRequest(BaseModel):
+    """複数の空き時間検索をまとめたリクエストを表すスキーマ"""
+
+    requests: list[ScheduleRequest] = Field(..., min_length=1, description="空き時間検索のリスト")
+
+
+class AvailabilityBatchResponse(BaseModel):
+    """複数の空き時間検索の結果を表すスキーマ（requests と同じ順序）"""
+
+    results: list[AvailabilityResponse] = Field(..., description="各検索の空き時間候補")
+
+
+class AppointmentFilter(BaseModel):
+    """アポイントメント一覧・エクスポートの絞り込み条件を表すスキーマ"""
+
+    employee_email: str | None = Field(None, description="面接担当者のメールアドレス")
+    start_date: date | None = Field(None, description="面接日の開始日 (この日を含む)")
+    end_date: date | None = Field(None, description="面接日の終了日 (この日を含む)")
+    interview_stage: str | None = Field(None, description="面接のステージ")
+
+
+class AppointmentRecord(BaseModel):
+    """登録済みアポイントメントを表すスキーマ"""
+
+    scheduled_interview_datetime: str | None = Field(None, description="面接日時 ('開始日時,終了日時' の形式)")
+    employee_email: str | None = Field(None, description="面接担当者のメールアドレス")
+    candidate_lastname: str | None = Field(None, description="候補者の姓")
+    candidate_firstname: str | None = Field(None, description="候補者の名")
+    company: str | None = Field(None, description="候補者の所属会社")
+    candidate_email: str | None = Field(None, description="候補者のメールアドレス")
+    cosmos_db_id: str | None = Field(None, description="CosmosDBのID")
+    candidate_id: int | None = Field(None, description="候補者のID")
+    interview_stage: str | None = Field(None, description="面接のステージ")
+
+
+class AppointmentListResponse(BaseModel):
+    """アポイントメント一覧のレスポンスを表すスキーマ"""
+
+    items: list[AppointmentRecord] = Field(..., description="アポイントメントのリスト")
+    next_cursor: str | None = Field(None, description="次ページ取得用のカーソル（最終ページの場合はNone）")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {
+                        "scheduled_interview_datetime": "2025-01-10T10:00:00,2025-01-10T11:00:00",
+                        "employee_email": "crawler01@intelligentforce.co.jp",
+                        "candidate_lastname": "青木",
+                        "candidate_firstname": "駿介",
+                        "company": "株式会社サンプル",
+                        "candidate_email": "shunsuke.aoki0913@gmail.com",
+                        "cosmos_db_id": "sample-az-cosmos-id-123",
+                        "candidate_id": 1234567890,
+                        "interview_stage": "firstInterview",
+                    }
+                ],
+                "next_cursor": "WyIyMDI1LTAxLTEwVDEwOjAwOjAwLDIwMjUtMDEtMTBUMTE6MDA6MDAiLCAic2FtcGxlIl0",
+            }
+        }
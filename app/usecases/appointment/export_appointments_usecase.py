@@ -0,0 +1,72 @@
+import csv
+import io
+import itertools
+import json
+import logging
+from typing import Iterator
+
+from app.schemas import AppointmentFilter, AppointmentRecord
+from app.interfaces.appointment_repository_interface import AppointmentRepositoryInterface
+
+logger = logging.getLogger(__name__)
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class ExportAppointmentsUsecase:
+    def __init__(self, appointment_repository: AppointmentRepositoryInterface, batch_size: int = 1000):
+        self.appointment_repository = appointment_repository
+        self.batch_size = batch_size
+
+    def execute(self, appointment_filter: AppointmentFilter, export_format: str) -> Iterator[str]:
+        """条件に一致するアポイントメントをCSVまたはNDJSONで逐次出力するユースケース
+
+        クエリの実行と最初のチャンクの生成はここで行い、DBのエラーはレスポンスを返す前に送出する。
+        （同期的にDBへアクセスするため、スレッドで呼び出すこと）
+        """
+        rows = self.appointment_repository.stream_appointments(appointment_filter, self.batch_size)
+        chunks = self._to_csv(rows) if export_format == "csv" else self._to_ndjson(rows)
+        first = next(chunks, None)
+        return self._guard(itertools.chain([first] if first is not None else [], chunks))
+
+    @staticmethod
+    def _guard(chunks: Iterator[str]) -> Iterator[str]:
+        """出力の途中で発生したエラーを記録する
+
+        レスポンスのヘッダーは送信済みでステータスを変えられないため、例外を送出したまま接続を切り、
+        途中までの内容を完全なファイルとして受け取らせない。
+        """
+        try:
+            yield from chunks
+        except Exception:
+            logger.exception("アポイントメントのエクスポート中にエラーが発生しました（出力を中断します）")
+            raise
+
+    def _to_csv(self, rows) -> Iterator[str]:
+        fields = list(AppointmentRecord.model_fields)
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+        # Excel で文字化けしないよう BOM を付与
+        buffer.write("\ufeff")
+        writer.writeheader()
+
+        for count, row in enumerate(rows, start=1):
+            writer.writerow(dict(row._mapping))
+            if count % self.batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    def _to_ndjson(self, rows) -> Iterator[str]:
+        chunk: list[str] = []
+        for row in rows:
+            chunk.append(json.dumps(dict(row._mapping), ensure_ascii=False, default=str))
+            if len(chunk) >= self.batch_size:
+                yield "\n".join(chunk) + "\n"
+                chunk = []
+        if chunk:
+            yield "\n".join(chunk) + "\n"
@@ -0,0 +1,37 @@
+import asyncio
+import logging
+from fastapi import HTTPException
+
+from app.schemas import AppointmentFilter, AppointmentRecord, AppointmentListResponse
+from app.interfaces.appointment_repository_interface import AppointmentRepositoryInterface
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+
+class ListAppointmentsUsecase:
+    def __init__(self, appointment_repository: AppointmentRepositoryInterface):
+        self.appointment_repository = appointment_repository
+
+    @traced("ListAppointmentsUsecase.execute")
+    async def execute(
+        self, appointment_filter: AppointmentFilter, limit: int, cursor: str | None = None
+    ) -> AppointmentListResponse:
+        """条件に一致するアポイントメントを1ページ分取得するユースケース"""
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        rows = await asyncio.to_thread(
+            self.appointment_repository.list_appointments, appointment_filter, limit, after
+        )
+        items = [AppointmentRecord(**row._mapping) for row in rows]
+
+        next_cursor = None
+        if len(items) == limit:
+            last = rows[-1]
+            next_cursor = encode_cursor((last.scheduled_interview_datetime, last.id))
+
+        return AppointmentListResponse(items=items, next_cursor=next_cursor)
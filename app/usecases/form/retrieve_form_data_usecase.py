@@ -3,24 +3,39 @@ from fastapi import HTTPException
 from typing import Any
 
 from app.schemas import FormData, ScheduleRequest
-from app.infrastructure.az_cosmos import AzCosmosDBClient
-from app.infrastructure.graph_api import GraphAPIClient
+from app.interfaces.az_cosmos_interface import AzCosmosDBClientInterface
+from app.interfaces.graph_api_interface import GraphAPIClientInterface
+from app.utils.admission import GraphAdmissionController, estimate_graph_cost
 from app.utils.time import time_string_to_float
 from app.utils.slot import split_candidates
 from app.utils.availability import aggregate_user_availability, calculate_common_availability
+from app.utils.http_cache import digest
+from app.utils.log_payload import summarize
+from app.utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
 class RetrieveFormDataUsecase:
-    def __init__(self):
-        self.cosmos_db_client = AzCosmosDBClient()
-        self.graph_api_client = GraphAPIClient()
+    def __init__(
+        self,
+        cosmos_db_client: AzCosmosDBClientInterface,
+        graph_api_client: GraphAPIClientInterface,
+        admission_controller: GraphAdmissionController,
+    ):
+        self.cosmos_db_client = cosmos_db_client
+        self.graph_api_client = graph_api_client
+        self.admission_controller = admission_controller
 
-    async def execute(self, cosmos_db_id: str) -> FormData:
-        """フォームデータを取得し、返すユースケース"""
+    @traced("RetrieveFormDataUsecase.execute")
+    async def execute(self, cosmos_db_id: str) -> tuple[FormData, str]:
+        """フォームデータを取得し、バージョン（ETag の元になる値）とともに返すユースケース
+
+        バージョンはフォームの Cosmos DB _etag と、最新の空き時間を計算した場合はその内容ダイジェストから成る。
+        """
         try:
             form_data = self.cosmos_db_client.get_form_data(cosmos_db_id)
+            version = form_data.get("_etag", "")
             # is_confirmedがfalseの場合、最新の空き時間を取得
             if not form_data.get("is_confirmed", True):
                 logger.info("is_confirmedがfalseのため、最新の空き時間を取得します")
@@ -37,17 +52,20 @@ class RetrieveFormDataUsecase:
                     required_participants=form_data["required_participants"],
                     time_zone=form_data.get("time_zone", "Tokyo Standard Time")
                 )
-                # 最新の空き時間を取得
-                common_times, slot_employees_map = self._get_latest_availability(schedule_req)
+                # 候補者向けの画面のため、確保された Graph API の呼び出し枠を使う
+                async with self.admission_controller.metered(None, estimate_graph_cost(schedule_req)):
+                    # 最新の空き時間を取得
+                    common_times, slot_employees_map = self._get_latest_availability(schedule_req)
                 # common_timesは既にlist[list[str]]の形式なので、そのまま設定
                 form_data["schedule_interview_datetimes"] = common_times
                 form_data["slot_employees_map"] = slot_employees_map
+                version = f"{version}:{digest([common_times, slot_employees_map])}"
             else:
                 form_data["schedule_interview_datetimes"] = split_candidates(
                     form_data["schedule_interview_datetimes"], form_data["duration_minutes"]
                 )
 
-            return FormData(**form_data)
+            return FormData.from_trusted(form_data), version
 
         except Exception as e:
             logger.error(f"フォームデータが見つかりません: {e}")
@@ -58,9 +76,9 @@ class RetrieveFormDataUsecase:
         """最新の空き時間を取得する"""
         try:
             schedule_info_list = self.graph_api_client.get_schedules(schedule_req)
-            logger.info(f"スケジュール情報: {schedule_info_list}")
+            logger.debug("スケジュール情報: %s", summarize(schedule_info_list))
             common_times, slot_employees_map = self._calculate_common_times(schedule_req, schedule_info_list)
-            logger.info(f"空き時間: {common_times}")
+            logger.debug("空き時間: %s", summarize(common_times))
             return common_times, slot_employees_map
         except Exception as e:
             logger.exception("最新の空き時間取得に失敗しました")
@@ -83,8 +101,8 @@ class RetrieveFormDataUsecase:
             schedule_req.start_date,
             schedule_req.end_date,
         )
-        logger.info(f"date_user_slots: {date_user_slots}")
-        logger.info(f"date_list: {date_list}")
+        logger.debug("date_user_slots: %s", summarize(date_user_slots))
+        logger.debug("date_list: %s", summarize(date_list))
 
         common_availability, slot_employees_map = calculate_common_availability(
             date_user_slots,
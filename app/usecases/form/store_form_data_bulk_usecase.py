@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import uuid
+from typing import Any
+
+from app.schemas import FormData, FormDataBulkItemResult, FormDataBulkResponse
+from app.interfaces.az_cosmos_interface import AzCosmosDBClientInterface
+from app.utils.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+
+class StoreFormDataBulkUsecase:
+    def __init__(self, cosmos_db_client: AzCosmosDBClientInterface, batch_size: int, max_concurrency: int):
+        self.cosmos_db_client = cosmos_db_client
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+
+    async def _store_chunk(
+        self, semaphore: asyncio.Semaphore, payloads: list[dict[str, Any]]
+    ) -> tuple[list[dict[str, Any]], float]:
+        """1回のトランザクションバッチ分を保存する（Cosmos DB クライアントは同期のためスレッドで呼び出す）
+
+        想定外の例外（通信のタイムアウトなど）ではサーバー側で保存されている可能性があるため、
+        失敗ではなく unknown として、確認用に生成したIDを返す（再送による重複登録を防ぐ）。
+        """
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(self.cosmos_db_client.create_form_data_batch, payloads)
+            except Exception as e:
+                logger.error(f"フォームデータの一括保存の結果が不明です: {len(payloads)}件: {e}")
+                return [
+                    {
+                        "status": "unknown",
+                        "cosmos_db_id": payload["id"],
+                        "error": "保存されたか確認できませんでした",
+                        "status_code": 500,
+                    }
+                    for payload in payloads
+                ], 0.0
+
+    @traced("StoreFormDataBulkUsecase.execute")
+    async def execute(self, forms: list[FormData]) -> FormDataBulkResponse:
+        """
+        複数のフォームデータを batch_size 件ずつのトランザクションバッチで並行に保存し、項目ごとの結果を返すユースケース
+        """
+        # ID はここで生成し、結果が不明な項目でも呼び出し元が確認できるようにする
+        payloads = [{**form.model_dump(), "id": str(uuid.uuid4())} for form in forms]
+        chunks = [payloads[i : i + self.batch_size] for i in range(0, len(payloads), self.batch_size)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        chunk_results = await asyncio.gather(*[self._store_chunk(semaphore, chunk) for chunk in chunks])
+
+        results = [FormDataBulkItemResult.model_construct(**r) for items, _ in chunk_results for r in items]
+        succeeded = sum(1 for r in results if r.status == "stored")
+        unknown = sum(1 for r in results if r.status == "unknown")
+        failed = len(results) - succeeded - unknown
+        request_charge = round(sum(charge for _, charge in chunk_results), 2)
+        logger.info(
+            f"フォームデータの一括保存: {len(results)}件（成功 {succeeded}件 / 失敗 {failed}件 / 不明 {unknown}件）"
+            f" | バッチ {len(chunks)}回 | {request_charge} RU"
+        )
+        return FormDataBulkResponse.model_construct(
+            results=results,
+            succeeded=succeeded,
+            failed=failed,
+            unknown=unknown,
+            request_charge=request_charge,
+        )
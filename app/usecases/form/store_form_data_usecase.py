@@ -2,15 +2,17 @@ import logging
 from fastapi import HTTPException
 
 from app.schemas import FormData
-from app.infrastructure.az_cosmos import AzCosmosDBClient
+from app.interfaces.az_cosmos_interface import AzCosmosDBClientInterface
+from app.utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
 class StoreFormDataUsecase:
-    def __init__(self):
-        self.cosmos_db_client = AzCosmosDBClient()
+    def __init__(self, cosmos_db_client: AzCosmosDBClientInterface):
+        self.cosmos_db_client = cosmos_db_client
 
+    @traced("StoreFormDataUsecase.execute")
     async def execute(self, payload: FormData) -> str:
         """
         フォームデータを保存し、CosmosDBのIDを返すユースケース
@@ -0,0 +1,407 @@
+import asyncio
+import logging
+import time
+from functools import partial
+from typing import Any, Callable
+
+from fastapi import HTTPException
+
+from app.schemas import AppointmentRequest, Notification, OutboxMessage
+from app.interfaces.graph_api_interface import GraphAPIClientInterface
+from app.interfaces.az_cosmos_interface import AzCosmosDBClientInterface
+from app.interfaces.appointment_repository_interface import AppointmentRepositoryInterface
+from app.utils.formatting import parse_candidate, format_candidate_date
+from app.config.config import get_config
+from app.constants import EMPLOYEE_EMAILS, INTERVIEW_STAGE_MAPPING
+from app.workers.notification_dispatcher import NotificationDispatcher
+from app.utils.metrics import APPOINTMENT_STEP_DURATION
+from app.utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+# アウトボックスのメッセージ種別
+REGISTER_EVENT = "appointment.register_event"
+STORE_EVENT_IDS = "appointment.store_event_ids"
+SEND_CONFIRMATION_EMAILS = "appointment.send_confirmation_emails"
+SEND_NO_AVAILABLE_SCHEDULE_EMAILS = "appointment.send_no_available_schedule_emails"
+
+# register_event のペイロードに保存する、登録したイベントを削除済みにした回数（transactionId の世代）
+EVENT_GENERATION_KEY = "event_generation"
+
+
+def _is_not_found(error: Exception) -> bool:
+    return isinstance(error, HTTPException) and error.status_code == 404
+
+
+def event_transaction_id(message: OutboxMessage) -> str:
+    """Graph API に渡す transactionId（再試行でも同じ値にし、登録済みのイベントを重複して作らせない）
+
+    登録したイベントを取り消しで削除した後だけ世代を進め、次の試行で新しいイベントとして登録する。
+    """
+    generation = int(message.payload.get(EVENT_GENERATION_KEY, 0))
+    return message.id if generation == 0 else f"{message.id}:{generation}"
+
+
+def build_event_payload(appointment_req: AppointmentRequest) -> dict[str, Any]:
+    """Graph APIに登録するイベントのペイロードを構築"""
+    if not appointment_req.schedule_interview_datetime:
+        raise ValueError("schedule_interview_datetime is required")
+
+    start_str, end_str, _ = parse_candidate(appointment_req.schedule_interview_datetime)
+    if not (start_str and end_str):
+        raise ValueError(f"Invalid datetime format. start={start_str}, end={end_str}")
+
+    interview_stage_jp = INTERVIEW_STAGE_MAPPING.get(
+        appointment_req.interview_stage, appointment_req.interview_stage
+    )
+
+    event_payload = {
+        "subject": f"#{appointment_req.candidate_id} (WEB)【{appointment_req.university}/{appointment_req.candidate_lastname} {appointment_req.candidate_firstname}様】 キャリア採用・{interview_stage_jp}",
+        "body": {
+            "contentType": "HTML",
+            "content": (
+                "日程調整が完了しました。詳細は下記の通りです。<br><br>"
+                f"・氏名<br>{appointment_req.candidate_lastname} {appointment_req.candidate_firstname}<br>"
+                f"・所属<br>{appointment_req.company}<br>"
+                f"・大学<br>{appointment_req.university}<br>"
+                f"・メールアドレス<br>{appointment_req.candidate_email}<br>"
+                f"・日程<br>{format_candidate_date(appointment_req.schedule_interview_datetime)}<br><br>"
+            ),
+        },
+        "start": {"dateTime": start_str, "timeZone": "Tokyo Standard Time"},
+        "end": {"dateTime": end_str, "timeZone": "Tokyo Standard Time"},
+        "isOnlineMeeting": True,
+        "onlineMeetingProvider": "teamsForBusiness",
+        "attendees": [
+            {
+                "emailAddress": {
+                    "address": appointment_req.employee_email,
+                    "name": "面接担当者",
+                },
+                "type": "required",
+            },
+            {
+                "emailAddress": {
+                    "address": appointment_req.candidate_email,
+                    "name": f"{appointment_req.candidate_lastname} {appointment_req.candidate_firstname}",
+                },
+                "type": "required",
+            },
+        ],
+    }
+    return event_payload
+
+
+class AppointmentSideEffectsUsecase:
+    """アポイントメント登録に伴う副作用をアウトボックス経由で実行するユースケース
+
+    各ハンドラは再試行されても結果が変わらないように実装する。
+    """
+
+    def __init__(
+        self,
+        graph_api_client: GraphAPIClientInterface,
+        az_cosmos_db_client: AzCosmosDBClientInterface,
+        appointment_repository: AppointmentRepositoryInterface,
+        notification_dispatcher: NotificationDispatcher,
+    ):
+        self.graph_api_client = graph_api_client
+        self.az_cosmos_db_client = az_cosmos_db_client
+        self.appointment_repository = appointment_repository
+        self.notification_dispatcher = notification_dispatcher
+
+    def handlers(self) -> dict[str, Any]:
+        return {
+            REGISTER_EVENT: self.register_event,
+            STORE_EVENT_IDS: self.store_event_ids,
+            SEND_CONFIRMATION_EMAILS: self.handle_confirmation_emails,
+            SEND_NO_AVAILABLE_SCHEDULE_EMAILS: self.handle_no_available_schedule_emails,
+        }
+
+    async def _run_steps(
+        self, timings: dict[str, float], steps: dict[str, Callable[[], Any]]
+    ) -> tuple[dict[str, Any], dict[str, Exception]]:
+        """同期処理をスレッドで並行に実行し、成功した処理の結果と失敗した処理の例外を返す
+
+        各処理の所要時間は timings と APPOINTMENT_STEP_DURATION に記録する。
+        """
+
+        async def run(name: str, step: Callable[[], Any]) -> Any:
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                with span(f"appointment.{name}"):
+                    result = await asyncio.to_thread(step)
+                outcome = "ok"
+                return result
+            finally:
+                timings[name] = round(time.perf_counter() - started, 3)
+                APPOINTMENT_STEP_DURATION.labels(name, outcome).observe(timings[name])
+
+        names = list(steps)
+        outcomes = await asyncio.gather(*[run(name, steps[name]) for name in names], return_exceptions=True)
+        results: dict[str, Any] = {}
+        failures: dict[str, Exception] = {}
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, BaseException):
+                if not isinstance(outcome, Exception):
+                    raise outcome
+                failures[name] = outcome
+            else:
+                results[name] = outcome
+        return results, failures
+
+    async def register_event(self, message: OutboxMessage) -> list[OutboxMessage]:
+        """Graph APIにイベントを登録し、Cosmos DBへのイベントIDの保存とアポイントメントの存在確認を並行に行う
+
+        保存・確認のいずれかが失敗した場合は、登録したイベントを削除して Cosmos DB を元に戻してから例外を送出する。
+        削除できた場合だけ transactionId の世代を進めてペイロードに記録し（失敗時にアウトボックスへ保存される）、
+        再試行では新しいイベントとして登録し直す。登録の応答を受け取れなかった場合や削除に失敗した場合は
+        同じ transactionId のまま再試行し、Graph API 側で登録済みのイベントと重複させない。
+        アポイントメントが取り消されていた場合も同様に戻し、再試行せずに終える。
+        成功した場合は確定メールの送信を後続メッセージとして返す。
+        """
+        appointment_req = AppointmentRequest(**message.payload)
+        cosmos_db_id = appointment_req.cosmos_db_id
+        event_payload = build_event_payload(appointment_req)
+        event_payload["transactionId"] = event_transaction_id(message)
+
+        timings: dict[str, float] = {}
+        # 取り消し時に戻せるよう、イベント登録と並行してフォームの現在の内容を読み込む
+        steps: dict[str, Callable[[], Any]] = {
+            "register_event": partial(
+                self.graph_api_client.register_event, config["SYSTEM_SENDER_EMAIL"], event_payload
+            ),
+        }
+        if cosmos_db_id:
+            # 取り消し時に書き戻す内容のため、キャッシュを使わない
+            steps["read_form"] = partial(self.az_cosmos_db_client.get_form_data, cosmos_db_id, use_cache=False)
+        results, failures = await self._run_steps(timings, steps)
+        if "register_event" in failures:
+            raise failures["register_event"]
+        event_resp = results["register_event"]
+        if not event_resp or "id" not in event_resp:
+            raise RuntimeError(f"Graph API returned invalid response: {event_resp}")
+        event_id = event_resp["id"]
+        logger.info("イベント登録成功: %s - %s", config["SYSTEM_SENDER_EMAIL"], event_id)
+
+        try:
+            if not cosmos_db_id:
+                logger.warning("cosmos_db_id が無いため CosmosDB の更新をスキップします")
+            elif "read_form" in failures:
+                deleted = await self._compensate(timings, cosmos_db_id, event_id, None)
+                if _is_not_found(failures["read_form"]):
+                    logger.warning(f"フォームが削除されていたため予定を削除しました: {cosmos_db_id}")
+                    return []
+                if deleted:
+                    self._next_generation(message)
+                raise failures["read_form"]
+            else:
+                previous_form = results["read_form"]
+                results, failures = await self._run_steps(
+                    timings,
+                    {
+                        "store_event_ids": partial(
+                            self.az_cosmos_db_client.update_form_data,
+                            cosmos_db_id,
+                            appointment_req.schedule_interview_datetime,
+                            {appointment_req.employee_email: event_id},
+                        ),
+                        "check_appointment": partial(
+                            self.appointment_repository.get_appointment_by_cosmos_db_id, cosmos_db_id
+                        ),
+                    },
+                )
+                # アポイントメントまたはフォームが削除されていた場合は、予約が取り消されたものとして扱う
+                cancelled = ("check_appointment" in results and results["check_appointment"] is None) or any(
+                    _is_not_found(error) for error in failures.values()
+                )
+                if cancelled or failures:
+                    for name, error in failures.items():
+                        logger.error(f"イベント登録後の処理に失敗しました: {message.id} - {name}: {error}")
+                    deleted = await self._compensate(
+                        timings, cosmos_db_id, event_id, previous_form if "store_event_ids" in results else None
+                    )
+                    if cancelled:
+                        logger.warning(f"予約が取り消されていたため予定を削除しました: {cosmos_db_id}")
+                        return []
+                    if deleted:
+                        self._next_generation(message)
+                    raise next(iter(failures.values()))
+        finally:
+            logger.info(
+                f"イベント登録処理の所要時間: {message.id} | "
+                + ", ".join(f"{name}={seconds}s" for name, seconds in timings.items())
+            )
+
+        meeting_url = (event_resp.get("onlineMeeting") or {}).get("joinUrl")
+        return [
+            OutboxMessage(
+                message_type=SEND_CONFIRMATION_EMAILS,
+                aggregate_id=message.aggregate_id,
+                payload={"appointment": message.payload, "meeting_urls": [meeting_url]},
+            )
+        ]
+
+    @staticmethod
+    def _next_generation(message: OutboxMessage) -> None:
+        """登録したイベントを削除できたため、次の試行では新しい transactionId で登録させる"""
+        message.payload[EVENT_GENERATION_KEY] = int(message.payload.get(EVENT_GENERATION_KEY, 0)) + 1
+
+    async def _compensate(
+        self,
+        timings: dict[str, float],
+        cosmos_db_id: str,
+        event_id: str,
+        previous_form: dict[str, Any] | None,
+    ) -> bool:
+        """登録したイベントを削除し、previous_form がある場合はフォームの日時とイベントIDを元に戻す（失敗は記録のみ）
+
+        イベントを削除できた（既に存在しない場合を含む）かどうかを返す。
+        """
+        steps: dict[str, Callable[[], Any]] = {
+            "delete_event": partial(self.graph_api_client.delete_event, config["SYSTEM_SENDER_EMAIL"], event_id),
+        }
+        if previous_form is not None:
+            steps["restore_form"] = partial(
+                self.az_cosmos_db_client.update_form_data,
+                cosmos_db_id,
+                previous_form.get("schedule_interview_datetime"),
+                previous_form.get("event_ids") or {},
+            )
+        _, failures = await self._run_steps(timings, steps)
+        for name, error in failures.items():
+            logger.error(f"イベント登録の取り消しに失敗しました（手動での確認が必要）: {cosmos_db_id} - {name}: {error}")
+        return "delete_event" not in failures or _is_not_found(failures["delete_event"])
+
+    def store_event_ids(self, message: OutboxMessage) -> None:
+        """Cosmos DBにイベントIDを保存（register_event で直接保存する前に積まれたメッセージの処理用）"""
+        self.az_cosmos_db_client.update_form_data(
+            message.payload["cosmos_db_id"],
+            message.payload["schedule_interview_datetime"],
+            message.payload["event_ids"],
+        )
+
+    def handle_confirmation_emails(self, message: OutboxMessage) -> None:
+        # 再試行時に同じメールが二重にキューへ積まれないよう、メッセージIDを重複防止キーに使う
+        self.send_confirmation_emails(
+            AppointmentRequest(**message.payload["appointment"]),
+            message.payload["meeting_urls"],
+            dedupe_prefix=message.id,
+        )
+
+    def handle_no_available_schedule_emails(self, message: OutboxMessage) -> None:
+        self.send_no_available_schedule_emails(
+            AppointmentRequest(**message.payload), dedupe_prefix=message.id
+        )
+
+
+    def send_confirmation_emails(
+        self,
+        appointment_req: AppointmentRequest,
+        meeting_urls: list[str | None],
+        dedupe_prefix: str | None = None,
+    ) -> None:
+        """社内関係者と候補者への確定メールを送信キューに積む"""
+        meeting_url = next((url for url in meeting_urls if url), None)
+        if meeting_url is None:
+            raise ValueError("会議 URL が取得できませんでした")
+
+        # 内部向け
+        internal_subject = f"【{appointment_req.company}/{appointment_req.candidate_lastname} {appointment_req.candidate_firstname}様】日程確定"
+        internal_body = (
+            "日程調整が完了しました。詳細は下記の通りです。<br><br>"
+            f"・氏名<br>{appointment_req.candidate_lastname} {appointment_req.candidate_firstname}<br>"
+            f"・所属<br>{appointment_req.company}<br>"
+            f"・メールアドレス<br>{appointment_req.candidate_email}<br>"
+            f"・日程<br>{format_candidate_date(appointment_req.schedule_interview_datetime)}<br>"
+            f'・会議URL<br><a href="{meeting_url}">{meeting_url}</a><br><br>'
+        )
+        # appointment_req.employee_emailに加えて、定数のEMPLOYEE_EMAILSにも送信（同一内容は1通にまとめて送られる）
+        recipients = []
+        if appointment_req.employee_email:
+            recipients.append(appointment_req.employee_email)
+        # 定数からメールアドレスを追加
+        recipients.extend([*EMPLOYEE_EMAILS, config["SYSTEM_SENDER_EMAIL"]])
+
+        notifications = [
+            Notification(
+                sender_email=config["SYSTEM_SENDER_EMAIL"],
+                recipient_email=recipient_email,
+                subject=internal_subject,
+                body=internal_body,
+                dedupe_key=f"{dedupe_prefix}:internal:{recipient_email}" if dedupe_prefix else None,
+            )
+            for recipient_email in dict.fromkeys(recipients)
+        ]
+
+        # クライアント向け
+        client_subject = "日程確定（インテリジェントフォース）"
+        reschedule_link = f"{config['CLIENT_URL']}/reschedule?cosmosDbId={appointment_req.cosmos_db_id}"
+        client_body = (
+            f"{appointment_req.candidate_lastname}様<br><br>"
+            "この度は日程を調整いただきありがとうございます。<br>"
+            "ご登録いただいた内容、および当日の会議URLは下記の通りです。<br><br>"
+            f"・氏名<br>{appointment_req.candidate_lastname} {appointment_req.candidate_firstname}<br><br>"
+            f"・所属<br>{appointment_req.company}<br><br>"
+            f"・メールアドレス<br>{appointment_req.candidate_email}<br><br>"
+            f"・日程<br>{format_candidate_date(appointment_req.schedule_interview_datetime)}<br><br>"
+            f'・会議URL<br><a href="{meeting_url}">{meeting_url}</a><br><br>'
+            "※日程の再調整が必要な場合はこちらからご対応ください：<br>"
+            f'<a href="{reschedule_link}">{reschedule_link}</a><br>'
+            "再調整のご対応後は、元の予定は自動的に削除されます。<br><br>"
+            "以上になります。<br>"
+            "当日はどうぞよろしくお願いいたします。"
+        )
+        notifications.append(
+            Notification(
+                sender_email=config["SYSTEM_SENDER_EMAIL"],
+                recipient_email=appointment_req.candidate_email,
+                subject=client_subject,
+                body=client_body,
+                dedupe_key=f"{dedupe_prefix}:client" if dedupe_prefix else None,
+            )
+        )
+        self.notification_dispatcher.enqueue(notifications)
+
+
+    def send_no_available_schedule_emails(
+        self, appointment_req: AppointmentRequest, dedupe_prefix: str | None = None
+    ) -> None:
+        """「可能な日程がない」が選択されたことを社内関係者へ通知するメールを送信キューに積む"""
+        if not appointment_req.employee_email:
+            logger.warning("employee_email が無いため通知メールをスキップします")
+            return
+
+        subject = f"【{appointment_req.company}/{appointment_req.candidate_lastname} {appointment_req.candidate_firstname}様】日程確定"
+        body = (
+            f"{appointment_req.candidate_lastname}様<br><br>"
+            "以下の候補者から日程調整の回答がありましたが、提示された日程では面接の調整ができませんでした。<br><br>"
+            f"・氏名<br>{appointment_req.candidate_lastname} {appointment_req.candidate_firstname}<br><br>"
+            f"・所属<br>{appointment_req.company}<br><br>"
+            f"・メールアドレス<br>{appointment_req.candidate_email}<br><br>"
+            "候補者からは「可能な日程がない」との回答がありました。<br>"
+            "別の日程を提示するか、直接候補者と調整をお願いします。<br><br>"
+            "※このメールは自動送信されています。"
+        )
+        # appointment_req.employee_emailに加えて、定数のEMPLOYEE_EMAILSにも送信（同一内容は1通にまとめて送られる）
+        recipients = []
+        if appointment_req.employee_email:
+            recipients.append(appointment_req.employee_email)
+        # 定数からメールアドレスを追加
+        recipients.extend([*EMPLOYEE_EMAILS, config["SYSTEM_SENDER_EMAIL"]])
+
+        self.notification_dispatcher.enqueue(
+            [
+                Notification(
+                    sender_email=config["SYSTEM_SENDER_EMAIL"],
+                    recipient_email=recipient_email,
+                    subject=subject,
+                    body=body,
+                    dedupe_key=f"{dedupe_prefix}:{recipient_email}" if dedupe_prefix else None,
+                )
+                for recipient_email in dict.fromkeys(recipients)
+            ]
+        )
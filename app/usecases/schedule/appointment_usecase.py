@@ -1,14 +1,18 @@
+import asyncio
 import logging
-from fastapi import BackgroundTasks
-from typing import Any
 
-from app.schemas import AppointmentRequest, AppointmentResponse
-from app.infrastructure.graph_api import GraphAPIClient
-from app.infrastructure.az_cosmos import AzCosmosDBClient
-from app.utils.formatting import parse_candidate, format_candidate_date
+from app.schemas import AppointmentRequest, AppointmentResponse, OutboxMessage
 from app.config.config import get_config
-from app.infrastructure.appointment_repository import AppointmentRepository
-from app.constants import EMPLOYEE_EMAILS, INTERVIEW_STAGE_MAPPING
+from app.interfaces.appointment_repository_interface import AppointmentRepositoryInterface
+from app.interfaces.outbox_repository_interface import OutboxRepositoryInterface
+from app.usecases.schedule.appointment_side_effects_usecase import (
+    REGISTER_EVENT,
+    SEND_CONFIRMATION_EMAILS,
+    SEND_NO_AVAILABLE_SCHEDULE_EMAILS,
+    build_event_payload,
+)
+from app.workers.outbox_worker import OutboxWorker
+from app.utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -16,26 +20,44 @@ config = get_config()
 
 
 class AppointmentUsecase:
-    def __init__(self):
-        self.graph_api_client = GraphAPIClient()
-        self.az_cosmos_db_client = AzCosmosDBClient()
-        self.appointment_repository = AppointmentRepository()
-
+    def __init__(
+        self,
+        appointment_repository: AppointmentRepositoryInterface,
+        outbox_repository: OutboxRepositoryInterface,
+        outbox_worker: OutboxWorker,
+    ):
+        self.appointment_repository = appointment_repository
+        self.outbox_repository = outbox_repository
+        self.outbox_worker = outbox_worker
+
+    @traced("AppointmentUsecase.execute")
     async def execute(
         self,
-        background_tasks: BackgroundTasks,
         appointment_req: AppointmentRequest,
     ) -> AppointmentResponse:
-        """面接担当者の予定を登録し、確認メールを送信するユースケース"""
+        """面接予約をSQLに記録し、予定登録と確認メール送信をアウトボックスに積むユースケース
+
+        既定では SQL のコミット後すぐに応答し、予定登録・Cosmos DBの更新・メール送信は OutboxWorker が
+        非同期に実行する（会議URLは確認メールで送られ、meeting_urls は空になる）。
+        APPOINTMENT_EVENT_WAIT_SECONDS を指定した場合に限り、その秒数まで予定登録を待って会議URLを返す。
+        """
 
         try:
             if appointment_req.schedule_interview_datetime is None:
                 logger.info(
                     "候補として '可能な日程がない' が選択されました。予定は登録されません。"
                 )
-                background_tasks.add_task(
-                    self.send_no_available_schedule_emails, appointment_req
+                await asyncio.to_thread(
+                    self.outbox_repository.enqueue,
+                    [
+                        OutboxMessage(
+                            message_type=SEND_NO_AVAILABLE_SCHEDULE_EMAILS,
+                            aggregate_id=appointment_req.cosmos_db_id,
+                            payload=appointment_req.model_dump(),
+                        )
+                    ],
                 )
+                self.outbox_worker.notify()
                 return AppointmentResponse(
                     message="候補として '可能な日程がない' が選択されました。予定は登録されません。",
                     subjects=[],
@@ -43,26 +65,30 @@ class AppointmentUsecase:
                     employee_email=appointment_req.employee_email,
                 )
 
-            # Graph APIでイベント登録
-            created_events = self._register_events_to_graph_api(appointment_req)
-            if not created_events:
-                raise RuntimeError("Graph API がイベントを返しませんでした")
-            # Cosmos DBにイベントIDを保存
-            self._store_event_ids_to_cosmos(appointment_req, created_events)
+            # 日時の形式チェックを兼ねてイベント内容を構築
+            event_payload = build_event_payload(appointment_req)
 
-            self.appointment_repository.create_appointment(appointment_req)
-
-            meeting_urls: list[str | None] = [
-                (e.get("onlineMeeting") or {}).get("joinUrl") if e else None
-                for e in created_events
-            ]
-            background_tasks.add_task(
-                self.send_confirmation_emails, appointment_req, meeting_urls
+            # アポイントメントとイベント登録メッセージを同一トランザクションで保存
+            register_message = OutboxMessage(
+                message_type=REGISTER_EVENT,
+                aggregate_id=appointment_req.cosmos_db_id,
+                payload=appointment_req.model_dump(),
+            )
+            await asyncio.to_thread(
+                self.appointment_repository.create_appointment, appointment_req, [register_message]
             )
 
+            meeting_urls = await self._register_event_now(register_message.id)
+            if meeting_urls is None:
+                return AppointmentResponse(
+                    message="予定登録を受け付けました。会議URLと確認メールは別途送信されます。",
+                    subjects=[event_payload["subject"]],
+                    meeting_urls=[],
+                    employee_email=appointment_req.employee_email,
+                )
             return AppointmentResponse(
                 message="予定を登録しました。確認メールは別途送信されます。",
-                subjects=[e.get("subject") if e else None for e in created_events],
+                subjects=[event_payload["subject"]],
                 meeting_urls=meeting_urls,
                 employee_email=appointment_req.employee_email,
             )
@@ -71,185 +97,28 @@ class AppointmentUsecase:
             logger.exception("予定作成ユースケースエラー: %s", e)
             raise
 
-
-    def _register_events_to_graph_api(
-        self,
-        appointment_req: AppointmentRequest,
-    ) -> list[dict[str, Any]]:
-        """Graph APIにイベントを登録"""
-        if not appointment_req.schedule_interview_datetime:
-            raise ValueError("schedule_interview_datetime is required")
-
-        start_str, end_str, _ = parse_candidate(appointment_req.schedule_interview_datetime)
-        if not (start_str and end_str):
-            raise ValueError(f"Invalid datetime format. start={start_str}, end={end_str}")
-
-        interview_stage_jp = INTERVIEW_STAGE_MAPPING.get(
-            appointment_req.interview_stage, appointment_req.interview_stage
-        )
-
-        event_payload = {
-            "subject": f"#{appointment_req.candidate_id} (WEB)【{appointment_req.university}/{appointment_req.candidate_lastname} {appointment_req.candidate_firstname}様】 キャリア採用・{interview_stage_jp}",
-            "body": {
-                "contentType": "HTML",
-                "content": (
-                    "日程調整が完了しました。詳細は下記の通りです。<br><br>"
-                    f"・氏名<br>{appointment_req.candidate_lastname} {appointment_req.candidate_firstname}<br>"
-                    f"・所属<br>{appointment_req.company}<br>"
-                    f"・大学<br>{appointment_req.university}<br>"
-                    f"・メールアドレス<br>{appointment_req.candidate_email}<br>"
-                    f"・日程<br>{format_candidate_date(appointment_req.schedule_interview_datetime)}<br><br>"
-                ),
-            },
-            "start": {"dateTime": start_str, "timeZone": "Tokyo Standard Time"},
-            "end": {"dateTime": end_str, "timeZone": "Tokyo Standard Time"},
-            "isOnlineMeeting": True,
-            "onlineMeetingProvider": "teamsForBusiness",
-            "attendees": [
-                {
-                    "emailAddress": {
-                        "address": appointment_req.employee_email,
-                        "name": "面接担当者",
-                    },
-                    "type": "required",
-                },
-                {
-                    "emailAddress": {
-                        "address": appointment_req.candidate_email,
-                        "name": f"{appointment_req.candidate_lastname} {appointment_req.candidate_firstname}",
-                    },
-                    "type": "required",
-                },
-            ],
-        }
-
-        created_events: list[dict[str, Any]] = []
-
+    async def _register_event_now(self, message_id: str) -> list[str | None] | None:
+        """イベント登録メッセージをその場で処理し、会議URLを返す（待機の上限を超えた・失敗した場合は None）
+
+        待機しない設定（既定）ではワーカーに通知するだけで None を返す。待機をやめても処理は中断せず
+        （タスクはワーカーが保持する）、完了すれば後続メッセージが通常どおり積まれる。
+        """
+        wait_seconds = config["APPOINTMENT_EVENT_WAIT_SECONDS"]
+        if wait_seconds <= 0:
+            self.outbox_worker.notify()
+            return None
+        task = self.outbox_worker.process_in_background(message_id)
         try:
-            event_resp = self.graph_api_client.register_event(
-                config["SYSTEM_SENDER_EMAIL"], event_payload
-            )
-            if not event_resp or "id" not in event_resp:
-                raise RuntimeError(f"Graph API returned invalid response: {event_resp}")
-            created_events.append(event_resp)
-            logger.info(
-                "イベント登録成功: %s - %s",
-                config["SYSTEM_SENDER_EMAIL"],
-                event_resp["id"],
-            )
-        except Exception as e:
-            logger.exception("イベント登録失敗: %s", e)
-            raise
-
-        return created_events
-
-
-    def _store_event_ids_to_cosmos(
-        self, appointment_req: AppointmentRequest, created_events: list[dict[str, Any]]
-    ) -> None:
-        """Cosmos DBにイベントIDを保存"""
-        if not appointment_req.cosmos_db_id:
-            logger.warning("cosmos_db_id が無いため CosmosDB の更新をスキップします")
-            return
-
-        try:
-            event_ids = {appointment_req.employee_email: created_events[0]["id"]}
-            self.az_cosmos_db_client.update_form_data(
-                appointment_req.cosmos_db_id,
-                appointment_req.schedule_interview_datetime,
-                event_ids,
-            )
-        except Exception as e:
-            logger.exception("Cosmos DB 更新失敗: %s", e)
-
-
-    def send_confirmation_emails(
-        self,
-        appointment_req: AppointmentRequest,
-        meeting_urls: list[str | None],
-    ) -> None:
-        meeting_url = next((url for url in meeting_urls if url), None)
-        if meeting_url is None:
-            raise ValueError("会議 URL が取得できませんでした")
-
-        # 内部向け
-        internal_subject = f"【{appointment_req.company}/{appointment_req.candidate_lastname} {appointment_req.candidate_firstname}様】日程確定"
-        internal_body = (
-            "日程調整が完了しました。詳細は下記の通りです。<br><br>"
-            f"・氏名<br>{appointment_req.candidate_lastname} {appointment_req.candidate_firstname}<br>"
-            f"・所属<br>{appointment_req.company}<br>"
-            f"・メールアドレス<br>{appointment_req.candidate_email}<br>"
-            f"・日程<br>{format_candidate_date(appointment_req.schedule_interview_datetime)}<br>"
-            f'・会議URL<br><a href="{meeting_url}">{meeting_url}</a><br><br>'
-        )
-        # appointment_req.employee_emailに加えて、定数のEMPLOYEE_EMAILSもループで送信
-        recipients = []
-        if appointment_req.employee_email:
-            recipients.append(appointment_req.employee_email)
-        # 定数からメールアドレスを追加
-        recipients.extend([*EMPLOYEE_EMAILS, config["SYSTEM_SENDER_EMAIL"]])
-
-        for recipient_email in recipients:
-            self.graph_api_client.send_email(
-                config["SYSTEM_SENDER_EMAIL"],
-                recipient_email,
-                internal_subject,
-                internal_body,
-            )
-
-        # クライアント向け
-        client_subject = "日程確定（インテリジェントフォース）"
-        reschedule_link = f"{config['CLIENT_URL']}/reschedule?cosmosDbId={appointment_req.cosmos_db_id}"
-        client_body = (
-            f"{appointment_req.candidate_lastname}様<br><br>"
-            "この度は日程を調整いただきありがとうございます。<br>"
-            "ご登録いただいた内容、および当日の会議URLは下記の通りです。<br><br>"
-            f"・氏名<br>{appointment_req.candidate_lastname} {appointment_req.candidate_firstname}<br><br>"
-            f"・所属<br>{appointment_req.company}<br><br>"
-            f"・メールアドレス<br>{appointment_req.candidate_email}<br><br>"
-            f"・日程<br>{format_candidate_date(appointment_req.schedule_interview_datetime)}<br><br>"
-            f'・会議URL<br><a href="{meeting_url}">{meeting_url}</a><br><br>'
-            "※日程の再調整が必要な場合はこちらからご対応ください：<br>"
-            f'<a href="{reschedule_link}">{reschedule_link}</a><br>'
-            "再調整のご対応後は、元の予定は自動的に削除されます。<br><br>"
-            "以上になります。<br>"
-            "当日はどうぞよろしくお願いいたします。"
-        )
-        self.graph_api_client.send_email(
-            config["SYSTEM_SENDER_EMAIL"],
-            appointment_req.candidate_email,
-            client_subject,
-            client_body,
-        )
-
-
-    def send_no_available_schedule_emails(self, appointment_req: AppointmentRequest) -> None:
-        if not appointment_req.employee_email:
-            logger.warning("employee_email が無いため通知メールをスキップします")
-            return
-
-        subject = f"【{appointment_req.company}/{appointment_req.candidate_lastname} {appointment_req.candidate_firstname}様】日程確定"
-        body = (
-            f"{appointment_req.candidate_lastname}様<br><br>"
-            "以下の候補者から日程調整の回答がありましたが、提示された日程では面接の調整ができませんでした。<br><br>"
-            f"・氏名<br>{appointment_req.candidate_lastname} {appointment_req.candidate_firstname}<br><br>"
-            f"・所属<br>{appointment_req.company}<br><br>"
-            f"・メールアドレス<br>{appointment_req.candidate_email}<br><br>"
-            "候補者からは「可能な日程がない」との回答がありました。<br>"
-            "別の日程を提示するか、直接候補者と調整をお願いします。<br><br>"
-            "※このメールは自動送信されています。"
-        )
-        # appointment_req.employee_emailに加えて、定数のEMPLOYEE_EMAILSもループで送信
-        recipients = []
-        if appointment_req.employee_email:
-            recipients.append(appointment_req.employee_email)
-        # 定数からメールアドレスを追加
-        recipients.extend([*EMPLOYEE_EMAILS, config["SYSTEM_SENDER_EMAIL"]])
-
-        for recipient_email in recipients:
-            self.graph_api_client.send_email(
-                config["SYSTEM_SENDER_EMAIL"],
-                recipient_email,
-                subject,
-                body,
-            )
+            follow_ups = await asyncio.wait_for(asyncio.shield(task), wait_seconds)
+        except asyncio.TimeoutError:
+            logger.warning(f"イベント登録が {wait_seconds} 秒以内に終わらなかったため、受付のみ返します: {message_id}")
+            return None
+        if follow_ups is None:
+            # 他のワーカーが処理中、または失敗して再試行待ち
+            self.outbox_worker.notify()
+            return None
+        for follow_up in follow_ups:
+            if follow_up.message_type == SEND_CONFIRMATION_EMAILS:
+                return follow_up.payload["meeting_urls"]
+        # 予約が取り消されていた場合など、登録したイベントが残っていない
+        return []
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any
+
+from app.schemas import AvailabilityResponse, EmployeeEmail, ScheduleRequest
+from app.interfaces.graph_api_interface import GraphAPIClientInterface
+from app.usecases.schedule.availability_usecase import AvailabilityUsecase
+from app.utils.availability import resample_availability_view
+from app.utils.time import date_sequence
+from app.utils.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+# Graph API の availabilityViewInterval の下限（分）
+MIN_VIEW_INTERVAL_MINUTES = 5
+
+
+@dataclass(frozen=True)
+class ScheduleFetch:
+    """1人・1日分の getSchedule 呼び出し（複数のリクエストで共有する）"""
+
+    email: str
+    day: str
+    start_minutes: int
+    end_minutes: int
+    interval_minutes: int
+    time_zone: str
+
+    def to_schedule_request(self) -> ScheduleRequest:
+        return ScheduleRequest.model_construct(
+            start_date=self.day,
+            end_date=self.day,
+            start_time=_to_hhmm(self.start_minutes),
+            end_time=_to_hhmm(self.end_minutes),
+            selected_days=[],
+            duration_minutes=self.interval_minutes,
+            employee_emails=[EmployeeEmail.model_construct(email=self.email)],
+            required_participants=1,
+            time_zone=self.time_zone,
+        )
+
+
+@dataclass(frozen=True)
+class ViewSlice:
+    """共有した取得結果から、あるリクエストの表示を取り出す位置（offset 区間目から ratio 区間ずつ count 区間）"""
+
+    fetch: ScheduleFetch
+    offset: int
+    ratio: int
+    count: int
+
+
+def _to_minutes(hhmm: str) -> int:
+    hour, minute = map(int, hhmm.split(":"))
+    return hour * 60 + minute
+
+
+def _to_hhmm(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def plan_fetches(schedule_reqs: list[ScheduleRequest]) -> list[list[ViewSlice]]:
+    """各リクエストの（日付×担当者）ごとに、どの共有取得のどの位置を使うかを決める
+
+    同じ担当者・日付・タイムゾーンの取得は、全リクエストの時間帯を含む範囲を、
+    各リクエストの打合せ時間と開始時刻のずれの最大公約数の間隔で1回だけ取得する。
+    間隔が Graph API の下限を下回る場合は、時間帯と打合せ時間が同じリクエストどうしでのみ共有する。
+    戻り値はリクエストごとに、get_schedules と同じ順序（日付×担当者）の ViewSlice のリスト。
+    """
+    if any(r.duration_minutes <= 0 for r in schedule_reqs):
+        raise ValueError("duration_minutes は1以上を指定してください")
+    windows: list[tuple[int, int, int]] = [
+        (_to_minutes(r.start_time), _to_minutes(r.end_time), r.duration_minutes) for r in schedule_reqs
+    ]
+    groups: dict[tuple[str, str, str], set[int]] = defaultdict(set)
+    emails: dict[tuple[str, str, str], str] = {}
+    targets: list[list[tuple[str, str, str]]] = []
+    for i, schedule_req in enumerate(schedule_reqs):
+        request_targets = []
+        for day in date_sequence(schedule_req.start_date, schedule_req.end_date):
+            for employee in schedule_req.employee_emails:
+                key = (employee.email.lower(), day, schedule_req.time_zone)
+                groups[key].add(i)
+                emails.setdefault(key, employee.email)
+                request_targets.append(key)
+        targets.append(request_targets)
+
+    # 担当者・日付ごとに、リクエスト番号 → 取得位置
+    slices: dict[tuple[tuple[str, str, str], int], ViewSlice] = {}
+    for key, request_indexes in groups.items():
+        _, day, time_zone = key
+        email = emails[key]
+        window_start = min(windows[i][0] for i in request_indexes)
+        window_end = max(windows[i][1] for i in request_indexes)
+        interval = math.gcd(
+            *(windows[i][2] for i in request_indexes), *(windows[i][0] - window_start for i in request_indexes)
+        )
+        for i in request_indexes:
+            start, end, duration = windows[i]
+            count = max(0, (end - start) // duration)
+            if interval >= MIN_VIEW_INTERVAL_MINUTES:
+                fetch = ScheduleFetch(email, day, window_start, window_end, interval, time_zone)
+                slices[(key, i)] = ViewSlice(fetch, (start - window_start) // interval, duration // interval, count)
+            else:
+                fetch = ScheduleFetch(email, day, start, end, duration, time_zone)
+                slices[(key, i)] = ViewSlice(fetch, 0, 1, count)
+
+    return [[slices[(key, i)] for key in request_targets] for i, request_targets in enumerate(targets)]
+
+
+def _slice_schedule(schedule_info: dict[str, Any] | None, view_slice: ViewSlice) -> dict[str, Any] | None:
+    """共有した取得結果を、リクエスト自身の時間帯・打合せ時間で取得した場合と同じ形に変換する"""
+    values = (schedule_info or {}).get("value") or []
+    if not values:
+        return schedule_info
+    view = resample_availability_view(
+        values[0].get("availabilityView", ""), view_slice.offset, view_slice.ratio, view_slice.count
+    )
+    return {**schedule_info, "value": [{**values[0], "availabilityView": view}, *values[1:]]}
+
+
+class AvailabilityBatchUsecase(AvailabilityUsecase):
+    def __init__(self, graph_api_client: GraphAPIClientInterface, max_concurrency: int):
+        super().__init__(graph_api_client)
+        self.max_concurrency = max_concurrency
+
+    async def _fetch_all(self, fetches: set[ScheduleFetch]) -> dict[ScheduleFetch, dict[str, Any] | None]:
+        """共有取得を同時実行数を制限して並行に実行する（Graph API クライアントは同期のためスレッドで呼び出す）"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_one(fetch: ScheduleFetch) -> dict[str, Any] | None:
+            async with semaphore:
+                schedules = await asyncio.to_thread(self.graph_api_client.get_schedules, fetch.to_schedule_request())
+                return schedules[0] if schedules else None
+
+        ordered = list(fetches)
+        results = await asyncio.gather(*[fetch_one(fetch) for fetch in ordered])
+        return dict(zip(ordered, results))
+
+    @traced("AvailabilityBatchUsecase.execute")
+    async def execute(
+        self,
+        schedule_reqs: list[ScheduleRequest],
+        plan: list[list[ViewSlice]] | None = None,
+    ) -> list[AvailabilityResponse]:
+        """複数のリクエストの空き時間を、担当者・日付ごとの取得を共有して計算するユースケース
+
+        plan には事前に plan_fetches で求めたもの（受付制御のコスト計算に使ったもの）を渡せる。
+        """
+        plan = plan if plan is not None else plan_fetches(schedule_reqs)
+        fetches = {view_slice.fetch for slices in plan for view_slice in slices}
+        logger.info(
+            f"空き時間のバッチ取得開始: {len(schedule_reqs)}件 | getSchedule {len(fetches)}回"
+            f"（個別に取得した場合 {sum(len(slices) for slices in plan)}回）"
+        )
+        try:
+            results = await self._fetch_all(fetches)
+            responses = []
+            for schedule_req, slices in zip(schedule_reqs, plan):
+                schedule_info_list = [_slice_schedule(results[s.fetch], s) for s in slices]
+                common_times, slot_employees_map = self._calculate_common_times(schedule_req, schedule_info_list)
+                # 自前で計算した値のため再検証せずに構築する
+                responses.append(
+                    AvailabilityResponse.model_construct(
+                        common_availability=common_times, slot_employees_map=slot_employees_map
+                    )
+                )
+            return responses
+        except Exception:
+            logger.exception("空き時間のバッチ取得ユースケースに失敗しました")
+            raise
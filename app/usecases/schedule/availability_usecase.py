@@ -2,30 +2,36 @@ import logging
 from typing import Any
 
 from app.schemas import ScheduleRequest, AvailabilityResponse
-from app.infrastructure.graph_api import GraphAPIClient
+from app.interfaces.graph_api_interface import GraphAPIClientInterface
 from app.utils.time import time_string_to_float
 from app.utils.availability import aggregate_user_availability, calculate_common_availability
+from app.utils.log_payload import summarize
+from app.utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
 class AvailabilityUsecase:
-    def __init__(self):
-        self.graph_api_client = GraphAPIClient()
+    def __init__(self, graph_api_client: GraphAPIClientInterface):
+        self.graph_api_client = graph_api_client
 
+    @traced("AvailabilityUsecase.execute")
     async def execute(
         self,
         schedule_req: ScheduleRequest,
     ) -> AvailabilityResponse:
         """ユーザーの空き時間を計算して返すユースケース"""
-        logger.info(f"空き時間取得開始: {schedule_req}")
+        logger.info("空き時間取得開始: %s", summarize(schedule_req))
         try:
             schedule_info_list = self.graph_api_client.get_schedules(schedule_req)
-            logger.info(f"スケジュール情報: {schedule_info_list}")
+            logger.debug("スケジュール情報: %s", summarize(schedule_info_list))
             common_times, slot_employees_map = self._calculate_common_times(schedule_req, schedule_info_list)
-            logger.info(f"空き時間: {common_times}")
-            logger.info(f"各スロットの参加者リスト: {slot_employees_map}")
-            return AvailabilityResponse(common_availability=common_times, slot_employees_map=slot_employees_map)
+            logger.debug("空き時間: %s", summarize(common_times))
+            logger.debug("各スロットの参加者リスト: %s", summarize(slot_employees_map))
+            # 自前で計算した値のため再検証せずに構築する
+            return AvailabilityResponse.model_construct(
+                common_availability=common_times, slot_employees_map=slot_employees_map
+            )
         except Exception as e:
             logger.exception("空き時間取得ユースケースに失敗しました")
             raise
@@ -47,8 +53,8 @@ class AvailabilityUsecase:
             schedule_req.start_date,
             schedule_req.end_date,
         )
-        logger.info(f"date_user_slots: {date_user_slots}")
-        logger.info(f"date_list: {date_list}")
+        logger.debug("date_user_slots: %s", summarize(date_user_slots))
+        logger.debug("date_list: %s", summarize(date_list))
 
         common_availability, slot_employees_map = calculate_common_availability(
             date_user_slots,
@@ -1,31 +1,29 @@
 import logging
 
-from app.infrastructure.az_cosmos import AzCosmosDBClient
-from app.infrastructure.graph_api import GraphAPIClient
-from app.infrastructure.appointment_repository import AppointmentRepository
+from app.interfaces.az_cosmos_interface import AzCosmosDBClientInterface
 from app.schemas import FormData
 from app.utils.slot import split_candidates
 from app.config.config import get_config
+from app.utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 config = get_config()
 
 class GetRescheduleDataUsecase:
-    def __init__(self):
-        self.cosmos_db_client = AzCosmosDBClient()
-        self.graph_api_client = GraphAPIClient()
-        self.appointment_repository = AppointmentRepository()
+    def __init__(self, cosmos_db_client: AzCosmosDBClientInterface):
+        self.cosmos_db_client = cosmos_db_client
 
-    async def execute(self, cosmos_db_id: str) -> FormData:
-        """リスケジュール用のフォームデータを取得するユースケース"""
+    @traced("GetRescheduleDataUsecase.execute")
+    async def execute(self, cosmos_db_id: str) -> tuple[FormData, str]:
+        """リスケジュール用のフォームデータを、バージョン（Cosmos DB の _etag）とともに返すユースケース"""
         try:
             form_data = self.cosmos_db_client.get_form_data(cosmos_db_id)
             form_data["schedule_interview_datetimes"] = split_candidates(
                 form_data["schedule_interview_datetimes"], form_data["duration_minutes"]
             )
 
-            return FormData(**form_data)
+            return FormData.from_trusted(form_data), form_data.get("_etag", "")
 
         except Exception as e:
             logger.error(f"リスケジュール用フォームデータが見つかりません: {e}")
@@ -1,13 +1,18 @@
+import asyncio
 import logging
+from functools import partial
+from typing import Any, Callable
 
-from app.infrastructure.az_cosmos import AzCosmosDBClient
-from app.infrastructure.graph_api import GraphAPIClient
-from app.infrastructure.appointment_repository import AppointmentRepository
+from app.interfaces.az_cosmos_interface import AzCosmosDBClientInterface
+from app.interfaces.graph_api_interface import GraphAPIClientInterface
+from app.interfaces.appointment_repository_interface import AppointmentRepositoryInterface
 from app.utils.formatting import parse_candidate
 from app.config.config import get_config
-from app.schemas import RescheduleRequest
+from app.schemas import Notification, RescheduleRequest
 from app.utils.formatting import format_candidate_date
 from app.constants import EMPLOYEE_EMAILS
+from app.workers.notification_dispatcher import NotificationDispatcher
+from app.utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -15,70 +20,145 @@ config = get_config()
 
 
 class RescheduleUsecase:
-    def __init__(self):
-        self.cosmos_db_client = AzCosmosDBClient()
-        self.graph_api_client = GraphAPIClient()
-        self.appointment_repository = AppointmentRepository()
+    def __init__(
+        self,
+        cosmos_db_client: AzCosmosDBClientInterface,
+        graph_api_client: GraphAPIClientInterface,
+        appointment_repository: AppointmentRepositoryInterface,
+        notification_dispatcher: NotificationDispatcher,
+    ):
+        self.cosmos_db_client = cosmos_db_client
+        self.graph_api_client = graph_api_client
+        self.appointment_repository = appointment_repository
+        self.notification_dispatcher = notification_dispatcher
 
+    async def _run_concurrently(self, steps: dict[str, Callable[[], Any]]) -> dict[str, Exception]:
+        """互いに依存しない同期処理をスレッドで並行に実行し、失敗した処理の名前と例外を返す"""
+        names = list(steps)
+        results = await asyncio.gather(*[asyncio.to_thread(steps[name]) for name in names], return_exceptions=True)
+        failures = {}
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                failures[name] = result
+        return failures
+
+    @traced("RescheduleUsecase.execute")
     async def execute(self, reschedule_req: RescheduleRequest) -> None:
-        """リスケジュール処理を行うユースケース"""
+        """リスケジュール処理を行うユースケース
+
+        フォームとアポイントメントを並行に読み込んだ後、DBの更新・予定時刻の更新・フォームの書き込み（1回）を
+        並行に行う。いずれかが失敗した場合は、成功した処理を元の日時に戻してからエラーを送出する。
+        メールは送信キューに追加し、送信はバックグラウンドで行う。
+        メールには宛先ごとに、変更前のフォームのバージョン（_etag）を含む重複防止キーを付け、
+        同じ変更を重ねて実行した場合（二重送信など）に同じメールを二度送らない。
+        """
+        cosmos_db_id = reschedule_req.cosmos_db_id
         try:
-            form_data = self.cosmos_db_client.get_form_data(reschedule_req.cosmos_db_id)
+            form_data, appointment_data = await asyncio.gather(
+                # 読み込んだフォームを書き換えて保存するため、キャッシュを使わない
+                asyncio.to_thread(self.cosmos_db_client.get_form_data, cosmos_db_id, use_cache=False),
+                asyncio.to_thread(self.appointment_repository.get_appointment_by_cosmos_db_id, cosmos_db_id),
+            )
+            previous_datetime = form_data.get("schedule_interview_datetime")
+            dedupe_prefix = f"reschedule:{cosmos_db_id}:{form_data.get('_etag') or previous_datetime}"
             # 可能な日程がない場合の処理
             if reschedule_req.schedule_interview_datetime is None:
                 logger.info("候補として '可能な日程がない' が選択されました。")
-                # Outlookカレンダーのイベントを削除
-                if "event_ids" in form_data:
-                    for user_email, event_id in form_data["event_ids"].items():
-                        try:
-                            self.graph_api_client.delete_event(user_email, event_id)
-                            logger.info(f"Outlookイベント削除成功: {user_email} - {event_id}")
-                        except Exception as e:
-                            logger.error(f"Outlookイベント削除失敗: {user_email} - {event_id}: {e}")
-                # DBのアポイントメントレコードを削除
-                self.appointment_repository.delete_appointment(reschedule_req.cosmos_db_id)
-                logger.info(f"DBレコード削除成功: {reschedule_req.cosmos_db_id}")
-                # CosmosDBのフォームデータを削除
-                self.cosmos_db_client.delete_form_data(reschedule_req.cosmos_db_id)
-                logger.info(f"CosmosDBレコード削除成功: {reschedule_req.cosmos_db_id}")
-                
-                self._send_no_available_reschedule_emails(reschedule_req.cosmos_db_id)
+                await self._cancel(cosmos_db_id, form_data)
+                await asyncio.to_thread(
+                    self._send_no_available_reschedule_emails, cosmos_db_id, appointment_data, dedupe_prefix
+                )
                 return
 
-            # CosmosDBのschedule_interview_datetimeを更新
-            form_data["schedule_interview_datetime"] = reschedule_req.schedule_interview_datetime
-            self.cosmos_db_client.container.replace_item(item=form_data["id"], body=form_data)
-            logger.info(f"CosmosDBの日時更新成功: {reschedule_req.cosmos_db_id}")
-            # DBのschedule_interview_datetimeを更新
-            self.appointment_repository.update_schedule_interview_datetime(reschedule_req.cosmos_db_id, reschedule_req.schedule_interview_datetime)
-            logger.info(f"DBの日時更新成功: {reschedule_req.cosmos_db_id}")
-            # Outlookカレンダーのイベント時刻を更新
-            start_str, end_str, _ = parse_candidate(reschedule_req.schedule_interview_datetime)
-            
-            for user_email, event_id in form_data["event_ids"].items():
-                try:
-                    self.graph_api_client.update_event_time(user_email, event_id, start_str, end_str)
-                    logger.info(f"予定時刻更新成功: {user_email} - {event_id}")
-                except Exception as e:
-                    logger.error(f"予定時刻更新失敗: {user_email} - {event_id}: {e}")
-                    raise
-
-            # リスケジュール完了メールを送信
-            self._send_reschedule_emails(reschedule_req.cosmos_db_id, reschedule_req.schedule_interview_datetime)
-            # フォームのリセット
-            form_data["is_confirmed"] = False
-            self.cosmos_db_client.container.replace_item(item=form_data["id"], body=form_data)
+            new_datetime = reschedule_req.schedule_interview_datetime
+            # 書き込みを始める前に形式を検証する
+            start_str, end_str, _ = parse_candidate(new_datetime)
+            event_ids = form_data.get("event_ids") or {}
+
+            # フォームは最終的な内容（新しい日時・未確定）で1回だけ書き込む
+            updated_form = {**form_data, "schedule_interview_datetime": new_datetime, "is_confirmed": False}
+            steps: dict[str, Callable[[], Any]] = {
+                "cosmos": partial(self.cosmos_db_client.replace_form_data, updated_form),
+                "sql": partial(self.appointment_repository.update_schedule_interview_datetime, cosmos_db_id, new_datetime),
+            }
+            for user_email, event_id in event_ids.items():
+                steps[f"event:{user_email}"] = partial(
+                    self.graph_api_client.update_event_time, user_email, event_id, start_str, end_str
+                )
+            failures = await self._run_concurrently(steps)
+            if failures:
+                for name, error in failures.items():
+                    logger.error(f"リスケジュールの更新失敗: {cosmos_db_id} - {name}: {error}")
+                await self._compensate(
+                    cosmos_db_id, form_data, previous_datetime, [name for name in steps if name not in failures]
+                )
+                raise next(iter(failures.values()))
+            logger.info(f"リスケジュールの更新成功: {cosmos_db_id} | 予定 {len(event_ids)}件")
+
+            # リスケジュール完了メールを送信キューに追加
+            await asyncio.to_thread(
+                self._send_reschedule_emails, cosmos_db_id, appointment_data, new_datetime, dedupe_prefix
+            )
 
         except Exception as e:
             logger.error(f"リスケジュールユースケースエラー: {e}")
             raise
 
+    async def _compensate(
+        self,
+        cosmos_db_id: str,
+        form_data: dict[str, Any],
+        previous_datetime: str | None,
+        succeeded: list[str],
+    ) -> None:
+        """成功した更新を元に戻す（失敗は記録のみ。元の日時が不明な場合、DBと予定は戻さない）"""
+        event_ids = form_data.get("event_ids") or {}
+        previous = parse_candidate(previous_datetime) if previous_datetime else None
+        steps: dict[str, Callable[[], Any]] = {}
+        for name in succeeded:
+            if name == "cosmos":
+                steps[name] = partial(self.cosmos_db_client.replace_form_data, form_data)
+            elif name == "sql" and previous_datetime:
+                steps[name] = partial(
+                    self.appointment_repository.update_schedule_interview_datetime, cosmos_db_id, previous_datetime
+                )
+            elif name.startswith("event:") and previous:
+                user_email = name[len("event:") :]
+                steps[name] = partial(
+                    self.graph_api_client.update_event_time, user_email, event_ids[user_email], previous[0], previous[1]
+                )
+        failures = await self._run_concurrently(steps)
+        for name, error in failures.items():
+            logger.error(f"リスケジュールの取り消し失敗（手動での確認が必要）: {cosmos_db_id} - {name}: {error}")
+        logger.warning(f"リスケジュールの更新を取り消しました: {cosmos_db_id} | {len(steps) - len(failures)}/{len(steps)}件")
 
-    def _send_reschedule_emails(self, cosmos_db_id: str, schedule_interview_datetime: str | None) -> None:
-        """リスケジュール完了メールを送信"""
-        # DBからアポイントメントデータを取得
-        appointment_data = self.appointment_repository.get_appointment_by_cosmos_db_id(cosmos_db_id)
-        
+    async def _cancel(self, cosmos_db_id: str, form_data: dict[str, Any]) -> None:
+        """予定・DBレコード・フォームを並行に削除する（予定の削除失敗は記録のみ）"""
+        steps: dict[str, Callable[[], Any]] = {
+            "sql": partial(self.appointment_repository.delete_appointment, cosmos_db_id),
+            "cosmos": partial(self.cosmos_db_client.delete_form_data, cosmos_db_id),
+        }
+        event_ids = form_data.get("event_ids") or {}
+        for user_email, event_id in event_ids.items():
+            steps[f"event:{user_email}"] = partial(self.graph_api_client.delete_event, user_email, event_id)
+        failures = await self._run_concurrently(steps)
+        for name, error in failures.items():
+            logger.error(f"リスケジュールの削除失敗: {cosmos_db_id} - {name}: {error}")
+        logger.info(f"予定・DBレコード・CosmosDBレコードを削除しました: {cosmos_db_id} | 予定 {len(event_ids)}件")
+        for name in ("sql", "cosmos"):
+            if name in failures:
+                raise failures[name]
+
+    def _send_reschedule_emails(
+        self,
+        cosmos_db_id: str,
+        appointment_data: Any,
+        schedule_interview_datetime: str | None,
+        dedupe_prefix: str,
+    ) -> None:
+        """リスケジュール完了メールを宛先ごとに送信キューに追加する"""
         if not appointment_data:
             logger.error(f"アポイントメントデータが見つかりません: {cosmos_db_id}")
             return
@@ -99,19 +179,18 @@ class RescheduleUsecase:
         if appointment_data.employee_email:
             recipients.append(appointment_data.employee_email)
         # recipients.extend(EMPLOYEE_EMAILS)
-        recipients = list(set(recipients))  # 重複を除去
-        
-        for recipient_email in recipients:
-            try:
-                self.graph_api_client.send_email(
-                    config["SYSTEM_SENDER_EMAIL"],
-                    recipient_email,
-                    internal_subject,
-                    internal_body,
-                )
-                logger.info(f"社内向けリスケジュールメール送信成功: {recipient_email}")
-            except Exception as e:
-                logger.error(f"社内向けリスケジュールメール送信失敗: {recipient_email}: {e}")
+        recipients = list(dict.fromkeys(recipients))  # 重複を除去
+
+        notifications = [
+            Notification(
+                sender_email=config["SYSTEM_SENDER_EMAIL"],
+                recipient_email=recipient_email,
+                subject=internal_subject,
+                body=internal_body,
+                dedupe_key=f"{dedupe_prefix}:internal:{recipient_email}",
+            )
+            for recipient_email in recipients
+        ]
 
         # クライアント向けメール
         client_subject = "日程変更完了（インテリジェントフォース）"
@@ -130,24 +209,25 @@ class RescheduleUsecase:
             "以上になります。<br>"
             "変更後の日程にてお待ちしております。"
         )
-        
-        try:
-            self.graph_api_client.send_email(
-                config["SYSTEM_SENDER_EMAIL"],
-                appointment_data.candidate_email,
-                client_subject,
-                client_body,
+        notifications.append(
+            Notification(
+                sender_email=config["SYSTEM_SENDER_EMAIL"],
+                recipient_email=appointment_data.candidate_email,
+                subject=client_subject,
+                body=client_body,
+                dedupe_key=f"{dedupe_prefix}:client:{appointment_data.candidate_email}",
             )
-            logger.info(f"クライアント向けリスケジュールメール送信成功: {appointment_data.candidate_email}")
+        )
+
+        try:
+            self.notification_dispatcher.enqueue(notifications)
+            logger.info(f"リスケジュールメールを送信キューに追加しました: {cosmos_db_id}")
         except Exception as e:
-            logger.error(f"クライアント向けリスケジュールメール送信失敗: {appointment_data.candidate_email}: {e}")
+            logger.error(f"リスケジュールメールの送信キュー追加失敗: {cosmos_db_id}: {e}")
 
 
-    def _send_no_available_reschedule_emails(self, cosmos_db_id: str) -> None:
-        """可能な日程がない場合の社内向けメール送信"""
-        # DBからアポイントメントデータを取得
-        appointment_data = self.appointment_repository.get_appointment_by_cosmos_db_id(cosmos_db_id)
-        
+    def _send_no_available_reschedule_emails(self, cosmos_db_id: str, appointment_data: Any, dedupe_prefix: str) -> None:
+        """可能な日程がない場合の社内向けメールを宛先ごとに送信キューに追加する（appointment_data は削除前に読み込んだもの）"""
         if not appointment_data:
             logger.error(f"予約データが見つかりません: {cosmos_db_id}")
             return
@@ -173,15 +253,20 @@ class RescheduleUsecase:
         if appointment_data.employee_email:
             recipients.append(appointment_data.employee_email)
         recipients.extend([*EMPLOYEE_EMAILS, config["SYSTEM_SENDER_EMAIL"]])
-        
-        for recipient_email in recipients:
-            try:
-                self.graph_api_client.send_email(
-                    config["SYSTEM_SENDER_EMAIL"],
-                    recipient_email,
-                    subject,
-                    body,
-                )
-                logger.info(f"再調整不可メール送信成功: {recipient_email}")
-            except Exception as e:
-                logger.error(f"再調整不可メール送信失敗: {recipient_email}: {e}")
+
+        try:
+            self.notification_dispatcher.enqueue(
+                [
+                    Notification(
+                        sender_email=config["SYSTEM_SENDER_EMAIL"],
+                        recipient_email=recipient_email,
+                        subject=subject,
+                        body=body,
+                        dedupe_key=f"{dedupe_prefix}:none:{recipient_email}",
+                    )
+                    for recipient_email in dict.fromkeys(recipients)
+                ]
+            )
+            logger.info(f"再調整不可メールを送信キューに追加しました: {cosmos_db_id}")
+        except Exception as e:
+            logger.error(f"再調整不可メールの送信キュー追加失敗: {cosmos_db_id}: {e}")
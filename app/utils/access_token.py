@@ -12,6 +12,13 @@ def get_access_token() -> str:
     """
     Microsoft Graph API にアクセスするための認証トークンを取得
     """
+    return acquire_access_token()[0]
+
+
+def acquire_access_token() -> tuple[str, float]:
+    """
+    Microsoft Graph API の認証トークンと、その有効期間（秒）を取得
+    """
     max_retries = 3
     retry_count = 0
 
@@ -32,7 +39,7 @@ def get_access_token() -> str:
                 result = app.acquire_token_for_client(scopes=scope)
 
             if "access_token" in result:
-                return result["access_token"]
+                return result["access_token"], float(result.get("expires_in", 0))
             else:
                 logger.error(
                     f"トークン取得に失敗しました: {result.get('error_description')}"
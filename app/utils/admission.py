@@ -0,0 +1,193 @@
+import asyncio
+import contextvars
+import logging
+import math
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Any, AsyncIterator
+
+from fastapi import HTTPException, Request
+
+from app.config.config import get_config
+from app.schemas import ScheduleRequest
+from app.utils.metrics import GRAPH_ADMISSION_DECISIONS, GRAPH_ADMISSION_WAIT
+from app.utils.rate_limit import AsyncTokenBucket
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+# 送信元ごとのバケットをこの数まで保持する（超えた場合は最も長く使われていないものから捨てる）
+_MAX_TRACKED_CLIENTS = 10000
+
+# metered の中で実際に Graph API を呼び出した回数（ミラーやキャッシュから返した分は数えない）
+_graph_calls: contextvars.ContextVar[list[int] | None] = contextvars.ContextVar("graph_calls", default=None)
+
+
+def record_graph_call() -> None:
+    """Graph API を1回呼び出したことを記録する（GraphAPIClient から呼び出す）"""
+    calls = _graph_calls.get()
+    if calls is not None:
+        calls[0] += 1
+
+
+def estimate_graph_cost(schedule_req: ScheduleRequest) -> int:
+    """空き時間の取得で発生する Graph API の呼び出し回数（getSchedule は担当者ごと・日ごとに1回）"""
+    try:
+        days = (date.fromisoformat(schedule_req.end_date) - date.fromisoformat(schedule_req.start_date)).days + 1
+    except ValueError:
+        # 日付が不正な場合は取得処理側でエラーになるため、最小のコストとして扱う
+        days = 1
+    return len(schedule_req.employee_emails) * max(days, 0)
+
+
+def get_client_id(request: Request, trusted_proxy_hops: int | None = None) -> str:
+    """送信元の識別子
+
+    X-Forwarded-For の先頭はクライアントが自由に指定できるため使わない。信頼するリバースプロキシ
+    （Container Apps のイングレスなど）の数 TRUSTED_PROXY_HOPS だけ末尾から数えた、プロキシが追加した値を使う。
+    ヘッダーがない・短い場合は接続元のアドレスを使う。
+    """
+    hops = config["TRUSTED_PROXY_HOPS"] if trusted_proxy_hops is None else trusted_proxy_hops
+    if hops > 0:
+        forwarded_for = [hop.strip() for hop in request.headers.get("X-Forwarded-For", "").split(",") if hop.strip()]
+        if len(forwarded_for) >= hops:
+            return forwarded_for[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+class GraphAdmissionController:
+    """Graph API を呼び出すリクエストをコスト（呼び出し回数）に応じて受け付けるか判定する
+
+    全体のトークンバケットと送信元ごとのトークンバケットの両方に枠がある場合に受け付け、
+    枠が空くまでの時間が max_wait_seconds 以内なら待ってから、超える場合は 429 を返す。
+    全体の容量のうち reserve_ratio の割合は候補者向けの画面（admit_reserved）のために残しておき、
+    担当者の大きな検索が続いても候補者のフォーム表示が Graph API の制限に巻き込まれないようにする。
+    バケットの容量を超えるコストの検索は容量分として扱い、バケットが満杯になるまで待ってから受け付ける。
+    metered で受け付けた場合は、ミラーやキャッシュから返して Graph API を呼び出さなかった分を処理後に戻す。
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: float,
+        reserve_ratio: float,
+        client_rate_per_second: float,
+        client_burst: float,
+        max_wait_seconds: float,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.max_wait_seconds = max_wait_seconds
+        self.client_rate_per_second = client_rate_per_second
+        self.client_burst = client_burst
+        self._global = AsyncTokenBucket(rate_per_second, burst)
+        self._reserve = burst * reserve_ratio
+        self._clients: OrderedDict[str, AsyncTokenBucket] = OrderedDict()
+        self._decisions: Counter[tuple[str, str]] = Counter()
+        self._refunded = 0.0
+
+    def _client_bucket(self, client_id: str) -> AsyncTokenBucket:
+        bucket = self._clients.get(client_id)
+        if bucket is None:
+            while len(self._clients) >= _MAX_TRACKED_CLIENTS:
+                self._clients.popitem(last=False)
+            bucket = self._clients[client_id] = AsyncTokenBucket(
+                self.client_rate_per_second, self.client_burst
+            )
+        else:
+            self._clients.move_to_end(client_id)
+        return bucket
+
+    def _record(self, priority: str, result: str, waited: float) -> None:
+        self._decisions[(priority, result)] += 1
+        GRAPH_ADMISSION_DECISIONS.labels(priority, result).inc()
+        if result != "rejected":
+            GRAPH_ADMISSION_WAIT.labels(priority).observe(waited)
+
+    async def admit(self, client_id: str, cost: float) -> float:
+        """担当者向けの検索を受け付け、消費したトークン数を返す。枠が空かない場合は HTTPException(429) を送出する"""
+        if not self.enabled or cost <= 0:
+            return 0.0
+        # 容量を超えるコストは満杯になれば受け付けられるよう容量分に切り詰める
+        cost = min(cost, self.client_burst, self._global.capacity - self._reserve)
+
+        client = self._client_bucket(client_id)
+        waited = 0.0
+        while True:
+            wait = max(client.wait_time(cost), self._global.wait_time(cost, self._reserve))
+            if wait == 0:
+                break
+            if waited + wait > self.max_wait_seconds:
+                self._record("standard", "rejected", waited)
+                logger.warning(f"Graph API の呼び出し枠が不足しているため拒否しました: client={client_id} cost={cost}")
+                raise HTTPException(
+                    status_code=429,
+                    detail="Graph API の呼び出しが集中しています。時間をおいて再試行してください",
+                    headers={"Retry-After": str(math.ceil(wait))},
+                )
+            await asyncio.sleep(wait)
+            waited += wait
+        # 待機後の判定からここまでに await を挟まないため、他のリクエストと枠を取り合うことはない
+        client.take(cost)
+        self._global.take(cost)
+        self._record("standard", "queued" if waited else "admitted", waited)
+        return cost
+
+    async def admit_reserved(self, cost: float) -> float:
+        """候補者向けの処理を受け付け、消費したトークン数を返す。確保された容量も使い、待機の上限を超えても拒否はしない"""
+        if not self.enabled or cost <= 0:
+            return 0.0
+        cost = min(cost, self._global.capacity)
+        needed = cost
+        waited = 0.0
+        while True:
+            wait = self._global.wait_time(needed)
+            if wait == 0 or waited + wait > self.max_wait_seconds:
+                break
+            await asyncio.sleep(wait)
+            waited += wait
+        self._global.take(cost)
+        if wait > 0:
+            logger.warning(f"Graph API の呼び出し枠を超えて候補者向けの処理を実行します: cost={cost}")
+            self._record("reserved", "overflow", waited)
+        else:
+            self._record("reserved", "queued" if waited else "admitted", waited)
+        return cost
+
+    @asynccontextmanager
+    async def metered(self, client_id: str | None, cost: float) -> AsyncIterator[None]:
+        """cost（担当者数×日数）で受け付けて処理を実行し、実際に Graph API を呼び出さなかった分を戻す
+
+        client_id が None の場合は候補者向けの処理（admit_reserved）として受け付ける。
+        呼び出し回数は処理中に record_graph_call で数える（asyncio.to_thread で実行した処理も含む）。
+        """
+        charged = await (self.admit(client_id, cost) if client_id is not None else self.admit_reserved(cost))
+        calls = [0]
+        token = _graph_calls.set(calls)
+        try:
+            yield
+        finally:
+            _graph_calls.reset(token)
+            self._refund(client_id, charged - min(calls[0], charged))
+
+    def _refund(self, client_id: str | None, tokens: float) -> None:
+        if tokens <= 0:
+            return
+        self._global.give(tokens)
+        if client_id is not None and client_id in self._clients:
+            self._clients[client_id].give(tokens)
+        self._refunded += tokens
+
+    def stats(self) -> dict[str, Any]:
+        """受付判定の件数と、現在の全体の残り枠を返す"""
+        return {
+            "enabled": self.enabled,
+            "available_tokens": round(self._global.available(), 1),
+            "capacity": self._global.capacity,
+            "reserved_tokens": self._reserve,
+            "tracked_clients": len(self._clients),
+            "refunded_tokens": round(self._refunded, 1),
+            "decisions": {f"{priority}.{result}": n for (priority, result), n in sorted(self._decisions.items())},
+        }
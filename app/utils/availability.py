@@ -1,3 +1,4 @@
+import math
 from collections import defaultdict
 from typing import Any
 
@@ -160,3 +161,28 @@ def calculate_common_availability(
             key = f"{start_iso}/{end_iso}"
             slot_employees_map[key] = employees
     return common_availability, slot_employees_map
+
+def resample_availability_view(view: str, offset: int, ratio: int, count: int) -> str:
+    """細かい間隔で取得した availabilityView を、offset 区間目から ratio 区間ずつまとめた count 区間の表示に変換する。
+    まとめた区間がすべて空き('0')の場合のみ空きとし、それ以外は含まれる状態の最大値にする。"""
+    merged: list[str] = []
+    for i in range(count):
+        chunk = view[offset + i * ratio : offset + (i + 1) * ratio]
+        if len(chunk) < ratio:
+            break
+        merged.append(max(chunk))
+    return "".join(merged)
+
+def build_availability_view(
+    intervals: list[tuple[float, float, int]], start: float, interval_seconds: float, count: int
+) -> str:
+    """予定の区間（開始・終了の UNIX 時刻と状態 1〜4）から、start から interval_seconds ずつ count 区間の
+    availabilityView を組み立てる。各区間は重なる予定の状態の最大値（予定がなければ空き '0'）にする。"""
+    view = [0] * count
+    for busy_start, busy_end, status in intervals:
+        first = max(0, int((busy_start - start) // interval_seconds))
+        last = min(count, math.ceil((busy_end - start) / interval_seconds))
+        for i in range(first, last):
+            if status > view[i]:
+                view[i] = status
+    return "".join(map(str, view))
@@ -0,0 +1,22 @@
+import base64
+import json
+
+# キーセットページネーション用カーソルのエンコード・デコード
+
+
+def encode_cursor(key: tuple[str | None, int]) -> str:
+    """ソートキー (面接日時, id) のタプルをURLセーフな不透明文字列に変換する。"""
+    raw = json.dumps(list(key), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    """encode_cursor で生成したカーソル文字列をソートキーのタプルに戻す。"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        first, second = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if isinstance(second, bool) or not isinstance(second, int):
+            raise TypeError(f"id must be int: {second!r}")
+        return str(first or ""), second
+    except Exception as e:
+        raise ValueError("カーソルの形式が不正です") from e
@@ -0,0 +1,34 @@
+import hashlib
+from typing import Any
+
+import orjson
+from fastapi import Request
+
+# 条件付きGET（ETag / If-None-Match）の補助関数
+
+
+def digest(value: Any) -> str:
+    """JSONに変換できる値の内容ダイジェスト（キー順に依存しない）"""
+    return hashlib.sha256(orjson.dumps(value, option=orjson.OPT_SORT_KEYS)).hexdigest()[:32]
+
+
+def make_etag(*parts: str) -> str:
+    """バージョンを構成する値から強いETagを作る"""
+    return '"{}"'.format(hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:32])
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match がETagと一致するか（弱い比較。"*" は常に一致）"""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    candidates = {_strip_encoding(c.strip().removeprefix("W/")) for c in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _strip_encoding(etag: str) -> str:
+    """圧縮ミドルウェアが付与したエンコーディングの接尾辞を取り除く"""
+    for suffix in ('-gzip"', '-br"'):
+        if etag.endswith(suffix):
+            return etag[: -len(suffix)] + '"'
+    return etag
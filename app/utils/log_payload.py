@@ -0,0 +1,32 @@
+from typing import Any
+
+from app.config.config import get_config
+
+config = get_config()
+
+# ログ出力用のペイロード要約（%s で出力されるまで文字列化しない）
+
+
+class LazySummary:
+    __slots__ = ("value", "max_chars")
+
+    def __init__(self, value: Any, max_chars: int):
+        self.value = value
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        text = self.value if isinstance(self.value, str) else repr(self.value)
+        if len(text) > self.max_chars:
+            text = f"{text[: self.max_chars]}...({len(text) - self.max_chars} chars truncated)"
+        if isinstance(self.value, (list, tuple, set, dict)):
+            return f"<{type(self.value).__name__} len={len(self.value)}> {text}"
+        return text
+
+
+def summarize(value: Any, max_chars: int | None = None) -> LazySummary:
+    """大きなペイロードを切り詰めてログに出すための要約を返す
+
+    logger.debug("スケジュール情報: %s", summarize(schedule_info_list)) のように使う。
+    ログレベルが無効な場合は文字列化されない。
+    """
+    return LazySummary(value, max_chars or config["LOG_PAYLOAD_MAX_CHARS"])
@@ -0,0 +1,125 @@
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.tracing import Span, end_span, span, start_span
+
+# Prometheus 形式で公開するメトリクスの定義と計測ヘルパー
+# ラベルの値は必ず有限集合（ルートのテンプレート・操作名など）にすること
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTPリクエストの処理時間（レスポンスヘッダ送信まで）",
+    ["method", "route", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "処理中のHTTPリクエスト数",
+)
+DEPENDENCY_CALL_DURATION = Histogram(
+    "dependency_call_duration_seconds",
+    "外部依存（Graph API / Cosmos DB / SQL）の呼び出し時間",
+    ["dependency", "operation"],
+    buckets=_LATENCY_BUCKETS,
+)
+DEPENDENCY_CALL_ERRORS = Counter(
+    "dependency_call_errors_total",
+    "外部依存の呼び出しで発生した例外の数",
+    ["dependency", "operation"],
+)
+COSMOS_REQUEST_CHARGE = Counter(
+    "cosmos_request_charge_total",
+    "Cosmos DB の消費RU（x-ms-request-charge の合計）",
+    ["operation"],
+)
+APPOINTMENT_STEP_DURATION = Histogram(
+    "appointment_step_duration_seconds",
+    "予定登録処理（アウトボックス）の各ステップの所要時間（outcome は ok / error）",
+    ["step", "outcome"],
+    buckets=_LATENCY_BUCKETS,
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "イベントループの遅延",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+EVENT_LOOP_STALLS = Counter(
+    "event_loop_stalls_total",
+    "イベントループの遅延がしきい値を超えた回数",
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "キャッシュの参照回数（result は hit / stale / miss）",
+    ["cache", "result"],
+)
+
+GRAPH_ADMISSION_DECISIONS = Counter(
+    "graph_admission_decisions_total",
+    "Graph API を呼び出すリクエストの受付判定（priority は reserved / standard、result は admitted / queued / rejected / overflow）",
+    ["priority", "result"],
+)
+GRAPH_ADMISSION_WAIT = Histogram(
+    "graph_admission_wait_seconds",
+    "Graph API の呼び出し枠を待った時間",
+    ["priority"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+_SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "MERGE"}
+
+
+@contextmanager
+def track_dependency(dependency: str, operation: str, **attributes) -> Iterator[Span | None]:
+    """外部依存の呼び出し時間と例外数を記録し、トレース中であれば子スパンを作成する"""
+    started = time.perf_counter()
+    with span(f"{dependency}.{operation}", **attributes) as s:
+        try:
+            yield s
+        except BaseException:
+            DEPENDENCY_CALL_ERRORS.labels(dependency, operation).inc()
+            raise
+        finally:
+            DEPENDENCY_CALL_DURATION.labels(dependency, operation).observe(time.perf_counter() - started)
+
+
+def _sql_operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in _SQL_OPERATIONS else "OTHER"
+
+
+def instrument_engine(engine: Engine) -> None:
+    """SQLAlchemy エンジンの全クエリについて実行時間と例外数を記録し、スパンを作成する"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        s, token = start_span(
+            f"sql.{_sql_operation(statement)}",
+            statement=statement[:500],
+            executemany=executemany,
+        )
+        conn.info.setdefault("query_started", []).append((time.perf_counter(), s, token))
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started, s, token = conn.info["query_started"].pop()
+        DEPENDENCY_CALL_DURATION.labels("sql", _sql_operation(statement)).observe(
+            time.perf_counter() - started
+        )
+        if s is not None:
+            s.set_attribute("rowcount", cursor.rowcount)
+        end_span(s, token)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            _, s, token = started.pop()
+            end_span(s, token, context.original_exception)
+        DEPENDENCY_CALL_ERRORS.labels("sql", _sql_operation(context.statement or "")).inc()
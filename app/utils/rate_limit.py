@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+# レート制限（トークンバケット）
+
+
+class AsyncTokenBucket:
+    """一定レートでトークンが補充されるバケット。acquire はトークンが揃うまで待機する。"""
+
+    def __init__(self, rate_per_second: float, capacity: float | None = None):
+        self.rate = rate_per_second
+        self.capacity = capacity if capacity is not None else max(rate_per_second, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    def available(self) -> float:
+        """現在のトークン数"""
+        self._refill()
+        return self._tokens
+
+    def wait_time(self, tokens: float, reserve: float = 0.0) -> float:
+        """reserve 分を残して tokens を取得できるまでの秒数を返す（取得はしない）"""
+        self._refill()
+        return max(0.0, (tokens + reserve - self._tokens) / self.rate)
+
+    def take(self, tokens: float) -> None:
+        """待たずに tokens を消費する（残量が負になることを許容する）"""
+        self._refill()
+        self._tokens -= tokens
+
+    def give(self, tokens: float) -> None:
+        """消費した tokens を戻す（容量は超えない）"""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + tokens)
@@ -0,0 +1,18 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+class FastJSONResponse(JSONResponse):
+    """pydantic モデルは pydantic-core で、それ以外は orjson で直接JSONにするレスポンス
+
+    ルートからこのレスポンスを返すと、FastAPI による response_model の再検証と
+    jsonable_encoder を経由しない。信頼できるデータから構築したモデルにのみ使うこと。
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
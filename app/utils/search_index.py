@@ -0,0 +1,64 @@
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+
+# 前方一致・部分一致検索用のインメモリインデックス
+
+
+def normalize(text: str) -> str:
+    """検索用に文字列を正規化する（全角半角の統一・大文字小文字の無視）。"""
+    return unicodedata.normalize("NFKC", text or "").casefold().strip()
+
+
+def _ngrams(text: str, n: int) -> set[str]:
+    """文字列から長さ n の部分文字列集合を返す。"""
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+class SearchIndex:
+    """複数フィールドに対する前方一致・部分一致検索を行うインデックス。
+
+    前方一致はソート済みキーの二分探索、部分一致は1文字・2文字の n-gram
+    転置インデックスで候補を絞り込んでから照合する。
+    """
+
+    def __init__(self, documents: list[list[str]]):
+        self._fields: list[list[str]] = [[normalize(f) for f in fields if f] for fields in documents]
+        self._prefix_keys: list[tuple[str, int]] = []
+        self._postings: dict[str, set[int]] = defaultdict(set)
+
+        for doc_id, fields in enumerate(self._fields):
+            for field in fields:
+                # フィールド全体と空白区切りの各トークン、メールのローカル部を前方一致対象とする
+                keys = {field, *field.split(), field.split("@", 1)[0]}
+                self._prefix_keys.extend((key, doc_id) for key in keys if key)
+                for n in (1, 2):
+                    for gram in _ngrams(field, n):
+                        self._postings[gram].add(doc_id)
+        self._prefix_keys.sort()
+
+    def _prefix_matches(self, query: str) -> set[int]:
+        matches: set[int] = set()
+        i = bisect_left(self._prefix_keys, (query, -1))
+        while i < len(self._prefix_keys) and self._prefix_keys[i][0].startswith(query):
+            matches.add(self._prefix_keys[i][1])
+            i += 1
+        return matches
+
+    def _substring_matches(self, query: str) -> set[int]:
+        grams = _ngrams(query, 2) if len(query) >= 2 else {query}
+        posting_lists = sorted((self._postings.get(g, set()) for g in grams), key=len)
+        if not posting_lists or not posting_lists[0]:
+            return set()
+        candidates = set.intersection(*posting_lists)
+        return {doc_id for doc_id in candidates if any(query in f for f in self._fields[doc_id])}
+
+    def search(self, query: str) -> list[int]:
+        """クエリに一致するドキュメントIDを、前方一致を優先して元の順序で返す。"""
+        query = normalize(query)
+        if not query:
+            return list(range(len(self._fields)))
+
+        prefix = self._prefix_matches(query)
+        substring = self._substring_matches(query) - prefix
+        return sorted(prefix) + sorted(substring)
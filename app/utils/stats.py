@@ -0,0 +1,19 @@
+# 監視用の簡易統計
+
+
+def percentile(values: list[float], q: float) -> float:
+    """値の q 分位点（0 <= q <= 1）を返す。値が空の場合は 0.0"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize_latencies(values: list[float]) -> dict[str, float]:
+    """レイテンシ（秒）の p50/p95/p99/max を丸めて返す"""
+    return {
+        "p50": round(percentile(values, 0.5), 3),
+        "p95": round(percentile(values, 0.95), 3),
+        "p99": round(percentile(values, 0.99), 3),
+        "max": round(max(values, default=0.0), 3),
+    }
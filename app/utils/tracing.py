@@ -0,0 +1,242 @@
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator, TextIO
+
+from app.config.config import get_config
+
+logger = logging.getLogger(__name__)
+
+config = get_config()
+
+# リクエスト（またはバックグラウンド処理）単位のトレースと子スパンの記録
+# サンプリングされなかったトレースでは span() は何もしない
+
+
+@dataclass
+class Span:
+    trace_id: str
+    name: str
+    parent_id: str | None = None
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    attributes: dict[str, Any] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.time)
+    duration_ms: float | None = None
+    status: str = "ok"
+    error: str | None = None
+    # 同じトレースに属する終了済みスパン（ルートスパンと共有する）
+    _finished: list["Span"] = field(default_factory=list, repr=False)
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(),
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+_current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar("current_span", default=None)
+
+
+class JsonLinesExporter:
+    """終了したトレースを1スパン1行のJSONで書き出すエクスポータ
+
+    書き込みは専用スレッドで行い、リクエスト処理をブロックしない。
+    close() で残りを書き出してからファイルを閉じる（停止時に末尾のトレースを失わないため）。
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        # None はスレッドの停止を表す
+        self._queue: queue.SimpleQueue[list[Span] | None] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write_forever, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, spans: list[Span]) -> None:
+        self._queue.put(spans)
+
+    def _write_forever(self) -> None:
+        while True:
+            spans = self._queue.get()
+            if spans is None:
+                return
+            try:
+                for s in spans:
+                    self.stream.write(json.dumps(s.to_dict(), ensure_ascii=False, default=str) + "\n")
+                self.stream.flush()
+            except Exception as e:
+                logger.warning(f"トレースの出力に失敗しました: {e}")
+
+    def close(self, timeout: float = 5.0) -> None:
+        """キューに残ったスパンを書き出して停止し、標準出力以外のストリームを閉じる"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("トレースの書き出しが時間内に終わらなかったため、残りを破棄します")
+            return
+        try:
+            if self.stream in (sys.stdout, sys.stderr):
+                self.stream.flush()
+            else:
+                self.stream.close()
+        except Exception as e:
+            logger.warning(f"トレース出力先のクローズに失敗しました: {e}")
+
+
+def _create_exporter() -> JsonLinesExporter | None:
+    exporter = config["TRACE_EXPORTER"]
+    if exporter == "stdout":
+        return JsonLinesExporter(sys.stdout)
+    if exporter == "file":
+        path = config["TRACE_FILE_PATH"]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        return JsonLinesExporter(open(path, "a", encoding="utf-8"))
+    return None
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def _get_exporter() -> JsonLinesExporter | None:
+    global _exporter
+    if _exporter is None and config["TRACE_EXPORTER"] != "none":
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = _create_exporter()
+    return _exporter
+
+
+def shutdown_tracing() -> None:
+    """エクスポータを閉じる（アプリケーションの停止時に呼び出す）"""
+    global _exporter
+    with _exporter_lock:
+        exporter, _exporter = _exporter, None
+    if exporter is not None:
+        exporter.close()
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def _finish(s: Span, exc: BaseException | None) -> None:
+    s.duration_ms = round((time.perf_counter() - s._started) * 1000, 3)
+    if exc is not None:
+        s.status = "error"
+        s.error = f"{type(exc).__name__}: {exc}"[:500]
+    s._finished.append(s)
+
+
+@contextmanager
+def start_trace(name: str, trace_id: str | None = None, **attributes: Any) -> Iterator[Span | None]:
+    """ルートスパンを開始する。サンプリングされなかった場合は None を返す"""
+    if _get_exporter() is None or random.random() >= config["TRACE_SAMPLE_RATE"]:
+        token = _current_span.set(None)
+        try:
+            yield None
+        finally:
+            _current_span.reset(token)
+        return
+
+    root = Span(trace_id=trace_id or uuid.uuid4().hex, name=name, attributes=attributes)
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        _finish(root, e)
+        raise
+    else:
+        _finish(root, None)
+    finally:
+        _current_span.reset(token)
+        exporter = _get_exporter()
+        if exporter is not None:
+            exporter.export(root._finished)
+
+
+def start_span(name: str, **attributes: Any) -> tuple[Span | None, contextvars.Token | None]:
+    """子スパンを開始する（with 文を使えない箇所用）。end_span で必ず終了すること"""
+    parent = _current_span.get()
+    if parent is None:
+        return None, None
+    child = Span(
+        trace_id=parent.trace_id,
+        name=name,
+        parent_id=parent.span_id,
+        attributes=attributes,
+        _finished=parent._finished,
+    )
+    return child, _current_span.set(child)
+
+
+def end_span(s: Span | None, token: contextvars.Token | None, exc: BaseException | None = None) -> None:
+    if s is None:
+        return
+    _finish(s, exc)
+    try:
+        _current_span.reset(token)
+    except ValueError:
+        # 開始時と異なるコンテキストで終了した場合は親に戻す必要がない
+        pass
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """現在のスパンの子スパンを記録する。トレース外では何もしない"""
+    s, token = start_span(name, **attributes)
+    if s is None:
+        yield None
+        return
+    try:
+        yield s
+    except BaseException as e:
+        end_span(s, token, e)
+        raise
+    else:
+        end_span(s, token)
+
+
+def traced(name: str) -> Callable:
+    """関数（同期・非同期）の実行をスパンとして記録するデコレータ"""
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from app.interfaces.calendar_mirror_interface import CalendarMirrorInterface
+from app.interfaces.graph_api_interface import GraphAPIClientInterface
+from app.utils.tracing import start_trace
+
+logger = logging.getLogger(__name__)
+
+# Graph API の showAs と getSchedule の availabilityView の状態の対応（free はミラーに保持しない）
+SHOW_AS_STATUS = {"tentative": 1, "busy": 2, "oof": 3, "workingElsewhere": 4, "unknown": 2}
+
+# 同期時刻を迎えたメールボックスを確認する間隔（秒）
+_POLL_SECONDS = 5.0
+
+
+def _timestamp(value: dict[str, Any]) -> int:
+    """calendarView の日時（outlook.timezone="UTC" で取得した "2025-01-10T01:00:00.0000000"）を UNIX 時刻にする"""
+    return int(datetime.fromisoformat(value["dateTime"][:19]).replace(tzinfo=timezone.utc).timestamp())
+
+
+def parse_changes(events: list[dict[str, Any]]) -> tuple[list[tuple[str, int, int, int]], list[str]]:
+    """calendarView/delta の結果を、保持する予定 (イベントID, 開始, 終了, 状態) と削除するイベントIDに分ける"""
+    upserts: list[tuple[str, int, int, int]] = []
+    removed: list[str] = []
+    for event in events:
+        status = SHOW_AS_STATUS.get(event.get("showAs", "busy"))
+        if "@removed" in event or event.get("isCancelled") or status is None:
+            removed.append(event["id"])
+        else:
+            upserts.append((event["id"], _timestamp(event["start"]), _timestamp(event["end"]), status))
+    return upserts, removed
+
+
+class CalendarSyncer:
+    """担当者ごとの予定を calendarView/delta で取得し、ローカルのミラーを最新に保つバックグラウンド処理
+
+    同期する期間は前日から weeks 週間先まで（UTC の日単位）。日付が変わって期間がずれた場合と deltaLink が
+    失効した場合は初回同期からやり直し、それ以外は前回の deltaLink から変更分のみを取得する。
+    同期対象は GraphAPIClient.get_schedules でミラーから計算できなかった担当者（と起動時に指定した担当者）。
+    """
+
+    def __init__(
+        self,
+        mirror: CalendarMirrorInterface,
+        graph_api_client: GraphAPIClientInterface,
+        weeks: int,
+        interval_seconds: float,
+        max_concurrency: int,
+        lease_seconds: float,
+        mailboxes: list[str] | None = None,
+    ):
+        self.mirror = mirror
+        self.graph_api_client = graph_api_client
+        self.weeks = weeks
+        self.interval_seconds = interval_seconds
+        self.max_concurrency = max_concurrency
+        self.lease_seconds = lease_seconds
+        self.mailboxes = mailboxes or []
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._task: asyncio.Task | None = None
+        self._sync_runs = 0
+        self._full_syncs = 0
+        self._failures = 0
+        self._last_sync_seconds: float | None = None
+
+    def _window(self) -> tuple[datetime, datetime]:
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        return today - timedelta(days=1), today + timedelta(weeks=self.weeks)
+
+    def sync_mailbox(self, mailbox: dict[str, Any]) -> None:
+        """1つのメールボックスを同期する（同期的に Graph API を呼び出すためスレッドで実行する）"""
+        email = mailbox["email"]
+        window_start, window_end = self._window()
+        start_ts, end_ts = int(window_start.timestamp()), int(window_end.timestamp())
+        delta_link = mailbox["delta_link"]
+        reset = not delta_link or (mailbox["window_start"], mailbox["window_end"]) != (start_ts, end_ts)
+        started = time.perf_counter()
+        try:
+            try:
+                events, next_link = self.graph_api_client.calendar_view_delta(
+                    email, window_start.isoformat(), window_end.isoformat(), None if reset else delta_link
+                )
+            except Exception as e:
+                if reset or getattr(e, "status_code", None) != 410:
+                    raise
+                logger.info(f"deltaLink が失効したため初回同期からやり直します: {email}")
+                reset = True
+                events, next_link = self.graph_api_client.calendar_view_delta(
+                    email, window_start.isoformat(), window_end.isoformat()
+                )
+            upserts, removed = parse_changes(events)
+            self.mirror.apply_changes(
+                email, upserts, removed, next_link, start_ts, end_ts, reset, time.time() + self.interval_seconds
+            )
+            self._sync_runs += 1
+            self._full_syncs += int(reset)
+            self._last_sync_seconds = round(time.perf_counter() - started, 3)
+        except Exception as e:
+            self._failures += 1
+            logger.warning(f"予定の同期に失敗しました: {email}: {e}")
+            self.mirror.mark_failed(email, str(e), time.time() + self.interval_seconds)
+
+    async def _sync(self, mailbox: dict[str, Any]) -> None:
+        async with self._semaphore:
+            with start_trace("calendar_sync", mailbox=mailbox["email"]):
+                await asyncio.to_thread(self.sync_mailbox, mailbox)
+
+    async def run_once(self) -> int:
+        """同期時刻を迎えたメールボックスを同期し、件数を返す"""
+        mailboxes = await asyncio.to_thread(self.mirror.claim_due, self.max_concurrency * 4, self.lease_seconds)
+        if mailboxes:
+            await asyncio.gather(*(self._sync(mailbox) for mailbox in mailboxes))
+        return len(mailboxes)
+
+    async def _run(self) -> None:
+        if self.mailboxes:
+            await asyncio.to_thread(self.mirror.track, self.mailboxes)
+        while True:
+            try:
+                processed = await self.run_once()
+            except Exception as e:
+                logger.error(f"予定の同期対象の取得に失敗しました: {e}")
+                processed = 0
+            if not processed:
+                await asyncio.sleep(min(_POLL_SECONDS, self.interval_seconds))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self.mirror.stats(),
+            "sync_runs": self._sync_runs,
+            "full_syncs": self._full_syncs,
+            "failures": self._failures,
+            "last_sync_seconds": self._last_sync_seconds,
+        }
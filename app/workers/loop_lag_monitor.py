@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any
+
+from app.utils.metrics import EVENT_LOOP_LAG, EVENT_LOOP_STALLS
+from app.utils.stats import summarize_latencies
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LoopLagMonitor:
+    """イベントループの遅延を計測し、ブロッキング呼び出しを検出するモニタ
+
+    ループ上のタスクが一定間隔で sleep し、予定より遅れて再開した時間を遅延として記録する。
+    別スレッドのウォッチドッグがハートビートの途絶を検知すると、ブロック中のループスレッドの
+    スタックを取得してログに出力する（同期I/Oを呼んでいる箇所の特定用）。
+    """
+
+    def __init__(self, interval_seconds: float, threshold_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.threshold_seconds = threshold_seconds
+        self._lags: deque[float] = deque(maxlen=1000)
+        self._max_lag = 0.0
+        self._stalls = 0
+        self._recent_stalls: deque[dict[str, Any]] = deque(maxlen=20)
+        self._heartbeat = time.monotonic()
+        # ウォッチドッグがブロック中に取得したスタック情報（ループ再開時に記録へ移す）
+        self._captured: dict[str, Any] | None = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+
+    def _capture(self, blocked_seconds: float) -> dict[str, Any]:
+        """ループスレッドの現在のスタックと実行中のタスクを取得する"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.extract_stack(frame) if frame is not None else traceback.StackSummary()
+        # ライブラリ内部ではなく、ブロッキング呼び出しを行っているアプリ側の最も内側のフレーム
+        location = next(
+            (f for f in reversed(stack) if f.filename.startswith(_APP_DIR) and f.filename != __file__),
+            stack[-1] if stack else None,
+        )
+        task = asyncio.current_task(self._loop) if self._loop else None
+        return {
+            "task": task.get_name() if task else None,
+            "location": f"{location.filename}:{location.lineno} in {location.name}" if location else None,
+            "stack": "".join(stack.format()),
+            "blocked_seconds": blocked_seconds,
+        }
+
+    def _watch(self) -> None:
+        check_interval = min(self.interval_seconds, self.threshold_seconds / 2)
+        while not self._stop_event.wait(check_interval):
+            blocked = time.monotonic() - self._heartbeat - self.interval_seconds
+            if blocked < self.threshold_seconds:
+                continue
+            with self._lock:
+                if self._captured is not None:
+                    continue
+                self._captured = captured = self._capture(blocked)
+            logger.warning(
+                f"イベントループが {blocked:.3f} 秒以上ブロックされています "
+                f"(task={captured['task']}, location={captured['location']})\n{captured['stack']}"
+            )
+
+    def _record(self, lag: float) -> None:
+        self._lags.append(lag)
+        self._max_lag = max(self._max_lag, lag)
+        EVENT_LOOP_LAG.observe(lag)
+        if lag < self.threshold_seconds:
+            return
+
+        with self._lock:
+            captured, self._captured = self._captured, None
+        self._stalls += 1
+        EVENT_LOOP_STALLS.inc()
+        self._recent_stalls.append(
+            {
+                "detected_at": datetime.now(timezone.utc).isoformat(),
+                "lag_seconds": round(lag, 3),
+                "task": captured["task"] if captured else None,
+                "location": captured["location"] if captured else None,
+            }
+        )
+        if captured is None:
+            # ウォッチドッグの検査間隔より短いブロックはスタックを取得できない
+            logger.warning(f"イベントループが {lag:.3f} 秒ブロックされました")
+        else:
+            logger.warning(f"イベントループが {lag:.3f} 秒ブロックされました: {captured['location']}")
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval_seconds)
+            now = time.monotonic()
+            self._heartbeat = now
+            self._record(max(0.0, now - started - self.interval_seconds))
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop_event.clear()
+        self._task = asyncio.create_task(self._run())
+        self._thread = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop_event.set()
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join, 1)
+            self._thread = None
+
+    def stats(self) -> dict[str, Any]:
+        """直近の遅延分布、起動以降の最大遅延、しきい値超過の回数と発生箇所を返す"""
+        return {
+            "interval_seconds": self.interval_seconds,
+            "threshold_seconds": self.threshold_seconds,
+            "lag_seconds": summarize_latencies(list(self._lags)),
+            "max_lag_seconds": round(self._max_lag, 3),
+            "stalls": self._stalls,
+            "recent_stalls": list(self._recent_stalls),
+        }
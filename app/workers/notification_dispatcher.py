@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Any
+
+from app.interfaces.graph_api_interface import GraphAPIClientInterface
+from app.interfaces.notification_queue_interface import NotificationQueueInterface
+from app.schemas.notification import Notification
+from app.utils.rate_limit import AsyncTokenBucket
+from app.utils.stats import summarize_latencies
+from app.utils.tracing import start_trace
+
+logger = logging.getLogger(__name__)
+
+# Graph API sendMail の1メッセージあたりの宛先数上限に余裕を持たせた値
+MAX_RECIPIENTS_PER_MESSAGE = 100
+
+
+class NotificationDispatcher:
+    """永続キューからメール通知を取り出し、同一内容の通知を1通にまとめて並行送信する"""
+
+    def __init__(
+        self,
+        queue: NotificationQueueInterface,
+        graph_api_client: GraphAPIClientInterface,
+        max_concurrency: int,
+        rate_per_second: float,
+        batch_size: int,
+        max_attempts: int,
+        lease_seconds: float,
+        poll_interval_seconds: float,
+        retention_seconds: float,
+    ):
+        self.queue = queue
+        self.graph_api_client = graph_api_client
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.retention_seconds = retention_seconds
+        self._purged_at = 0.0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._rate_limiter = AsyncTokenBucket(rate_per_second)
+        self._wakeup = asyncio.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        # 直近の送信についての待ち時間（キュー投入→送信完了）と送信APIの所要時間（秒）
+        self._queue_latencies: deque[float] = deque(maxlen=1000)
+        self._send_latencies: deque[float] = deque(maxlen=1000)
+        self._messages_sent = 0
+        self._notifications_sent = 0
+
+    def enqueue(self, notifications: list[Notification]) -> int:
+        """通知をキューに追加してディスパッチャを起こす（任意のスレッドから呼び出し可）"""
+        inserted = self.queue.enqueue(notifications)
+        if inserted:
+            self.notify()
+        return inserted
+
+    def notify(self) -> None:
+        if self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # イベントループ停止後の呼び出しは無視する（通知はキューに残る）
+            pass
+
+    def _retry_at(self, attempts: int) -> float | None:
+        if attempts >= self.max_attempts:
+            return None
+        return time.time() + min(2**attempts, 600)
+
+    async def _send_group(self, rows: list[dict[str, Any]]) -> None:
+        """同一内容の通知をまとめて1通として送信する"""
+        first = rows[0]
+        recipients = list(dict.fromkeys(row["recipient_email"] for row in rows))
+        ids = [row["id"] for row in rows]
+
+        async with self._semaphore:
+            await self._rate_limiter.acquire()
+            started = time.monotonic()
+            try:
+                with start_trace(
+                    "notification.send",
+                    notifications=len(rows),
+                    recipients=len(recipients),
+                ):
+                    await asyncio.to_thread(
+                        self.graph_api_client.send_email_to_recipients,
+                        first["sender_email"],
+                        recipients,
+                        first["subject"],
+                        first["body"],
+                    )
+            except Exception as e:
+                attempts = max(row["attempts"] for row in rows)
+                retry_at = self._retry_at(attempts)
+                logger.error(
+                    f"メール送信失敗 ({attempts}/{self.max_attempts}): {first['subject']} -> {recipients}: {e}"
+                )
+                await asyncio.to_thread(self.queue.mark_failed, ids, str(e), retry_at)
+                return
+
+        now = time.time()
+        self._send_latencies.append(time.monotonic() - started)
+        self._queue_latencies.extend(now - row["enqueued_at"] for row in rows)
+        self._messages_sent += 1
+        self._notifications_sent += len(rows)
+        await asyncio.to_thread(self.queue.mark_sent, ids)
+        logger.info(f"メール送信成功: {first['subject']} -> {len(recipients)}件の宛先")
+
+    async def run_once(self) -> int:
+        """キューから1バッチ分取得して送信し、処理した通知件数を返す"""
+        rows = await asyncio.to_thread(self.queue.claim, self.batch_size, self.lease_seconds, self.max_attempts)
+        groups: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            groups[row["content_hash"]].append(row)
+
+        sends = []
+        for group in groups.values():
+            for i in range(0, len(group), MAX_RECIPIENTS_PER_MESSAGE):
+                sends.append(self._send_group(group[i : i + MAX_RECIPIENTS_PER_MESSAGE]))
+        await asyncio.gather(*sends)
+        return len(rows)
+
+    async def _purge_if_due(self) -> None:
+        """送信済み通知を1時間に1回、保持期間を過ぎたものから削除する"""
+        if time.monotonic() - self._purged_at < 3600:
+            return
+        self._purged_at = time.monotonic()
+        try:
+            await asyncio.to_thread(self.queue.purge_sent, self.retention_seconds)
+        except Exception as e:
+            logger.warning(f"送信済み通知の削除に失敗しました: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except Exception as e:
+                logger.error(f"通知キューの取得に失敗しました: {e}")
+                processed = 0
+            if processed:
+                continue
+            await self._purge_if_due()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        """キューの深さと送信レイテンシの統計を返す"""
+        return {
+            "queue": self.queue.stats(),
+            "messages_sent": self._messages_sent,
+            "notifications_sent": self._notifications_sent,
+            "queue_latency_seconds": summarize_latencies(list(self._queue_latencies)),
+            "send_latency_seconds": summarize_latencies(list(self._send_latencies)),
+        }
+
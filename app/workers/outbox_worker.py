@@ -0,0 +1,153 @@
+import asyncio
+import inspect
+import logging
+from datetime import timedelta
+from typing import Any, Callable
+
+from app.infrastructure.outbox_repository import utcnow
+from app.interfaces.outbox_repository_interface import OutboxRepositoryInterface
+from app.schemas.outbox import OutboxMessage
+from app.utils.tracing import start_trace
+
+logger = logging.getLogger(__name__)
+
+# ハンドラは同期関数（スレッドで実行）またはコルーチン関数で、成功時に後続メッセージ（任意）を返す。
+# 例外を送出すると再試行される。ハンドラが message.payload に書き込んだ内容は失敗時に保存され、再試行に引き継がれる
+OutboxHandler = Callable[[OutboxMessage], Any]
+
+
+class OutboxWorker:
+    """アウトボックスのメッセージを取得し、登録されたハンドラで再試行付きに処理するワーカー"""
+
+    def __init__(
+        self,
+        repository: OutboxRepositoryInterface,
+        poll_interval_seconds: float,
+        batch_size: int,
+        max_attempts: int,
+        lease_seconds: float,
+    ):
+        self.repository = repository
+        self.poll_interval_seconds = poll_interval_seconds
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.handlers: dict[str, OutboxHandler] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        # process_in_background で開始した処理（呼び出し元のリクエストが終わっても破棄されないよう参照を保持する）
+        self._pending: set[asyncio.Task] = set()
+
+    def register_handlers(self, handlers: dict[str, OutboxHandler]) -> None:
+        self.handlers.update(handlers)
+
+    def notify(self) -> None:
+        """新しいメッセージが追加されたことを通知し、ポーリング間隔を待たずに処理させる"""
+        self._wakeup.set()
+
+    def _retry_at(self, attempts: int):
+        """指数バックオフ（上限10分）で次回の試行時刻を返す。上限回数に達した場合は None"""
+        if attempts >= self.max_attempts:
+            return None
+        return utcnow() + timedelta(seconds=min(2**attempts, 600))
+
+    async def _process(self, message: OutboxMessage) -> list[OutboxMessage] | None:
+        """メッセージを処理し、成功した場合は後続メッセージ（なければ空のリスト）を返す。失敗した場合は None"""
+        handler = self.handlers.get(message.message_type)
+        if handler is None:
+            logger.error(f"未登録のアウトボックスメッセージです: {message.message_type} ({message.id})")
+            await asyncio.to_thread(self.repository.fail, message.id, "handler not registered", None, None)
+            return None
+
+        try:
+            with start_trace(
+                f"outbox.{message.message_type}",
+                message_id=message.id,
+                aggregate_id=message.aggregate_id,
+                attempt=message.attempts,
+            ):
+                if inspect.iscoroutinefunction(handler):
+                    follow_ups = await handler(message)
+                else:
+                    follow_ups = await asyncio.to_thread(handler, message)
+        except Exception as e:
+            retry_at = self._retry_at(message.attempts)
+            if retry_at is None:
+                logger.error(
+                    f"アウトボックス処理が上限回数に達しました: {message.message_type} ({message.id}): {e}"
+                )
+            else:
+                logger.warning(
+                    f"アウトボックス処理失敗、再試行します ({message.attempts}/{self.max_attempts}): "
+                    f"{message.message_type} ({message.id}): {e}"
+                )
+            await asyncio.to_thread(self.repository.fail, message.id, str(e), retry_at, message.payload)
+            return None
+
+        await asyncio.to_thread(self.repository.complete, message.id, follow_ups)
+        logger.info(f"アウトボックス処理成功: {message.message_type} ({message.id})")
+        if follow_ups:
+            self.notify()
+        return follow_ups or []
+
+    async def process_now(self, message_id: str) -> list[OutboxMessage] | None:
+        """指定したメッセージをポーリングを待たずに処理し、成功した場合は後続メッセージを返す
+
+        他のワーカーが取得済みの場合や処理に失敗した場合は None を返す（失敗したものは通常どおり再試行される）。
+        """
+        message = await asyncio.to_thread(
+            self.repository.claim_message, message_id, self.lease_seconds, self.max_attempts
+        )
+        if message is None:
+            return None
+        return await self._process(message)
+
+    def process_in_background(self, message_id: str) -> asyncio.Task:
+        """process_now をタスクとして開始する。呼び出し元が待機をやめても、処理は最後まで続く"""
+        task = asyncio.create_task(self.process_now(message_id))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return task
+
+    async def run_once(self) -> int:
+        """処理可能なメッセージを1バッチ分処理し、処理件数を返す"""
+        messages = await asyncio.to_thread(
+            self.repository.claim, self.batch_size, self.lease_seconds, self.max_attempts
+        )
+        if messages:
+            await asyncio.gather(*(self._process(message) for message in messages))
+        return len(messages)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except Exception as e:
+                logger.error(f"アウトボックスの取得に失敗しました: {e}")
+                processed = 0
+            if processed:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        # 処理中のメッセージは中断しても、リースの期限切れ後に再試行される
+        pending = list(self._pending)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
@@ -0,0 +1,98 @@
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+# 同期関数はスレッドで、コルーチン関数はそのまま実行する
+WarmupStep = Callable[[], Any]
+
+
+class Warmup:
+    """起動直後に接続やキャッシュを温めるバックグラウンド処理
+
+    各ステップを並行に実行し、すべて終わった時点で準備完了（ready）とする。
+    required のステップ（Graph API のトークン取得・Cosmos DB への接続など、失敗するとどのリクエストも処理できないもの）は
+    成功するまで間隔を空けて再試行し、それまでは準備完了にしない。依存サービスの障害中もプロセスは起動したまま
+    /readyz で失敗内容を返し、復旧すると再起動せずに準備完了になる。
+    それ以外のステップは失敗・タイムアウトしても準備完了にする（温めは初回リクエストの待ち時間を減らすためのもので、
+    失敗しても通常のリクエスト処理で改めて接続されるため）。結果は stats() で確認できる。
+    """
+
+    # required のステップの再試行間隔の上限（秒）。1秒から倍々に延ばす
+    RETRY_MAX_SECONDS = 30.0
+
+    def __init__(self, steps: dict[str, WarmupStep], timeout_seconds: float, required: set[str] | None = None):
+        self.steps = steps
+        self.timeout_seconds = timeout_seconds
+        self.required = required or set()
+        self.ready = False
+        self._started_at: float | None = None
+        self._seconds: float | None = None
+        self._results: dict[str, dict[str, Any]] = {}
+        self._task: asyncio.Task | None = None
+
+    async def _attempt(self, name: str, step: WarmupStep, attempts: int) -> bool:
+        started = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(step):
+                await asyncio.wait_for(step(), self.timeout_seconds)
+            else:
+                await asyncio.wait_for(asyncio.to_thread(step), self.timeout_seconds)
+            self._results[name] = {"ok": True, "seconds": round(time.perf_counter() - started, 3), "attempts": attempts}
+            return True
+        except Exception as e:
+            error = "timeout" if isinstance(e, asyncio.TimeoutError) else str(e)
+            self._results[name] = {
+                "ok": False,
+                "seconds": round(time.perf_counter() - started, 3),
+                "attempts": attempts,
+                "error": error,
+            }
+            logger.warning(f"起動時の温め処理に失敗しました: {name} ({attempts}回目): {error}")
+            return False
+
+    async def _run_step(self, name: str, step: WarmupStep) -> None:
+        attempts = 1
+        while not await self._attempt(name, step, attempts) and name in self.required:
+            await asyncio.sleep(min(2 ** (attempts - 1), self.RETRY_MAX_SECONDS))
+            attempts += 1
+
+    async def run(self) -> None:
+        self._started_at = time.perf_counter()
+        await asyncio.gather(*[self._run_step(name, step) for name, step in self.steps.items()])
+        self._seconds = round(time.perf_counter() - self._started_at, 3)
+        self.ready = True
+        logger.info(
+            f"起動時の温め処理が完了しました: {self._seconds}秒 | "
+            + ", ".join(f"{name}={r['seconds']}s{'' if r['ok'] else '(失敗)'}" for name, r in self._results.items())
+        )
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    def skip(self) -> None:
+        """温めを行わずに準備完了とする"""
+        self.ready = True
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "seconds": self._seconds,
+            "steps": {
+                name: {**self._results.get(name, {"ok": None}), "required": name in self.required}
+                for name in self.steps
+            },
+        }
@@ -0,0 +1,216 @@
+"""空き時間計算・スロット操作・日時整形ユーティリティのベンチマーク
+
+対象: aggregate_user_availability / calculate_common_availability / find_continuous_slots /
+      split_candidates / format_candidate_date
+
+合成した getSchedule のレスポンス（担当者数・日数・間隔・予定の埋まり具合で指定）に対して
+各関数の実行時間の中央値を計測し、保存済みのベースラインと比較する。
+出力内容のダイジェストもベースラインに保存し、変更で計算結果が変わった場合も検出する。
+
+実行:
+    python -m benchmarks.bench_availability                  # ベースラインと比較（劣化があれば終了コード1）
+    python -m benchmarks.bench_availability --save-baseline  # 現在の結果をベースラインとして保存
+    python -m benchmarks.bench_availability --threshold 0.1 --filter split
+
+ベースラインの時間は計測したマシンに依存するため、比較は同じマシン（またはCIの同じランナー）で行うこと。
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from app.utils.availability import aggregate_user_availability, calculate_common_availability
+from app.utils.formatting import format_candidate_date
+from app.utils.http_cache import digest
+from app.utils.slot import find_continuous_slots, split_candidates
+from app.utils.time import time_string_to_float
+from benchmarks.payloads import ScheduleScenario, make_schedule_payloads
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "bench_availability.json")
+
+SCENARIOS = [
+    ScheduleScenario(interviewers=3, days=5, interval_minutes=30, busy_density=0.3),
+    ScheduleScenario(interviewers=10, days=20, interval_minutes=30, busy_density=0.5),
+    ScheduleScenario(interviewers=30, days=60, interval_minutes=15, busy_density=0.5),
+    ScheduleScenario(interviewers=30, days=60, interval_minutes=60, busy_density=0.1),
+]
+
+
+@dataclass(frozen=True)
+class Case:
+    """1つの計測対象（入力を束縛済みの関数）"""
+
+    name: str
+    func: Callable[[], Any]
+
+
+def build_cases(scenario: ScheduleScenario) -> list[Case]:
+    start_hour = time_string_to_float(scenario.start_time)
+    end_hour = time_string_to_float(scenario.end_time)
+    slot_duration = scenario.interval_minutes / 60.0
+    employee_emails = scenario.employee_emails()
+    required = max(1, scenario.interviewers // 2)
+    payloads = make_schedule_payloads(scenario)
+
+    def aggregate():
+        return aggregate_user_availability(
+            payloads,
+            employee_emails,
+            start_hour,
+            end_hour,
+            slot_duration,
+            scenario.start_date,
+            scenario.end_date,
+        )
+
+    date_user_slots, date_list = aggregate()
+
+    def common():
+        return calculate_common_availability(
+            date_user_slots,
+            date_list,
+            employee_emails,
+            required,
+            scenario.interval_minutes,
+            start_hour,
+            end_hour,
+        )
+
+    # find_continuous_slots には日ごとに全担当者の空きスロットの和集合を渡す
+    daily_slots = [sorted({s for user in date_user_slots[d] for s in user}) for d in date_list]
+
+    def continuous():
+        return [find_continuous_slots(slots, 1.0) for slots in daily_slots]
+
+    common_availability, _ = common()
+    # Cosmos DB には分割前の区間が保存されるため、60/90/120分の区間を混ぜて分割する
+    candidates = [
+        [start, (datetime.fromisoformat(start) + timedelta(minutes=(60, 90, 120)[i % 3])).isoformat()]
+        for i, (start, _) in enumerate(common_availability)
+    ]
+
+    def split():
+        return split_candidates(candidates, 60)
+
+    formatted_inputs = [f"{start}, {end}" for start, end in common_availability]
+
+    def format_dates():
+        return [format_candidate_date(c) for c in formatted_inputs]
+
+    label = scenario.label
+    return [
+        Case(f"aggregate_user_availability[{label}]", aggregate),
+        Case(f"calculate_common_availability[{label}]", common),
+        Case(f"find_continuous_slots[{label}]", continuous),
+        Case(f"split_candidates[{label}]", split),
+        Case(f"format_candidate_date[{label}]", format_dates),
+    ]
+
+
+def measure(func: Callable[[], Any], min_seconds: float, min_repeat: int) -> float:
+    """min_seconds 以上かつ min_repeat 回以上実行し、1回あたりの中央値（秒）を返す"""
+    func()  # ウォームアップ
+    timings = []
+    total = 0.0
+    while len(timings) < min_repeat or total < min_seconds:
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        timings.append(elapsed)
+        total += elapsed
+    return statistics.median(timings)
+
+
+def load_baseline(path: str) -> dict[str, Any] | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, results: dict[str, dict[str, Any]]) -> None:
+    """結果をベースラインに書き込む（--filter で一部だけ計測した場合は該当ケースだけ更新する）"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    existing = load_baseline(path)
+    baseline = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform()},
+        "cases": {**(existing["cases"] if existing else {}), **results},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(results: dict[str, dict[str, Any]], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """ベースラインより threshold の割合を超えて遅くなったケースと、出力が変わったケースを返す"""
+    problems = []
+    for name, result in results.items():
+        base = baseline["cases"].get(name)
+        if base is None:
+            continue
+        if result["digest"] != base["digest"]:
+            problems.append(f"{name}: 出力がベースラインと異なります")
+        if result["median_us"] > base["median_us"] * (1 + threshold):
+            problems.append(
+                f"{name}: {base['median_us']:.1f}us -> {result['median_us']:.1f}us "
+                f"(+{(result['median_us'] / base['median_us'] - 1) * 100:.0f}%)"
+            )
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save-baseline", action="store_true", help="結果をベースラインとして保存する")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="ベースラインのファイルパス")
+    parser.add_argument("--threshold", type=float, default=0.25, help="劣化とみなす増加率（0.25 = 25%%）")
+    parser.add_argument("--filter", default="", help="ケース名にこの文字列を含むものだけ実行する")
+    parser.add_argument("--min-seconds", type=float, default=0.3, help="ケースごとの最小計測時間（秒）")
+    parser.add_argument("--min-repeat", type=int, default=5, help="ケースごとの最小実行回数")
+    args = parser.parse_args()
+
+    baseline = None if args.save_baseline else load_baseline(args.baseline)
+    if baseline is not None and baseline["machine"]["python"] != platform.python_version():
+        print(
+            f"警告: ベースラインは Python {baseline['machine']['python']} で計測されています"
+            f"（現在 {platform.python_version()}）",
+            file=sys.stderr,
+        )
+
+    results: dict[str, dict[str, Any]] = {}
+    print(f"{'case':<62}{'median us':>12}{'baseline':>12}{'diff':>8}")
+    for scenario in SCENARIOS:
+        for case in build_cases(scenario):
+            if args.filter not in case.name:
+                continue
+            median = measure(case.func, args.min_seconds, args.min_repeat)
+            results[case.name] = {"median_us": round(median * 1e6, 1), "digest": digest(case.func())}
+            base = baseline["cases"].get(case.name) if baseline else None
+            if base:
+                diff = f"{(median * 1e6 / base['median_us'] - 1) * 100:+.0f}%"
+                print(f"{case.name:<62}{median * 1e6:>12.1f}{base['median_us']:>12.1f}{diff:>8}")
+            else:
+                print(f"{case.name:<62}{median * 1e6:>12.1f}{'-':>12}{'-':>8}")
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"ベースラインを保存しました: {args.baseline}")
+        return 0
+    if baseline is None:
+        print("ベースラインがありません。--save-baseline で作成してください")
+        return 0
+
+    problems = compare(results, baseline, args.threshold)
+    for problem in problems:
+        print(f"劣化: {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
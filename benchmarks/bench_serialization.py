@@ -0,0 +1,116 @@
+"""レスポンスのモデル構築とJSONシリアライズのベンチマーク
+
+変更前: モデルを検証付きで構築し、FastAPI の response_model と同様に
+        再検証 → model_dump(mode="json") → JSONResponse(json.dumps) を通す経路
+変更後: 検証を省略して構築し（from_trusted / model_construct）、FastJSONResponse で直接JSONにする経路
+
+実行: python -m benchmarks.bench_serialization
+"""
+
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from fastapi.responses import JSONResponse
+
+from app.schemas import AvailabilityResponse, FormData
+from app.utils.responses import FastJSONResponse
+
+EMPLOYEES = [f"employee{i:02d}@example.com" for i in range(5)]
+
+
+def make_form_document(slots: int) -> dict[str, Any]:
+    """Cosmos DB に保存されているフォームと同じ形のドキュメントを作る"""
+    start = datetime(2025, 1, 6, 9, 0)
+    datetimes = []
+    slot_map = {}
+    for i in range(slots):
+        s = start + timedelta(minutes=30 * i)
+        e = s + timedelta(hours=1)
+        pair = [s.isoformat(), e.isoformat()]
+        datetimes.append(pair)
+        slot_map[f"{pair[0]}/{pair[1]}"] = EMPLOYEES[: 2 + i % 4]
+    return {
+        "id": "00000000-0000-0000-0000-000000000000",
+        "partitionKey": "form",
+        "start_date": "2025-01-06",
+        "end_date": "2025-03-31",
+        "start_time": "09:00",
+        "end_time": "18:00",
+        "selected_days": ["月", "火", "水", "木", "金"],
+        "duration_minutes": 60,
+        "employee_emails": [{"email": e} for e in EMPLOYEES],
+        "required_participants": 2,
+        "time_zone": "Tokyo Standard Time",
+        "is_confirmed": False,
+        "schedule_interview_datetimes": datetimes,
+        "slot_employees_map": slot_map,
+        "schedule_interview_datetime": None,
+        "event_ids": None,
+    }
+
+
+def form_before(doc: dict[str, Any]) -> bytes:
+    model = FormData(**doc)
+    validated = FormData.model_validate(model.model_dump())
+    return JSONResponse(validated.model_dump(mode="json")).body
+
+
+def form_after(doc: dict[str, Any]) -> bytes:
+    return FastJSONResponse(FormData.from_trusted(doc)).body
+
+
+def availability_before(doc: dict[str, Any]) -> bytes:
+    model = AvailabilityResponse(
+        common_availability=doc["schedule_interview_datetimes"],
+        slot_employees_map=doc["slot_employees_map"],
+    )
+    validated = AvailabilityResponse.model_validate(model.model_dump())
+    return JSONResponse(validated.model_dump(mode="json")).body
+
+
+def availability_after(doc: dict[str, Any]) -> bytes:
+    model = AvailabilityResponse.model_construct(
+        common_availability=doc["schedule_interview_datetimes"],
+        slot_employees_map=doc["slot_employees_map"],
+    )
+    return FastJSONResponse(model).body
+
+
+def measure(func: Callable[[dict[str, Any]], bytes], doc: dict[str, Any], repeat: int) -> tuple[float, int]:
+    """中央値の実行時間（秒）とペイロードサイズ（バイト）を返す"""
+    size = len(func(doc))
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(doc)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), size
+
+
+def main() -> None:
+    cases = [
+        ("form", form_before, form_after),
+        ("availability", availability_before, availability_after),
+    ]
+    print(f"{'case':<14}{'slots':>7}{'KB':>9}{'before us/KB':>15}{'after us/KB':>14}{'speedup':>9}")
+    for slots in (100, 1000, 5000):
+        doc = make_form_document(slots)
+        repeat = max(20, 20000 // slots)
+        for name, before, after in cases:
+            before_seconds, size = measure(before, doc, repeat)
+            after_seconds, _ = measure(after, doc, repeat)
+            # 経路を変えても出力内容が同じであること
+            assert json.loads(before(doc)) == json.loads(after(doc))
+            kb = size / 1024
+            print(
+                f"{name:<14}{slots:>7}{kb:>9.1f}"
+                f"{before_seconds * 1e6 / kb:>15.2f}{after_seconds * 1e6 / kb:>14.2f}"
+                f"{before_seconds / after_seconds:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""アプリのインポート時間を計測する（コールドスタートの悪化を検知するため）
+
+python -X importtime で子プロセスを起動して対象モジュールをインポートし、
+パッケージ別・モジュール別の所要時間（self 時間の合計）を出力する。
+.pyc の有無で結果が変わるため、複数回実行して合計時間が中央値の回を採用する。
+
+実行例:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget-ms 1500   # 超えた場合は終了コード 1
+    python -m benchmarks.import_time --module app.container --top 30 --json import_time.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Any
+
+_MARKER = "--import-time-start--"
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str) -> dict[str, Any]:
+    """子プロセスで module をインポートし、合計時間（ミリ秒）とモジュールごとの self 時間（マイクロ秒）を返す"""
+    code = (
+        "import sys, time\n"
+        f"sys.stderr.write({_MARKER!r} + '\\n')\n"
+        "started = time.perf_counter()\n"
+        f"import {module}\n"
+        "print((time.perf_counter() - started) * 1000)\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=_ROOT,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [_ROOT, os.environ.get("PYTHONPATH")]))},
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{module} のインポートに失敗しました:\n{completed.stderr[-2000:]}")
+
+    modules: dict[str, int] = {}
+    started = False
+    for line in completed.stderr.splitlines():
+        if line == _MARKER:
+            started = True
+            continue
+        if not started or not line.startswith("import time:"):
+            continue
+        self_us, _cumulative_us, name = line[len("import time:") :].split("|")
+        if self_us.strip().isdigit():
+            modules[name.strip()] = int(self_us)
+    return {"total_ms": float(completed.stdout.strip().splitlines()[-1]), "modules": modules}
+
+
+def summarize(result: dict[str, Any], top: int) -> dict[str, Any]:
+    by_package: dict[str, int] = defaultdict(int)
+    for name, self_us in result["modules"].items():
+        by_package[name.split(".")[0]] += self_us
+    return {
+        "total_ms": round(result["total_ms"], 1),
+        "modules_imported": len(result["modules"]),
+        "packages": {
+            name: round(us / 1000, 1) for name, us in sorted(by_package.items(), key=lambda x: -x[1])[:top]
+        },
+        "modules": {
+            name: round(us / 1000, 1) for name, us in sorted(result["modules"].items(), key=lambda x: -x[1])[:top]
+        },
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main", help="計測するモジュール")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数")
+    parser.add_argument("--top", type=int, default=15, help="表示するパッケージ・モジュールの数")
+    parser.add_argument("--budget-ms", type=float, help="合計時間の上限（ミリ秒）。超えた場合は終了コード 1")
+    parser.add_argument("--json", help="結果をJSONで書き出すパス")
+    args = parser.parse_args()
+
+    results = sorted((measure(args.module) for _ in range(args.repeat)), key=lambda r: r["total_ms"])
+    result = results[len(results) // 2]
+    summary = summarize(result, args.top)
+
+    totals = [r["total_ms"] for r in results]
+    print(
+        f"import {args.module}: {summary['total_ms']:.1f} ms "
+        f"(median of {len(totals)}, min {min(totals):.1f} / max {max(totals):.1f}, "
+        f"{summary['modules_imported']} modules)"
+    )
+    print(f"\n{'package':<32}{'self ms':>10}")
+    for name, ms in summary["packages"].items():
+        print(f"{name:<32}{ms:>10.1f}")
+    print(f"\n{'module':<48}{'self ms':>10}")
+    for name, ms in summary["modules"].items():
+        print(f"{name:<48}{ms:>10.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {"module": args.module, "median_total_ms": statistics.median(totals), **summary},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+    if args.budget_ms is not None and summary["total_ms"] > args.budget_ms:
+        print(f"\nインポート時間が上限を超えています: {summary['total_ms']:.1f} ms > {args.budget_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
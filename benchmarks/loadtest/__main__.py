@@ -0,0 +1,78 @@
+"""FastAPI アプリの負荷試験（Graph API / Cosmos DB / SQL はメモリ上のスタンドイン）
+
+アプリ本体は本番と同じ create_app で構築し、コンテナにスタンドインを注入する。
+担当者のフォーム作成・候補者のフォーム閲覧・予約・日程再調整のシナリオを混ぜて、
+仮想ユーザー数を段階的に増やしながら実行し、レイテンシ・スループット・エラーを出力する。
+
+実行例:
+    python -m benchmarks.loadtest --users 5,10,20,40 --duration 30
+    python -m benchmarks.loadtest --mode uvicorn --mix poll=6,book=2,reschedule=1,recruiter=1 --json report.json
+    python -m benchmarks.loadtest --latency-scale 0.1 --duration 10  # 依存先が速い場合の上限を見る
+
+mode=inprocess はASGIを直接呼び出し（負荷生成側と同じイベントループ）、mode=uvicorn は
+別スレッドで起動した uvicorn に実際のHTTPで接続する。
+アプリの設定は環境変数で変更できる（例: GRAPH_ADMISSION_ENABLED=false）。
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+
+
+def _parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--users", default="5,10,20", help="段階ごとの仮想ユーザー数（カンマ区切り）")
+    parser.add_argument("--duration", type=float, default=20, help="段階ごとの実行時間（秒）")
+    parser.add_argument("--mix", default="poll=6,book=2,reschedule=1,recruiter=1", help="シナリオの比率")
+    parser.add_argument("--think-ms", type=float, default=500, help="シナリオ間の平均待ち時間（ミリ秒）")
+    parser.add_argument("--forms", type=int, default=200, help="事前に登録する未回答フォームの数")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="スタンドインの遅延の倍率")
+    parser.add_argument("--timeout", type=float, default=60, help="リクエストのタイムアウト（秒）")
+    parser.add_argument("--json", help="レポートをJSONで書き出すパス")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    # 設定はモジュール読み込み時に確定するため、アプリを import する前に設定する
+    os.environ.setdefault("SCHEMA_CHECK_ENABLED", "false")
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    os.environ.setdefault("LOG_FORMAT", "text")
+    os.environ.setdefault("OUTBOX_POLL_INTERVAL_SECONDS", "0.2")
+
+    from benchmarks.loadtest.fakes import LatencyProfile
+    from benchmarks.loadtest.runner import run, write_report
+    from benchmarks.loadtest.scenarios import SCENARIOS
+
+    mix = _parse_mix(args.mix)
+    unknown = set(mix) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"不明なシナリオ: {', '.join(sorted(unknown))}（{', '.join(SCENARIOS)} から選択）")
+
+    options = {
+        "mode": args.mode,
+        "users": [int(u) for u in args.users.split(",")],
+        "duration": args.duration,
+        "mix": mix,
+        "think_seconds": args.think_ms / 1000,
+        "forms": args.forms,
+        "profile": LatencyProfile().scaled(args.latency_scale),
+        "timeout": args.timeout,
+        "notification_queue_path": os.path.join(workdir, "notifications.sqlite3"),
+    }
+    report = asyncio.run(run(options))
+    if args.json:
+        write_report(report, args.json)
+        print(f"レポートを書き出しました: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
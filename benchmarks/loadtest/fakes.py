@@ -0,0 +1,332 @@
+"""負荷試験用の Graph API / Cosmos DB / SQL のスタンドイン
+
+各メソッドは本物のクライアントと同じく同期的に、設定した分布の遅延（time.sleep）を挟んで応答する。
+本番と同じくイベントループ上から同期呼び出しされた場合はループをブロックするため、
+その影響もレイテンシに現れる。状態はすべてメモリ上に保持する。
+"""
+
+import copy
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Iterator
+
+from app.schemas import AppointmentFilter, AppointmentRequest, OutboxMessage, ScheduleRequest
+from app.utils.time import time_string_to_float
+from benchmarks.payloads import make_availability_view
+
+
+@dataclass(frozen=True)
+class Latency:
+    """中央値と99パーセンタイル（ミリ秒）で指定する対数正規分布の遅延"""
+
+    median_ms: float
+    p99_ms: float
+
+    def sample(self, rng: random.Random) -> float:
+        sigma = math.log(self.p99_ms / self.median_ms) / 2.326 if self.p99_ms > self.median_ms else 0.0
+        return rng.lognormvariate(math.log(self.median_ms), sigma) / 1000
+
+    def scaled(self, factor: float) -> "Latency":
+        return Latency(self.median_ms * factor, self.p99_ms * factor)
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    graph: Latency = Latency(120, 800)
+    cosmos: Latency = Latency(8, 40)
+    sql: Latency = Latency(15, 80)
+
+    def scaled(self, factor: float) -> "LatencyProfile":
+        return LatencyProfile(self.graph.scaled(factor), self.cosmos.scaled(factor), self.sql.scaled(factor))
+
+
+class _Delay:
+    def __init__(self, latency: Latency, seed: int):
+        self.latency = latency
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self) -> None:
+        with self._lock:
+            seconds = self.latency.sample(self._rng)
+        time.sleep(seconds)
+
+
+class FakeGraphAPIClient:
+    def __init__(self, latency: Latency, busy_density: float = 0.4, seed: int = 0):
+        self._delay = _Delay(latency, seed)
+        self.busy_density = busy_density
+        self.calls: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, operation: str) -> None:
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+
+    def close(self) -> None:
+        pass
+
+    def refresh_token(self, rejected: str | None = None) -> None:
+        pass
+
+    def post_request(self, url: str, body: dict[str, Any], timeout: int = 60, operation: str = "post") -> dict[str, Any]:
+        self._count(operation)
+        self._delay()
+        return {}
+
+    def get_schedules(self, schedule_req: ScheduleRequest) -> list[dict[str, Any]]:
+        """本物と同じく日付×担当者ごとに1回ずつ呼び出す。内容は担当者と日付から決まる"""
+        slots = int(
+            (time_string_to_float(schedule_req.end_time) - time_string_to_float(schedule_req.start_time))
+            * 60
+            // schedule_req.duration_minutes
+        )
+        day = datetime.strptime(schedule_req.start_date, "%Y-%m-%d")
+        end = datetime.strptime(schedule_req.end_date, "%Y-%m-%d")
+        schedules = []
+        while day <= end:
+            for employee in schedule_req.employee_emails:
+                self._count("get_schedule")
+                self._delay()
+                rng = random.Random(f"{employee.email}:{day.date()}")
+                view = make_availability_view(rng, slots, self.busy_density)
+                schedules.append({"value": [{"scheduleId": employee.email, "availabilityView": view}]})
+            day += timedelta(days=1)
+        return schedules
+
+    def calendar_view_delta(
+        self, employee_email: str, start_datetime: str, end_datetime: str, delta_link: str | None = None
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """予定のミラーの同期用。負荷試験では予定を返さない（空き時間は get_schedules で決まる）"""
+        self._count("calendar_view_delta")
+        self._delay()
+        return [], "fake-delta"
+
+    def register_event(self, employee_email: str, event: dict[str, Any]) -> dict[str, Any]:
+        self._count("register_event")
+        self._delay()
+        event_id = uuid.uuid4().hex
+        return {"id": event_id, "onlineMeeting": {"joinUrl": f"https://teams.example.com/l/meetup-join/{event_id}"}}
+
+    def send_email(self, sender_email: str, target_employee_email: str, subject: str, body: str) -> None:
+        self._count("send_mail")
+        self._delay()
+
+    def send_email_to_recipients(self, sender_email: str, recipient_emails: list[str], subject: str, body: str) -> None:
+        self._count("send_mail")
+        self._delay()
+
+    def update_event_time(self, employee_email: str, event_id: str, start_datetime: str, end_datetime: str) -> None:
+        self._count("update_event")
+        self._delay()
+
+    def delete_event(self, employee_email: str, event_id: str) -> None:
+        self._count("delete_event")
+        self._delay()
+
+
+class FakeCosmosDBClient:
+    def __init__(self, latency: Latency, seed: int = 0):
+        self._delay = _Delay(latency, seed)
+        self._forms: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _put(self, form: dict[str, Any]) -> None:
+        with self._lock:
+            self._forms[form["id"]] = {**copy.deepcopy(form), "_etag": f'"{uuid.uuid4().hex}"'}
+
+    def _get(self, cosmos_db_id: str) -> dict[str, Any]:
+        with self._lock:
+            if cosmos_db_id not in self._forms:
+                raise KeyError(f"form not found: {cosmos_db_id}")
+            return copy.deepcopy(self._forms[cosmos_db_id])
+
+    def close(self) -> None:
+        pass
+
+    def create_form_data(self, payload: dict[str, Any]) -> str:
+        self._delay()
+        cosmos_db_id = str(uuid.uuid4())
+        self._put({**payload, "id": cosmos_db_id, "partitionKey": "form"})
+        return cosmos_db_id
+
+    def create_form_data_batch(self, payloads: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], float]:
+        self._delay()
+        results = []
+        for payload in payloads:
+            cosmos_db_id = payload.get("id") or str(uuid.uuid4())
+            self._put({**payload, "id": cosmos_db_id, "partitionKey": "form"})
+            results.append({"status": "stored", "cosmos_db_id": cosmos_db_id})
+        return results, 0.0
+
+    def get_form_data(self, cosmos_db_id: str, use_cache: bool = True) -> dict[str, Any]:
+        self._delay()
+        return self._get(cosmos_db_id)
+
+    def update_form_data(self, cosmos_db_id: str, schedule_interview_datetime: str, event_ids: dict[str, str]) -> None:
+        self._delay()
+        form = self._get(cosmos_db_id)
+        form.update(schedule_interview_datetime=schedule_interview_datetime, event_ids=event_ids, is_confirmed=True)
+        self._put(form)
+
+    def remove_candidate_from_other_forms(
+        self, selected_cosmos_db_id: str, selected_schedule_interview_datetime: list[str]
+    ) -> None:
+        self._delay()
+
+    def replace_form_data(self, form: dict[str, Any]) -> None:
+        self._delay()
+        self._put(form)
+
+    def confirm_form(self, cosmos_db_id: str) -> None:
+        self._delay()
+        form = self._get(cosmos_db_id)
+        form["is_confirmed"] = True
+        self._put(form)
+
+    def finalize_form(self, cosmos_db_id: str, selected_schedule_interview_datetime: list[str]) -> None:
+        self._delay()
+
+    def delete_form_data(self, cosmos_db_id: str) -> None:
+        self._delay()
+        with self._lock:
+            self._forms.pop(cosmos_db_id, None)
+
+    def seed(self, form: dict[str, Any]) -> str:
+        """遅延なしでフォームを登録する（試験の前準備用）"""
+        self._put(form)
+        return form["id"]
+
+
+class FakeAppointmentRepository:
+    def __init__(self, latency: Latency, seed: int = 0):
+        self._delay = _Delay(latency, seed)
+        self._rows: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.outbox: "FakeOutboxRepository | None" = None
+
+    def get_appointment_by_cosmos_db_id(self, cosmos_db_id: str) -> Any:
+        self._delay()
+        with self._lock:
+            row = self._rows.get(cosmos_db_id)
+        return SimpleNamespace(**row) if row else None
+
+    def create_appointment(
+        self, appointment_req: AppointmentRequest, outbox_messages: list[OutboxMessage] | None = None
+    ) -> None:
+        self._delay()
+        row = {**appointment_req.model_dump(), "created_at": datetime.now(timezone.utc)}
+        with self._lock:
+            self._rows[appointment_req.cosmos_db_id or uuid.uuid4().hex] = row
+        if outbox_messages and self.outbox is not None:
+            self.outbox.enqueue(outbox_messages, delay=False)
+
+    def update_schedule_interview_datetime(self, cosmos_db_id: str, new_schedule_interview_datetime: str) -> None:
+        self._delay()
+        with self._lock:
+            if cosmos_db_id in self._rows:
+                self._rows[cosmos_db_id]["schedule_interview_datetime"] = new_schedule_interview_datetime
+
+    def delete_appointment(self, cosmos_db_id: str) -> None:
+        self._delay()
+        with self._lock:
+            self._rows.pop(cosmos_db_id, None)
+
+    def list_appointments(
+        self, appointment_filter: AppointmentFilter, limit: int, after: tuple[str, int] | None = None
+    ) -> list[Any]:
+        self._delay()
+        return []
+
+    def stream_appointments(self, appointment_filter: AppointmentFilter, batch_size: int = 1000) -> Iterator[Any]:
+        self._delay()
+        return iter(())
+
+    def seed(self, appointment_req: AppointmentRequest) -> None:
+        with self._lock:
+            self._rows[appointment_req.cosmos_db_id] = appointment_req.model_dump()
+
+
+class FakeEmployeeDirectoryRepository:
+    def __init__(self, latency: Latency, employees: int = 500, seed: int = 0):
+        self._delay = _Delay(latency, seed)
+        self._rows = [
+            SimpleNamespace(name=f"社員{i:04d}", mail=f"employee{i:04d}@example.com") for i in range(employees)
+        ]
+
+    def get_all_employee_directory(self) -> Any:
+        self._delay()
+        return list(self._rows)
+
+
+class FakeOutboxRepository:
+    def __init__(self, latency: Latency, seed: int = 0):
+        self._delay = _Delay(latency, seed)
+        self._messages: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def enqueue(self, messages: list[OutboxMessage], delay: bool = True) -> None:
+        if delay:
+            self._delay()
+        now = time.time()
+        with self._lock:
+            for message in messages:
+                self._messages[message.id] = {"message": message, "status": "pending", "available_at": now}
+
+    def _claim_entry(self, entry: dict[str, Any], now: float) -> OutboxMessage | None:
+        if entry["status"] != "pending" or entry["available_at"] > now:
+            return None
+        entry["status"] = "processing"
+        entry["message"] = entry["message"].model_copy(update={"attempts": entry["message"].attempts + 1})
+        return entry["message"]
+
+    def claim(self, limit: int, lease_seconds: float, max_attempts: int) -> list[OutboxMessage]:
+        self._delay()
+        now = time.time()
+        claimed = []
+        with self._lock:
+            for entry in self._messages.values():
+                if len(claimed) >= limit:
+                    break
+                message = self._claim_entry(entry, now)
+                if message is not None:
+                    claimed.append(message)
+        return claimed
+
+    def claim_message(self, message_id: str, lease_seconds: float, max_attempts: int) -> OutboxMessage | None:
+        self._delay()
+        with self._lock:
+            entry = self._messages.get(message_id)
+            return self._claim_entry(entry, time.time()) if entry is not None else None
+
+    def complete(self, message_id: str, follow_ups: list[OutboxMessage] | None = None) -> None:
+        self._delay()
+        with self._lock:
+            self._messages.pop(message_id, None)
+        if follow_ups:
+            self.enqueue(follow_ups, delay=False)
+
+    def fail(
+        self, message_id: str, error: str, retry_at: datetime | None, payload: dict[str, Any] | None = None
+    ) -> None:
+        self._delay()
+        with self._lock:
+            entry = self._messages.get(message_id)
+            if entry is None:
+                return
+            if payload is not None:
+                entry["message"] = entry["message"].model_copy(update={"payload": payload})
+            if retry_at is None:
+                entry["status"] = "failed"
+            else:
+                entry.update(status="pending", available_at=retry_at.replace(tzinfo=timezone.utc).timestamp())
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for e in self._messages.values() if e["status"] != "failed")
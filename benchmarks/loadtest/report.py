@@ -0,0 +1,40 @@
+"""負荷試験・リプレイ結果の集計と表示"""
+
+from collections import Counter, defaultdict
+from typing import Any
+
+from app.utils.stats import summarize_latencies
+from benchmarks.loadtest.scenarios import Result
+
+
+def summarize(results: list[Result], elapsed: float) -> dict[str, Any]:
+    """リクエスト種別ごと（と全体）の件数・スループット・エラー率・レイテンシ（ミリ秒）"""
+    by_name: dict[str, list[Result]] = defaultdict(list)
+    for r in results:
+        by_name[r.name].append(r)
+    by_name["ALL"] = results
+
+    summary = {}
+    for name, items in sorted(by_name.items()):
+        latencies = summarize_latencies([r.seconds for r in items])
+        errors = [r for r in items if not r.ok]
+        summary[name] = {
+            "requests": len(items),
+            "rps": round(len(items) / elapsed, 2) if elapsed else 0.0,
+            "errors": len(errors),
+            "error_rate": round(len(errors) / len(items), 4) if items else 0.0,
+            "statuses": dict(Counter(str(r.status) for r in items)),
+            **{f"{k}_ms": round(v * 1000, 1) for k, v in latencies.items()},
+        }
+    return summary
+
+
+def print_stage(title: str, summary: dict[str, Any]) -> None:
+    print(f"\n== {title} ==")
+    print(f"{'request':<26}{'count':>7}{'rps':>8}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  statuses")
+    for name, s in summary.items():
+        print(
+            f"{name:<26}{s['requests']:>7}{s['rps']:>8.1f}{s['error_rate'] * 100:>6.1f}%"
+            f"{s['p50_ms']:>9.0f}{s['p95_ms']:>9.0f}{s['p99_ms']:>9.0f}{s['max_ms']:>9.0f}  "
+            + " ".join(f"{k}:{v}" for k, v in sorted(s["statuses"].items()))
+        )
@@ -0,0 +1,235 @@
+"""負荷試験の実行とレポート
+
+スタンドインを注入したコンテナでアプリを構築し、仮想ユーザー数を段階的に増やしながら
+シナリオを繰り返し実行する。段階ごとにリクエスト種別別のレイテンシ・スループット・エラーを集計する。
+"""
+
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from typing import Any
+
+import httpx
+import uvicorn
+
+from app.container import Container
+from app.infrastructure.notification_queue import NotificationQueue
+from app.main import create_app
+from app.schemas import AppointmentRequest
+from benchmarks.loadtest.fakes import (
+    FakeAppointmentRepository,
+    FakeCosmosDBClient,
+    FakeEmployeeDirectoryRepository,
+    FakeGraphAPIClient,
+    FakeOutboxRepository,
+    LatencyProfile,
+)
+from benchmarks.loadtest.report import print_stage, summarize
+from benchmarks.loadtest.scenarios import EMPLOYEES, SCENARIOS, Fixtures, Recorder, Result, Session
+
+
+class Backends:
+    """スタンドイン一式（試験後に呼び出し回数などを参照するため保持する）"""
+
+    def __init__(self, profile: LatencyProfile, notification_queue_path: str):
+        self.graph = FakeGraphAPIClient(profile.graph)
+        self.cosmos = FakeCosmosDBClient(profile.cosmos)
+        self.appointments = FakeAppointmentRepository(profile.sql)
+        self.employee_directory = FakeEmployeeDirectoryRepository(profile.sql)
+        self.outbox = FakeOutboxRepository(profile.sql)
+        self.appointments.outbox = self.outbox
+        self.notification_queue_path = notification_queue_path
+
+    def container(self) -> Container:
+        return Container(
+            graph_api_client=self.graph,
+            cosmos_db_client=self.cosmos,
+            appointment_repository=self.appointments,
+            employee_directory_repository=self.employee_directory,
+            outbox_repository=self.outbox,
+            notification_queue=NotificationQueue(self.notification_queue_path),
+        )
+
+
+def _form(rng: random.Random, index: int) -> dict[str, Any]:
+    start = date(2025, 1, 6) + timedelta(days=index % 60)
+    days = rng.randint(3, 7)
+    employees = rng.sample(EMPLOYEES, rng.randint(2, 4))
+    datetimes = [
+        [f"{start + timedelta(days=d)}T{h:02d}:00:00", f"{start + timedelta(days=d)}T{h + 1:02d}:00:00"]
+        for d in range(days)
+        for h in (10, 13, 15)
+    ]
+    return {
+        "id": str(uuid.uuid4()),
+        "partitionKey": "form",
+        "start_date": start.isoformat(),
+        "end_date": (start + timedelta(days=days - 1)).isoformat(),
+        "start_time": "09:00",
+        "end_time": "18:00",
+        "selected_days": ["月", "火", "水", "木", "金"],
+        "duration_minutes": 60,
+        "employee_emails": [{"email": e} for e in employees],
+        "required_participants": max(1, len(employees) // 2),
+        "time_zone": "Tokyo Standard Time",
+        "is_confirmed": False,
+        "schedule_interview_datetimes": datetimes,
+        "slot_employees_map": {f"{s}/{e}": employees for s, e in datetimes},
+        "schedule_interview_datetime": None,
+        "event_ids": None,
+    }
+
+
+def seed(backends: Backends, forms: int, rng: random.Random) -> Fixtures:
+    """未回答のフォームと、予約済み（予定登録済み）のフォームを登録する"""
+    fixtures = Fixtures(open_forms=[], booked_forms=[])
+    for i in range(forms):
+        fixtures.open_forms.append(backends.cosmos.seed(_form(rng, i)))
+    for i in range(max(1, forms // 4)):
+        form = _form(rng, i)
+        start, end = form["schedule_interview_datetimes"][0]
+        form.update(
+            is_confirmed=True,
+            schedule_interview_datetime=f"{start},{end}",
+            event_ids={form["employee_emails"][0]["email"]: uuid.uuid4().hex},
+        )
+        backends.cosmos.seed(form)
+        backends.appointments.seed(
+            AppointmentRequest(
+                schedule_interview_datetime=form["schedule_interview_datetime"],
+                employee_email=form["employee_emails"][0]["email"],
+                candidate_lastname="試験",
+                candidate_firstname=f"花子{i}",
+                company="負荷試験株式会社",
+                candidate_email=f"booked{i}@example.com",
+                cosmos_db_id=form["id"],
+                university=None,
+            )
+        )
+        fixtures.booked_forms.append(form["id"])
+    return fixtures
+
+
+async def _virtual_user(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    fixtures: Fixtures,
+    mix: dict[str, float],
+    think_seconds: float,
+    deadline: float,
+    seed: int,
+) -> None:
+    rng = random.Random(seed)
+    session = Session(client, recorder, fixtures, rng)
+    names, weights = zip(*mix.items())
+    # 全員が同時に開始しないよう、最初の待ち時間をずらす
+    await asyncio.sleep(rng.uniform(0, think_seconds))
+    while time.monotonic() < deadline:
+        await SCENARIOS[rng.choices(names, weights)[0]](session)
+        await asyncio.sleep(rng.expovariate(1 / think_seconds) if think_seconds > 0 else 0)
+
+
+async def run_stage(
+    client: httpx.AsyncClient,
+    fixtures: Fixtures,
+    users: int,
+    duration: float,
+    mix: dict[str, float],
+    think_seconds: float,
+    seed: int,
+) -> tuple[list[Result], float]:
+    recorder = Recorder()
+    started = time.monotonic()
+    deadline = started + duration
+    await asyncio.gather(
+        *[
+            _virtual_user(client, recorder, fixtures, mix, think_seconds, deadline, seed * 100000 + i)
+            for i in range(users)
+        ]
+    )
+    return recorder.results, time.monotonic() - started
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _UvicornThread:
+    """uvicorn を別スレッド（別イベントループ）で起動し、実際のソケット越しに試験する"""
+
+    def __init__(self, app, port: int):
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, name="loadtest-uvicorn", daemon=True)
+
+    def __enter__(self) -> "_UvicornThread":
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("uvicorn の起動に失敗しました")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self.thread.join(10)
+
+
+async def _run_stages(client: httpx.AsyncClient, fixtures: Fixtures, options: dict[str, Any]) -> list[dict[str, Any]]:
+    stages = []
+    for i, users in enumerate(options["users"]):
+        results, elapsed = await run_stage(
+            client, fixtures, users, options["duration"], options["mix"], options["think_seconds"], seed=i
+        )
+        summary = summarize(results, elapsed)
+        print_stage(f"{users} users", summary)
+        stages.append({"users": users, "elapsed_seconds": round(elapsed, 2), "requests": summary})
+    return stages
+
+
+async def run(options: dict[str, Any]) -> dict[str, Any]:
+    backends = Backends(options["profile"], options["notification_queue_path"])
+    fixtures = seed(backends, options["forms"], random.Random(0))
+    app = create_app(backends.container)
+    timeout = httpx.Timeout(options["timeout"])
+
+    if options["mode"] == "uvicorn":
+        port = _free_port()
+        with _UvicornThread(app, port):
+            limits = httpx.Limits(max_connections=max(options["users"]) * 2)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=timeout, limits=limits) as client:
+                stages = await _run_stages(client, fixtures, options)
+    else:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+                stages = await _run_stages(client, fixtures, options)
+
+    print("\n== saturation ==")
+    print(f"{'users':>7}{'rps':>9}{'p50 ms':>9}{'p99 ms':>9}{'err%':>7}")
+    for stage in stages:
+        total = stage["requests"]["ALL"]
+        print(
+            f"{stage['users']:>7}{total['rps']:>9.1f}{total['p50_ms']:>9.0f}"
+            f"{total['p99_ms']:>9.0f}{total['error_rate'] * 100:>6.1f}%"
+        )
+    print(f"\nbackend calls: graph={dict(backends.graph.calls)} outbox_pending={backends.outbox.pending()}")
+
+    return {
+        "mode": options["mode"],
+        "mix": options["mix"],
+        "duration_seconds": options["duration"],
+        "stages": stages,
+        "backend_calls": {"graph": dict(backends.graph.calls)},
+    }
+
+
+def write_report(report: dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,176 @@
+"""負荷試験のシナリオ（利用者1人分の一連の操作）
+
+各シナリオは Session を受け取り、HTTPリクエストを順に送る。
+リクエストごとの結果は Session.request が Recorder に記録する。
+"""
+
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+EMPLOYEES = [f"interviewer{i:03d}@example.com" for i in range(30)]
+
+
+@dataclass
+class Result:
+    name: str
+    status: int | str
+    seconds: float
+    started_at: float
+
+    @property
+    def ok(self) -> bool:
+        return isinstance(self.status, int) and self.status < 400
+
+
+@dataclass
+class Recorder:
+    results: list[Result] = field(default_factory=list)
+
+    def add(self, result: Result) -> None:
+        self.results.append(result)
+
+
+@dataclass
+class Fixtures:
+    """試験前に登録したデータのID"""
+
+    open_forms: list[str]
+    booked_forms: list[str]
+
+
+class Session:
+    """1人の仮想ユーザー。ETag を覚えて条件付きGETを送る"""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, fixtures: Fixtures, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.fixtures = fixtures
+        self.rng = rng
+        self.etags: dict[str, str] = {}
+
+    async def request(self, name: str, method: str, url: str, **kwargs: Any) -> httpx.Response | None:
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except Exception as e:
+            self.recorder.add(Result(name, type(e).__name__, time.perf_counter() - started, started_at))
+            return None
+        self.recorder.add(Result(name, response.status_code, time.perf_counter() - started, started_at))
+        return response
+
+    async def get_form(self, name: str, path: str, cosmos_db_id: str) -> dict[str, Any] | None:
+        headers = {}
+        if cosmos_db_id in self.etags:
+            headers["If-None-Match"] = self.etags[cosmos_db_id]
+        response = await self.request(name, "GET", path, params={"cosmos_db_id": cosmos_db_id}, headers=headers)
+        if response is None or response.status_code != 200:
+            return None
+        if "etag" in response.headers:
+            self.etags[cosmos_db_id] = response.headers["etag"]
+        return response.json()
+
+
+def schedule_request(rng: random.Random, interviewers: int, days: int) -> dict[str, Any]:
+    start = date(2025, 1, 6) + timedelta(days=rng.randrange(0, 60))
+    return {
+        "start_date": start.isoformat(),
+        "end_date": (start + timedelta(days=days - 1)).isoformat(),
+        "start_time": "09:00",
+        "end_time": "18:00",
+        "selected_days": ["月", "火", "水", "木", "金"],
+        "duration_minutes": 60,
+        "employee_emails": [{"email": e} for e in rng.sample(EMPLOYEES, interviewers)],
+        "required_participants": max(1, interviewers // 2),
+    }
+
+
+def appointment_request(cosmos_db_id: str, slot: list[str] | None, rng: random.Random) -> dict[str, Any]:
+    n = rng.randrange(100000)
+    return {
+        "schedule_interview_datetime": f"{slot[0]},{slot[1]}" if slot else None,
+        "employee_email": EMPLOYEES[0],
+        "candidate_lastname": "試験",
+        "candidate_firstname": f"太郎{n}",
+        "company": "負荷試験株式会社",
+        "candidate_email": f"candidate{n}@example.com",
+        "cosmos_db_id": cosmos_db_id,
+        "interview_stage": "1次面接",
+        "university": None,
+    }
+
+
+async def recruiter_creates_form(session: Session) -> None:
+    """担当者が空き時間を検索し、その結果でフォームを作成する"""
+    schedule_req = schedule_request(session.rng, interviewers=session.rng.randint(2, 5), days=session.rng.randint(3, 10))
+    response = await session.request("POST /availability", "POST", "/availability", json=schedule_req)
+    if response is None or response.status_code != 200:
+        return
+    availability = response.json()
+    form = {
+        **schedule_req,
+        "schedule_interview_datetimes": availability["common_availability"][:20],
+        "slot_employees_map": availability["slot_employees_map"],
+    }
+    response = await session.request("POST /store_form_data", "POST", "/store_form_data", json=form)
+    if response is not None and response.status_code == 200:
+        session.fixtures.open_forms.append(response.json()["cosmos_db_id"])
+
+
+async def candidate_polls(session: Session) -> None:
+    """候補者がフォームを開き、しばらくして再読み込みする（2回目以降は条件付きGET）"""
+    cosmos_db_id = session.rng.choice(session.fixtures.open_forms)
+    for _ in range(session.rng.randint(1, 3)):
+        await session.get_form("GET /retrieve_form_data", "/retrieve_form_data", cosmos_db_id)
+
+
+async def candidate_books(session: Session) -> None:
+    """候補者がフォームを開いて候補日時を選び、予約する（二重送信対策のキー付き）"""
+    cosmos_db_id = session.rng.choice(session.fixtures.open_forms)
+    session.etags.pop(cosmos_db_id, None)
+    form = await session.get_form("GET /retrieve_form_data", "/retrieve_form_data", cosmos_db_id)
+    if form is None:
+        return
+    slots = form.get("schedule_interview_datetimes") or []
+    slot = session.rng.choice(slots) if slots else None
+    await session.request(
+        "POST /appointment",
+        "POST",
+        "/appointment",
+        json=appointment_request(cosmos_db_id, slot, session.rng),
+        headers={"Idempotency-Key": uuid.uuid4().hex},
+    )
+
+
+async def candidate_reschedules(session: Session) -> None:
+    """予約済みの候補者が再調整画面を開き、別の日時に変更する"""
+    cosmos_db_id = session.rng.choice(session.fixtures.booked_forms)
+    session.etags.pop(cosmos_db_id, None)
+    form = await session.get_form("GET /reschedule", "/reschedule", cosmos_db_id)
+    if form is None:
+        return
+    slots = form.get("schedule_interview_datetimes") or []
+    if not slots:
+        return
+    start, end = session.rng.choice(slots)
+    await session.request(
+        "POST /reschedule",
+        "POST",
+        "/reschedule",
+        json={"cosmos_db_id": cosmos_db_id, "schedule_interview_datetime": f"{start},{end}"},
+        headers={"Idempotency-Key": uuid.uuid4().hex},
+    )
+
+
+SCENARIOS: dict[str, Callable[[Session], Awaitable[None]]] = {
+    "recruiter": recruiter_creates_form,
+    "poll": candidate_polls,
+    "book": candidate_books,
+    "reschedule": candidate_reschedules,
+}
@@ -0,0 +1,77 @@
+"""ベンチマーク・負荷試験用の合成データ生成
+
+Graph API の getSchedule のレスポンスを、GraphAPIClient.get_schedules と同じ順序
+（日付ごとに担当者の順）で生成する。乱数は seed で固定し、同じ引数なら同じデータを返す。
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+from app.schemas import EmployeeEmail
+from app.utils.time import time_string_to_float
+
+
+@dataclass(frozen=True)
+class ScheduleScenario:
+    """合成データの条件（担当者数、日数、availabilityView の1文字あたりの分数、予定の埋まり具合）"""
+
+    interviewers: int
+    days: int
+    interval_minutes: int
+    busy_density: float
+    start_date: str = "2025-01-06"
+    start_time: str = "09:00"
+    end_time: str = "18:00"
+    seed: int = 0
+
+    @property
+    def label(self) -> str:
+        return f"{self.interviewers}x{self.days}d/{self.interval_minutes}m/{self.busy_density}"
+
+    @property
+    def end_date(self) -> str:
+        return (date.fromisoformat(self.start_date) + timedelta(days=self.days - 1)).isoformat()
+
+    @property
+    def slots_per_day(self) -> int:
+        hours = time_string_to_float(self.end_time) - time_string_to_float(self.start_time)
+        return int(hours * 60 // self.interval_minutes)
+
+    def employee_emails(self) -> list[EmployeeEmail]:
+        return [EmployeeEmail(email=f"interviewer{i:03d}@example.com") for i in range(self.interviewers)]
+
+
+def make_availability_view(rng: random.Random, slots: int, busy_density: float) -> str:
+    """予定が連続して入る傾向を持たせた availabilityView（0: 空き, 1: 仮, 2: 予定あり）を作る"""
+    view = []
+    while len(view) < slots:
+        length = rng.randint(1, 4)
+        if rng.random() < busy_density:
+            view.extend(rng.choice("2221") for _ in range(length))
+        else:
+            view.extend("0" * length)
+    return "".join(view[:slots])
+
+
+def make_schedule_payloads(scenario: ScheduleScenario) -> list[dict[str, Any]]:
+    """getSchedule のレスポンス（日付×担当者の順）を生成する"""
+    rng = random.Random(scenario.seed)
+    emails = [e.email for e in scenario.employee_emails()]
+    payloads = []
+    for _ in range(scenario.days):
+        for email in emails:
+            payloads.append(
+                {
+                    "value": [
+                        {
+                            "scheduleId": email,
+                            "availabilityView": make_availability_view(
+                                rng, scenario.slots_per_day, scenario.busy_density
+                            ),
+                        }
+                    ]
+                }
+            )
+    return payloads
@@ -0,0 +1,146 @@
+"""記録したリクエスト（capture_middleware の出力）を対象のインスタンスに再送する
+
+元のタイミング（--speed 1）、速めた・遅めたタイミング（--speed 2 で2倍速）、
+または待ち時間なし（--speed 0、--concurrency で同時実行数を制限）で再送し、
+ルートごとのレイテンシ・スループット・エラーと、記録時の応答との差を出力する。
+
+実行例:
+    python -m benchmarks.replay data/capture/requests.jsonl* --target http://localhost:8000
+    python -m benchmarks.replay capture.jsonl --target http://staging:8000 --speed 4 --json replay.json
+    python -m benchmarks.replay capture.jsonl --target http://localhost:8000 --speed 0 --concurrency 20
+
+記録内の個人情報はハッシュ化されているため、対象には本番データではなく試験用の環境を使うこと。
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from typing import Any
+
+import httpx
+
+from app.utils.stats import percentile
+from benchmarks.loadtest.report import print_stage, summarize
+from benchmarks.loadtest.scenarios import Result
+
+
+def load_captures(paths: list[str], route_filter: str = "") -> list[dict[str, Any]]:
+    """複数のファイル（ローテーション済みのものを含む）を読み込み、記録時刻順に並べる"""
+    captures = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                capture = json.loads(line)
+                if route_filter in f"{capture['method']} {capture.get('route') or capture['path']}":
+                    captures.append(capture)
+    captures.sort(key=lambda c: c["ts"])
+    return captures
+
+
+def request_name(capture: dict[str, Any]) -> str:
+    return f"{capture['method']} {capture.get('route') or capture['path']}"
+
+
+async def _send(client: httpx.AsyncClient, capture: dict[str, Any]) -> Result:
+    kwargs: dict[str, Any] = {"params": capture["query"], "headers": capture["headers"]}
+    if capture["body"] is not None:
+        kwargs["content"] = json.dumps(capture["body"], ensure_ascii=False).encode("utf-8")
+    started_at = time.time()
+    started = time.perf_counter()
+    try:
+        response = await client.request(capture["method"], capture["path"], **kwargs)
+        status: int | str = response.status_code
+    except Exception as e:
+        status = type(e).__name__
+    return Result(request_name(capture), status, time.perf_counter() - started, started_at)
+
+
+async def replay(
+    captures: list[dict[str, Any]], target: str, speed: float, concurrency: int, timeout: float
+) -> tuple[list[tuple[dict[str, Any], Result]], float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    first_ts = captures[0]["ts"]
+    started = time.monotonic()
+
+    async def send_at(client: httpx.AsyncClient, capture: dict[str, Any]) -> tuple[dict[str, Any], Result]:
+        async with semaphore:
+            return capture, await _send(client, capture)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=target, timeout=timeout, limits=limits) as client:
+        tasks = []
+        for capture in captures:
+            if speed > 0:
+                delay = started + (capture["ts"] - first_ts) / speed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send_at(client, capture)))
+        pairs = await asyncio.gather(*tasks)
+    return pairs, time.monotonic() - started
+
+
+def compare_with_capture(pairs: list[tuple[dict[str, Any], Result]]) -> dict[str, Any]:
+    """記録時と再送時のステータスの不一致数と、p50 レイテンシの比較（ミリ秒）"""
+    comparison: dict[str, Any] = {}
+    names = sorted({result.name for _, result in pairs})
+    for name in names:
+        items = [(c, r) for c, r in pairs if r.name == name]
+        mismatches = Counter(f"{c['status']}->{r.status}" for c, r in items if c["status"] != r.status)
+        comparison[name] = {
+            "captured_p50_ms": round(percentile([c["duration_ms"] for c, _ in items], 0.5), 1),
+            "replayed_p50_ms": round(percentile([r.seconds * 1000 for _, r in items], 0.5), 1),
+            "status_mismatches": dict(mismatches),
+        }
+    return comparison
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="記録ファイル（ローテーション済みのものも指定可）")
+    parser.add_argument("--target", required=True, help="再送先のベースURL")
+    parser.add_argument("--speed", type=float, default=1.0, help="再送の速さ（1: 記録どおり、0: 待ち時間なし）")
+    parser.add_argument("--concurrency", type=int, default=100, help="同時に送るリクエストの上限")
+    parser.add_argument("--filter", default="", help="'METHOD ルート' にこの文字列を含むものだけ再送する")
+    parser.add_argument("--limit", type=int, default=0, help="再送する件数の上限（0 は全件）")
+    parser.add_argument("--timeout", type=float, default=60, help="リクエストのタイムアウト（秒）")
+    parser.add_argument("--json", help="レポートをJSONで書き出すパス")
+    args = parser.parse_args()
+
+    captures = load_captures(args.paths, args.filter)
+    if args.limit:
+        captures = captures[: args.limit]
+    if not captures:
+        print("再送するリクエストがありません", file=sys.stderr)
+        return 1
+    span = captures[-1]["ts"] - captures[0]["ts"]
+    print(f"{len(captures)} 件（記録期間 {span:.0f} 秒）を {args.target} に再送します")
+
+    pairs, elapsed = asyncio.run(replay(captures, args.target, args.speed, args.concurrency, args.timeout))
+    summary = summarize([r for _, r in pairs], elapsed)
+    print_stage(f"replay x{args.speed}" if args.speed > 0 else "replay (no wait)", summary)
+
+    comparison = compare_with_capture(pairs)
+    print(f"\n{'request':<40}{'captured p50':>14}{'replayed p50':>14}  status mismatches")
+    for name, c in comparison.items():
+        mismatches = " ".join(f"{k}:{v}" for k, v in sorted(c["status_mismatches"].items())) or "-"
+        print(f"{name:<40}{c['captured_p50_ms']:>14.1f}{c['replayed_p50_ms']:>14.1f}  {mismatches}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {"target": args.target, "speed": args.speed, "requests": summary, "comparison": comparison},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        print(f"レポートを書き出しました: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
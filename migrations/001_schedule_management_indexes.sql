@@ -0,0 +1,22 @@
+-- schedule_management の一覧・エクスポートAPI向けインデックス
+-- 面接担当者・面接ステージ・日時範囲での絞り込みと
+-- (scheduled_interview_datetime, cosmos_db_id) によるキーセットページネーションを支える。
+-- ※ キーセット用のインデックスは 003_schedule_management_keyset_id.sql で (…, id) に置き換える。
+-- 何度実行しても安全なように存在チェックを行う。
+-- ※ インデックス対象カラムが NVARCHAR(MAX) の場合は先に NVARCHAR(255) へ変更すること。
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_schedule_management_cosmos_db_id' AND object_id = OBJECT_ID('dbo.schedule_management'))
+    CREATE INDEX ix_schedule_management_cosmos_db_id
+        ON dbo.schedule_management (cosmos_db_id);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_schedule_management_datetime' AND object_id = OBJECT_ID('dbo.schedule_management'))
+    CREATE INDEX ix_schedule_management_datetime
+        ON dbo.schedule_management (scheduled_interview_datetime, cosmos_db_id);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_schedule_management_employee_datetime' AND object_id = OBJECT_ID('dbo.schedule_management'))
+    CREATE INDEX ix_schedule_management_employee_datetime
+        ON dbo.schedule_management (employee_email, scheduled_interview_datetime, cosmos_db_id);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_schedule_management_stage_datetime' AND object_id = OBJECT_ID('dbo.schedule_management'))
+    CREATE INDEX ix_schedule_management_stage_datetime
+        ON dbo.schedule_management (interview_stage, scheduled_interview_datetime, cosmos_db_id);
@@ -0,0 +1,22 @@
+-- アポイントメント登録の副作用（Graphイベント登録・Cosmos更新・メール送信）を
+-- schedule_management への INSERT と同一トランザクションで記録するアウトボックス。
+-- app/workers/outbox_worker.py が status/available_at を見て処理する。
+
+IF OBJECT_ID('dbo.appointment_outbox', 'U') IS NULL
+    CREATE TABLE dbo.appointment_outbox (
+        id            NVARCHAR(36)  NOT NULL PRIMARY KEY,
+        message_type  NVARCHAR(64)  NOT NULL,
+        aggregate_id  NVARCHAR(255) NULL,
+        payload       NVARCHAR(MAX) NOT NULL,
+        status        NVARCHAR(16)  NOT NULL,
+        attempts      INT           NOT NULL DEFAULT 0,
+        available_at  DATETIME2     NOT NULL,
+        locked_until  DATETIME2     NULL,
+        last_error    NVARCHAR(MAX) NULL,
+        created_at    DATETIME2     NOT NULL,
+        processed_at  DATETIME2     NULL
+    );
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_appointment_outbox_status_available_at' AND object_id = OBJECT_ID('dbo.appointment_outbox'))
+    CREATE INDEX ix_appointment_outbox_status_available_at
+        ON dbo.appointment_outbox (status, available_at);
@@ -0,0 +1,30 @@
+-- schedule_management のキーセットページネーション用の一意なキー
+-- (scheduled_interview_datetime, cosmos_db_id) は一意でない（同じフォームからの再登録や cosmos_db_id が NULL の行がある）ため、
+-- 同じ日時の行がページの境界をまたぐと取りこぼし・重複が起きる。IDENTITY の id を追加し、
+-- (scheduled_interview_datetime, id) の順で読み出す。
+-- 001 の (…, cosmos_db_id) のインデックスは置き換える。何度実行しても安全なように存在チェックを行う。
+-- 同じバッチで追加した id を参照するインデックスは、コンパイル時にカラムが解決できないため EXEC で作成する。
+
+IF COL_LENGTH('dbo.schedule_management', 'id') IS NULL
+    ALTER TABLE dbo.schedule_management ADD id BIGINT IDENTITY(1, 1) NOT NULL;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ux_schedule_management_id' AND object_id = OBJECT_ID('dbo.schedule_management'))
+    EXEC('CREATE UNIQUE INDEX ux_schedule_management_id ON dbo.schedule_management (id)');
+
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_schedule_management_datetime' AND object_id = OBJECT_ID('dbo.schedule_management'))
+    DROP INDEX ix_schedule_management_datetime ON dbo.schedule_management;
+
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_schedule_management_employee_datetime' AND object_id = OBJECT_ID('dbo.schedule_management'))
+    DROP INDEX ix_schedule_management_employee_datetime ON dbo.schedule_management;
+
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_schedule_management_stage_datetime' AND object_id = OBJECT_ID('dbo.schedule_management'))
+    DROP INDEX ix_schedule_management_stage_datetime ON dbo.schedule_management;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_schedule_management_datetime_id' AND object_id = OBJECT_ID('dbo.schedule_management'))
+    EXEC('CREATE INDEX ix_schedule_management_datetime_id ON dbo.schedule_management (scheduled_interview_datetime, id)');
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_schedule_management_employee_datetime_id' AND object_id = OBJECT_ID('dbo.schedule_management'))
+    EXEC('CREATE INDEX ix_schedule_management_employee_datetime_id ON dbo.schedule_management (employee_email, scheduled_interview_datetime, id)');
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_schedule_management_stage_datetime_id' AND object_id = OBJECT_ID('dbo.schedule_management'))
+    EXEC('CREATE INDEX ix_schedule_management_stage_datetime_id ON dbo.schedule_management (interview_stage, scheduled_interview_datetime, id)');
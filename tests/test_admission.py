@@ -0,0 +1,135 @@
+import asyncio
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import app.utils.admission as admission
+from app.schemas.form import EmployeeEmail, ScheduleRequest
+from app.utils.admission import GraphAdmissionController, estimate_graph_cost, get_client_id, record_graph_call
+from app.utils.rate_limit import AsyncTokenBucket
+
+
+def _controller(**overrides) -> GraphAdmissionController:
+    options = dict(
+        rate_per_second=1.0,
+        burst=100.0,
+        reserve_ratio=0.2,
+        client_rate_per_second=1.0,
+        client_burst=50.0,
+        max_wait_seconds=0.0,
+    )
+    options.update(overrides)
+    return GraphAdmissionController(**options)
+
+
+def _request(forwarded_for: str | None = None, peer: str = "10.0.0.1") -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for is not None else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 12345)})
+
+
+def test_estimate_graph_cost_counts_interviewers_times_days():
+    schedule_req = ScheduleRequest.model_construct(
+        start_date=str(date(2025, 1, 6)),
+        end_date=str(date(2025, 1, 10)),
+        selected_days=[],
+        employee_emails=[EmployeeEmail.model_construct(email=f"e{i}@example.com") for i in range(3)],
+    )
+
+    assert estimate_graph_cost(schedule_req) == 15
+
+
+def test_token_bucket_give_does_not_exceed_capacity():
+    bucket = AsyncTokenBucket(0.0, 10.0)
+    bucket.take(4)
+    bucket.give(2)
+    assert bucket.available() == pytest.approx(8)
+    bucket.give(100)
+    assert bucket.available() == pytest.approx(10)
+
+
+def test_oversized_cost_is_clamped_instead_of_rejected():
+    controller = _controller()
+
+    charged = asyncio.run(controller.admit("client", 1800))
+
+    # 送信元の容量（50）で受け付け、422 にはしない
+    assert charged == 50
+    assert controller.stats()["decisions"] == {"standard.admitted": 1}
+
+
+def test_exhausted_client_gets_429_with_retry_after():
+    controller = _controller()
+
+    async def scenario():
+        await controller.admit("client", 50)
+        await controller.admit("client", 10)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(scenario())
+    assert excinfo.value.status_code == 429
+    assert int(excinfo.value.headers["Retry-After"]) >= 1
+
+
+def test_standard_requests_leave_the_reserve_for_candidates():
+    controller = _controller(client_burst=100.0)
+
+    async def scenario():
+        await controller.admit("a", 80)
+        with pytest.raises(HTTPException):
+            await controller.admit("b", 10)
+        # 候補者向けの処理は確保された容量を使える
+        return await controller.admit_reserved(20)
+
+    assert asyncio.run(scenario()) == 20
+    assert controller.stats()["decisions"]["reserved.admitted"] == 1
+
+
+def test_metered_refunds_calls_that_did_not_reach_graph():
+    controller = _controller()
+
+    async def scenario():
+        async with controller.metered("client", 10):
+            # 10件のうち Graph API を呼び出したのは3件（残りはミラー・キャッシュから返した）
+            for _ in range(3):
+                await asyncio.to_thread(record_graph_call)
+
+    asyncio.run(scenario())
+
+    assert controller.stats()["refunded_tokens"] == pytest.approx(7, abs=0.1)
+    assert controller._clients["client"].available() == pytest.approx(47, abs=0.1)
+
+
+def test_record_graph_call_outside_metered_is_ignored():
+    record_graph_call()
+
+
+def test_client_id_uses_the_hop_appended_by_the_trusted_proxy():
+    # 先頭はクライアントが偽装できる値、末尾がイングレスの追加した実際の送信元
+    request = _request("203.0.113.9, 198.51.100.7")
+
+    assert get_client_id(request, trusted_proxy_hops=1) == "198.51.100.7"
+    assert get_client_id(request, trusted_proxy_hops=2) == "203.0.113.9"
+    assert get_client_id(request, trusted_proxy_hops=0) == "10.0.0.1"
+
+
+def test_client_id_falls_back_to_peer_when_header_is_too_short():
+    assert get_client_id(_request("198.51.100.7"), trusted_proxy_hops=2) == "10.0.0.1"
+    assert get_client_id(_request(), trusted_proxy_hops=1) == "10.0.0.1"
+
+
+def test_tracked_clients_are_bounded(monkeypatch):
+    monkeypatch.setattr(admission, "_MAX_TRACKED_CLIENTS", 3)
+    controller = _controller()
+
+    async def scenario():
+        for client_id in ["a", "b", "c"]:
+            await controller.admit(client_id, 1)
+        await controller.admit("a", 1)
+        await controller.admit("d", 1)
+
+    asyncio.run(scenario())
+
+    # 最も長く使われていない b が捨てられる
+    assert list(controller._clients) == ["c", "a", "d"]
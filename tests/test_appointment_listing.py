@@ -0,0 +1,106 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Iterator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.dependencies import get_export_appointments_usecase
+from app.infrastructure.appointment_repository import AppointmentRepository
+from app.routers.appointment_router import router
+from app.schemas import AppointmentFilter, AppointmentRequest
+from app.usecases.appointment.export_appointments_usecase import ExportAppointmentsUsecase
+from app.usecases.appointment.list_appointments_usecase import ListAppointmentsUsecase
+
+SAME_SLOT = "2025-01-10T10:00:00,2025-01-10T11:00:00"
+
+
+@pytest.fixture
+def repository():
+    repository = AppointmentRepository()
+    repository.engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    with repository.engine.begin() as conn:
+        # SQLite では IDENTITY の代わりに INTEGER PRIMARY KEY で id を採番する
+        conn.execute(
+            text(
+                "CREATE TABLE schedule_management ("
+                "scheduled_interview_datetime TEXT, employee_email TEXT, candidate_lastname TEXT, "
+                "candidate_firstname TEXT, company TEXT, candidate_email TEXT, cosmos_db_id TEXT, "
+                "candidate_id INTEGER, interview_stage TEXT, id INTEGER PRIMARY KEY AUTOINCREMENT)"
+            )
+        )
+    return repository
+
+
+def _appointment(cosmos_db_id: str | None, slot: str = SAME_SLOT) -> AppointmentRequest:
+    return AppointmentRequest.model_construct(
+        schedule_interview_datetime=slot,
+        employee_email="interviewer@example.com",
+        candidate_lastname="青木",
+        candidate_firstname="駿介",
+        company="株式会社サンプル",
+        candidate_email="candidate@example.com",
+        cosmos_db_id=cosmos_db_id,
+        candidate_id=1,
+        interview_stage="1",
+    )
+
+
+def test_pages_do_not_skip_or_repeat_rows_with_the_same_key(repository):
+    # 同じ日時・同じ cosmos_db_id（再登録）や cosmos_db_id のない行が混ざっていても、すべて1回ずつ返す
+    for cosmos_db_id in ["form-1", "form-1", None, None, "form-2"]:
+        repository.create_appointment(_appointment(cosmos_db_id))
+    repository.create_appointment(_appointment("form-0", "2025-01-09T10:00:00,2025-01-09T11:00:00"))
+    usecase = ListAppointmentsUsecase(repository)
+
+    seen: list[str | None] = []
+    cursor = None
+    while True:
+        page = asyncio.run(usecase.execute(AppointmentFilter(), 2, cursor))
+        seen.extend(item.cosmos_db_id for item in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert seen[0] == "form-0"
+    assert sorted(seen[1:], key=str) == sorted(["form-1", "form-1", None, None, "form-2"], key=str)
+
+
+class FailingRepository:
+    def __init__(self, fail_after: int | None):
+        self.fail_after = fail_after
+
+    def stream_appointments(self, appointment_filter: AppointmentFilter, batch_size: int = 1000) -> Iterator[Any]:
+        if self.fail_after is None:
+            raise ConnectionError("database unavailable")
+        for i in range(self.fail_after):
+            yield SimpleNamespace(_mapping={"cosmos_db_id": f"form-{i}"})
+        raise ConnectionError("connection reset")
+
+
+def _client(fail_after: int | None) -> TestClient:
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_export_appointments_usecase] = lambda: ExportAppointmentsUsecase(
+        FailingRepository(fail_after), batch_size=1
+    )
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_export_returns_500_when_the_query_fails():
+    response = _client(None).get("/appointments/export", params={"format": "ndjson"})
+
+    assert response.status_code == 500
+
+
+def test_export_error_after_streaming_started_is_not_a_complete_file():
+    usecase = ExportAppointmentsUsecase(FailingRepository(2), batch_size=1)
+
+    chunks = usecase.execute(AppointmentFilter(), "ndjson")
+    with pytest.raises(ConnectionError):
+        list(chunks)
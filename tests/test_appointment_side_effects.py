@@ -0,0 +1,317 @@
+import asyncio
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+import requests
+from fastapi import HTTPException
+
+import app.infrastructure.graph_api as graph_api
+from app.config.config import get_config
+from app.infrastructure.graph_api import GraphAPIClient
+from app.schemas import AppointmentRequest, OutboxMessage
+from app.usecases.schedule.appointment_side_effects_usecase import (
+    EVENT_GENERATION_KEY,
+    REGISTER_EVENT,
+    AppointmentSideEffectsUsecase,
+)
+from app.usecases.schedule.appointment_usecase import AppointmentUsecase
+from app.workers.outbox_worker import OutboxWorker
+
+APPOINTMENT = {
+    "schedule_interview_datetime": "2025-01-10T10:00:00,2025-01-10T11:00:00",
+    "employee_email": "interviewer@example.com",
+    "candidate_lastname": "青木",
+    "candidate_firstname": "駿介",
+    "company": "株式会社サンプル",
+    "candidate_email": "candidate@example.com",
+    "cosmos_db_id": "form-1",
+    "candidate_id": 1,
+    "interview_stage": "1",
+    "university": "インテリ大学",
+}
+
+
+class GraphStub:
+    """transactionId が同じ登録には既存のイベントを返す（Graph API の重複防止と同じ振る舞い）"""
+
+    def __init__(self, fail_after_create: int = 0):
+        self.fail_after_create = fail_after_create
+        self.events: dict[str, dict[str, Any]] = {}
+        self.transaction_ids: list[str] = []
+
+    def live_events(self) -> list[dict[str, Any]]:
+        return [event for event in self.events.values() if not event["deleted"]]
+
+    def register_event(self, employee_email: str, event: dict[str, Any]) -> dict[str, Any]:
+        transaction_id = event["transactionId"]
+        self.transaction_ids.append(transaction_id)
+        created = self.events.get(transaction_id)
+        if created is None or created["deleted"]:
+            event_id = uuid.uuid4().hex
+            created = {"id": event_id, "deleted": False, "onlineMeeting": {"joinUrl": f"https://teams/{event_id}"}}
+            self.events[transaction_id] = created
+        if self.fail_after_create:
+            # Graph API 側では登録済みだが、クライアントには応答が届かない（タイムアウトなど）
+            self.fail_after_create -= 1
+            raise TimeoutError("read timed out")
+        return created
+
+    def delete_event(self, employee_email: str, event_id: str) -> None:
+        for event in self.events.values():
+            if event["id"] == event_id:
+                event["deleted"] = True
+
+
+class CosmosStub:
+    def __init__(self, fail_updates: int = 0):
+        self.fail_updates = fail_updates
+        self.form = {"id": "form-1", "schedule_interview_datetime": None, "event_ids": {}}
+
+    def get_form_data(self, cosmos_db_id: str, use_cache: bool = True) -> dict[str, Any]:
+        return dict(self.form)
+
+    def update_form_data(self, cosmos_db_id: str, schedule_interview_datetime: str, event_ids: dict[str, str]) -> None:
+        if self.fail_updates:
+            self.fail_updates -= 1
+            raise RuntimeError("cosmos unavailable")
+        self.form.update(schedule_interview_datetime=schedule_interview_datetime, event_ids=event_ids)
+
+
+class AppointmentRepositoryStub:
+    def __init__(self, outbox: "OutboxRepositoryStub | None" = None):
+        self.outbox = outbox
+
+    def create_appointment(self, appointment_req: AppointmentRequest, outbox_messages: list[OutboxMessage]) -> None:
+        self.outbox.enqueue(outbox_messages)
+
+    def get_appointment_by_cosmos_db_id(self, cosmos_db_id: str) -> Any:
+        return SimpleNamespace(cosmos_db_id=cosmos_db_id)
+
+
+class OutboxRepositoryStub:
+    """再試行の待ち時間を無視して、失敗したメッセージを次の claim ですぐに返す"""
+
+    def __init__(self, messages: list[OutboxMessage]):
+        self.messages = {message.id: message for message in messages}
+        self.status = {message.id: "pending" for message in messages}
+        self.follow_ups: list[OutboxMessage] = []
+
+    def enqueue(self, messages: list[OutboxMessage]) -> None:
+        for message in messages:
+            self.messages[message.id] = message
+            self.status[message.id] = "pending"
+
+    def claim_message(self, message_id: str, lease_seconds: float, max_attempts: int) -> OutboxMessage | None:
+        if self.status.get(message_id) != "pending":
+            return None
+        message = self.messages[message_id].model_copy(
+            update={"attempts": self.messages[message_id].attempts + 1}, deep=True
+        )
+        self.messages[message_id] = message
+        self.status[message_id] = "processing"
+        return message
+
+    def claim(self, limit: int, lease_seconds: float, max_attempts: int) -> list[OutboxMessage]:
+        claimed = []
+        for message_id in [message_id for message_id, status in self.status.items() if status == "pending"][:limit]:
+            claimed.append(self.claim_message(message_id, lease_seconds, max_attempts))
+        return claimed
+
+    def complete(self, message_id: str, follow_ups: list[OutboxMessage] | None = None) -> None:
+        self.status[message_id] = "done"
+        self.follow_ups.extend(follow_ups or [])
+
+    def fail(self, message_id: str, error: str, retry_at: Any, payload: dict[str, Any] | None = None) -> None:
+        self.status[message_id] = "pending" if retry_at is not None else "failed"
+        if payload is not None:
+            self.messages[message_id] = self.messages[message_id].model_copy(update={"payload": payload})
+
+
+class GraphSessionStub:
+    """Graph API の HTTP 応答（イベントの登録は成功し、削除は既に存在しないため 404 を返す）"""
+
+    def __init__(self):
+        self.requests: list[tuple[str, str]] = []
+
+    @staticmethod
+    def _response(url: str, status_code: int, body: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status_code
+        response.url = url
+        response._content = body
+        return response
+
+    def request(self, method: str, url: str, headers: dict[str, str], **kwargs) -> requests.Response:
+        self.requests.append((method, url))
+        if method == "POST":
+            event_id = f"event-{len(self.requests)}"
+            body = f'{{"id": "{event_id}", "onlineMeeting": {{"joinUrl": "https://teams/{event_id}"}}}}'
+            return self._response(url, 201, body.encode())
+        return self._response(url, 404, b'{"error": {"code": "ErrorItemNotFound"}}')
+
+    def close(self) -> None:
+        pass
+
+
+def _worker(repository: OutboxRepositoryStub, graph: GraphStub, cosmos: CosmosStub) -> OutboxWorker:
+    worker = OutboxWorker(repository, poll_interval_seconds=0, batch_size=10, max_attempts=5, lease_seconds=60)
+    worker.register_handlers(
+        AppointmentSideEffectsUsecase(graph, cosmos, AppointmentRepositoryStub(), None).handlers()
+    )
+    return worker
+
+
+def _run_until_done(graph: GraphStub, cosmos: CosmosStub) -> OutboxRepositoryStub:
+    message = OutboxMessage(message_type=REGISTER_EVENT, aggregate_id="form-1", payload=dict(APPOINTMENT))
+    repository = OutboxRepositoryStub([message])
+    worker = _worker(repository, graph, cosmos)
+
+    async def drain() -> None:
+        deadline = time.monotonic() + 5
+        while await worker.run_once() and time.monotonic() < deadline:
+            pass
+
+    asyncio.run(drain())
+    assert repository.status[message.id] == "done"
+    return repository
+
+
+def test_retry_after_lost_response_reuses_the_created_event():
+    graph = GraphStub(fail_after_create=1)
+    cosmos = CosmosStub()
+
+    repository = _run_until_done(graph, cosmos)
+
+    assert len(graph.transaction_ids) == 2
+    assert len(set(graph.transaction_ids)) == 1
+    live = graph.live_events()
+    assert len(live) == 1
+    assert cosmos.form["event_ids"] == {APPOINTMENT["employee_email"]: live[0]["id"]}
+    assert repository.follow_ups[0].payload["meeting_urls"] == [live[0]["onlineMeeting"]["joinUrl"]]
+
+
+def test_retry_after_compensation_registers_a_new_event():
+    graph = GraphStub()
+    cosmos = CosmosStub(fail_updates=1)
+
+    repository = _run_until_done(graph, cosmos)
+
+    # 1回目のイベントは取り消しで削除済みのため、世代を進めた transactionId で登録し直す
+    first, second = graph.transaction_ids
+    assert first != second
+    assert repository.messages[next(iter(repository.messages))].payload[EVENT_GENERATION_KEY] == 1
+    live = graph.live_events()
+    assert len(live) == 1
+    assert cosmos.form["event_ids"] == {APPOINTMENT["employee_email"]: live[0]["id"]}
+
+
+@pytest.fixture
+def wait_for_event(monkeypatch):
+    """予定登録を待って会議URLを返す設定（明示的に有効にした場合のみ）"""
+    monkeypatch.setitem(get_config(), "APPOINTMENT_EVENT_WAIT_SECONDS", 5)
+
+
+def test_already_deleted_event_counts_as_compensated(monkeypatch):
+    monkeypatch.setattr(graph_api, "acquire_access_token", lambda: ("token", 3600))
+    graph = GraphAPIClient()
+    graph.session = GraphSessionStub()
+
+    message = OutboxMessage(message_type=REGISTER_EVENT, aggregate_id="form-1", payload=dict(APPOINTMENT))
+    repository = OutboxRepositoryStub([message])
+    worker = _worker(repository, graph, CosmosStub(fail_updates=1))
+
+    async def drain() -> None:
+        deadline = time.monotonic() + 5
+        while await worker.run_once() and time.monotonic() < deadline:
+            pass
+
+    asyncio.run(drain())
+
+    # 取り消しの削除が 404（既に存在しない）でも削除できたものとして世代を進める
+    assert [method for method, _ in graph.session.requests] == ["POST", "DELETE", "POST"]
+    assert repository.status[message.id] == "done"
+    assert repository.messages[message.id].payload[EVENT_GENERATION_KEY] == 1
+
+
+def test_graph_not_found_is_surfaced_as_404(monkeypatch):
+    monkeypatch.setattr(graph_api, "acquire_access_token", lambda: ("token", 3600))
+    graph = GraphAPIClient()
+    graph.session = GraphSessionStub()
+
+    with pytest.raises(HTTPException) as excinfo:
+        graph.delete_event("interviewer@example.com", "event-1")
+    assert excinfo.value.status_code == 404
+
+
+def test_appointment_only_enqueues_by_default():
+    graph = GraphStub()
+    repository = OutboxRepositoryStub([])
+    worker = _worker(repository, graph, CosmosStub())
+    usecase = AppointmentUsecase(AppointmentRepositoryStub(repository), repository, worker)
+
+    response = asyncio.run(usecase.execute(AppointmentRequest(**APPOINTMENT)))
+
+    # SQL のコミットだけで応答し、Graph API の登録はワーカーに任せる
+    assert response.meeting_urls == []
+    assert graph.transaction_ids == []
+    assert list(repository.status.values()) == ["pending"]
+    assert worker._wakeup.is_set()
+
+
+def test_appointment_response_contains_the_meeting_url(wait_for_event):
+    graph = GraphStub()
+    repository = OutboxRepositoryStub([])
+    usecase = AppointmentUsecase(
+        AppointmentRepositoryStub(repository), repository, _worker(repository, graph, CosmosStub())
+    )
+
+    response = asyncio.run(usecase.execute(AppointmentRequest(**APPOINTMENT)))
+
+    assert response.meeting_urls == [graph.live_events()[0]["onlineMeeting"]["joinUrl"]]
+    assert list(repository.status.values()) == ["done"]
+    assert repository.follow_ups[0].payload["meeting_urls"] == response.meeting_urls
+
+
+def test_appointment_is_accepted_when_registration_fails(wait_for_event):
+    repository = OutboxRepositoryStub([])
+    usecase = AppointmentUsecase(
+        AppointmentRepositoryStub(repository), repository, _worker(repository, GraphStub(fail_after_create=1), CosmosStub())
+    )
+
+    response = asyncio.run(usecase.execute(AppointmentRequest(**APPOINTMENT)))
+
+    # 登録は再試行に回り、会議URLは確認メールで送られる
+    assert response.meeting_urls == []
+    assert list(repository.status.values()) == ["pending"]
+
+
+def test_registration_outlives_the_request_after_the_wait(monkeypatch):
+    monkeypatch.setitem(get_config(), "APPOINTMENT_EVENT_WAIT_SECONDS", 0.05)
+    graph = GraphStub()
+    repository = OutboxRepositoryStub([])
+    worker = _worker(repository, graph, CosmosStub())
+    register_event = graph.register_event
+
+    def slow_register_event(employee_email: str, event: dict[str, Any]) -> dict[str, Any]:
+        time.sleep(0.2)
+        return register_event(employee_email, event)
+
+    graph.register_event = slow_register_event
+
+    async def scenario():
+        # 予約ごとにユースケースを作り直す（リクエストごとの依存性注入と同じ）
+        usecase = AppointmentUsecase(AppointmentRepositoryStub(repository), repository, worker)
+        response = await usecase.execute(AppointmentRequest(**APPOINTMENT))
+        del usecase
+        assert len(worker._pending) == 1
+        await asyncio.gather(*worker._pending)
+        return response
+
+    response = asyncio.run(scenario())
+
+    assert response.meeting_urls == []
+    assert list(repository.status.values()) == ["done"]
+    assert len(graph.live_events()) == 1
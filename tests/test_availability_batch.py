@@ -0,0 +1,69 @@
+import pytest
+
+from app.schemas.form import EmployeeEmail, ScheduleRequest
+from app.usecases.schedule.availability_batch_usecase import ScheduleFetch, ViewSlice, plan_fetches
+from app.utils.availability import resample_availability_view
+
+
+def _schedule_request(start: str, end: str, duration: int, emails: list[str], days: int = 1) -> ScheduleRequest:
+    return ScheduleRequest.model_construct(
+        start_date="2025-01-06",
+        end_date=f"2025-01-{5 + days:02d}",
+        start_time=start,
+        end_time=end,
+        selected_days=[],
+        duration_minutes=duration,
+        employee_emails=[EmployeeEmail.model_construct(email=email) for email in emails],
+        required_participants=1,
+        time_zone="Tokyo Standard Time",
+    )
+
+
+def test_resample_takes_the_highest_status_of_each_chunk():
+    assert resample_availability_view("00102200", 0, 2, 4) == "0120"
+    assert resample_availability_view("00102200", 1, 3, 2) == "12"
+
+
+def test_resample_drops_incomplete_trailing_chunks():
+    assert resample_availability_view("0000", 1, 2, 3) == "0"
+    assert resample_availability_view("", 0, 1, 2) == ""
+
+
+def test_requests_for_the_same_interviewer_share_one_fetch():
+    first = _schedule_request("10:00", "12:00", 30, ["A@example.com"])
+    second = _schedule_request("10:30", "12:00", 60, ["a@example.com"])
+
+    [[first_slice], [second_slice]] = plan_fetches([first, second])
+
+    fetch = ScheduleFetch("A@example.com", "2025-01-06", 600, 720, 30, "Tokyo Standard Time")
+    assert first_slice == ViewSlice(fetch, offset=0, ratio=1, count=4)
+    assert second_slice == ViewSlice(fetch, offset=1, ratio=2, count=1)
+
+
+def test_slices_follow_the_get_schedules_order():
+    schedule_req = _schedule_request("10:00", "11:00", 30, ["a@example.com", "b@example.com"], days=2)
+
+    [slices] = plan_fetches([schedule_req])
+
+    assert [(s.fetch.day, s.fetch.email) for s in slices] == [
+        ("2025-01-06", "a@example.com"),
+        ("2025-01-06", "b@example.com"),
+        ("2025-01-07", "a@example.com"),
+        ("2025-01-07", "b@example.com"),
+    ]
+
+
+def test_interval_below_the_graph_minimum_is_not_shared():
+    first = _schedule_request("10:00", "11:00", 7, ["a@example.com"])
+    second = _schedule_request("10:00", "11:00", 5, ["a@example.com"])
+
+    [[first_slice], [second_slice]] = plan_fetches([first, second])
+
+    assert first_slice.fetch != second_slice.fetch
+    assert (first_slice.fetch.interval_minutes, first_slice.ratio, first_slice.count) == (7, 1, 8)
+    assert (second_slice.fetch.interval_minutes, second_slice.ratio, second_slice.count) == (5, 1, 12)
+
+
+def test_non_positive_duration_is_rejected():
+    with pytest.raises(ValueError):
+        plan_fetches([_schedule_request("10:00", "11:00", 0, ["a@example.com"])])
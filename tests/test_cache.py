@@ -0,0 +1,44 @@
+import threading
+import time
+
+from app.infrastructure.cache import MemoryCacheBackend
+
+
+class SlowSetBackend(MemoryCacheBackend):
+    """set を遅くして、確認と書き込みの間に他のスレッドが入り込む余地を広げる"""
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        time.sleep(0.05)
+        super().set(key, value, ttl_seconds)
+
+
+def test_memory_add_is_atomic_across_threads():
+    backend = SlowSetBackend(max_entries=100)
+    barrier = threading.Barrier(8)
+    results: list[bool] = []
+
+    def add() -> None:
+        barrier.wait()
+        results.append(backend.add("idempotency:key-1", b"pending", 30))
+
+    threads = [threading.Thread(target=add) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 1
+
+
+def test_memory_add_succeeds_after_expiry_and_respects_the_entry_limit():
+    backend = MemoryCacheBackend(max_entries=2)
+
+    assert backend.add("a", b"1", 0.01)
+    assert not backend.add("a", b"2", 30)
+    time.sleep(0.02)
+    assert backend.add("a", b"3", 30)
+    backend.add("b", b"1", 30)
+    backend.add("c", b"1", 30)
+
+    assert backend.get("a") is None
+    assert backend.get("c") == b"1"
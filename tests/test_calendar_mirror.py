@@ -0,0 +1,113 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.config.config import get_config
+from app.container import Container
+from app.infrastructure.calendar_mirror import CalendarMirror
+from app.schemas.form import ScheduleRequest
+from app.utils.availability import build_availability_view
+from app.workers.calendar_syncer import parse_changes
+
+DAY = date(2025, 1, 10)
+START = datetime(2025, 1, 10, 1, 0, tzinfo=timezone.utc).timestamp()
+
+
+def test_build_availability_view_takes_the_highest_status_per_slot():
+    intervals = [
+        (START, START + 1800, 1),
+        (START + 900, START + 3600, 2),
+        (START + 5400, START + 5500, 3),
+    ]
+
+    assert build_availability_view(intervals, START, 1800, 4) == "2203"
+
+
+def test_build_availability_view_clips_events_outside_the_window():
+    intervals = [(START - 7200, START + 600, 2), (START + 7000, START + 99999, 4)]
+
+    assert build_availability_view(intervals, START, 1800, 4) == "2004"
+    assert build_availability_view([], START, 1800, 3) == "000"
+
+
+def test_parse_changes_splits_upserts_and_removals():
+    events = [
+        {
+            "id": "busy",
+            "showAs": "busy",
+            "start": {"dateTime": "2025-01-10T01:00:00.0000000"},
+            "end": {"dateTime": "2025-01-10T02:00:00.0000000"},
+        },
+        {
+            "id": "tentative",
+            "showAs": "tentative",
+            "start": {"dateTime": "2025-01-10T03:00:00.0000000"},
+            "end": {"dateTime": "2025-01-10T03:30:00.0000000"},
+        },
+        {"id": "deleted", "@removed": {"reason": "deleted"}},
+        {"id": "cancelled", "isCancelled": True, "showAs": "busy"},
+        {"id": "free", "showAs": "free"},
+    ]
+
+    upserts, removed = parse_changes(events)
+
+    assert upserts == [
+        ("busy", int(START), int(START + 3600), 2),
+        ("tentative", int(START + 7200), int(START + 9000), 1),
+    ]
+    assert removed == ["deleted", "cancelled", "free"]
+
+
+def _schedule_request() -> ScheduleRequest:
+    return ScheduleRequest.model_construct(
+        start_date=str(DAY),
+        end_date=str(DAY),
+        start_time="10:00",
+        end_time="12:00",
+        selected_days=[],
+        duration_minutes=30,
+        time_zone="Tokyo Standard Time",
+    )
+
+
+def test_mark_stale_sends_lookups_back_to_graph(tmp_path):
+    mirror = CalendarMirror(str(tmp_path / "mirror.sqlite3"), max_mailboxes=10, max_staleness_seconds=120)
+    mirror.track(["Interviewer@example.com"])
+    window_start = int(START) - 86400
+    mirror.apply_changes(
+        "interviewer@example.com",
+        [("event-1", int(START), int(START + 3600), 2)],
+        [],
+        "delta",
+        window_start,
+        window_start + 7 * 86400,
+        reset=True,
+        next_sync_at=0,
+    )
+    targets = [(DAY, "interviewer@example.com")]
+
+    assert mirror.get_schedules(_schedule_request(), targets)[0]["value"][0]["availabilityView"] == "2200"
+
+    mirror.mark_stale("Interviewer@example.com")
+    assert mirror.get_schedules(_schedule_request(), targets) == [None]
+    mirror.close()
+
+
+@pytest.fixture
+def mirror_config(monkeypatch, tmp_path):
+    config = get_config()
+    monkeypatch.setitem(config, "CALENDAR_MIRROR_ENABLED", True)
+    monkeypatch.setitem(config, "CALENDAR_MIRROR_PATH", str(tmp_path / "mirror.sqlite3"))
+    return config
+
+
+def test_mirror_is_used_with_a_single_replica(mirror_config, monkeypatch):
+    monkeypatch.setitem(mirror_config, "APP_REPLICAS", 1)
+
+    assert isinstance(Container._calendar_mirror(), CalendarMirror)
+
+
+def test_mirror_is_disabled_with_multiple_replicas(mirror_config, monkeypatch):
+    monkeypatch.setitem(mirror_config, "APP_REPLICAS", 2)
+
+    assert Container._calendar_mirror() is None
@@ -0,0 +1,38 @@
+import pytest
+
+import app.middlewares.capture_middleware as capture_middleware
+from app.config.config import get_config
+from app.main import create_app
+
+
+@pytest.fixture
+def secret(monkeypatch):
+    monkeypatch.setitem(get_config(), "REQUEST_CAPTURE_HASH_SECRET", "test-secret")
+
+
+def _middleware_names(app) -> list[str]:
+    return [m.kwargs["dispatch"].__name__ for m in app.user_middleware if "dispatch" in m.kwargs]
+
+
+def test_candidate_id_is_replaced_with_a_stable_number(secret):
+    body = {"candidate_id": 1234567890, "candidate_email": "taro@example.com", "interview_stage": "1"}
+
+    first = capture_middleware.sanitize(body)
+    second = capture_middleware.sanitize(dict(body))
+
+    assert isinstance(first["candidate_id"], int)
+    assert first["candidate_id"] != body["candidate_id"]
+    assert first == second
+    assert first["candidate_email"].endswith("@redacted.invalid")
+    assert first["interview_stage"] == "1"
+
+
+def test_capture_is_not_registered_without_hash_secret(monkeypatch):
+    config = get_config()
+    monkeypatch.setitem(config, "REQUEST_CAPTURE_ENABLED", True)
+    monkeypatch.setitem(config, "REQUEST_CAPTURE_HASH_SECRET", "")
+
+    assert "capture_requests_middleware" not in _middleware_names(create_app(lambda: None))
+
+    monkeypatch.setitem(config, "REQUEST_CAPTURE_HASH_SECRET", "test-secret")
+    assert "capture_requests_middleware" in _middleware_names(create_app(lambda: None))
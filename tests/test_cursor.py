@@ -0,0 +1,23 @@
+import pytest
+
+from app.utils.cursor import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips_and_is_url_safe():
+    cursor = encode_cursor(("2025-01-10T10:00:00,2025-01-10T11:00:00", 42))
+
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+    assert decode_cursor(cursor) == ("2025-01-10T10:00:00,2025-01-10T11:00:00", 42)
+
+
+def test_cursor_without_datetime_decodes_to_empty_string():
+    assert decode_cursor(encode_cursor((None, 7))) == ("", 7)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["", "not-base64!", encode_cursor(("2025-01-10", "7")), encode_cursor(("2025-01-10", True)), "WyJhIl0"],
+)
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
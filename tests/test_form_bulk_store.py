@@ -0,0 +1,129 @@
+import asyncio
+from typing import Any
+
+from azure.core.exceptions import ServiceResponseError
+from azure.cosmos import exceptions
+
+from app.infrastructure.az_cosmos import AzCosmosDBClient
+from app.schemas import FormData
+from app.usecases.form.store_form_data_bulk_usecase import StoreFormDataBulkUsecase
+
+
+class ContainerStub:
+    """トランザクションバッチを受け付けるコンテナ
+
+    committed_batch: サーバー側ではコミットするが、クライアントにはタイムアウトを返す（応答の消失）
+    lost_creates: 1件ずつの保存でも、コミット後に応答が届かない回数
+    readable: read_item が応答するか
+    """
+
+    def __init__(self, committed_batch: bool = False, lost_creates: int = 0, readable: bool = True):
+        self.committed_batch = committed_batch
+        self.lost_creates = lost_creates
+        self.readable = readable
+        self.items: dict[str, dict[str, Any]] = {}
+
+    def execute_item_batch(self, batch_operations, partition_key, response_hook=None):
+        if self.committed_batch:
+            for _, (document,) in batch_operations:
+                self.items[document["id"]] = {**document, "_etag": "1"}
+        raise ServiceResponseError("read timed out")
+
+    def create_item(self, body, response_hook=None):
+        if body["id"] in self.items:
+            raise exceptions.CosmosResourceExistsError(status_code=409, message="conflict")
+        self.items[body["id"]] = {**body, "_etag": "1"}
+        if self.lost_creates:
+            self.lost_creates -= 1
+            raise ServiceResponseError("read timed out")
+        return body
+
+    def read_item(self, item, partition_key, response_hook=None):
+        if not self.readable:
+            raise ServiceResponseError("read timed out")
+        if item not in self.items:
+            raise exceptions.CosmosResourceNotFoundError(status_code=404, message="not found")
+        return dict(self.items[item])
+
+
+def _client(container: ContainerStub) -> AzCosmosDBClient:
+    client = AzCosmosDBClient()
+    client._container = container
+    return client
+
+
+PAYLOADS = [{"start_date": "2025-01-06", "duration_minutes": 30}, {"start_date": "2025-01-07", "duration_minutes": 60}]
+
+
+def test_failed_batch_is_retried_item_by_item():
+    container = ContainerStub()
+
+    results, _ = _client(container).create_form_data_batch(PAYLOADS)
+
+    assert [r["status"] for r in results] == ["stored", "stored"]
+    assert [container.items[r["cosmos_db_id"]]["start_date"] for r in results] == ["2025-01-06", "2025-01-07"]
+
+
+def test_batch_committed_on_the_server_is_not_reported_as_conflict():
+    container = ContainerStub(committed_batch=True)
+
+    results, _ = _client(container).create_form_data_batch(PAYLOADS)
+
+    assert [r["status"] for r in results] == ["stored", "stored"]
+    assert len(container.items) == 2
+
+
+def test_conflict_with_different_content_is_still_an_error():
+    container = ContainerStub()
+    container.items["fixed-id"] = {"id": "fixed-id", "start_date": "2024-12-31"}
+
+    results, _ = _client(container).create_form_data_batch([{**PAYLOADS[0], "id": "fixed-id"}])
+
+    assert results == [{"status": "failed", "error": "Duplicate cosmos_db_id", "status_code": 409}]
+
+
+def test_timed_out_create_is_read_back():
+    container = ContainerStub(lost_creates=1)
+
+    results, _ = _client(container).create_form_data_batch(PAYLOADS)
+
+    assert [r["status"] for r in results] == ["stored", "stored"]
+    assert len(container.items) == 2
+
+
+def test_unverifiable_timeout_is_unknown_with_the_id():
+    container = ContainerStub(lost_creates=2, readable=False)
+
+    results, _ = _client(container).create_form_data_batch(PAYLOADS)
+
+    assert [r["status"] for r in results] == ["unknown", "unknown"]
+    assert [r["cosmos_db_id"] for r in results] == list(container.items)
+
+
+class FailingCosmosClient:
+    def __init__(self):
+        self.payloads: list[dict[str, Any]] = []
+
+    def create_form_data_batch(self, payloads):
+        self.payloads.extend(payloads)
+        raise TimeoutError("transport timed out")
+
+
+def test_unexpected_error_reports_items_as_unknown_not_failed():
+    cosmos = FailingCosmosClient()
+    form = FormData(
+        start_date="2025-01-06",
+        end_date="2025-01-10",
+        start_time="10:00",
+        end_time="18:00",
+        selected_days=[],
+        duration_minutes=30,
+        employee_emails=[{"email": "interviewer@example.com"}],
+        required_participants=1,
+    )
+
+    response = asyncio.run(StoreFormDataBulkUsecase(cosmos, batch_size=100, max_concurrency=1).execute([form, form]))
+
+    assert (response.succeeded, response.failed, response.unknown) == (0, 0, 2)
+    assert [r.cosmos_db_id for r in response.results] == [p["id"] for p in cosmos.payloads]
+    assert len({r.cosmos_db_id for r in response.results}) == 2
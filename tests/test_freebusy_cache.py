@@ -0,0 +1,70 @@
+from datetime import date
+from typing import Any
+
+import pytest
+
+from app.infrastructure.cache import Cache, MemoryCacheBackend
+from app.infrastructure.graph_api import GraphAPIClient
+from app.schemas.form import EmployeeEmail, ScheduleRequest
+
+DAY = date(2025, 1, 10)
+
+
+def _schedule_request() -> ScheduleRequest:
+    return ScheduleRequest.model_construct(
+        start_date=str(DAY),
+        end_date=str(DAY),
+        start_time="10:00",
+        end_time="12:00",
+        selected_days=[],
+        duration_minutes=30,
+        employee_emails=[EmployeeEmail.model_construct(email="Interviewer@example.com")],
+        required_participants=1,
+        time_zone="Tokyo Standard Time",
+    )
+
+
+@pytest.fixture
+def client(monkeypatch):
+    backend = MemoryCacheBackend(max_entries=100)
+    graph = GraphAPIClient(freebusy_cache=Cache(backend, "freebusy", ttl_seconds=60))
+    graph.views = ["0000"]
+    graph.fetches = 0
+
+    def get_schedule(schedule_req: ScheduleRequest, day: date, email: str) -> dict[str, Any]:
+        graph.fetches += 1
+        return {"value": [{"scheduleId": email, "availabilityView": graph.views[-1]}]}
+
+    monkeypatch.setattr(graph, "_get_schedule", get_schedule)
+    monkeypatch.setattr(graph, "delete_event", lambda email, event_id: graph._invalidate_freebusy(email))
+    graph.backend = backend
+    return graph
+
+
+def _view(client: GraphAPIClient) -> str:
+    return client.get_schedules(_schedule_request())[0]["value"][0]["availabilityView"]
+
+
+def test_repeated_lookup_is_served_from_cache(client):
+    assert _view(client) == "0000"
+    assert _view(client) == "0000"
+    assert client.fetches == 1
+
+
+def test_event_change_invalidates_the_interviewer(client):
+    _view(client)
+    client.views.append("2200")
+    client.delete_event("interviewer@example.com", "event-1")
+
+    assert _view(client) == "2200"
+    assert client.fetches == 2
+
+
+def test_lost_generation_does_not_return_results_from_before_the_change(client):
+    _view(client)
+    client.views.append("2200")
+    client.delete_event("interviewer@example.com", "event-1")
+    # 世代のキーだけが追い出された（期限切れ・障害）場合も、変更前の結果は返さない
+    client.backend.delete("freebusy:gen:interviewer@example.com")
+
+    assert _view(client) == "2200"
@@ -0,0 +1,43 @@
+from starlette.requests import Request
+
+from app.utils.http_cache import digest, is_not_modified, make_etag
+
+
+def _request(if_none_match: str | None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match is not None else []
+    return Request({"type": "http", "headers": headers})
+
+
+def test_digest_does_not_depend_on_key_order():
+    assert digest({"a": 1, "b": [1, 2]}) == digest({"b": [1, 2], "a": 1})
+    assert digest({"a": 1}) != digest({"a": 2})
+
+
+def test_etag_is_quoted_and_changes_with_the_version():
+    etag = make_etag("form-1", "v1")
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag("form-1", "v1")
+    assert etag != make_etag("form-1", "v2")
+
+
+def test_matching_if_none_match_is_not_modified():
+    etag = make_etag("form-1", "v1")
+
+    assert is_not_modified(_request(etag), etag)
+    assert is_not_modified(_request(f'"other", W/{etag}'), etag)
+    assert is_not_modified(_request("*"), etag)
+
+
+def test_etag_with_compression_suffix_still_matches():
+    etag = make_etag("form-1", "v1")
+
+    assert is_not_modified(_request(etag[:-1] + '-gzip"'), etag)
+    assert is_not_modified(_request(etag[:-1] + '-br"'), etag)
+
+
+def test_missing_or_different_if_none_match_is_modified():
+    etag = make_etag("form-1", "v1")
+
+    assert not is_not_modified(_request(None), etag)
+    assert not is_not_modified(_request(make_etag("form-1", "v2")), etag)
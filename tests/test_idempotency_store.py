@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.infrastructure.cache import Cache, MemoryCacheBackend, SQLiteCacheBackend
+from app.infrastructure.idempotency_store import REPLAYED_HEADER, IdempotencyStore
+
+
+def _store(backend) -> IdempotencyStore:
+    return IdempotencyStore(Cache(backend, "idempotency", ttl_seconds=60), lease_seconds=30, wait_timeout_seconds=5)
+
+
+class Appointment:
+    """予約の作成（呼び出し回数を数え、release まで完了しない）"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        await self.release.wait()
+        return {"message": "ok", "call": self.calls}
+
+
+def test_duplicate_on_another_worker_waits_and_replays(tmp_path):
+    # 同じ SQLite ファイルを共有する2つのワーカー
+    path = str(tmp_path / "cache.sqlite3")
+    first, second = _store(SQLiteCacheBackend(path)), _store(SQLiteCacheBackend(path))
+
+    async def scenario():
+        appointment = Appointment()
+        original = asyncio.create_task(first.execute("appointment", "key-1", "fp", appointment))
+        await asyncio.sleep(0.05)
+        duplicate = asyncio.create_task(second.execute("appointment", "key-1", "fp", appointment))
+        await asyncio.sleep(0.1)
+        appointment.release.set()
+        return appointment.calls, await original, await duplicate
+
+    calls, original, duplicate = asyncio.run(scenario())
+
+    assert calls == 1
+    assert duplicate.body == original.body
+    assert duplicate.headers[REPLAYED_HEADER] == "true"
+
+
+def test_in_flight_key_is_not_evicted_by_other_entries():
+    backend = MemoryCacheBackend(max_entries=2)
+    store = _store(backend)
+
+    async def scenario():
+        appointment = Appointment()
+        original = asyncio.create_task(store.execute("appointment", "key-1", "fp", appointment))
+        await asyncio.sleep(0.01)
+        # 実行中に他のキャッシュの書き込みで実行中の印が追い出されても、重複して実行しない
+        for i in range(5):
+            backend.set(f"form:{i}", b"{}", 60)
+        duplicate = asyncio.create_task(store.execute("appointment", "key-1", "fp", appointment))
+        await asyncio.sleep(0.01)
+        appointment.release.set()
+        await original
+        await duplicate
+        return appointment.calls
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_failure_releases_the_key(tmp_path):
+    store = _store(SQLiteCacheBackend(str(tmp_path / "cache.sqlite3")))
+
+    async def fail():
+        raise HTTPException(status_code=500, detail="予定作成エラー")
+
+    async def succeed():
+        return {"message": "ok"}
+
+    async def scenario():
+        with pytest.raises(HTTPException):
+            await store.execute("appointment", "key-1", "fp", fail)
+        return await store.execute("appointment", "key-1", "fp", succeed)
+
+    response = asyncio.run(scenario())
+    assert REPLAYED_HEADER not in response.headers
+
+
+def test_key_reused_with_different_request_is_rejected(tmp_path):
+    store = _store(SQLiteCacheBackend(str(tmp_path / "cache.sqlite3")))
+
+    async def succeed():
+        return {"message": "ok"}
+
+    async def scenario():
+        await store.execute("appointment", "key-1", "fp-1", succeed)
+        await store.execute("appointment", "key-1", "fp-2", succeed)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(scenario())
+    assert excinfo.value.status_code == 422
+
+
+@pytest.mark.parametrize("backend_kind", ["memory", "sqlite"])
+def test_add_writes_only_when_absent_or_expired(tmp_path, backend_kind):
+    backend = MemoryCacheBackend(10) if backend_kind == "memory" else SQLiteCacheBackend(str(tmp_path / "c.sqlite3"))
+
+    assert backend.add("k", b"1", 60) is True
+    assert backend.add("k", b"2", 60) is False
+    assert backend.get("k") == b"1"
+    backend.set("expired", b"1", -1)
+    assert backend.add("expired", b"2", 60) is True
+    assert backend.get("expired") == b"2"
@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+from app.infrastructure.notification_queue import NotificationQueue
+from app.schemas.notification import Notification
+from app.workers.notification_dispatcher import MAX_RECIPIENTS_PER_MESSAGE, NotificationDispatcher
+
+
+class MailStub:
+    """sendMail の呼び出しを記録する（failures 回まで失敗する）"""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.sent: list[tuple[str, list[str], str]] = []
+
+    def send_email_to_recipients(self, sender_email: str, recipients: list[str], subject: str, body: str) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("graph unavailable")
+        self.sent.append((sender_email, recipients, subject))
+
+
+@pytest.fixture
+def queue(tmp_path) -> NotificationQueue:
+    return NotificationQueue(str(tmp_path / "notification_queue.sqlite3"))
+
+
+def _dispatcher(queue: NotificationQueue, mail: MailStub, **overrides) -> NotificationDispatcher:
+    options = dict(
+        max_concurrency=4,
+        rate_per_second=1000,
+        batch_size=500,
+        max_attempts=3,
+        lease_seconds=60,
+        poll_interval_seconds=0.01,
+        retention_seconds=3600,
+    )
+    options.update(overrides)
+    return NotificationDispatcher(queue, mail, **options)
+
+
+def _notification(recipient: str, subject: str = "面接日程のご案内") -> Notification:
+    return Notification(
+        sender_email="noreply@example.com", recipient_email=recipient, subject=subject, body="<p>本文</p>"
+    )
+
+
+def test_identical_notifications_are_merged_into_one_send(queue):
+    mail = MailStub()
+    queue.enqueue(
+        [_notification("a@example.com"), _notification("b@example.com"), _notification("a@example.com")]
+        + [_notification("c@example.com", subject="別件")]
+    )
+
+    processed = asyncio.run(_dispatcher(queue, mail).run_once())
+
+    assert processed == 4
+    assert sorted((subject, recipients) for _, recipients, subject in mail.sent) == [
+        ("別件", ["c@example.com"]),
+        ("面接日程のご案内", ["a@example.com", "b@example.com"]),
+    ]
+    assert queue.stats()["sent"] == 4
+
+
+def test_large_groups_are_split_by_the_recipient_limit(queue):
+    mail = MailStub()
+    queue.enqueue([_notification(f"user{i}@example.com") for i in range(MAX_RECIPIENTS_PER_MESSAGE + 50)])
+
+    asyncio.run(_dispatcher(queue, mail).run_once())
+
+    assert sorted(len(recipients) for _, recipients, _ in mail.sent) == [50, MAX_RECIPIENTS_PER_MESSAGE]
+
+
+def test_sends_are_rate_limited(queue):
+    mail = MailStub()
+    queue.enqueue([_notification("a@example.com", subject=f"件名{i}") for i in range(24)])
+
+    started = time.monotonic()
+    asyncio.run(_dispatcher(queue, mail, rate_per_second=20).run_once())
+
+    # バケットの容量（20通）を超えた4通は補充を待つ
+    assert len(mail.sent) == 24
+    assert time.monotonic() - started >= 0.15
+
+
+def test_failed_send_is_retried_then_dead_lettered(queue):
+    mail = MailStub(failures=10)
+    queue.enqueue([_notification("a@example.com")])
+    dispatcher = _dispatcher(queue, mail, max_attempts=2)
+
+    asyncio.run(dispatcher.run_once())
+    assert queue.stats()["pending"] == 1
+
+    # 再試行時刻を待たずに取得させる
+    queue._connect().execute("UPDATE notifications SET available_at = 0")
+    asyncio.run(dispatcher.run_once())
+
+    assert queue.stats()["failed"] == 1
+    assert mail.sent == []
+
+
+def test_expired_lease_at_max_attempts_is_dead_lettered(queue):
+    queue.enqueue([_notification("a@example.com")])
+
+    # 送信中にワーカーが停止し続ける（リース期限が切れても完了しない）
+    assert len(queue.claim(10, 0, max_attempts=2)) == 1
+    time.sleep(0.01)
+    assert queue.claim(10, 0, max_attempts=2)[0]["attempts"] == 2
+    time.sleep(0.01)
+
+    assert queue.claim(10, 0, max_attempts=2) == []
+    stats = queue.stats()
+    assert (stats["sending"], stats["failed"]) == (0, 1)
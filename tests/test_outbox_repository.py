@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.pool import StaticPool
+
+from app.infrastructure.outbox_repository import (
+    STATUS_FAILED,
+    STATUS_PENDING,
+    STATUS_PROCESSING,
+    OutboxRepository,
+    utcnow,
+)
+from app.infrastructure.tables import appointment_outbox
+
+MAX_ATTEMPTS = 3
+
+
+@pytest.fixture
+def repository():
+    repository = OutboxRepository()
+    repository.engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    appointment_outbox.create(repository.engine)
+    return repository
+
+
+def _insert(repository: OutboxRepository, message_id: str, status: str, attempts: int) -> None:
+    now = utcnow()
+    with repository.engine.begin() as conn:
+        conn.execute(
+            insert(appointment_outbox).values(
+                id=message_id,
+                message_type="appointment.register_event",
+                aggregate_id="form-1",
+                payload="{}",
+                status=status,
+                attempts=attempts,
+                available_at=now - timedelta(minutes=10),
+                # 処理中のものはリース期限切れ（ワーカーが処理中に停止した）
+                locked_until=now - timedelta(minutes=1) if status == STATUS_PROCESSING else None,
+                created_at=now - timedelta(minutes=10),
+            )
+        )
+
+
+def _status(repository: OutboxRepository, message_id: str) -> str:
+    with repository.engine.begin() as conn:
+        return conn.execute(select(appointment_outbox.c.status).where(appointment_outbox.c.id == message_id)).scalar()
+
+
+def test_expired_lease_is_reclaimed_below_max_attempts(repository):
+    _insert(repository, "crashed-once", STATUS_PROCESSING, 1)
+
+    claimed = repository.claim(10, 60, MAX_ATTEMPTS)
+
+    assert [(message.id, message.attempts) for message in claimed] == [("crashed-once", 2)]
+
+
+def test_expired_lease_at_max_attempts_is_dead_lettered(repository):
+    _insert(repository, "poison", STATUS_PROCESSING, MAX_ATTEMPTS)
+    _insert(repository, "pending", STATUS_PENDING, 0)
+
+    claimed = repository.claim(10, 60, MAX_ATTEMPTS)
+
+    assert [message.id for message in claimed] == ["pending"]
+    assert _status(repository, "poison") == STATUS_FAILED
+
+
+def test_claim_message_skips_messages_held_by_another_worker(repository):
+    _insert(repository, "pending", STATUS_PENDING, 0)
+
+    assert repository.claim_message("pending", 60, MAX_ATTEMPTS).attempts == 1
+    # リース中のため他のワーカーは取得できない
+    assert repository.claim_message("pending", 60, MAX_ATTEMPTS) is None
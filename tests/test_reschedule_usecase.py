@@ -0,0 +1,93 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+from app.infrastructure.notification_queue import NotificationQueue
+from app.schemas import RescheduleRequest
+from app.usecases.schedule.reschedule_usecase import RescheduleUsecase
+from app.workers.notification_dispatcher import NotificationDispatcher
+
+NEW_SLOT = "2025-01-11T10:00:00,2025-01-11T11:00:00"
+
+
+class CosmosStub:
+    def __init__(self):
+        self.form = {
+            "id": "form-1",
+            "_etag": '"v1"',
+            "schedule_interview_datetime": "2025-01-10T10:00:00,2025-01-10T11:00:00",
+            "event_ids": {"interviewer@example.com": "event-1"},
+        }
+
+    def get_form_data(self, cosmos_db_id: str, use_cache: bool = True) -> dict[str, Any]:
+        return dict(self.form)
+
+    def replace_form_data(self, form: dict[str, Any]) -> None:
+        pass
+
+
+class AppointmentRepositoryStub:
+    def get_appointment_by_cosmos_db_id(self, cosmos_db_id: str) -> Any:
+        return SimpleNamespace(
+            cosmos_db_id=cosmos_db_id,
+            employee_email="interviewer@example.com",
+            candidate_email="candidate@example.com",
+            candidate_lastname="青木",
+            candidate_firstname="駿介",
+            company="株式会社サンプル",
+        )
+
+    def update_schedule_interview_datetime(self, cosmos_db_id: str, new_schedule_interview_datetime: str) -> None:
+        pass
+
+
+class GraphStub:
+    def update_event_time(self, user_email: str, event_id: str, start: str, end: str) -> None:
+        pass
+
+
+def _usecase(tmp_path) -> tuple[RescheduleUsecase, NotificationQueue, CosmosStub]:
+    queue = NotificationQueue(str(tmp_path / "notifications.sqlite3"))
+    dispatcher = NotificationDispatcher(
+        queue,
+        None,
+        max_concurrency=1,
+        rate_per_second=1,
+        batch_size=10,
+        max_attempts=3,
+        lease_seconds=60,
+        poll_interval_seconds=1,
+        retention_seconds=3600,
+    )
+    cosmos = CosmosStub()
+    return RescheduleUsecase(cosmos, GraphStub(), AppointmentRepositoryStub(), dispatcher), queue, cosmos
+
+
+def _queued(queue: NotificationQueue) -> list[tuple[str, str]]:
+    rows = queue.claim(100, 60, max_attempts=8)
+    return sorted((row["recipient_email"], row["subject"]) for row in rows)
+
+
+def test_duplicate_reschedule_queues_each_mail_once(tmp_path):
+    usecase, queue, _ = _usecase(tmp_path)
+    request = RescheduleRequest(cosmos_db_id="form-1", schedule_interview_datetime=NEW_SLOT)
+
+    async def scenario():
+        # 二重送信（どちらも同じバージョンのフォームを読み込む）
+        await asyncio.gather(usecase.execute(request), usecase.execute(request))
+
+    asyncio.run(scenario())
+
+    recipients = [recipient for recipient, _ in _queued(queue)]
+    assert recipients == ["candidate@example.com", "interviewer@example.com"]
+
+
+def test_next_reschedule_of_the_same_form_is_sent(tmp_path):
+    usecase, queue, cosmos = _usecase(tmp_path)
+    request = RescheduleRequest(cosmos_db_id="form-1", schedule_interview_datetime=NEW_SLOT)
+
+    asyncio.run(usecase.execute(request))
+    cosmos.form["_etag"] = '"v2"'
+    asyncio.run(usecase.execute(request))
+
+    assert len(_queued(queue)) == 4
@@ -0,0 +1,37 @@
+from app.utils.search_index import SearchIndex, normalize
+
+DOCUMENTS = [
+    ["山田 太郎", "taro.yamada@example.com"],
+    ["佐藤 花子", "hanako.sato@example.com"],
+    ["Yamamoto Ken", "ken@example.com"],
+    ["田中 一郎", ""],
+]
+
+
+def test_normalize_unifies_width_and_case():
+    assert normalize("  ＹＡＭＡＤＡ ") == "yamada"
+    assert normalize(None) == ""
+
+
+def test_prefix_matches_come_before_substring_matches():
+    index = SearchIndex(DOCUMENTS)
+
+    # 「yama」は 2 の名前の前方一致、0 はメールアドレス（taro.yamada）の部分一致
+    assert index.search("yama") == [2, 0]
+    # 「田」は 3 の姓の前方一致、0 の部分一致
+    assert index.search("田") == [3, 0]
+
+
+def test_email_local_part_and_full_width_queries_match():
+    index = SearchIndex(DOCUMENTS)
+
+    assert index.search("hanako") == [1]
+    assert index.search("ＫＥＮ") == [2]
+    assert index.search("@example.com") == [0, 1, 2]
+
+
+def test_empty_query_returns_all_and_unknown_returns_none():
+    index = SearchIndex(DOCUMENTS)
+
+    assert index.search("  ") == [0, 1, 2, 3]
+    assert index.search("存在しない") == []
@@ -0,0 +1,90 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.infrastructure.graph_api as graph_api
+from app.config.config import get_config
+from app.container import Container
+from app.infrastructure.graph_api import GraphAPIClient
+from app.infrastructure.notification_queue import NotificationQueue
+from app.main import create_app
+from benchmarks.loadtest.fakes import (
+    FakeAppointmentRepository,
+    FakeCosmosDBClient,
+    FakeEmployeeDirectoryRepository,
+    FakeOutboxRepository,
+    Latency,
+)
+
+NO_LATENCY = Latency(0.01, 0.01)
+
+
+class TokenEndpointStub:
+    """Azure AD のトークン取得。available を切り替えるまで失敗する"""
+
+    def __init__(self):
+        self.available = False
+        self.calls = 0
+
+    def __call__(self) -> tuple[str, int]:
+        self.calls += 1
+        if not self.available:
+            raise ConnectionError("login.microsoftonline.com unreachable")
+        return "token", 3600
+
+
+@pytest.fixture
+def token_endpoint(monkeypatch):
+    stub = TokenEndpointStub()
+    monkeypatch.setattr(graph_api, "acquire_access_token", stub)
+    config = get_config()
+    monkeypatch.setitem(config, "SCHEMA_CHECK_ENABLED", False)
+    monkeypatch.setitem(config, "WARMUP_ENABLED", True)
+    monkeypatch.setitem(config, "CALENDAR_MIRROR_ENABLED", False)
+    return stub
+
+
+def _container_factory(tmp_path):
+    def build() -> Container:
+        return Container(
+            graph_api_client=GraphAPIClient(),
+            cosmos_db_client=FakeCosmosDBClient(NO_LATENCY),
+            appointment_repository=FakeAppointmentRepository(NO_LATENCY),
+            employee_directory_repository=FakeEmployeeDirectoryRepository(NO_LATENCY),
+            outbox_repository=FakeOutboxRepository(NO_LATENCY),
+            notification_queue=NotificationQueue(str(tmp_path / "notification_queue.sqlite3")),
+        )
+
+    return build
+
+
+def _wait_for_readiness(client: TestClient, status_code: int, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get("/readyz")
+        if response.status_code == status_code or time.monotonic() > deadline:
+            return response
+        time.sleep(0.05)
+
+
+def test_boots_while_graph_is_down_and_becomes_ready_after_recovery(token_endpoint, tmp_path):
+    with TestClient(create_app(_container_factory(tmp_path))) as client:
+        assert client.get("/healthz").status_code == 200
+
+        # 初回の失敗が記録されるまで待つ
+        deadline = time.monotonic() + 5
+        while token_endpoint.calls == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        step = response.json()["steps"]["graph_token"]
+        assert step["ok"] is False
+        assert step["required"] is True
+        assert "unreachable" in step["error"]
+
+        token_endpoint.available = True
+        response = _wait_for_readiness(client, 200)
+        assert response.status_code == 200
+        assert response.json()["steps"]["graph_token"]["ok"] is True
+        assert response.json()["steps"]["graph_token"]["attempts"] >= 2
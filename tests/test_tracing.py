@@ -0,0 +1,72 @@
+import json
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+import app.utils.tracing as tracing
+from app.middlewares.tracing_middleware import trace_requests
+from app.utils.tracing import JsonLinesExporter, Span, start_trace
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def trace_requests_middleware(request: Request, call_next):
+        return await trace_requests(request, call_next)
+
+    @app.get("/ping")
+    async def ping(request: Request):
+        return {"request_id": request.state.request_id}
+
+    return app
+
+
+def test_valid_request_id_is_kept():
+    with TestClient(_app()) as client:
+        response = client.get("/ping", headers={"X-Request-ID": "req-123.abc_DEF"})
+
+    assert response.headers["X-Request-ID"] == "req-123.abc_DEF"
+    assert response.json()["request_id"] == "req-123.abc_DEF"
+
+
+def test_invalid_or_oversized_request_id_is_replaced():
+    with TestClient(_app()) as client:
+        for header in ["../../etc/passwd", "a b", "x" * 65, "id\x1b[31m"]:
+            response = client.get("/ping", headers={"X-Request-ID": header})
+
+            request_id = response.headers["X-Request-ID"]
+            assert request_id != header
+            assert len(request_id) == 32
+            assert int(request_id, 16) >= 0
+
+
+def test_close_flushes_pending_spans_and_closes_the_file(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    stream = open(path, "a", encoding="utf-8")
+    exporter = JsonLinesExporter(stream)
+    exporter.export([Span(trace_id="t1", name=f"span-{i}") for i in range(100)])
+
+    exporter.close()
+
+    assert stream.closed
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 100
+    assert json.loads(lines[-1])["name"] == "span-99"
+
+
+def test_shutdown_tracing_closes_the_global_exporter(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setitem(tracing.config, "TRACE_EXPORTER", "file")
+    monkeypatch.setitem(tracing.config, "TRACE_FILE_PATH", str(path))
+    monkeypatch.setitem(tracing.config, "TRACE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(tracing, "_exporter", None)
+
+    with start_trace("job"):
+        pass
+    exporter = tracing._exporter
+    tracing.shutdown_tracing()
+
+    assert tracing._exporter is None
+    assert exporter.stream.closed
+    assert json.loads(path.read_text(encoding="utf-8"))["name"] == "job"